@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import zlib
+from typing import Any
+
+
+# Codec tag stored next to each blob so older rows stay readable if the codec ever changes.
+CODEC = 'zlib'
+_LEVEL = 6
+
+
+def encode_json(value: Any) -> tuple[str, bytes, int]:
+  """(sha256 of the canonical JSON, compressed bytes, uncompressed size) for `value`.
+
+  Keys are sorted so equal payloads hash identically regardless of the order the model emitted them.
+  """
+  raw = json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+  return hashlib.sha256(raw).hexdigest(), zlib.compress(raw, _LEVEL), len(raw)
+
+
+def decode_json(codec: str, data: bytes) -> Any:
+  if codec != CODEC:
+    raise ValueError(f'Unknown blob codec: {codec}')
+  return json.loads(zlib.decompress(data).decode('utf-8'))
+
+
+class StreamEncoder:
+  """encode_json's counterpart for raw bytes arriving in pieces (uploads): feed with update(), then finish()."""
+
+  def __init__(self) -> None:
+    self._hash = hashlib.sha256()
+    self._compressor = zlib.compressobj(_LEVEL)
+    self._parts: list[bytes] = []
+    self.size = 0
+
+  def update(self, data: bytes) -> None:
+    self._hash.update(data)
+    self._parts.append(self._compressor.compress(data))
+    self.size += len(data)
+
+  def finish(self) -> tuple[str, bytes, int]:
+    """(sha256 of the raw bytes, compressed bytes, uncompressed size)."""
+    self._parts.append(self._compressor.flush())
+    return self._hash.hexdigest(), b''.join(self._parts), self.size
+
+
+def decode_text(codec: str, data: bytes) -> str:
+  if codec != CODEC:
+    raise ValueError(f'Unknown blob codec: {codec}')
+  return zlib.decompress(data).decode('utf-8')
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, TypeVar
+
+from app.core.config import settings
+
+
+V = TypeVar('V')
+
+
+class TTLCache(Generic[V]):
+  """Small thread-safe LRU cache whose entries expire `ttl_seconds` after being stored."""
+
+  def __init__(self, *, ttl_seconds: float, max_entries: int):
+    self.ttl_seconds = ttl_seconds
+    self.max_entries = max_entries
+    self._items: OrderedDict[Hashable, tuple[float, V]] = OrderedDict()
+    self._lock = threading.Lock()
+
+  def get(self, key: Hashable) -> V | None:
+    with self._lock:
+      item = self._items.get(key)
+      if item is None:
+        return None
+      expires_at, value = item
+      if expires_at < time.monotonic():
+        del self._items[key]
+        return None
+      self._items.move_to_end(key)
+      return value
+
+  def set(self, key: Hashable, value: V) -> None:
+    if self.ttl_seconds <= 0 or self.max_entries <= 0:
+      return
+    with self._lock:
+      self._items[key] = (time.monotonic() + self.ttl_seconds, value)
+      self._items.move_to_end(key)
+      while len(self._items) > self.max_entries:
+        self._items.popitem(last=False)
+
+  def discard(self, predicate) -> None:
+    with self._lock:
+      for key in [k for k in self._items if predicate(k)]:
+        del self._items[key]
+
+  def clear(self) -> None:
+    with self._lock:
+      self._items.clear()
+
+
+# Serialized JSON bodies of GET responses, keyed by (tables, versions, path, query). Deliberately
+# per worker: the change-counter versions in the key come from the database, so a worker can never
+# serve a body another worker's write has invalidated.
+response_cache: TTLCache[bytes] = TTLCache(
+  ttl_seconds=settings.response_cache_ttl_seconds,
+  max_entries=settings.response_cache_max_entries,
+)
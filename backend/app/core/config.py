@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Any
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -19,6 +20,21 @@ class Settings(BaseSettings):
   )
 
   database_url: str | None = None
+  database_echo: bool = True
+  # WAL lets readers in other uvicorn workers proceed while one worker writes (SQLite only).
+  database_sqlite_wal: bool = True
+  # Lock file serializing schema upgrades across processes; defaults to <db file>.schema.lock.
+  schema_lock_path: str | None = None
+
+  # Cross-worker state (admission counter, in-flight dedup, breaker, Gemini context caches), see
+  # app/core/shared_state.py. Use sqlite:///... or redis://... when running more than one worker.
+  shared_state_url: str = 'memory://'
+  # Counters and claims expire this long after their last update, so a crashed worker cannot hold
+  # them forever.
+  shared_state_lease_seconds: float = 600.0
+  # Expired entries (e.g. stored Idempotency-Key responses) are deleted at most this often, on a write;
+  # Redis expires keys itself.
+  shared_state_purge_interval_seconds: float = 60.0
 
   auth_secret_key: str | None = None
   auth_algorithm: str = 'HS256'
@@ -28,6 +44,86 @@ class Settings(BaseSettings):
   gemini_api_key: str | None = None
   gemini_model: str = 'gemini-2.5-flash'
   gemini_endpoint: str = 'https://generativelanguage.googleapis.com/v1beta/models'
+  gemini_resolver_ttl_seconds: float = 600.0
+  gemini_timeout_seconds: float = 30.0
+  # JSON list of routing tiers, see services/routing.py; empty routes everything to gemini_model.
+  gemini_routing_rules: list[dict[str, Any]] = []
+
+  # Hedging: if a call is still pending after the gemini_hedge_percentile of recent latencies, send
+  # a second one (to gemini_hedge_model, or the same model) and keep whichever returns valid JSON first.
+  gemini_hedge_enabled: bool = False
+  gemini_hedge_model: str | None = None
+  gemini_hedge_percentile: float = 90.0
+  gemini_hedge_min_samples: int = 20
+  gemini_hedge_min_delay_seconds: float = 1.0
+  gemini_hedge_default_delay_seconds: float = 8.0
+
+  # Explicit context caching of the per-job prompt prefix (Gemini cachedContents). Prefixes below the
+  # model's minimum cacheable size are sent inline.
+  gemini_context_cache_enabled: bool = False
+  gemini_context_cache_ttl_seconds: float = 3600.0
+  gemini_context_cache_min_tokens: int = 1024
+
+  gemini_breaker_failure_threshold: int = 5
+  gemini_breaker_error_rate: float = 0.5
+  gemini_breaker_window: int = 20
+  gemini_breaker_min_calls: int = 10
+  gemini_breaker_cooldown_seconds: float = 30.0
+  gemini_breaker_half_open_probes: int = 1
+
+  # Daily token cap (prompt + output, UTC day) for batch re-analysis; 0 disables. Past
+  # analysis_budget_throttle_ratio of the cap, batch runs sleep between pairs; at the cap they pause.
+  analysis_daily_token_budget: int = 0
+  analysis_budget_throttle_ratio: float = 0.8
+  analysis_budget_throttle_delay_seconds: float = 5.0
+
+  # Concurrent analyses (requests + background re-runs) before POST /ai-analyses answers 503.
+  analysis_max_backlog: int = 32
+  analysis_retry_after_seconds: int = 10
+
+  # New resumes whose estimated Jaccard similarity to an earlier one reaches this are flagged as its
+  # duplicate; at most resume_dedup_max_candidates LSH candidates are compared per submission.
+  resume_dedup_threshold: float = 0.8
+  resume_dedup_max_candidates: int = 50
+  # Copy an earlier analysis instead of calling Gemini when the prompt is byte-for-byte the same.
+  analysis_reuse_enabled: bool = True
+
+  # Job-level interview questions (GET /jobs/{id}/questions): this many are generated once per version of
+  # the job. Questions from analyses are merged into the job's bank when their bigram Jaccard
+  # similarity to a stored one reaches question_dedup_threshold.
+  job_question_count: int = 8
+  job_question_max_output_tokens: int = 1024
+  question_dedup_threshold: float = 0.6
+
+  # Responses of POST /resumes and POST /ai-analyses sent with an Idempotency-Key are replayed to
+  # requests with the same key for this long (app/idempotency.py).
+  idempotency_ttl_seconds: float = 86400.0
+
+  # Rows fetched per round trip by the streaming exports (GET /jobs/{id}/export).
+  export_batch_size: int = 1000
+
+  # Interview transcripts: upload cap, map-step chunk size (estimated tokens), concurrent Gemini calls
+  # per transcript, and the model used (empty = GEMINI_MODEL).
+  transcript_max_bytes: int = 10_000_000
+  transcript_chunk_tokens: int = 3000
+  transcript_concurrency: int = 4
+  transcript_model: str = ''
+  transcript_max_output_tokens: int = 1024
+
+  # Change feed (GET /events): events kept for reconnecting clients, and how often a subscriber checks
+  # for events from other workers (its own worker's writes wake it immediately).
+  change_feed_retention: int = 10_000
+  change_feed_poll_seconds: float = 2.0
+  change_feed_keepalive_seconds: float = 15.0
+
+  response_cache_ttl_seconds: float = 5.0
+  response_cache_max_entries: int = 256
+  # Responses at least this large are gzip-compressed when the client accepts it; 0 disables.
+  gzip_minimum_size: int = 1024
+
+  # Extra skill synonyms as JSON, {"JavaScript": ["JS"], ...}, merged over services/skills.py's
+  # built-in list. Run `python -m app.migrations --reindex-skills` after changing it.
+  skill_aliases: dict[str, list[str]] = {}
 
   cors_origins: str = 'http://localhost:5173,http://localhost:5174'
 
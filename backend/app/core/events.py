@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class ChangeBroker:
+  """Wakes change-feed subscribers in this process as soon as a transaction with events commits.
+
+  The events themselves live in the change_events table (crud.record_change), which is what makes
+  sequence numbers durable and shared between workers; the broker only removes the polling delay
+  for writes made by this worker. Writers run in threadpool threads, subscribers on the event loop.
+  """
+
+  def __init__(self) -> None:
+    self._waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+    self._lock = threading.Lock()
+
+  def notify(self) -> None:
+    with self._lock:
+      waiters = list(self._waiters)
+    for loop, waiter in waiters:
+      try:
+        loop.call_soon_threadsafe(waiter.set)
+      except RuntimeError:
+        # Loop already closed (shutdown); nothing is listening any more.
+        pass
+
+  async def wait(self, timeout: float) -> bool:
+    """Sleep until the next local notify() or `timeout` seconds; True when notified."""
+    waiter = (asyncio.get_running_loop(), asyncio.Event())
+    with self._lock:
+      self._waiters.add(waiter)
+    try:
+      await asyncio.wait_for(waiter[1].wait(), timeout)
+      return True
+    except asyncio.TimeoutError:
+      return False
+    finally:
+      with self._lock:
+        self._waiters.discard(waiter)
+
+
+change_broker = ChangeBroker()
+
+# Set by crud.record_change on the session that wrote events; cleared when its transaction ends.
+PENDING_KEY = 'change_events_pending'
+
+
+@event.listens_for(Session, 'after_commit')
+def _notify_after_commit(session: Session) -> None:
+  if session.info.pop(PENDING_KEY, False):
+    change_broker.notify()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _drop_after_rollback(session: Session) -> None:
+  session.info.pop(PENDING_KEY, None)
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator
+
+
+@contextmanager
+def file_lock(path: str | Path, *, timeout: float = 120.0, poll_seconds: float = 0.1) -> Iterator[None]:
+  """Exclusive advisory lock on `path`, held across processes on the same machine.
+
+  Uses flock on POSIX and msvcrt on Windows; the OS drops the lock if the holder dies, so a crashed
+  worker never leaves it stuck. Raises TimeoutError after `timeout` seconds.
+  """
+  path = Path(path)
+  path.parent.mkdir(parents=True, exist_ok=True)
+  fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+  deadline = time.monotonic() + timeout
+  try:
+    while True:
+      try:
+        _lock(fd)
+        break
+      except OSError:
+        if time.monotonic() >= deadline:
+          raise TimeoutError(f'Could not acquire lock {path} within {timeout:.0f}s') from None
+        time.sleep(poll_seconds)
+    try:
+      yield
+    finally:
+      _unlock(fd)
+  finally:
+    os.close(fd)
+
+
+if os.name == 'nt':
+  import msvcrt
+
+  def _lock(fd: int) -> None:
+    os.lseek(fd, 0, os.SEEK_SET)
+    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+
+  def _unlock(fd: int) -> None:
+    os.lseek(fd, 0, os.SEEK_SET)
+    msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+else:
+  import fcntl
+
+  def _lock(fd: int) -> None:
+    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+  def _unlock(fd: int) -> None:
+    fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+@contextmanager
+def shared_lock(
+  names: Iterable[str],
+  *,
+  lease_seconds: float = 60.0,
+  timeout: float = 10.0,
+  poll_seconds: float = 0.02,
+) -> Iterator[None]:
+  """Exclusive locks on `names`, held across workers through shared state (app/core/shared_state.py).
+
+  Names are taken in sorted order so two holders of overlapping sets cannot deadlock. Each lock
+  expires after `lease_seconds`, so a crashed holder frees it eventually. Raises TimeoutError
+  (holding nothing) when the locks are not all acquired within `timeout` seconds.
+  """
+  from app.core.shared_state import shared_state
+
+  state = shared_state()
+  token = f'{os.getpid()}:{uuid.uuid4().hex}'
+  held: list[str] = []
+  deadline = time.monotonic() + timeout
+  try:
+    for name in sorted(set(names)):
+      key = f'lock:{name}'
+      while not state.add(key, token, ttl=lease_seconds):
+        if time.monotonic() >= deadline:
+          raise TimeoutError(f'Could not acquire lock {name} within {timeout:.0f}s')
+        time.sleep(poll_seconds)
+      held.append(key)
+    yield
+  finally:
+    for key in reversed(held):
+      # Only drop our own lock: past its lease it may belong to someone else.
+      state.delete_if(key, token)
@@ -1,14 +1,18 @@
 from __future__ import annotations
 
 import datetime as dt
-
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from functools import lru_cache
 
 from app.core.config import settings
 
 
-_pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
+# passlib/bcrypt and python-jose are comparatively slow to import; load them on first use so they
+# stay off the backend's cold-start path.
+@lru_cache(maxsize=1)
+def _pwd_context():
+  from passlib.context import CryptContext
+
+  return CryptContext(schemes=['bcrypt'], deprecated='auto')
 
 
 class AuthError(Exception):
@@ -16,11 +20,11 @@ class AuthError(Exception):
 
 
 def hash_password(password: str) -> str:
-  return _pwd_context.hash(password)
+  return _pwd_context().hash(password)
 
 
 def verify_password(password: str, password_hash: str) -> bool:
-  return _pwd_context.verify(password, password_hash)
+  return _pwd_context().verify(password, password_hash)
 
 
 def _require_secret() -> str:
@@ -39,6 +43,8 @@ def create_access_token(*, subject: str, user_id: int) -> str:
     'exp': expire,
     'type': 'access',
   }
+  from jose import jwt
+
   return jwt.encode(payload, _require_secret(), algorithm=settings.auth_algorithm)
 
 
@@ -52,10 +58,14 @@ def create_refresh_token(*, subject: str, user_id: int) -> str:
     'exp': expire,
     'type': 'refresh',
   }
+  from jose import jwt
+
   return jwt.encode(payload, _require_secret(), algorithm=settings.auth_algorithm)
 
 
 def decode_token(token: str) -> dict:
+  from jose import JWTError, jwt
+
   try:
     return jwt.decode(token, _require_secret(), algorithms=[settings.auth_algorithm])
   except JWTError as exc:
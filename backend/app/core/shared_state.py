@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from pathlib import Path
+
+from app.core.config import settings
+
+
+class SharedState(ABC):
+  """Small key/value store for state that must agree across uvicorn workers.
+
+  Values are strings; every key may carry a TTL in seconds (wall clock, so it means the same thing
+  in every process). Backends are chosen by `SHARED_STATE_URL`:
+
+  - `memory://` (default): per process, the behaviour of a single worker.
+  - `sqlite:///path/to/state.db`: a WAL-mode SQLite file shared by the workers on one machine.
+  - `redis://host:port/0`: any Redis-compatible server (needs the optional `redis` package).
+  """
+
+  @abstractmethod
+  def get(self, key: str) -> str | None: ...
+
+  @abstractmethod
+  def set(self, key: str, value: str, *, ttl: float | None = None) -> None: ...
+
+  @abstractmethod
+  def add(self, key: str, value: str, *, ttl: float | None = None) -> bool:
+    """Set `key` only if it is absent (or expired); True when this call stored it."""
+
+  @abstractmethod
+  def delete(self, key: str) -> None: ...
+
+  @abstractmethod
+  def delete_if(self, key: str, value: str) -> bool:
+    """Delete `key` only while it holds `value`, atomically; True when this call deleted it."""
+
+  @abstractmethod
+  def incr(self, key: str, delta: int = 1, *, ttl: float | None = None) -> int:
+    """Add `delta` to an integer value (missing counts as 0), refresh its TTL and return the result."""
+
+  def purge_expired(self) -> int:
+    """Delete every expired entry and return how many were deleted."""
+    return 0
+
+
+class _PurgingState(SharedState):
+  """Deletes expired entries every `shared_state_purge_interval_seconds`, on the next write.
+
+  A read only drops the key it reads, so keys that are written once and never read again (stored
+  Idempotency-Key responses, claims of finished work) would otherwise stay forever.
+  """
+
+  _next_purge = 0.0
+
+  def _maybe_purge(self) -> None:
+    now = time.monotonic()
+    if now < self._next_purge:
+      return
+    self._next_purge = now + settings.shared_state_purge_interval_seconds
+    self.purge_expired()
+
+
+class MemoryState(_PurgingState):
+  def __init__(self) -> None:
+    self._items: dict[str, tuple[str, float | None]] = {}
+    self._lock = threading.Lock()
+
+  def _live(self, key: str) -> str | None:
+    item = self._items.get(key)
+    if item is None:
+      return None
+    value, expires_at = item
+    if expires_at is not None and expires_at <= time.time():
+      del self._items[key]
+      return None
+    return value
+
+  @staticmethod
+  def _expiry(ttl: float | None) -> float | None:
+    return time.time() + ttl if ttl is not None else None
+
+  def get(self, key: str) -> str | None:
+    with self._lock:
+      return self._live(key)
+
+  def set(self, key: str, value: str, *, ttl: float | None = None) -> None:
+    self._maybe_purge()
+    with self._lock:
+      self._items[key] = (value, self._expiry(ttl))
+
+  def add(self, key: str, value: str, *, ttl: float | None = None) -> bool:
+    self._maybe_purge()
+    with self._lock:
+      if self._live(key) is not None:
+        return False
+      self._items[key] = (value, self._expiry(ttl))
+      return True
+
+  def delete(self, key: str) -> None:
+    with self._lock:
+      self._items.pop(key, None)
+
+  def delete_if(self, key: str, value: str) -> bool:
+    with self._lock:
+      if self._live(key) != value:
+        return False
+      del self._items[key]
+      return True
+
+  def incr(self, key: str, delta: int = 1, *, ttl: float | None = None) -> int:
+    with self._lock:
+      value = int(self._live(key) or 0) + delta
+      self._items[key] = (str(value), self._expiry(ttl))
+      return value
+
+  def purge_expired(self) -> int:
+    now = time.time()
+    with self._lock:
+      expired = [key for key, (_, expires_at) in self._items.items() if expires_at is not None and expires_at <= now]
+      for key in expired:
+        del self._items[key]
+    return len(expired)
+
+
+class SQLiteState(_PurgingState):
+  """Shared state in its own SQLite file (WAL), separate from the application database."""
+
+  def __init__(self, path: str) -> None:
+    self.path = path
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    self._local = threading.local()
+    with self._conn() as conn:
+      conn.execute('CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)')
+      conn.execute('CREATE INDEX IF NOT EXISTS kv_expires_at ON kv (expires_at)')
+
+  def _conn(self) -> sqlite3.Connection:
+    conn = getattr(self._local, 'conn', None)
+    if conn is None:
+      conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+      conn.execute('PRAGMA journal_mode=WAL')
+      conn.execute('PRAGMA synchronous=NORMAL')
+      self._local.conn = conn
+    return conn
+
+  @staticmethod
+  def _expiry(ttl: float | None) -> float | None:
+    return time.time() + ttl if ttl is not None else None
+
+  def get(self, key: str) -> str | None:
+    row = self._conn().execute(
+      'SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)',
+      (key, time.time()),
+    ).fetchone()
+    return row[0] if row else None
+
+  def set(self, key: str, value: str, *, ttl: float | None = None) -> None:
+    self._maybe_purge()
+    self._conn().execute(
+      'INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?) '
+      'ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at',
+      (key, value, self._expiry(ttl)),
+    )
+
+  def add(self, key: str, value: str, *, ttl: float | None = None) -> bool:
+    self._maybe_purge()
+    cursor = self._conn().execute(
+      'INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?) '
+      'ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at '
+      'WHERE kv.expires_at IS NOT NULL AND kv.expires_at <= ?',
+      (key, value, self._expiry(ttl), time.time()),
+    )
+    return cursor.rowcount == 1
+
+  def delete(self, key: str) -> None:
+    self._conn().execute('DELETE FROM kv WHERE key = ?', (key,))
+
+  def delete_if(self, key: str, value: str) -> bool:
+    cursor = self._conn().execute(
+      'DELETE FROM kv WHERE key = ? AND value = ? AND (expires_at IS NULL OR expires_at > ?)',
+      (key, value, time.time()),
+    )
+    return cursor.rowcount == 1
+
+  def incr(self, key: str, delta: int = 1, *, ttl: float | None = None) -> int:
+    row = self._conn().execute(
+      'INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?) '
+      'ON CONFLICT(key) DO UPDATE SET '
+      '  value = CASE WHEN kv.expires_at IS NOT NULL AND kv.expires_at <= ? THEN excluded.value '
+      '          ELSE CAST(kv.value AS INTEGER) + ? END, '
+      '  expires_at = excluded.expires_at '
+      'RETURNING value',
+      (key, str(delta), self._expiry(ttl), time.time(), delta),
+    ).fetchone()
+    return int(row[0])
+
+  def purge_expired(self) -> int:
+    cursor = self._conn().execute('DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?', (time.time(),))
+    return cursor.rowcount
+
+
+class RedisState(SharedState):
+  # Compare-and-delete in one round trip; Redis runs scripts atomically.
+  _DELETE_IF = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) else return 0 end"
+
+  def __init__(self, url: str) -> None:
+    import redis
+
+    self._redis = redis.Redis.from_url(url, decode_responses=True)
+    self._delete_if = self._redis.register_script(self._DELETE_IF)
+
+  @staticmethod
+  def _px(ttl: float | None) -> int | None:
+    return max(1, int(ttl * 1000)) if ttl is not None else None
+
+  def get(self, key: str) -> str | None:
+    return self._redis.get(key)
+
+  def set(self, key: str, value: str, *, ttl: float | None = None) -> None:
+    self._redis.set(key, value, px=self._px(ttl))
+
+  def add(self, key: str, value: str, *, ttl: float | None = None) -> bool:
+    return bool(self._redis.set(key, value, px=self._px(ttl), nx=True))
+
+  def delete(self, key: str) -> None:
+    self._redis.delete(key)
+
+  def delete_if(self, key: str, value: str) -> bool:
+    return bool(self._delete_if(keys=[key], args=[value]))
+
+  def incr(self, key: str, delta: int = 1, *, ttl: float | None = None) -> int:
+    pipe = self._redis.pipeline()
+    pipe.incrby(key, delta)
+    if ttl is not None:
+      pipe.pexpire(key, self._px(ttl))
+    return int(pipe.execute()[0])
+
+
+@lru_cache(maxsize=1)
+def shared_state() -> SharedState:
+  url = settings.shared_state_url
+  if url.startswith('sqlite:///'):
+    return SQLiteState(url.removeprefix('sqlite:///'))
+  if url.startswith(('redis://', 'rediss://', 'unix://')):
+    return RedisState(url)
+  if url.startswith('memory://'):
+    return MemoryState()
+  raise ValueError(f'Unsupported SHARED_STATE_URL: {url}')
@@ -1,14 +1,88 @@
 from __future__ import annotations
 
-from sqlalchemy import select
+import datetime as dt
+from typing import Iterable, Iterator
+
+from sqlalchemy import and_, case, delete, exists, func, insert, or_, select, update
+from sqlalchemy.engine import Row, RowMapping
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app import models
-from app.schemas import AIAnalysisOut, InterviewCreate, InterviewUpdate, JobCreate, JobUpdate, ResumeCreate
+from app.core.blobs import CODEC, encode_json
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.events import PENDING_KEY
+from app.services.dedup import (
+  Fingerprint,
+  band_hashes,
+  fingerprint,
+  jaccard,
+  pack_signature,
+  question_shingles,
+  similarity,
+  unpack_signature,
+)
+from app.services.scheduling import to_utc_naive
+from app.services.skills import canonical_skill, skill_key
+from app.schemas import (
+  INTERVIEW_MAX_MINUTES,
+  AIAnalysisOut,
+  InterviewCreate,
+  InterviewUpdate,
+  JobCreate,
+  JobUpdate,
+  ResumeCreate,
+)
+
 
+# Columns selected by the list endpoints (exactly the fields of the matching *ListOut schema). Rows
+# come back as plain mappings, so large lists build no ORM objects and never read the long text /
+# JSON bodies, which only the detail endpoints load.
+_JOB_LIST_COLUMNS = (
+  models.Job.id,
+  models.Job.title,
+  models.Job.department,
+  models.Job.required_skills,
+  models.Job.nice_to_have,
+  models.Job.status,
+  models.Job.experience_level,
+  models.Job.education,
+  models.Job.ai_resume_matching_enabled,
+  models.Job.ai_question_gen_enabled,
+  models.Job.created_at,
+)
+_RESUME_LIST_COLUMNS = (
+  models.Resume.id,
+  models.Resume.candidate_name,
+  models.Resume.job_id,
+  models.Resume.status,
+  models.Resume.education,
+  models.Resume.years_exp,
+  models.Resume.skills,
+  models.Resume.submitted_at,
+  models.Resume.duplicate_of_id,
+)
+_ANALYSIS_LIST_COLUMNS = (
+  models.AIAnalysis.id,
+  models.AIAnalysis.job_id,
+  models.AIAnalysis.resume_id,
+  models.AIAnalysis.created_at,
+  models.AIAnalysis.model,
+  models.AIAnalysis.prompt_version,
+  models.AIAnalysis.overall_score,
+  models.AIAnalysis.professional_score,
+  models.AIAnalysis.communication_score,
+  models.AIAnalysis.problem_solving_score,
+  models.AIAnalysis.is_mock,
+  models.AIAnalysis.route_tier,
+  models.AIAnalysis.latency_ms,
+)
 
-def list_jobs(db: Session) -> list[models.Job]:
-  return list(db.scalars(select(models.Job).order_by(models.Job.created_at.desc())))
+
+def list_jobs(db: Session) -> list[RowMapping]:
+  stmt = select(*_JOB_LIST_COLUMNS).order_by(models.Job.created_at.desc())
+  return list(db.execute(stmt).mappings())
 
 
 def get_job(db: Session, job_id: int) -> models.Job | None:
@@ -18,6 +92,11 @@ def get_job(db: Session, job_id: int) -> models.Job | None:
 def create_job(db: Session, data: JobCreate) -> models.Job:
   job = models.Job(**data.model_dump())
   db.add(job)
+  db.flush()
+  _init_job_stats(db, job.id)
+  _index_job_skills(db, job.id, job.required_skills, job.nice_to_have)
+  mark_changed(db, 'jobs')
+  record_change(db, 'job', job.id, 'created', job_id=job.id)
   db.commit()
   db.refresh(job)
   return job
@@ -28,21 +107,64 @@ def update_job(db: Session, job: models.Job, data: JobUpdate) -> models.Job:
   for k, v in patch.items():
     setattr(job, k, v)
   db.add(job)
+  if 'required_skills' in patch or 'nice_to_have' in patch:
+    _index_job_skills(db, job.id, job.required_skills, job.nice_to_have)
+  mark_changed(db, 'jobs')
+  record_change(db, 'job', job.id, 'updated', job_id=job.id)
   db.commit()
   db.refresh(job)
   return job
 
 
 def delete_job(db: Session, job: models.Job) -> None:
+  # Resumes of other jobs may point at this job's resumes as their first submission.
+  db.execute(
+    update(models.Resume)
+    .where(models.Resume.duplicate_of_id.in_(select(models.Resume.id).where(models.Resume.job_id == job.id)))
+    .values(duplicate_of_id=None, duplicate_similarity=None)
+    .execution_options(synchronize_session=False)
+  )
   db.delete(job)
+  db.flush()
+  prune_raw_responses(db)
+  mark_changed(db, 'jobs', 'resumes', 'ai_analyses', 'interviews')
+  # Its resumes, analyses and interviews go with it; subscribers drop them by job_id.
+  record_change(db, 'job', job.id, 'deleted', job_id=job.id)
   db.commit()
 
 
-def list_resumes(db: Session, job_id: int | None = None) -> list[models.Resume]:
-  stmt = select(models.Resume).order_by(models.Resume.submitted_at.desc())
+def list_resumes(db: Session, job_id: int | None = None, skill: str | None = None) -> list[RowMapping]:
+  """Resume list rows plus the job title and latest analysis id / overall score, in one query.
+
+  `skill` filters through the resume_skills index, so any alias of a skill matches.
+  """
+  a = models.AIAnalysis
+  latest = select(
+    a.resume_id,
+    a.id,
+    a.overall_score,
+    func.row_number().over(partition_by=a.resume_id, order_by=(a.created_at.desc(), a.id.desc())).label('rank'),
+  ).subquery()
+  stmt = (
+    select(
+      *_RESUME_LIST_COLUMNS,
+      models.Job.title.label('applied_job_title'),
+      latest.c.id.label('analysis_id'),
+      latest.c.overall_score.label('ai_match_score'),
+    )
+    .outerjoin(models.Job, models.Job.id == models.Resume.job_id)
+    .outerjoin(latest, and_(latest.c.resume_id == models.Resume.id, latest.c.rank == 1))
+    .order_by(models.Resume.submitted_at.desc())
+  )
   if job_id is not None:
     stmt = stmt.where(models.Resume.job_id == job_id)
-  return list(db.scalars(stmt))
+  if skill is not None:
+    skill_id = find_skill_id(db, skill)
+    if skill_id is None:
+      return []
+    rs = models.ResumeSkill
+    stmt = stmt.join(rs, and_(rs.resume_id == models.Resume.id, rs.skill_id == skill_id))
+  return list(db.execute(stmt).mappings())
 
 
 def get_resume(db: Session, resume_id: int) -> models.Resume | None:
@@ -52,6 +174,12 @@ def get_resume(db: Session, resume_id: int) -> models.Resume | None:
 def create_resume(db: Session, data: ResumeCreate) -> models.Resume:
   resume = models.Resume(**data.model_dump())
   db.add(resume)
+  db.flush()
+  _index_resume_skills(db, resume.id, resume.skills)
+  resume.duplicate_of_id, resume.duplicate_similarity = _index_resume_fingerprint(db, resume.id, resume.resume_text)
+  track_resume_status(db, resume.job_id, None, resume.status)
+  mark_changed(db, 'resumes')
+  record_change(db, 'resume', resume.id, 'created', job_id=resume.job_id)
   db.commit()
   db.refresh(resume)
   return resume
@@ -76,13 +204,250 @@ def get_latest_analysis_for_resume(db: Session, resume_id: int) -> models.AIAnal
   return db.scalars(stmt).first()
 
 
-def list_analyses(db: Session, job_id: int | None = None, resume_id: int | None = None) -> list[models.AIAnalysis]:
-  stmt = select(models.AIAnalysis).order_by(models.AIAnalysis.created_at.desc())
+def list_analyses(db: Session, job_id: int | None = None, resume_id: int | None = None) -> list[RowMapping]:
+  stmt = select(*_ANALYSIS_LIST_COLUMNS).order_by(models.AIAnalysis.created_at.desc())
   if job_id is not None:
     stmt = stmt.where(models.AIAnalysis.job_id == job_id)
   if resume_id is not None:
     stmt = stmt.where(models.AIAnalysis.resume_id == resume_id)
-  return list(db.scalars(stmt))
+  return list(db.execute(stmt).mappings())
+
+
+def find_reusable_analysis(db: Session, input_fingerprint: str, *, exclude_id: int | None = None) -> models.AIAnalysis | None:
+  """Latest real (non-mock) analysis generated from exactly the prompt with this fingerprint."""
+  a = models.AIAnalysis
+  stmt = select(a).where(a.input_fingerprint == input_fingerprint, a.is_mock.is_(False))
+  if exclude_id is not None:
+    stmt = stmt.where(a.id != exclude_id)
+  return db.scalars(stmt.order_by(a.created_at.desc(), a.id.desc()).limit(1)).first()
+
+
+def list_job_prompt_inputs(db: Session, job_id: int | None = None) -> list[Row]:
+  """The job columns the analysis prompt prefix is built from, without loading Job objects."""
+  j = models.Job
+  stmt = select(j.id, j.title, j.department, j.description, j.required_skills, j.nice_to_have)
+  if job_id is not None:
+    stmt = stmt.where(j.id == job_id)
+  return list(db.execute(stmt))
+
+
+def list_stale_analyses(db: Session, job_prompt_hashes: dict[int, str], *, include_mock: bool) -> list[Row]:
+  """(id, job_id, resume_id) of analyses of these jobs whose inputs changed, highest-priority first.
+
+  `job_prompt_hashes` maps each job to its current prompt hash; the resume side is compared against
+  resume_fingerprints. Priority: analyses known to be outdated before ones from before the hashes
+  were stored, then previously best-scoring candidates, mock results before real ones, oldest first.
+  """
+  if not job_prompt_hashes:
+    return []
+  a, fp = models.AIAnalysis, models.ResumeFingerprint
+  current_job = case(job_prompt_hashes, value=a.job_id, else_='')
+  outdated = [a.job_prompt_hash != current_job, a.resume_content_hash != func.coalesce(fp.content_hash, '')]
+  if include_mock:
+    outdated.append(a.is_mock.is_(True))
+  stmt = (
+    select(a.id, a.job_id, a.resume_id)
+    .outerjoin(fp, fp.resume_id == a.resume_id)
+    .where(a.job_id.in_(job_prompt_hashes), or_(*outdated))
+    .order_by((a.job_prompt_hash == '').asc(), a.overall_score.desc(), a.is_mock.desc(), a.created_at.asc(), a.id.asc())
+  )
+  return list(db.execute(stmt))
+
+
+def iter_job_export_rows(db: Session, job_id: int, *, batch_size: int = 1000) -> Iterator[RowMapping]:
+  """Every resume of the job with its latest analysis and latest interview, best score first.
+
+  One query streamed `batch_size` rows at a time (server-side cursor where the driver has one), so
+  an export holds a single batch of plain rows in memory, never ORM objects.
+  """
+  a, i, r = models.AIAnalysis, models.Interview, models.Resume
+  analysis = select(
+    a.resume_id,
+    a.overall_score,
+    a.professional_score,
+    a.communication_score,
+    a.problem_solving_score,
+    a.summary,
+    a.strengths,
+    a.risks,
+    a.created_at,
+    func.row_number().over(partition_by=a.resume_id, order_by=(a.created_at.desc(), a.id.desc())).label('rank'),
+  ).where(a.job_id == job_id).subquery()
+  interview = select(
+    i.resume_id,
+    i.status,
+    i.scheduled_at,
+    i.interviewer,
+    i.decision,
+    i.rating,
+    func.row_number()
+    .over(partition_by=i.resume_id, order_by=(func.coalesce(i.scheduled_at, i.created_at).desc(), i.id.desc()))
+    .label('rank'),
+  ).where(i.job_id == job_id).subquery()
+  stmt = (
+    select(
+      r.id.label('resume_id'),
+      r.candidate_name,
+      r.status,
+      r.submitted_at,
+      r.education,
+      r.years_exp,
+      r.skills,
+      r.duplicate_of_id,
+      analysis.c.overall_score,
+      analysis.c.professional_score,
+      analysis.c.communication_score,
+      analysis.c.problem_solving_score,
+      analysis.c.summary,
+      analysis.c.strengths,
+      analysis.c.risks,
+      analysis.c.created_at.label('analyzed_at'),
+      interview.c.status.label('interview_status'),
+      interview.c.scheduled_at.label('interview_scheduled_at'),
+      interview.c.interviewer,
+      interview.c.decision,
+      interview.c.rating,
+    )
+    .outerjoin(analysis, and_(analysis.c.resume_id == r.id, analysis.c.rank == 1))
+    .outerjoin(interview, and_(interview.c.resume_id == r.id, interview.c.rank == 1))
+    .where(r.job_id == job_id)
+    .order_by(analysis.c.overall_score.desc().nulls_last(), r.id)
+  )
+  return iter(db.execute(stmt.execution_options(yield_per=batch_size)).mappings())
+
+
+def store_raw_response(db: Session, payload: dict) -> str:
+  """Store `payload` compressed in analysis_blobs (once per distinct content) and return its hash."""
+  digest, data, size = encode_json(payload)
+  if db.get(models.AnalysisBlob, digest) is not None:
+    return digest
+  try:
+    with db.begin_nested():
+      db.add(models.AnalysisBlob(hash=digest, codec=CODEC, size=size, data=data))
+  except IntegrityError:
+    # Stored concurrently by another writer; the content is identical.
+    pass
+  return digest
+
+
+def prune_raw_responses(db: Session, hashes: list[str] | None = None) -> int:
+  """Delete blobs no analysis references any more (limited to `hashes` when given)."""
+  blob = models.AnalysisBlob
+  stmt = delete(blob).where(~exists().where(models.AIAnalysis.raw_response_hash == blob.hash))
+  if hashes is not None:
+    if not hashes:
+      return 0
+    stmt = stmt.where(blob.hash.in_(hashes))
+  return db.execute(stmt.execution_options(synchronize_session=False)).rowcount
+
+
+def routing_stats(db: Session) -> list[tuple[str, str, int, float, int, int]]:
+  """(route_tier, model, count, avg_latency_ms, max_latency_ms, sum_estimated_prompt_tokens) for real analyses.
+
+  Copies of an earlier analysis (reused_from_id) made no Gemini call, so they are left out.
+  """
+  a = models.AIAnalysis
+  stmt = (
+    select(a.route_tier, a.model, func.count(), func.avg(a.latency_ms), func.max(a.latency_ms), func.sum(a.estimated_prompt_tokens))
+    .where(a.is_mock.is_(False), a.reused_from_id.is_(None))
+    .group_by(a.route_tier, a.model)
+    .order_by(a.route_tier, a.model)
+  )
+  return [(tier, model, n, float(avg or 0), int(mx or 0), int(tokens or 0)) for tier, model, n, avg, mx, tokens in db.execute(stmt)]
+
+
+# --- Token usage ------------------------------------------------------------------------------------
+
+
+def record_usage(
+  db: Session,
+  *,
+  day: dt.date,
+  job_id: int,
+  user_id: int | None,
+  prompt_tokens: int,
+  output_tokens: int,
+  cached_tokens: int,
+  latency_ms: int,
+  analyses: int = 1,
+) -> None:
+  """Add one analysis (`analyses=0` for other Gemini calls) to the UsageDaily row for (day, job, user).
+
+  Runs inside the caller's transaction.
+  """
+  usage = models.UsageDaily
+  key = (usage.day == day, usage.job_id == job_id, usage.user_id == (user_id or 0))
+  stmt = (
+    update(usage)
+    .where(*key)
+    .values(
+      analyses=usage.analyses + analyses,
+      prompt_tokens=usage.prompt_tokens + prompt_tokens,
+      output_tokens=usage.output_tokens + output_tokens,
+      cached_tokens=usage.cached_tokens + cached_tokens,
+      latency_ms=usage.latency_ms + latency_ms,
+    )
+    .execution_options(synchronize_session=False)
+  )
+  if db.execute(stmt).rowcount:
+    return
+  try:
+    with db.begin_nested():
+      db.add(
+        usage(
+          day=day,
+          job_id=job_id,
+          user_id=user_id or 0,
+          analyses=analyses,
+          prompt_tokens=prompt_tokens,
+          output_tokens=output_tokens,
+          cached_tokens=cached_tokens,
+          latency_ms=latency_ms,
+        )
+      )
+  except IntegrityError:
+    # Another writer created the row between our UPDATE and INSERT.
+    db.execute(stmt)
+
+
+def tokens_used_on(db: Session, day: dt.date) -> int:
+  """Prompt + output tokens billed on `day` across all jobs and users."""
+  usage = models.UsageDaily
+  total = db.scalar(select(func.sum(usage.prompt_tokens + usage.output_tokens)).where(usage.day == day))
+  return int(total or 0)
+
+
+_USAGE_GROUPS = {
+  'day': models.UsageDaily.day,
+  'job': models.UsageDaily.job_id,
+  'user': models.UsageDaily.user_id,
+}
+
+
+def usage_summary(
+  db: Session,
+  *,
+  group_by: str = 'day',
+  since: dt.date | None = None,
+  until: dt.date | None = None,
+) -> list[tuple[object, int, int, int, int, int]]:
+  """(key, analyses, prompt_tokens, output_tokens, cached_tokens, latency_ms_sum) grouped by day/job/user."""
+  usage = models.UsageDaily
+  column = _USAGE_GROUPS[group_by]
+  stmt = select(
+    column,
+    func.sum(usage.analyses),
+    func.sum(usage.prompt_tokens),
+    func.sum(usage.output_tokens),
+    func.sum(usage.cached_tokens),
+    func.sum(usage.latency_ms),
+  )
+  if since is not None:
+    stmt = stmt.where(usage.day >= since)
+  if until is not None:
+    stmt = stmt.where(usage.day <= until)
+  stmt = stmt.group_by(column).order_by(column)
+  return [(key, *(int(v or 0) for v in rest)) for key, *rest in db.execute(stmt)]
 
 
 def list_interviews(
@@ -90,48 +455,414 @@ def list_interviews(
   job_id: int | None = None,
   resume_id: int | None = None,
   status: str | None = None,
-) -> list[models.Interview]:
-  stmt = select(models.Interview).order_by(models.Interview.created_at.desc())
+) -> list[RowMapping]:
+  """Interview rows with the job title/department and candidate name joined in."""
+  stmt = (
+    select(
+      *models.Interview.__table__.columns,
+      models.Job.title.label('job_title'),
+      models.Job.department.label('department'),
+      models.Resume.candidate_name.label('candidate_name'),
+    )
+    .outerjoin(models.Job, models.Job.id == models.Interview.job_id)
+    .outerjoin(models.Resume, models.Resume.id == models.Interview.resume_id)
+    .order_by(models.Interview.created_at.desc())
+  )
   if job_id is not None:
     stmt = stmt.where(models.Interview.job_id == job_id)
   if resume_id is not None:
     stmt = stmt.where(models.Interview.resume_id == resume_id)
   if status is not None:
     stmt = stmt.where(models.Interview.status == status)
-  return list(db.scalars(stmt))
+  return list(db.execute(stmt).mappings())
 
 
 def get_interview(db: Session, interview_id: int) -> models.Interview | None:
   return db.get(models.Interview, interview_id)
 
 
-def create_interview(db: Session, data: InterviewCreate) -> models.Interview:
-  interview = models.Interview(**data.model_dump())
-  db.add(interview)
+def _set_interview_end(interview: models.Interview) -> None:
+  interview.scheduled_at = to_utc_naive(interview.scheduled_at)
+  interview.ends_at = (
+    interview.scheduled_at + dt.timedelta(minutes=interview.duration_minutes) if interview.scheduled_at else None
+  )
+
+
+def list_bookings(
+  db: Session,
+  interviewers: Iterable[str],
+  start: dt.datetime,
+  end: dt.datetime,
+  *,
+  exclude_ids: Iterable[int] = (),
+) -> list[RowMapping]:
+  """Non-canceled interviews of `interviewers` overlapping [start, end), per interviewer by start time.
+
+  An overlapping interview starts before `end` and at most INTERVIEW_MAX_MINUTES before `start`, so
+  this reads a bounded range of ix_interviews_interviewer_time whatever the history size.
+  """
+  interview = models.Interview
+  stmt = (
+    select(interview.id, interview.resume_id, interview.interviewer, interview.scheduled_at, interview.ends_at)
+    .where(
+      interview.interviewer.in_(list(interviewers)),
+      interview.scheduled_at >= start - dt.timedelta(minutes=INTERVIEW_MAX_MINUTES),
+      interview.scheduled_at < end,
+      interview.ends_at > start,
+      interview.status != 'canceled',
+    )
+    .order_by(interview.interviewer, interview.scheduled_at)
+  )
+  exclude = list(exclude_ids)
+  if exclude:
+    stmt = stmt.where(interview.id.not_in(exclude))
+  return list(db.execute(stmt).mappings())
+
+
+def find_interview_conflicts(
+  db: Session,
+  *,
+  interviewer: str,
+  scheduled_at: dt.datetime | None,
+  duration_minutes: int,
+  status: str = 'scheduled',
+  exclude_ids: Iterable[int] = (),
+) -> list[RowMapping]:
+  """Interviews the given slot would double-book (none for unscheduled or canceled interviews)."""
+  if not interviewer.strip() or scheduled_at is None or status == 'canceled':
+    return []
+  start = to_utc_naive(scheduled_at)
+  return list_bookings(db, [interviewer], start, start + dt.timedelta(minutes=duration_minutes), exclude_ids=exclude_ids)
+
+
+def get_interviews(db: Session, ids: Iterable[int]) -> dict[int, models.Interview]:
+  return {item.id: item for item in db.scalars(select(models.Interview).where(models.Interview.id.in_(list(ids))))}
+
+
+def get_resume_refs(db: Session, ids: Iterable[int]) -> dict[int, RowMapping]:
+  """id, job_id, status and candidate_name of each existing resume, with its job's title/department."""
+  stmt = (
+    select(
+      models.Resume.id,
+      models.Resume.job_id,
+      models.Resume.status,
+      models.Resume.candidate_name,
+      models.Job.title.label('job_title'),
+      models.Job.department.label('department'),
+    )
+    .join(models.Job, models.Job.id == models.Resume.job_id)
+    .where(models.Resume.id.in_(list(ids)))
+  )
+  return {row['id']: row for row in db.execute(stmt).mappings()}
+
+
+def _mark_resumes_interviewed(db: Session, resume_ids: Iterable[int]) -> None:
+  """Move the resumes to 'interviewed' with one UPDATE, adjusting the job counters per (job, old status)."""
+  resume = models.Resume
+  rows = db.execute(
+    select(resume.id, resume.job_id, resume.status).where(resume.id.in_(set(resume_ids)), resume.status != 'interviewed')
+  ).all()
+  if not rows:
+    return
+  db.execute(
+    update(resume)
+    .where(resume.id.in_([row.id for row in rows]))
+    .values(status='interviewed')
+    .execution_options(synchronize_session='fetch')
+  )
+  moved: dict[tuple[int, str], int] = {}
+  for row in rows:
+    moved[(row.job_id, row.status)] = moved.get((row.job_id, row.status), 0) + 1
+    record_change(db, 'resume', row.id, 'updated', job_id=row.job_id)
+  for (job_id, old_status), count in moved.items():
+    track_resume_status(db, job_id, old_status, 'interviewed', count=count)
+  mark_changed(db, 'resumes')
+
+
+def _track_interview_statuses(db: Session, changes: Iterable[tuple[int, str | None, str | None]]) -> None:
+  """track_interview_status for many (job_id, old, new) changes, one counter update per distinct change."""
+  counts: dict[tuple[int, str | None, str | None], int] = {}
+  for change in changes:
+    counts[change] = counts.get(change, 0) + 1
+  for (job_id, old, new), count in counts.items():
+    track_interview_status(db, job_id, old, new, count=count)
+
+
+def create_interviews(db: Session, items: list[InterviewCreate]) -> list[models.Interview]:
+  """Insert the interviews in one transaction; resumes of ones recorded as completed move to 'interviewed'."""
+  interviews = [models.Interview(**data.model_dump()) for data in items]
+  for interview in interviews:
+    _set_interview_end(interview)
+  db.add_all(interviews)
+  db.flush()
+  _track_interview_statuses(db, ((i.job_id, None, i.status) for i in interviews))
+  _mark_resumes_interviewed(db, (i.resume_id for i in interviews if i.status == 'completed'))
+  mark_changed(db, 'interviews')
+  for interview in interviews:
+    record_change(db, 'interview', interview.id, 'created', job_id=interview.job_id)
   db.commit()
-  db.refresh(interview)
-  return interview
+  for interview in interviews:
+    db.refresh(interview)
+  return interviews
 
 
-def update_interview(db: Session, interview: models.Interview, data: InterviewUpdate) -> models.Interview:
+def create_interview(db: Session, data: InterviewCreate) -> models.Interview:
+  return create_interviews(db, [data])[0]
+
+
+def interview_patch(data: InterviewUpdate) -> dict:
+  """The fields an update sets; an explicit null duration means "unchanged" (the column is required)."""
   patch = data.model_dump(exclude_unset=True)
-  for k, v in patch.items():
-    setattr(interview, k, v)
-  # manual updated_at
-  import datetime as dt
+  if patch.get('duration_minutes') is None:
+    patch.pop('duration_minutes', None)
+  return patch
+
 
-  interview.updated_at = dt.datetime.utcnow()
-  db.add(interview)
+def update_interviews(db: Session, changes: list[tuple[models.Interview, dict]]) -> list[models.Interview]:
+  """Apply (interview, patch) pairs in one transaction, e.g. from interview_patch().
+
+  Resumes of interviews whose patch marks them completed move to 'interviewed'.
+  """
+  now = dt.datetime.utcnow()
+  statuses = []
+  for interview, patch in changes:
+    old_status = interview.status
+    for k, v in patch.items():
+      setattr(interview, k, v)
+    _set_interview_end(interview)
+    interview.updated_at = now
+    statuses.append((interview.job_id, old_status, interview.status))
+  _track_interview_statuses(db, statuses)
+  _mark_resumes_interviewed(
+    db, (interview.resume_id for interview, patch in changes if patch.get('status') == 'completed')
+  )
+  mark_changed(db, 'interviews')
+  for interview, _ in changes:
+    record_change(db, 'interview', interview.id, 'updated', job_id=interview.job_id)
   db.commit()
-  db.refresh(interview)
-  return interview
+  for interview, _ in changes:
+    db.refresh(interview)
+  return [interview for interview, _ in changes]
+
+
+def update_interview(db: Session, interview: models.Interview, data: InterviewUpdate) -> models.Interview:
+  return update_interviews(db, [(interview, interview_patch(data))])[0]
 
 
 def delete_interview(db: Session, interview: models.Interview) -> None:
+  track_interview_status(db, interview.job_id, interview.status, None)
   db.delete(interview)
+  mark_changed(db, 'interviews')
+  record_change(db, 'interview', interview.id, 'deleted', job_id=interview.job_id)
+  db.commit()
+
+
+def get_transcript(db: Session, interview_id: int) -> models.InterviewTranscript | None:
+  return db.get(models.InterviewTranscript, interview_id)
+
+
+def list_transcript_chunks(db: Session, interview_id: int) -> list[models.TranscriptChunk]:
+  stmt = select(models.TranscriptChunk).where(models.TranscriptChunk.interview_id == interview_id).order_by(models.TranscriptChunk.idx)
+  return list(db.scalars(stmt))
+
+
+def count_transcript_chunks_done(db: Session, interview_id: int) -> int:
+  chunk = models.TranscriptChunk
+  return db.scalar(select(func.count()).where(chunk.interview_id == interview_id, chunk.summary.is_not(None))) or 0
+
+
+def store_transcript(
+  db: Session,
+  interview: models.Interview,
+  *,
+  digest: str,
+  data: bytes,
+  size: int,
+  chunk_count: int,
+) -> models.InterviewTranscript:
+  """Create or replace the interview's transcript, discarding the previous chunk summaries and evaluation."""
+  transcript = get_transcript(db, interview.id)
+  if transcript is None:
+    transcript = models.InterviewTranscript(interview_id=interview.id)
+    db.add(transcript)
+  else:
+    db.execute(delete(models.TranscriptChunk).where(models.TranscriptChunk.interview_id == interview.id))
+  transcript.codec = CODEC
+  transcript.sha256 = digest
+  transcript.data = data
+  transcript.size = size
+  transcript.uploaded_at = dt.datetime.utcnow()
+  transcript.status = 'pending'
+  transcript.chunk_count = chunk_count
+  transcript.evaluation = {}
+  transcript.model = ''
+  transcript.is_mock = False
+  transcript.prompt_tokens = 0
+  transcript.output_tokens = 0
+  transcript.error = ''
+  transcript.summarized_at = None
+  mark_changed(db, 'interviews')
+  record_change(db, 'interview', interview.id, 'updated', job_id=interview.job_id)
+  db.commit()
+  db.refresh(transcript)
+  return transcript
+
+
+def get_question_bank(db: Session, job_id: int) -> models.JobQuestionBank | None:
+  return db.get(models.JobQuestionBank, job_id)
+
+
+def list_job_questions(db: Session, job_id: int, *, resume_id: int | None = None) -> list[RowMapping]:
+  """The job-level questions, then (with `resume_id`) the candidate questions linked to that resume."""
+  question = models.JobQuestion
+  wanted = question.source == 'job'
+  if resume_id is not None:
+    linked = select(models.JobQuestionResume.question_id).where(models.JobQuestionResume.resume_id == resume_id)
+    wanted = or_(wanted, question.id.in_(linked))
+  stmt = (
+    select(question.id, question.source, question.category, question.question, question.times_suggested)
+    .where(question.job_id == job_id, wanted)
+    .order_by(question.source.desc(), question.id)
+  )
+  return list(db.execute(stmt).mappings())
+
+
+def replace_job_questions(
+  db: Session,
+  job_id: int,
+  *,
+  inputs_hash: str,
+  questions: list[tuple[str, str]],
+  model: str,
+  is_mock: bool,
+  prompt_tokens: int,
+  output_tokens: int,
+) -> None:
+  """Store a newly generated set of (category, question) job-level questions in place of the old one."""
+  db.execute(delete(models.JobQuestion).where(models.JobQuestion.job_id == job_id, models.JobQuestion.source == 'job'))
+  if questions:
+    db.execute(
+      insert(models.JobQuestion),
+      [
+        {'job_id': job_id, 'source': 'job', 'category': category, 'question': text, 'times_suggested': 0, 'created_at': dt.datetime.utcnow()}
+        for category, text in questions
+      ],
+    )
+  db.merge(
+    models.JobQuestionBank(
+      job_id=job_id,
+      inputs_hash=inputs_hash,
+      generated_at=dt.datetime.utcnow(),
+      model=model,
+      is_mock=is_mock,
+      prompt_tokens=prompt_tokens,
+      output_tokens=output_tokens,
+    )
+  )
+  mark_changed(db, 'job_questions')
   db.commit()
 
 
+def merge_candidate_questions(db: Session, job_id: int, resume_id: int, questions: list[str]) -> None:
+  """Make `questions` (from the resume's latest analysis) the resume's candidate questions.
+
+  Each one that is near-identical to a question already in the job's bank (job-level or another
+  candidate's, see question_dedup_threshold) is counted against that question instead of being stored
+  again; candidate questions no resume links to any more are dropped. Runs in the caller's transaction.
+  """
+  question, link = models.JobQuestion, models.JobQuestionResume
+  db.execute(delete(link).where(link.resume_id == resume_id))
+  db.execute(
+    delete(question)
+    .where(question.job_id == job_id, question.source == 'candidate', ~exists().where(link.question_id == question.id))
+    .execution_options(synchronize_session=False)
+  )
+
+  bank = [
+    (row.id, row.source, question_shingles(row.question))
+    for row in db.execute(select(question.id, question.source, question.question).where(question.job_id == job_id))
+  ]
+  threshold = settings.question_dedup_threshold
+  seen: set[int] = set()
+  for text in (q.strip() for q in questions):
+    if not text:
+      continue
+    grams = question_shingles(text)
+    score, match = max(((jaccard(grams, other), (qid, source)) for qid, source, other in bank), default=(0.0, None))
+    if match is not None and score >= threshold:
+      qid, source = match
+      if qid in seen:
+        continue
+      seen.add(qid)
+      db.execute(update(question).where(question.id == qid).values(times_suggested=question.times_suggested + 1))
+      if source == 'job':
+        # Already shown to every candidate of the job.
+        continue
+    else:
+      qid = db.scalar(
+        insert(question)
+        .values(job_id=job_id, source='candidate', category='', question=text, times_suggested=1, created_at=dt.datetime.utcnow())
+        .returning(question.id)
+      )
+      bank.append((qid, 'candidate', grams))
+      seen.add(qid)
+    db.execute(insert(link).values(question_id=qid, resume_id=resume_id))
+  mark_changed(db, 'job_questions')
+
+
+def get_change_versions(db: Session, tables: tuple[str, ...]) -> tuple[int, ...]:
+  """Current ChangeCounter versions for `tables` in one query (0 for tables never written)."""
+  counter = models.ChangeCounter
+  rows = dict(db.execute(select(counter.name, counter.version).where(counter.name.in_(tables))).all())
+  return tuple(rows.get(t, 0) for t in tables)
+
+
+def mark_changed(db: Session, *tables: str) -> None:
+  """Bump the change counters of `tables` inside the caller's transaction and drop cached responses."""
+  counter = models.ChangeCounter
+  stmt = (
+    update(counter)
+    .where(counter.name.in_(tables))
+    .values(version=counter.version + 1)
+    .execution_options(synchronize_session=False)
+  )
+  if db.execute(stmt).rowcount < len(tables):
+    existing = set(db.scalars(select(counter.name).where(counter.name.in_(tables))))
+    db.add_all(counter(name=t, version=1) for t in tables if t not in existing)
+    db.flush()
+  response_cache.discard(lambda key: any(t in key[0] for t in tables))
+
+
+def record_change(db: Session, entity: str, entity_id: int, action: str, *, job_id: int | None = None) -> None:
+  """Append a change-feed event inside the caller's transaction; subscribers see it once it commits."""
+  seq = db.scalar(
+    insert(models.ChangeEvent)
+    .values(created_at=dt.datetime.utcnow(), entity=entity, entity_id=entity_id, action=action, job_id=job_id)
+    .returning(models.ChangeEvent.seq)
+  )
+  db.info[PENDING_KEY] = True
+  retention = settings.change_feed_retention
+  if seq and retention > 0 and seq % 1000 == 0:
+    db.execute(delete(models.ChangeEvent).where(models.ChangeEvent.seq <= seq - retention))
+
+
+def change_feed_bounds(db: Session) -> tuple[int, int]:
+  """(oldest, newest) retained sequence numbers, (0, 0) for an empty feed."""
+  oldest, newest = db.execute(select(func.min(models.ChangeEvent.seq), func.max(models.ChangeEvent.seq))).one()
+  return oldest or 0, newest or 0
+
+
+def list_change_events(db: Session, after: int, *, limit: int = 500) -> list[RowMapping]:
+  event = models.ChangeEvent
+  stmt = (
+    select(event.seq, event.entity, event.entity_id, event.action, event.job_id, event.created_at)
+    .where(event.seq > after)
+    .order_by(event.seq)
+    .limit(limit)
+  )
+  return list(db.execute(stmt).mappings())
+
+
 def get_user_by_username(db: Session, username: str) -> models.User | None:
   return db.query(models.User).filter(models.User.username == username).first()
 
@@ -142,3 +873,393 @@ def create_user(db: Session, *, username: str, password_hash: str) -> models.Use
   db.commit()
   db.refresh(user)
   return user
+
+
+# --- Job dashboard aggregates -------------------------------------------------------------------
+# JobStats / JobScoreBucket rows are adjusted with relative UPDATEs inside the caller's transaction,
+# so concurrent writers never lose increments and reads never scan resumes/analyses/interviews.
+
+
+def _score_bucket(score: int) -> int:
+  return min(models.SCORE_BUCKETS - 1, max(0, score) // 10)
+
+
+def _init_job_stats(db: Session, job_id: int) -> None:
+  db.add(
+    models.JobStats(
+      job_id=job_id,
+      resumes_received=0,
+      resumes_analyzed=0,
+      resumes_interviewed=0,
+      analyses_count=0,
+      score_sum=0,
+      interviews_scheduled=0,
+      interviews_completed=0,
+      interviews_canceled=0,
+    )
+  )
+  db.add_all(models.JobScoreBucket(job_id=job_id, bucket=b, count=0) for b in range(models.SCORE_BUCKETS))
+  db.flush()
+
+
+def _bump_job_stats(db: Session, job_id: int, deltas: dict[str, int]) -> None:
+  deltas = {k: v for k, v in deltas.items() if v and hasattr(models.JobStats, k)}
+  if not deltas:
+    return
+  stats = models.JobStats
+  stmt = (
+    update(stats)
+    .where(stats.job_id == job_id)
+    .values({getattr(stats, k): getattr(stats, k) + v for k, v in deltas.items()})
+    .execution_options(synchronize_session=False)
+  )
+  if db.execute(stmt).rowcount == 0:
+    # Jobs created before the summary table existed (or inserted outside crud).
+    _init_job_stats(db, job_id)
+    db.execute(stmt)
+
+
+def _bump_score_bucket(db: Session, job_id: int, score: int, delta: int) -> None:
+  bucket = models.JobScoreBucket
+  stmt = (
+    update(bucket)
+    .where(bucket.job_id == job_id, bucket.bucket == _score_bucket(score))
+    .values(count=bucket.count + delta)
+    .execution_options(synchronize_session=False)
+  )
+  if db.execute(stmt).rowcount == 0:
+    _init_job_stats(db, job_id)
+    db.execute(stmt)
+
+
+def track_resume_status(db: Session, job_id: int, old: str | None, new: str | None, *, count: int = 1) -> None:
+  if old == new:
+    return
+  deltas: dict[str, int] = {}
+  if old:
+    deltas[f'resumes_{old}'] = -count
+  if new:
+    deltas[f'resumes_{new}'] = deltas.get(f'resumes_{new}', 0) + count
+  _bump_job_stats(db, job_id, deltas)
+
+
+def track_analysis_score(db: Session, job_id: int, old: int | None, new: int | None) -> None:
+  """Record an analysis being added (old=None), replaced, or removed (new=None)."""
+  count = (1 if new is not None else 0) - (1 if old is not None else 0)
+  score = (new or 0) - (old or 0)
+  _bump_job_stats(db, job_id, {'analyses_count': count, 'score_sum': score})
+  if old is not None:
+    _bump_score_bucket(db, job_id, old, -1)
+  if new is not None:
+    _bump_score_bucket(db, job_id, new, 1)
+
+
+def track_interview_status(db: Session, job_id: int, old: str | None, new: str | None, *, count: int = 1) -> None:
+  if old == new:
+    return
+  deltas: dict[str, int] = {}
+  if old:
+    deltas[f'interviews_{old}'] = -count
+  if new:
+    deltas[f'interviews_{new}'] = deltas.get(f'interviews_{new}', 0) + count
+  _bump_job_stats(db, job_id, deltas)
+
+
+def _histograms(db: Session, job_id: int | None = None) -> dict[int, list[int]]:
+  stmt = select(models.JobScoreBucket.job_id, models.JobScoreBucket.bucket, models.JobScoreBucket.count)
+  if job_id is not None:
+    stmt = stmt.where(models.JobScoreBucket.job_id == job_id)
+  out: dict[int, list[int]] = {}
+  for jid, b, count in db.execute(stmt):
+    out.setdefault(jid, [0] * models.SCORE_BUCKETS)[b] = count
+  return out
+
+
+def get_job_stats(db: Session, job_id: int) -> tuple[models.JobStats | None, list[int]]:
+  stats = db.get(models.JobStats, job_id)
+  return stats, _histograms(db, job_id).get(job_id, [0] * models.SCORE_BUCKETS)
+
+
+def list_job_stats(db: Session) -> list[tuple[models.JobStats, list[int]]]:
+  histograms = _histograms(db)
+  return [
+    (stats, histograms.get(stats.job_id, [0] * models.SCORE_BUCKETS))
+    for stats in db.scalars(select(models.JobStats).order_by(models.JobStats.job_id))
+  ]
+
+
+def rebuild_job_stats(db: Session) -> None:
+  """Recompute every JobStats/JobScoreBucket row from the source tables (flushes, does not commit)."""
+  db.execute(delete(models.JobScoreBucket))
+  db.execute(delete(models.JobStats))
+  job_ids = list(db.scalars(select(models.Job.id)))
+  for job_id in job_ids:
+    _init_job_stats(db, job_id)
+
+  for job_id, status, count in db.execute(
+    select(models.Resume.job_id, models.Resume.status, func.count()).group_by(models.Resume.job_id, models.Resume.status)
+  ):
+    _bump_job_stats(db, job_id, {f'resumes_{status}': count})
+
+  for job_id, score, count in db.execute(
+    select(models.AIAnalysis.job_id, models.AIAnalysis.overall_score, func.count()).group_by(
+      models.AIAnalysis.job_id, models.AIAnalysis.overall_score
+    )
+  ):
+    _bump_job_stats(db, job_id, {'analyses_count': count, 'score_sum': score * count})
+    _bump_score_bucket(db, job_id, score, count)
+
+  for job_id, status, count in db.execute(
+    select(models.Interview.job_id, models.Interview.status, func.count()).group_by(
+      models.Interview.job_id, models.Interview.status
+    )
+  ):
+    _bump_job_stats(db, job_id, {f'interviews_{status}': count})
+  db.flush()
+
+
+# --- Skills index -------------------------------------------------------------------------------
+# JobSkill / ResumeSkill mirror the JSON skill arrays with canonical skill ids (see services.skills),
+# rewritten inside the caller's transaction whenever the arrays change, so skill queries are plain
+# indexed joins and aggregates.
+
+
+def _create_skill_alias(db: Session, alias: str, canonical_key: str, display: str) -> int:
+  skill_id = db.scalar(select(models.Skill.id).where(models.Skill.key == canonical_key))
+  try:
+    with db.begin_nested():
+      if skill_id is None:
+        skill = models.Skill(key=canonical_key, name=display)
+        db.add(skill)
+        db.flush()
+        skill_id = skill.id
+      db.add(models.SkillAlias(alias=alias, skill_id=skill_id))
+  except IntegrityError:
+    # Created concurrently by another writer.
+    return db.scalar(select(models.SkillAlias.skill_id).where(models.SkillAlias.alias == alias))
+  return skill_id
+
+
+def resolve_skills(db: Session, names: Iterable[str]) -> list[int]:
+  """Skill ids for `names` (deduplicated, in order), registering skills and aliases for new spellings."""
+  resolved = [(skill_key(name), canonical_skill(name)) for name in names]
+  resolved = [(alias, canonical) for alias, canonical in resolved if canonical is not None]
+  known = dict(
+    db.execute(
+      select(models.SkillAlias.alias, models.SkillAlias.skill_id).where(models.SkillAlias.alias.in_({a for a, _ in resolved}))
+    ).all()
+  )
+  ids: list[int] = []
+  for alias, (canonical_key, display) in resolved:
+    if alias not in known:
+      known[alias] = _create_skill_alias(db, alias, canonical_key, display)
+    if known[alias] not in ids:
+      ids.append(known[alias])
+  return ids
+
+
+def find_skill_id(db: Session, name: str) -> int | None:
+  """Id of the skill `name` refers to, without registering anything."""
+  resolved = canonical_skill(name)
+  if resolved is None:
+    return None
+  skill_id = db.scalar(select(models.SkillAlias.skill_id).where(models.SkillAlias.alias == skill_key(name)))
+  if skill_id is None:
+    skill_id = db.scalar(select(models.Skill.id).where(models.Skill.key == resolved[0]))
+  return skill_id
+
+
+def _index_job_skills(db: Session, job_id: int, required: list[str] | None, nice_to_have: list[str] | None) -> None:
+  db.execute(delete(models.JobSkill).where(models.JobSkill.job_id == job_id))
+  rows = [
+    {'job_id': job_id, 'skill_id': skill_id, 'kind': kind}
+    for kind, names in (('required', required or []), ('nice_to_have', nice_to_have or []))
+    for skill_id in resolve_skills(db, names)
+  ]
+  if rows:
+    db.execute(insert(models.JobSkill), rows)
+
+
+def _index_resume_skills(db: Session, resume_id: int, skills: list[str] | None) -> None:
+  db.execute(delete(models.ResumeSkill).where(models.ResumeSkill.resume_id == resume_id))
+  rows = [{'resume_id': resume_id, 'skill_id': skill_id} for skill_id in resolve_skills(db, skills or [])]
+  if rows:
+    db.execute(insert(models.ResumeSkill), rows)
+
+
+def rebuild_skill_index(db: Session) -> None:
+  """Re-derive skills, aliases and both association tables from the JSON columns (flushes, does not commit).
+
+  Also the way to apply changed SKILL_ALIASES to existing data.
+  """
+  for table in (models.JobSkill, models.ResumeSkill, models.SkillAlias, models.Skill):
+    db.execute(delete(table))
+  for job_id, required, nice_to_have in db.execute(select(models.Job.id, models.Job.required_skills, models.Job.nice_to_have)).all():
+    _index_job_skills(db, job_id, required, nice_to_have)
+  for resume_id, skills in db.execute(select(models.Resume.id, models.Resume.skills)).all():
+    _index_resume_skills(db, resume_id, skills)
+  db.flush()
+
+
+def list_skills(db: Session) -> list[RowMapping]:
+  """(id, name, job_count, resume_count) for every canonical skill, most common in resumes first."""
+  skill = models.Skill
+  job_count = (
+    select(func.count(func.distinct(models.JobSkill.job_id))).where(models.JobSkill.skill_id == skill.id).scalar_subquery()
+  )
+  resume_count = select(func.count()).where(models.ResumeSkill.skill_id == skill.id).scalar_subquery()
+  stmt = select(
+    skill.id,
+    skill.name,
+    job_count.label('job_count'),
+    resume_count.label('resume_count'),
+  ).order_by(resume_count.desc(), skill.name)
+  return list(db.execute(stmt).mappings())
+
+
+def skill_matches(
+  db: Session,
+  job_id: int,
+  *,
+  min_matches: int = 1,
+  include_nice_to_have: bool = False,
+  limit: int = 200,
+) -> tuple[int, list[RowMapping]]:
+  """(number of job skills considered, resumes sharing at least `min_matches` of them, best first).
+
+  One aggregate over the (skill_id, kind, job_id) and (skill_id, resume_id) indexes; resumes of any
+  job are considered.
+  """
+  js, rs = models.JobSkill, models.ResumeSkill
+  kinds = ('required', 'nice_to_have') if include_nice_to_have else ('required',)
+  total = db.scalar(select(func.count(func.distinct(js.skill_id))).where(js.job_id == job_id, js.kind.in_(kinds))) or 0
+
+  job_skill_ids = select(js.skill_id).where(js.job_id == job_id, js.kind.in_(kinds)).distinct()
+  matched = (
+    select(rs.resume_id, func.count().label('matched_skills'))
+    .where(rs.skill_id.in_(job_skill_ids))
+    .group_by(rs.resume_id)
+    .having(func.count() >= min_matches)
+    .subquery()
+  )
+  r = models.Resume
+  stmt = (
+    select(
+      r.id.label('resume_id'),
+      r.candidate_name,
+      r.job_id,
+      r.status,
+      r.years_exp,
+      matched.c.matched_skills,
+    )
+    .join(matched, matched.c.resume_id == r.id)
+    .order_by(matched.c.matched_skills.desc(), r.submitted_at.desc())
+    .limit(limit)
+  )
+  return int(total), list(db.execute(stmt).mappings())
+
+
+# --- Near-duplicate resumes -----------------------------------------------------------------------
+# resume_fingerprints keeps each resume's MinHash signature and resume_lsh_bands its LSH buckets
+# (services.dedup). Candidates for a new resume are the resumes sharing any (band, bucket) key: one
+# primary-key lookup per band however many resumes exist, and only those few are compared in full.
+
+
+def find_similar_resumes(
+  db: Session,
+  fp: Fingerprint,
+  *,
+  exclude_resume_id: int | None = None,
+  threshold: float | None = None,
+) -> list[tuple[int, float]]:
+  """(resume_id, estimated similarity) of indexed resumes at least `threshold` similar, most similar first.
+
+  Identical normalized text counts as 1.0. At most RESUME_DEDUP_MAX_CANDIDATES (newest first) are compared.
+  """
+  threshold = settings.resume_dedup_threshold if threshold is None else threshold
+  band = models.ResumeLshBand
+  candidates = select(band.resume_id).where(
+    or_(*(and_(band.band == i, band.bucket == bucket) for i, bucket in enumerate(fp.bands)))
+  )
+  if exclude_resume_id is not None:
+    candidates = candidates.where(band.resume_id != exclude_resume_id)
+  candidates = candidates.distinct().order_by(band.resume_id.desc()).limit(settings.resume_dedup_max_candidates)
+
+  rf = models.ResumeFingerprint
+  matches: list[tuple[int, float]] = []
+  for resume_id, digest, signature in db.execute(
+    select(rf.resume_id, rf.content_hash, rf.signature).where(rf.resume_id.in_(candidates))
+  ).tuples():
+    score = 1.0 if digest == fp.content_hash else similarity(fp.signature, unpack_signature(signature))
+    if score >= threshold:
+      matches.append((resume_id, score))
+  matches.sort(key=lambda match: (-match[1], match[0]))
+  return matches
+
+
+def _index_resume_fingerprint(db: Session, resume_id: int, resume_text: str) -> tuple[int | None, float | None]:
+  """Store the resume's fingerprint and LSH buckets; returns (duplicate_of_id, similarity), both None if new.
+
+  duplicate_of_id is the first submission of the closest match's group, so groups do not chain.
+  """
+  fp = fingerprint(resume_text)
+  matches = find_similar_resumes(db, fp, exclude_resume_id=resume_id)
+  duplicate: tuple[int | None, float | None] = (None, None)
+  if matches:
+    match_id, score = matches[0]
+    root_id = db.scalar(select(models.Resume.duplicate_of_id).where(models.Resume.id == match_id))
+    duplicate = (root_id or match_id, round(score, 3))
+  db.execute(
+    insert(models.ResumeFingerprint),
+    [{'resume_id': resume_id, 'content_hash': fp.content_hash, 'signature': pack_signature(fp.signature)}],
+  )
+  db.execute(
+    insert(models.ResumeLshBand),
+    [{'band': i, 'bucket': bucket, 'resume_id': resume_id} for i, bucket in enumerate(fp.bands)],
+  )
+  return duplicate
+
+
+def rebuild_resume_fingerprints(db: Session) -> None:
+  """Re-fingerprint every resume in submission order and recompute the duplicate flags (flushes, does not commit)."""
+  for table in (models.ResumeLshBand, models.ResumeFingerprint):
+    db.execute(delete(table))
+  db.execute(update(models.Resume).values(duplicate_of_id=None, duplicate_similarity=None))
+  for resume_id, resume_text in db.execute(select(models.Resume.id, models.Resume.resume_text).order_by(models.Resume.id)).all():
+    duplicate_of_id, score = _index_resume_fingerprint(db, resume_id, resume_text)
+    if duplicate_of_id is not None:
+      db.execute(
+        update(models.Resume)
+        .where(models.Resume.id == resume_id)
+        .values(duplicate_of_id=duplicate_of_id, duplicate_similarity=score)
+      )
+  db.flush()
+
+
+def list_resume_duplicates(db: Session, resume_id: int, *, threshold: float | None = None) -> list[dict]:
+  """Other resumes whose text is near-identical to this one's, most similar first, with their job title."""
+  stored = db.get(models.ResumeFingerprint, resume_id)
+  if stored is None:
+    return []
+  signature = unpack_signature(stored.signature)
+  fp = Fingerprint(content_hash=stored.content_hash, signature=signature, bands=tuple(band_hashes(signature)))
+  scores = dict(find_similar_resumes(db, fp, exclude_resume_id=resume_id, threshold=threshold))
+  if not scores:
+    return []
+  r = models.Resume
+  rows = db.execute(
+    select(
+      r.id.label('resume_id'),
+      r.candidate_name,
+      r.job_id,
+      models.Job.title.label('applied_job_title'),
+      r.status,
+      r.submitted_at,
+    )
+    .outerjoin(models.Job, models.Job.id == r.job_id)
+    .where(r.id.in_(scores))
+  ).mappings()
+  return sorted(
+    ({**row, 'similarity': round(scores[row['resume_id']], 3)} for row in rows),
+    key=lambda row: (-row['similarity'], row['resume_id']),
+  )
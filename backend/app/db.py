@@ -3,7 +3,7 @@ from __future__ import annotations
 import os
 from pathlib import Path
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import settings
@@ -11,7 +11,7 @@ from app.core.config import settings
 
 engine = create_engine(
     settings.resolved_database_url,
-    echo = True,
+    echo = settings.database_echo,
     connect_args={
         "check_same_thread": False,
         "timeout": 30  # 增加 30 秒逾時，防止在 Electron 環境中因檔案存取延遲導致掛起
@@ -20,6 +20,16 @@ engine = create_engine(
     pool_size=5 if "postgresql" in settings.resolved_database_url else 0,
 )
 
+if engine.dialect.name == 'sqlite' and settings.database_sqlite_wal:
+
+  @event.listens_for(engine, 'connect')
+  def _sqlite_wal(dbapi_connection, _record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.close()
+
+
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, class_=Session)
 
 
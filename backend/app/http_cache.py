@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Callable
+
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.cache import response_cache
+from app.serialization import dump, json_response
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+  if not header:
+    return False
+  if header.strip() == '*':
+    return True
+  # Weak comparison: ignore the W/ prefix on either side.
+  candidates = {tag.strip().removeprefix('W/') for tag in header.split(',')}
+  return etag.removeprefix('W/') in candidates
+
+
+def conditional_json(
+  request: Request,
+  db: Session,
+  *,
+  tables: tuple[str, ...],
+  response_type: Any | None,
+  build: Callable[[], Any],
+) -> Response:
+  """Serve a GET whose body depends only on `tables`, with a weak ETag and a short-lived cache.
+
+  The ETag is derived from the tables' change counters, so an unchanged poll costs one counter
+  lookup and a 304; `build` (the ORM query + serialization) only runs on a cache miss. With
+  `response_type=None`, `build` returns the encoded JSON itself (see serialization.dump_rows).
+  """
+  versions = crud.get_change_versions(db, tables)
+  key = (tables, versions, request.url.path, request.url.query)
+  digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:20]
+  etag = f'W/"{digest}"'
+  headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+
+  if _etag_matches(request.headers.get('if-none-match'), etag):
+    return Response(status_code=304, headers=headers)
+
+  body = response_cache.get(key)
+  if body is None:
+    body = build() if response_type is None else dump(build(), response_type)
+    response_cache.set(key, body)
+  return json_response(body, headers=headers)
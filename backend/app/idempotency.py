@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import json
+from typing import Any, Awaitable, Callable
+
+from fastapi import HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.core.shared_state import shared_state
+from app.serialization import json_response
+
+
+HEADER = 'Idempotency-Key'
+_MAX_KEY_LENGTH = 255
+
+# Shared-state entries (app/core/shared_state.py): a claim while the first request runs, then its response.
+_STATE_KEY = 'idem:{scope}:{user_id}:{key}'
+_PENDING = 'pending'
+
+# Identical requests running in this process: (scope, user_id, key or fingerprint) -> future of the
+# response parts. Followers await the leader's future instead of running the endpoint again.
+_in_flight: dict[tuple[str, int, str], asyncio.Future] = {}
+
+_Stored = tuple[int, bytes, dict[str, str]]
+
+
+def fingerprint(value: Any) -> str:
+  """sha256 of the request payload; a key reused with a different payload is rejected."""
+  encoded = json.dumps(jsonable_encoder(value), sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+  return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def _replay(stored: _Stored, *, replayed: bool) -> Response:
+  status_code, body, headers = stored
+  if replayed:
+    headers = {**headers, 'Idempotent-Replayed': 'true'}
+  return json_response(body, status_code=status_code, headers=headers)
+
+
+def _capture(response: Response) -> _Stored:
+  headers = {k: v for k, v in response.headers.items() if k.lower() not in ('content-length', 'content-type')}
+  return response.status_code, bytes(response.body), headers
+
+
+def _error_parts(exc: HTTPException) -> _Stored:
+  body = json.dumps({'detail': jsonable_encoder(exc.detail)}, ensure_ascii=False).encode('utf-8')
+  return exc.status_code, body, dict(exc.headers or {})
+
+
+def _load(raw: str) -> tuple[str, _Stored]:
+  entry = json.loads(raw)
+  return entry['fingerprint'], (entry['status_code'], base64.b64decode(entry['body']), entry['headers'])
+
+
+def _dump(digest: str, stored: _Stored) -> str:
+  status_code, body, headers = stored
+  return json.dumps(
+    {'fingerprint': digest, 'status_code': status_code, 'body': base64.b64encode(body).decode('ascii'), 'headers': headers}
+  )
+
+
+async def idempotent(
+  request: Request,
+  *,
+  scope: str,
+  user_id: int,
+  payload: Any,
+  run: Callable[[], Awaitable[Response]],
+) -> Response:
+  """Run a non-idempotent POST at most once per Idempotency-Key, and once per identical concurrent request.
+
+  - Identical requests (same user and payload, or same key) arriving while one is running in this
+    process await that one's response instead of running `run` again.
+  - With an `Idempotency-Key` header, the response is kept for `idempotency_ttl_seconds` and replayed
+    (with `Idempotent-Replayed: true`) to later requests with the same key. Reusing a key with a
+    different payload is 422; a key whose first request is still running in another worker is 409.
+  - 5xx answers (e.g. the analysis backlog being full) are not kept, so a retry runs again.
+  """
+  key = request.headers.get(HEADER)
+  if key is not None:
+    key = key.strip()
+    if not key or len(key) > _MAX_KEY_LENGTH:
+      raise HTTPException(status_code=400, detail=f'{HEADER} must be 1-{_MAX_KEY_LENGTH} characters')
+  digest = fingerprint(payload)
+
+  while True:
+    flight = (scope, user_id, f'key:{key}' if key else f'payload:{digest}')
+    pending = _in_flight.get(flight)
+    if pending is None:
+      break
+    stored = await asyncio.shield(pending)
+    if stored is not None:
+      follower_digest, parts = stored
+      if follower_digest != digest:
+        raise HTTPException(status_code=422, detail=f'{HEADER} was already used with a different request')
+      return _replay(parts, replayed=True)
+    # The leader failed without an answer: the next request in line runs it.
+
+  state = shared_state()
+  state_key = _STATE_KEY.format(scope=scope, user_id=user_id, key=key) if key else None
+  if state_key is not None and not state.add(state_key, _PENDING, ttl=settings.shared_state_lease_seconds):
+    raw = state.get(state_key)
+    if raw is None or raw == _PENDING:
+      raise HTTPException(
+        status_code=409,
+        detail=f'A request with this {HEADER} is still in progress',
+        headers={'Retry-After': str(settings.analysis_retry_after_seconds)},
+      )
+    stored_digest, parts = _load(raw)
+    if stored_digest != digest:
+      raise HTTPException(status_code=422, detail=f'{HEADER} was already used with a different request')
+    return _replay(parts, replayed=True)
+
+  future: asyncio.Future = asyncio.get_running_loop().create_future()
+  _in_flight[flight] = future
+  result: tuple[str, _Stored] | None = None
+  try:
+    try:
+      parts = _capture(await run())
+    except HTTPException as exc:
+      parts = _error_parts(exc)
+    result = (digest, parts)
+    if state_key is not None:
+      if parts[0] < 500:
+        state.set(state_key, _dump(digest, parts), ttl=settings.idempotency_ttl_seconds)
+      else:
+        state.delete(state_key)
+    return _replay(parts, replayed=False)
+  except BaseException:
+    if state_key is not None:
+      state.delete(state_key)
+    raise
+  finally:
+    del _in_flight[flight]
+    future.set_result(result)
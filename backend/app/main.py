@@ -1,22 +1,25 @@
 from __future__ import annotations
-import anyio
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.core.config import settings
-from app.db import SessionLocal, engine
-from app.models import Base
+from app.db import engine
+from app.migrations import SCHEMA_VERSION, ensure_schema
 from app.routers.ai_analyses import router as ai_router
 from app.routers.auth import router as auth_router
+from app.routers.events import router as events_router
 from app.routers.interviews import router as interviews_router
 from app.routers.jobs import router as jobs_router
 from app.routers.resumes import router as resumes_router
-from app.seed import seed_if_empty
+from app.routers.skills import router as skills_router
+from app.services.gemini import aclose_client
 
 
 def create_app() -> FastAPI:
-  app = FastAPI(title='AI Interview Assistant API', version='0.1.0')
+  app = FastAPI(title='AI Interview Assistant API', version='0.1.0', default_response_class=ORJSONResponse)
 
   app.add_middleware(
     CORSMiddleware,
@@ -25,12 +28,16 @@ def create_app() -> FastAPI:
     allow_methods=['*'],
     allow_headers=['*'],
   )
+  if settings.gzip_minimum_size > 0:
+    app.add_middleware(GZipMiddleware, minimum_size=settings.gzip_minimum_size)
 
   app.include_router(jobs_router, prefix='/api/v1')
   app.include_router(resumes_router, prefix='/api/v1')
   app.include_router(ai_router, prefix='/api/v1')
   app.include_router(interviews_router, prefix='/api/v1')
   app.include_router(auth_router, prefix='/api/v1')
+  app.include_router(skills_router, prefix='/api/v1')
+  app.include_router(events_router, prefix='/api/v1')
 
   @app.get('/health')
   def health():
@@ -39,13 +46,17 @@ def create_app() -> FastAPI:
   @app.on_event('startup')
   def on_startup():
     try:
-      print("Creating database tables...")
-      Base.metadata.create_all(bind=engine)
-      print("Database tables created successfully")
+      # Only touches the schema when the stored version differs; a matching version costs one query.
+      if ensure_schema(engine):
+        print(f"Database schema migrated to version {SCHEMA_VERSION}")
     except Exception as e:
-      print(f"Error creating tables: {e}")
+      print(f"Error migrating database schema: {e}")
     # NOTE: seed_if_empty 已禁用，可手動執行: python -m app.seed
 
+  @app.on_event('shutdown')
+  async def on_shutdown():
+    await aclose_client()
+
   return app
 
 
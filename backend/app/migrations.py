@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import hashlib
+import json
+import tempfile
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Callable, ContextManager
+
+from sqlalchemy import Column, Engine, Integer, MetaData, Table, inspect, select, text, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.core.blobs import CODEC, encode_json
+from app.core.config import settings
+from app.core.locks import file_lock
+from app.models import AIAnalysis, Base, Job, Resume, ResumeFingerprint
+
+
+# Bump SCHEMA_VERSION whenever models.py changes. New tables need only the bump (`create_all` picks
+# them up during upgrade); changes to existing tables or backfills also need a @migration(version).
+SCHEMA_VERSION = 14
+
+_meta = MetaData()
+schema_version_table = Table('schema_version', _meta, Column('version', Integer, nullable=False))
+
+_MIGRATIONS: dict[int, Callable[[Connection], None]] = {}
+
+
+def migration(version: int) -> Callable[[Callable[[Connection], None]], Callable[[Connection], None]]:
+  def register(fn: Callable[[Connection], None]) -> Callable[[Connection], None]:
+    _MIGRATIONS[version] = fn
+    return fn
+
+  return register
+
+
+def add_column_if_missing(conn: Connection, table: str, column: str, ddl: str) -> None:
+  """`ALTER TABLE ... ADD COLUMN` that is a no-op when the column already exists."""
+  existing = {c['name'] for c in inspect(conn).get_columns(table)}
+  if column not in existing:
+    conn.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}'))
+
+
+def drop_column_if_exists(conn: Connection, table: str, column: str) -> None:
+  """`ALTER TABLE ... DROP COLUMN` (SQLite >= 3.35) that is a no-op when the column is already gone."""
+  existing = {c['name'] for c in inspect(conn).get_columns(table)}
+  if column in existing:
+    conn.execute(text(f'ALTER TABLE {table} DROP COLUMN {column}'))
+
+
+def read_schema_version(engine: Engine) -> int | None:
+  try:
+    with engine.connect() as conn:
+      return conn.execute(select(schema_version_table.c.version)).scalar_one_or_none()
+  except DBAPIError:
+    # Table does not exist yet: fresh database, or one created before versioning.
+    return None
+
+
+def _write_schema_version(conn: Connection, version: int) -> None:
+  _meta.create_all(conn)
+  conn.execute(schema_version_table.delete())
+  conn.execute(schema_version_table.insert().values(version=version))
+
+
+# Arbitrary constant identifying the schema upgrade in pg_advisory_xact_lock.
+_PG_SCHEMA_LOCK_KEY = 7_304_221
+
+
+def _schema_lock_path(engine: Engine) -> Path:
+  if settings.schema_lock_path:
+    return Path(settings.schema_lock_path)
+  database = engine.url.database
+  if engine.dialect.name == 'sqlite' and database and database != ':memory:':
+    return Path(database).with_name(Path(database).name + '.schema.lock')
+  digest = hashlib.sha1(engine.url.render_as_string(hide_password=True).encode('utf-8')).hexdigest()[:12]
+  return Path(tempfile.gettempdir()) / f'app-schema-{digest}.lock'
+
+
+def _schema_lock(engine: Engine) -> ContextManager[None]:
+  """Serialize upgrades between processes (uvicorn workers, CLI). Postgres locks in-transaction instead."""
+  if engine.dialect.name == 'postgresql':
+    return nullcontext()
+  return file_lock(_schema_lock_path(engine))
+
+
+def ensure_schema(engine: Engine) -> bool:
+  """Bring the database up to SCHEMA_VERSION. Returns False (one query) when it already matches.
+
+  Upgrades run under a cross-process lock, so workers booting together migrate once and the rest
+  find the new version when they get the lock.
+  """
+  if read_schema_version(engine) == SCHEMA_VERSION:
+    return False
+
+  with _schema_lock(engine), engine.begin() as conn:
+    if engine.dialect.name == 'postgresql':
+      conn.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': _PG_SCHEMA_LOCK_KEY})
+    # Re-read inside the transaction in case another process migrated meanwhile.
+    current = None
+    if inspect(conn).has_table('schema_version'):
+      current = conn.execute(select(schema_version_table.c.version)).scalar_one_or_none()
+    if current == SCHEMA_VERSION:
+      return False
+    if current is not None and current > SCHEMA_VERSION:
+      raise RuntimeError(f'Database schema version {current} is newer than this build ({SCHEMA_VERSION})')
+
+    is_fresh = not inspect(conn).has_table('jobs')
+    Base.metadata.create_all(conn)
+    if not is_fresh:
+      # Databases created before versioning existed are at the baseline schema (version 1).
+      for version in range((current or 1) + 1, SCHEMA_VERSION + 1):
+        step = _MIGRATIONS.get(version)
+        if step is not None:
+          step(conn)
+    _write_schema_version(conn, SCHEMA_VERSION)
+  return True
+
+
+@migration(2)
+def _analysis_input_fingerprint(conn: Connection) -> None:
+  add_column_if_missing(conn, 'ai_analyses', 'input_fingerprint', "VARCHAR(64) NOT NULL DEFAULT ''")
+  add_column_if_missing(conn, 'ai_analyses', 'extra_conditions', "TEXT NOT NULL DEFAULT ''")
+  conn.execute(text('CREATE INDEX IF NOT EXISTS ix_ai_analyses_input_fingerprint ON ai_analyses (input_fingerprint)'))
+
+
+@migration(3)
+def _backfill_job_stats(conn: Connection) -> None:
+  from app import crud
+
+  with Session(bind=conn) as db:
+    crud.rebuild_job_stats(db)
+
+
+@migration(5)
+def _analysis_routing_columns(conn: Connection) -> None:
+  add_column_if_missing(conn, 'ai_analyses', 'route_tier', "VARCHAR(40) NOT NULL DEFAULT ''")
+  add_column_if_missing(conn, 'ai_analyses', 'estimated_prompt_tokens', 'INTEGER NOT NULL DEFAULT 0')
+  add_column_if_missing(conn, 'ai_analyses', 'latency_ms', 'INTEGER NOT NULL DEFAULT 0')
+
+
+@migration(6)
+def _analysis_token_usage(conn: Connection) -> None:
+  add_column_if_missing(conn, 'ai_analyses', 'prompt_tokens', 'INTEGER NOT NULL DEFAULT 0')
+  add_column_if_missing(conn, 'ai_analyses', 'output_tokens', 'INTEGER NOT NULL DEFAULT 0')
+  add_column_if_missing(conn, 'ai_analyses', 'cached_tokens', 'INTEGER NOT NULL DEFAULT 0')
+  add_column_if_missing(conn, 'ai_analyses', 'requested_by_id', 'INTEGER REFERENCES users(id) ON DELETE SET NULL')
+
+
+@migration(7)
+def _analysis_raw_response_blobs(conn: Connection) -> None:
+  add_column_if_missing(conn, 'ai_analyses', 'raw_response_hash', 'VARCHAR(64) REFERENCES analysis_blobs(hash)')
+  conn.execute(text('CREATE INDEX IF NOT EXISTS ix_ai_analyses_raw_response_hash ON ai_analyses (raw_response_hash)'))
+  if 'raw_response' not in {c['name'] for c in inspect(conn).get_columns('ai_analyses')}:
+    return
+
+  # Move the inline JSON into compressed, deduplicated blobs in batches, then drop the column.
+  stored: set[str] = set(conn.execute(text('SELECT hash FROM analysis_blobs')).scalars())
+  last_id = 0
+  while True:
+    rows = conn.execute(
+      text('SELECT id, raw_response FROM ai_analyses WHERE id > :last_id ORDER BY id LIMIT 500'),
+      {'last_id': last_id},
+    ).all()
+    if not rows:
+      break
+    for analysis_id, raw in rows:
+      last_id = analysis_id
+      value = json.loads(raw) if isinstance(raw, (str, bytes)) else raw
+      if not value:
+        continue
+      digest, data, size = encode_json(value)
+      if digest not in stored:
+        conn.execute(
+          text('INSERT INTO analysis_blobs (hash, codec, size, data) VALUES (:hash, :codec, :size, :data)'),
+          {'hash': digest, 'codec': CODEC, 'size': size, 'data': data},
+        )
+        stored.add(digest)
+      conn.execute(text('UPDATE ai_analyses SET raw_response_hash = :hash WHERE id = :id'), {'hash': digest, 'id': analysis_id})
+  drop_column_if_exists(conn, 'ai_analyses', 'raw_response')
+
+
+@migration(8)
+def _backfill_skill_index(conn: Connection) -> None:
+  from app import crud
+
+  with Session(bind=conn) as db:
+    crud.rebuild_skill_index(db)
+
+
+@migration(9)
+def _resume_fingerprints(conn: Connection) -> None:
+  add_column_if_missing(conn, 'resumes', 'duplicate_of_id', 'INTEGER REFERENCES resumes(id) ON DELETE SET NULL')
+  add_column_if_missing(conn, 'resumes', 'duplicate_similarity', 'FLOAT')
+  add_column_if_missing(conn, 'ai_analyses', 'reused_from_id', 'INTEGER')
+  conn.execute(text('CREATE INDEX IF NOT EXISTS ix_resumes_duplicate_of_id ON resumes (duplicate_of_id)'))
+  # The fingerprints themselves are computed by migration 12, which every upgrade through 9 also runs.
+
+
+@migration(12)
+def _refingerprint_resumes(conn: Connection) -> None:
+  from app import crud
+
+  # Fingerprints every resume: those from before migration 9 had none, and services/dedup.py now
+  # splits CJK from Latin text written without spaces, which changes the signatures.
+  with Session(bind=conn) as db:
+    crud.rebuild_resume_fingerprints(db)
+
+
+@migration(13)
+def _interview_time_ranges(conn: Connection) -> None:
+  add_column_if_missing(conn, 'interviews', 'duration_minutes', 'INTEGER NOT NULL DEFAULT 60')
+  add_column_if_missing(conn, 'interviews', 'ends_at', 'TIMESTAMP')
+  conn.execute(
+    text('CREATE INDEX IF NOT EXISTS ix_interviews_interviewer_time ON interviews (interviewer, scheduled_at, ends_at)')
+  )
+  # Computed here rather than in SQL: date arithmetic and the stored datetime format differ per dialect.
+  interviews = Base.metadata.tables['interviews']
+  rows = conn.execute(
+    select(interviews.c.id, interviews.c.scheduled_at, interviews.c.duration_minutes).where(
+      interviews.c.scheduled_at.is_not(None), interviews.c.ends_at.is_(None)
+    )
+  ).all()
+  for interview_id, scheduled_at, minutes in rows:
+    conn.execute(
+      update(interviews)
+      .where(interviews.c.id == interview_id)
+      .values(ends_at=scheduled_at + dt.timedelta(minutes=minutes))
+    )
+
+
+
+@migration(14)
+def _analysis_input_hashes(conn: Connection) -> None:
+  from app.services.analysis import build_pair_prompt, job_prompt_hash
+  from app.services.gemini import prompt_fingerprint
+
+  add_column_if_missing(conn, 'ai_analyses', 'job_prompt_hash', "VARCHAR(64) NOT NULL DEFAULT ''")
+  add_column_if_missing(conn, 'ai_analyses', 'resume_content_hash', "VARCHAR(64) NOT NULL DEFAULT ''")
+
+  # Analyses still matching their full prompt get the current hashes; the rest keep '' and stay stale.
+  with Session(bind=conn) as db:
+    jobs = {job.id: job for job in db.scalars(select(Job))}
+    job_hashes = {job_id: job_prompt_hash(job) for job_id, job in jobs.items()}
+    last_id = 0
+    while True:
+      rows = db.execute(
+        select(AIAnalysis.id, AIAnalysis.job_id, AIAnalysis.input_fingerprint, AIAnalysis.extra_conditions, Resume, ResumeFingerprint.content_hash)
+        .join(Resume, Resume.id == AIAnalysis.resume_id)
+        .outerjoin(ResumeFingerprint, ResumeFingerprint.resume_id == AIAnalysis.resume_id)
+        .where(AIAnalysis.id > last_id)
+        .order_by(AIAnalysis.id)
+        .limit(500)
+      ).all()
+      if not rows:
+        break
+      for analysis_id, job_id, fingerprint, extra_conditions, resume, content_hash in rows:
+        last_id = analysis_id
+        if fingerprint != prompt_fingerprint(build_pair_prompt(jobs[job_id], resume, extra_conditions or None)):
+          continue
+        db.execute(
+          update(AIAnalysis)
+          .where(AIAnalysis.id == analysis_id)
+          .values(job_prompt_hash=job_hashes[job_id], resume_content_hash=content_hash or '')
+        )
+      db.expunge_all()
+    db.flush()
+
+def compact_database(engine: Engine) -> None:
+  """Drop unreferenced analysis blobs and, on SQLite, VACUUM so the freed pages leave the file."""
+  from app import crud
+
+  with Session(engine) as db:
+    pruned = crud.prune_raw_responses(db)
+    db.commit()
+  print(f'Pruned {pruned} unreferenced analysis blobs')
+  if engine.dialect.name == 'sqlite':
+    # VACUUM cannot run inside a transaction.
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+      conn.execute(text('VACUUM'))
+    print('Vacuumed database file')
+
+
+if __name__ == '__main__':
+  from app.db import engine
+
+  parser = argparse.ArgumentParser(description='Upgrade the database schema to this build.')
+  parser.add_argument('--compact', action='store_true', help='also prune unreferenced blobs and VACUUM (SQLite)')
+  parser.add_argument('--reindex-skills', action='store_true', help='rebuild the skills index (after changing SKILL_ALIASES)')
+  args = parser.parse_args()
+
+  changed = ensure_schema(engine)
+  print(f"Schema {'upgraded to' if changed else 'already at'} version {SCHEMA_VERSION}")
+  if args.reindex_skills:
+    from app import crud
+
+    with Session(engine) as db:
+      crud.rebuild_skill_index(db)
+      crud.mark_changed(db, 'jobs', 'resumes')
+      db.commit()
+    print('Rebuilt skills index')
+  if args.compact:
+    compact_database(engine)
@@ -2,10 +2,12 @@ from __future__ import annotations
 
 import datetime as dt
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint
+from sqlalchemy import BigInteger, Boolean, Date, DateTime, Float, ForeignKey, Index, Integer, LargeBinary, String, Text, UniqueConstraint
 from sqlalchemy.dialects.sqlite import JSON
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
+from app.core.blobs import decode_json, decode_text
+
 
 class Base(DeclarativeBase):
   pass
@@ -31,6 +33,11 @@ class Job(Base):
 
   resumes: Mapped[list['Resume']] = relationship(back_populates='job', cascade='all, delete-orphan')
   interviews: Mapped[list['Interview']] = relationship(back_populates='job', cascade='all, delete-orphan')
+  stats: Mapped['JobStats | None'] = relationship(cascade='all, delete-orphan', uselist=False)
+  score_buckets: Mapped[list['JobScoreBucket']] = relationship(cascade='all, delete-orphan')
+  skill_links: Mapped[list['JobSkill']] = relationship(cascade='all, delete-orphan')
+  question_bank: Mapped['JobQuestionBank | None'] = relationship(cascade='all, delete-orphan', uselist=False)
+  questions: Mapped[list['JobQuestion']] = relationship(cascade='all, delete-orphan')
 
 
 class User(Base):
@@ -57,9 +64,18 @@ class Resume(Base):
   years_exp: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
   skills: Mapped[list[str]] = mapped_column(JSON, nullable=False, default=list)
 
+  # Set at creation when an earlier resume has (nearly) the same text (services/dedup.py): the first
+  # submission of the closest match's group, and the estimated Jaccard similarity to that match.
+  duplicate_of_id: Mapped[int | None] = mapped_column(ForeignKey('resumes.id', ondelete='SET NULL'), nullable=True, index=True)
+  duplicate_similarity: Mapped[float | None] = mapped_column(Float, nullable=True)
+
   job: Mapped['Job'] = relationship(back_populates='resumes')
   analyses: Mapped[list['AIAnalysis']] = relationship(back_populates='resume', cascade='all, delete-orphan')
   interviews: Mapped[list['Interview']] = relationship(back_populates='resume', cascade='all, delete-orphan')
+  skill_links: Mapped[list['ResumeSkill']] = relationship(cascade='all, delete-orphan')
+  fingerprint: Mapped['ResumeFingerprint | None'] = relationship(cascade='all, delete-orphan', uselist=False)
+  lsh_bands: Mapped[list['ResumeLshBand']] = relationship(cascade='all, delete-orphan')
+  question_links: Mapped[list['JobQuestionResume']] = relationship(cascade='all, delete-orphan')
 
 
 class AIAnalysis(Base):
@@ -73,6 +89,13 @@ class AIAnalysis(Base):
   created_at: Mapped[dt.datetime] = mapped_column(DateTime, nullable=False, default=dt.datetime.utcnow)
   model: Mapped[str] = mapped_column(String(80), nullable=False, default='gemini-1.5-flash')
   prompt_version: Mapped[str] = mapped_column(String(40), nullable=False, default='v1')
+  # sha256 of the exact prompt the analysis was generated from; identical prompts reuse the result.
+  input_fingerprint: Mapped[str] = mapped_column(String(64), nullable=False, default='', index=True)
+  # What the prompt was built from, compared in SQL to find stale analyses: the job's prompt prefix
+  # hash (services.analysis.job_prompt_hash) and the resume's ResumeFingerprint.content_hash.
+  job_prompt_hash: Mapped[str] = mapped_column(String(64), nullable=False, default='')
+  resume_content_hash: Mapped[str] = mapped_column(String(64), nullable=False, default='')
+  extra_conditions: Mapped[str] = mapped_column(Text, nullable=False, default='')
 
   overall_score: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
   professional_score: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -84,14 +107,50 @@ class AIAnalysis(Base):
   risks: Mapped[list[str]] = mapped_column(JSON, nullable=False, default=list)
   suggested_questions: Mapped[list[str]] = mapped_column(JSON, nullable=False, default=list)
 
-  raw_response: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+  # Parsed model output, compressed and deduplicated in analysis_blobs; only loaded when read.
+  raw_response_hash: Mapped[str | None] = mapped_column(ForeignKey('analysis_blobs.hash'), nullable=True, index=True)
   is_mock: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
 
+  # Routing (services/routing.py): tier chosen, estimated prompt size and wall-clock Gemini latency.
+  route_tier: Mapped[str] = mapped_column(String(40), nullable=False, default='')
+  estimated_prompt_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  latency_ms: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+  # Token usage reported by Gemini (usageMetadata), summed over the call and its retry if any.
+  prompt_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  output_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  cached_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  requested_by_id: Mapped[int | None] = mapped_column(ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
+  # Analysis whose result was copied because the prompt was identical (no Gemini call, no tokens).
+  reused_from_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
   resume: Mapped['Resume'] = relationship(back_populates='analyses')
+  raw_blob: Mapped['AnalysisBlob | None'] = relationship(lazy='select')
+
+  @property
+  def raw_response(self) -> dict:
+    return self.raw_blob.decode() if self.raw_blob is not None else {}
+
+
+class AnalysisBlob(Base):
+  """Compressed JSON keyed by the sha256 of its canonical form (see app.core.blobs)."""
+
+  __tablename__ = 'analysis_blobs'
+
+  hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+  codec: Mapped[str] = mapped_column(String(10), nullable=False)
+  size: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+  def decode(self) -> dict:
+    return decode_json(self.codec, self.data)
 
 
 class Interview(Base):
   __tablename__ = 'interviews'
+  # Conflict and availability lookups: one interviewer, start times in a window bounded by the
+  # longest allowed interview (see crud.find_interview_conflicts).
+  __table_args__ = (Index('ix_interviews_interviewer_time', 'interviewer', 'scheduled_at', 'ends_at'),)
 
   id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
 
@@ -99,6 +158,9 @@ class Interview(Base):
   resume_id: Mapped[int] = mapped_column(ForeignKey('resumes.id', ondelete='CASCADE'), nullable=False)
 
   scheduled_at: Mapped[dt.datetime | None] = mapped_column(DateTime, nullable=True)
+  duration_minutes: Mapped[int] = mapped_column(Integer, nullable=False, default=60)
+  # scheduled_at + duration_minutes, kept in step by crud (None while unscheduled).
+  ends_at: Mapped[dt.datetime | None] = mapped_column(DateTime, nullable=True)
   status: Mapped[str] = mapped_column(String(20), nullable=False, default='scheduled')
 
   interview_round: Mapped[str] = mapped_column(String(40), nullable=False, default='')
@@ -115,3 +177,229 @@ class Interview(Base):
 
   job: Mapped['Job'] = relationship(back_populates='interviews')
   resume: Mapped['Resume'] = relationship(back_populates='interviews')
+  transcript: Mapped['InterviewTranscript | None'] = relationship(cascade='all, delete-orphan', uselist=False)
+
+
+class InterviewTranscript(Base):
+  """Uploaded interview transcript, zlib-compressed, and the evaluation summarized from it."""
+
+  __tablename__ = 'interview_transcripts'
+
+  interview_id: Mapped[int] = mapped_column(ForeignKey('interviews.id', ondelete='CASCADE'), primary_key=True)
+  codec: Mapped[str] = mapped_column(String(10), nullable=False)
+  # UTF-8 size before compression, and its sha256.
+  size: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  sha256: Mapped[str] = mapped_column(String(64), nullable=False)
+  data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+  uploaded_at: Mapped[dt.datetime] = mapped_column(DateTime, nullable=False, default=dt.datetime.utcnow)
+
+  # 'pending' -> 'summarizing' -> 'done' | 'failed' (see services/transcripts.py).
+  status: Mapped[str] = mapped_column(String(20), nullable=False, default='pending')
+  chunk_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  evaluation: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+  model: Mapped[str] = mapped_column(String(80), nullable=False, default='')
+  is_mock: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+  prompt_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  output_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  error: Mapped[str] = mapped_column(Text, nullable=False, default='')
+  summarized_at: Mapped[dt.datetime | None] = mapped_column(DateTime, nullable=True)
+
+  chunks: Mapped[list['TranscriptChunk']] = relationship(cascade='all, delete-orphan', order_by='TranscriptChunk.idx')
+
+  @property
+  def text(self) -> str:
+    return decode_text(self.codec, self.data)
+
+
+class TranscriptChunk(Base):
+  """Map-step summary of one chunk; kept so a re-run only summarizes the chunks that are missing."""
+
+  __tablename__ = 'transcript_chunks'
+
+  interview_id: Mapped[int] = mapped_column(ForeignKey('interview_transcripts.interview_id', ondelete='CASCADE'), primary_key=True)
+  idx: Mapped[int] = mapped_column(Integer, primary_key=True)
+  # SQL NULL, not JSON null, for a failed chunk, so `summary IS NOT NULL` counts the finished ones.
+  summary: Mapped[dict | None] = mapped_column(JSON(none_as_null=True), nullable=True)
+  error: Mapped[str] = mapped_column(Text, nullable=False, default='')
+  prompt_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  output_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+SCORE_BUCKETS = 10
+
+
+class JobStats(Base):
+  """Per-job dashboard counters, kept in step with resume/analysis/interview writes by crud."""
+
+  __tablename__ = 'job_stats'
+
+  job_id: Mapped[int] = mapped_column(ForeignKey('jobs.id', ondelete='CASCADE'), primary_key=True)
+
+  resumes_received: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  resumes_analyzed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  resumes_interviewed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+  analyses_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  score_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+  interviews_scheduled: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  interviews_completed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  interviews_canceled: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class JobScoreBucket(Base):
+  """Histogram of `AIAnalysis.overall_score` per job; bucket i covers [10*i, 10*i + 9], 100 is in 9."""
+
+  __tablename__ = 'job_score_buckets'
+
+  job_id: Mapped[int] = mapped_column(ForeignKey('jobs.id', ondelete='CASCADE'), primary_key=True)
+  bucket: Mapped[int] = mapped_column(Integer, primary_key=True)
+  count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class ChangeEvent(Base):
+  """Append-only change feed behind GET /events; `seq` orders events across all workers."""
+
+  __tablename__ = 'change_events'
+  # AUTOINCREMENT so SQLite never hands out a pruned sequence number again.
+  __table_args__ = {'sqlite_autoincrement': True}
+
+  seq: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+  created_at: Mapped[dt.datetime] = mapped_column(DateTime, nullable=False, default=dt.datetime.utcnow)
+  # 'job', 'resume', 'analysis' or 'interview'; action is 'created', 'updated' or 'deleted'.
+  entity: Mapped[str] = mapped_column(String(20), nullable=False)
+  entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
+  action: Mapped[str] = mapped_column(String(10), nullable=False)
+  job_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+
+class ChangeCounter(Base):
+  """Monotonic per-table version, bumped by crud on every write; backs list/detail ETags."""
+
+  __tablename__ = 'change_counters'
+
+  name: Mapped[str] = mapped_column(String(40), primary_key=True)
+  version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class UsageDaily(Base):
+  """Token usage per UTC day x job x requesting user, incremented with each billed Gemini call.
+
+  `analyses` counts stored analyses only; question banks and transcript summaries add tokens alone.
+
+  user_id 0 stands for analyses without a requesting user; job_id is kept after a job is deleted so
+  past spend stays visible.
+  """
+
+  __tablename__ = 'usage_daily'
+
+  day: Mapped[dt.date] = mapped_column(Date, primary_key=True)
+  job_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+  user_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+  analyses: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  prompt_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  output_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  cached_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  latency_ms: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class Skill(Base):
+  """Canonical skill; `key` is services.skills.skill_key() of the canonical name."""
+
+  __tablename__ = 'skills'
+
+  id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+  key: Mapped[str] = mapped_column(String(120), nullable=False, unique=True)
+  name: Mapped[str] = mapped_column(String(120), nullable=False)
+
+
+class SkillAlias(Base):
+  """Every spelling seen so far (as a skill_key) -> its canonical skill."""
+
+  __tablename__ = 'skill_aliases'
+
+  alias: Mapped[str] = mapped_column(String(120), primary_key=True)
+  skill_id: Mapped[int] = mapped_column(ForeignKey('skills.id', ondelete='CASCADE'), nullable=False, index=True)
+
+
+# Normalized mirrors of Job.required_skills / nice_to_have and Resume.skills, rewritten by crud on
+# every write; the JSON columns keep the spelling and order shown in the API.
+class JobSkill(Base):
+  __tablename__ = 'job_skills'
+  __table_args__ = (Index('ix_job_skills_skill', 'skill_id', 'kind', 'job_id'),)
+
+  job_id: Mapped[int] = mapped_column(ForeignKey('jobs.id', ondelete='CASCADE'), primary_key=True)
+  skill_id: Mapped[int] = mapped_column(ForeignKey('skills.id', ondelete='CASCADE'), primary_key=True)
+  # 'required' or 'nice_to_have'
+  kind: Mapped[str] = mapped_column(String(20), primary_key=True)
+
+
+class ResumeSkill(Base):
+  __tablename__ = 'resume_skills'
+  __table_args__ = (Index('ix_resume_skills_skill', 'skill_id', 'resume_id'),)
+
+  resume_id: Mapped[int] = mapped_column(ForeignKey('resumes.id', ondelete='CASCADE'), primary_key=True)
+  skill_id: Mapped[int] = mapped_column(ForeignKey('skills.id', ondelete='CASCADE'), primary_key=True)
+
+
+class ResumeFingerprint(Base):
+  """Normalized-text hash and MinHash signature of a resume (see services/dedup.py)."""
+
+  __tablename__ = 'resume_fingerprints'
+
+  resume_id: Mapped[int] = mapped_column(ForeignKey('resumes.id', ondelete='CASCADE'), primary_key=True)
+  content_hash: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+  signature: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+
+class ResumeLshBand(Base):
+  """LSH index: one row per (band, bucket) of each resume's signature; near-duplicates share a row key."""
+
+  __tablename__ = 'resume_lsh_bands'
+
+  band: Mapped[int] = mapped_column(Integer, primary_key=True)
+  bucket: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+  resume_id: Mapped[int] = mapped_column(ForeignKey('resumes.id', ondelete='CASCADE'), primary_key=True)
+
+
+class JobQuestionBank(Base):
+  """When and from which job inputs the job-level interview questions were generated."""
+
+  __tablename__ = 'job_question_banks'
+
+  job_id: Mapped[int] = mapped_column(ForeignKey('jobs.id', ondelete='CASCADE'), primary_key=True)
+  # services.questions.job_inputs_hash() at generation time; a different value means the job changed.
+  inputs_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+  generated_at: Mapped[dt.datetime] = mapped_column(DateTime, nullable=False, default=dt.datetime.utcnow)
+  model: Mapped[str] = mapped_column(String(80), nullable=False, default='')
+  is_mock: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+  prompt_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  output_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class JobQuestion(Base):
+  """One interview question of a job: generated for the job as a whole ('job') or suggested by a
+  resume's analysis for that candidate's gaps ('candidate', linked to every resume that got it)."""
+
+  __tablename__ = 'job_questions'
+  __table_args__ = (Index('ix_job_questions_job', 'job_id', 'source'),)
+
+  id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+  job_id: Mapped[int] = mapped_column(ForeignKey('jobs.id', ondelete='CASCADE'), nullable=False)
+  source: Mapped[str] = mapped_column(String(20), nullable=False)
+  category: Mapped[str] = mapped_column(String(40), nullable=False, default='')
+  question: Mapped[str] = mapped_column(Text, nullable=False)
+  # How many analyses suggested this question (or a near-identical one) since it was stored.
+  times_suggested: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  created_at: Mapped[dt.datetime] = mapped_column(DateTime, nullable=False, default=dt.datetime.utcnow)
+
+  resume_links: Mapped[list['JobQuestionResume']] = relationship(cascade='all, delete-orphan')
+
+
+class JobQuestionResume(Base):
+  __tablename__ = 'job_question_resumes'
+  __table_args__ = (Index('ix_job_question_resumes_resume', 'resume_id', 'question_id'),)
+
+  question_id: Mapped[int] = mapped_column(ForeignKey('job_questions.id', ondelete='CASCADE'), primary_key=True)
+  resume_id: Mapped[int] = mapped_column(ForeignKey('resumes.id', ondelete='CASCADE'), primary_key=True)
@@ -1,96 +1,192 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+import datetime as dt
+from typing import Literal
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 
 from app import crud, models
 from app.deps import get_current_user
 from app.db import get_db
-from app.schemas import AIAnalysisCreate, AIAnalysisOut
-from app.services.gemini import PROMPT_VERSION, build_prompt, generate_analysis
+from app.http_cache import conditional_json
+from app.idempotency import idempotent
+from app.schemas import (
+  AIAnalysisCreate,
+  AIAnalysisListOut,
+  AIAnalysisOut,
+  RoutingTierStatsOut,
+  StaleAnalysesOut,
+  TokenBudgetOut,
+  UsageOut,
+  UsageRowOut,
+)
+from app.serialization import dump_rows, model_response
+from app.services.analysis import (
+  AnalysisBacklogFull,
+  active_analyses,
+  analysis_slot,
+  analyze_pair,
+  budget_status,
+  find_stale_analyses,
+  reanalyze_pairs,
+)
+from app.services.gemini import breaker_stats, context_cache_stats, hedge_stats, parse_stats, resolver_stats
+from app.services.routing import tier_by_name
 
 
 router = APIRouter(prefix='/ai-analyses', tags=['ai-analyses'])
 
 
-@router.get('', response_model=list[AIAnalysisOut])
+@router.get('', response_model=list[AIAnalysisListOut])
 def list_analyses(
+  request: Request,
   job_id: int | None = Query(default=None),
   resume_id: int | None = Query(default=None),
   db: Session = Depends(get_db),
   _current_user: models.User = Depends(get_current_user),
 ):
-  return crud.list_analyses(db, job_id=job_id, resume_id=resume_id)
+  return conditional_json(
+    request,
+    db,
+    tables=('ai_analyses',),
+    response_type=None,
+    build=lambda: dump_rows(crud.list_analyses(db, job_id=job_id, resume_id=resume_id), AIAnalysisListOut),
+  )
 
 
-@router.get('/{analysis_id}', response_model=AIAnalysisOut)
-def get_analysis(analysis_id: int, db: Session = Depends(get_db), _current_user: models.User = Depends(get_current_user)):
-  item = crud.get_analysis(db, analysis_id)
-  if not item:
-    raise HTTPException(status_code=404, detail='AIAnalysis not found')
-  return item
+@router.get('/metrics')
+def analysis_metrics(_current_user: models.User = Depends(get_current_user)):
+  return {
+    'parse': parse_stats(),
+    'resolver': resolver_stats(),
+    'breaker': breaker_stats(),
+    'hedge': hedge_stats(),
+    'context_cache': context_cache_stats(),
+    'active_analyses': active_analyses(),
+  }
+
+
+@router.get('/routing-stats', response_model=list[RoutingTierStatsOut])
+def routing_stats(db: Session = Depends(get_db), _current_user: models.User = Depends(get_current_user)):
+  out: list[RoutingTierStatsOut] = []
+  for tier_name, model, count, avg_latency, max_latency, tokens in crud.routing_stats(db):
+    tier = tier_by_name(tier_name)
+    out.append(
+      RoutingTierStatsOut(
+        route_tier=tier_name,
+        model=model,
+        count=count,
+        avg_latency_ms=round(avg_latency, 1),
+        max_latency_ms=max_latency,
+        estimated_prompt_tokens=tokens,
+        estimated_input_cost_usd=round(tokens / 1000 * (tier.input_cost_per_1k if tier else 0.0), 4),
+      )
+    )
+  return out
+
+
+@router.get('/usage', response_model=UsageOut)
+def usage(
+  group_by: Literal['day', 'job', 'user'] = Query(default='day'),
+  since: dt.date | None = Query(default=None),
+  until: dt.date | None = Query(default=None),
+  db: Session = Depends(get_db),
+  _current_user: models.User = Depends(get_current_user),
+):
+  rows = [
+    UsageRowOut(
+      key=str(key),
+      analyses=analyses,
+      prompt_tokens=prompt_tokens,
+      output_tokens=output_tokens,
+      cached_tokens=cached_tokens,
+      avg_latency_ms=round(latency_ms / analyses, 1) if analyses else 0.0,
+    )
+    for key, analyses, prompt_tokens, output_tokens, cached_tokens, latency_ms in crud.usage_summary(
+      db, group_by=group_by, since=since, until=until
+    )
+  ]
+  return UsageOut(group_by=group_by, rows=rows, budget=TokenBudgetOut(**budget_status(db)))
+
+
+@router.get('/stale', response_model=StaleAnalysesOut)
+def list_stale_analyses(
+  job_id: int | None = Query(default=None),
+  db: Session = Depends(get_db),
+  _current_user: models.User = Depends(get_current_user),
+):
+  stale = find_stale_analyses(db, job_id=job_id)
+  return StaleAnalysesOut(count=len(stale), analysis_ids=[a.id for a in stale], queued=False)
 
 
-@router.post('', response_model=AIAnalysisOut)
-async def create_analysis(data: AIAnalysisCreate, db: Session = Depends(get_db), _current_user: models.User = Depends(get_current_user)):
-  job = crud.get_job(db, data.job_id)
-  if not job:
-    raise HTTPException(status_code=400, detail='Invalid job_id')
-  resume = crud.get_resume(db, data.resume_id)
-  if not resume:
-    raise HTTPException(status_code=400, detail='Invalid resume_id')
-  if resume.job_id != job.id:
-    raise HTTPException(status_code=400, detail='Resume is not linked to the given job')
-
-  existing = crud.get_analysis_by_pair(db, job_id=job.id, resume_id=resume.id)
-  if existing and not data.force:
-    return existing
-
-  prompt = build_prompt(
-    job_title=job.title,
-    job_department=job.department,
-    job_description=job.description,
-    required_skills=job.required_skills,
-    nice_to_have=job.nice_to_have,
-    resume_text=resume.resume_text,
-    extra_conditions=data.extra_conditions,
-  )
+@router.post('/stale/reanalyze', response_model=StaleAnalysesOut)
+def reanalyze_stale(
+  background_tasks: BackgroundTasks,
+  job_id: int | None = Query(default=None),
+  db: Session = Depends(get_db),
+  current_user: models.User = Depends(get_current_user),
+):
+  if budget_status(db)['exhausted']:
+    raise HTTPException(status_code=429, detail='今日 AI 分析 token 額度已用完')
+  stale = find_stale_analyses(db, job_id=job_id)
+  if stale:
+    background_tasks.add_task(reanalyze_pairs, [(a.job_id, a.resume_id) for a in stale], current_user.id)
+  return StaleAnalysesOut(count=len(stale), analysis_ids=[a.id for a in stale], queued=bool(stale))
 
-  parsed, is_mock, model_used = await generate_analysis(prompt=prompt)
 
-  def int_score(key: str) -> int:
-    try:
-      return int(max(0, min(100, int(parsed.get(key, 0)))))
-    except Exception:
-      return 0
-
-  analysis = models.AIAnalysis(
-    job_id=job.id,
-    resume_id=resume.id,
-    model=model_used,
-    prompt_version=PROMPT_VERSION,
-    overall_score=int_score('overall_score'),
-    professional_score=int_score('professional_score'),
-    communication_score=int_score('communication_score'),
-    problem_solving_score=int_score('problem_solving_score'),
-    summary=str(parsed.get('summary', '')).strip(),
-    strengths=list(parsed.get('strengths') or []),
-    risks=list(parsed.get('risks') or []),
-    suggested_questions=list(parsed.get('suggested_questions') or []),
-    raw_response=parsed,
-    is_mock=is_mock,
-  )
+@router.get('/{analysis_id}', response_model=AIAnalysisOut)
+def get_analysis(analysis_id: int, request: Request, db: Session = Depends(get_db), _current_user: models.User = Depends(get_current_user)):
+  def build() -> models.AIAnalysis:
+    item = crud.get_analysis(db, analysis_id)
+    if not item:
+      raise HTTPException(status_code=404, detail='AIAnalysis not found')
+    return item
 
-  if existing:
-    db.delete(existing)
-    db.flush()
+  return conditional_json(request, db, tables=('ai_analyses',), response_type=AIAnalysisOut, build=build)
 
-  db.add(analysis)
-  db.commit()
-  db.refresh(analysis)
 
-  resume.status = 'analyzed'
-  db.add(resume)
-  db.commit()
+@router.post('', response_model=AIAnalysisOut)
+async def create_analysis(
+  data: AIAnalysisCreate,
+  request: Request,
+  db: Session = Depends(get_db),
+  current_user: models.User = Depends(get_current_user),
+):
+  """Analyze a pair; retries with the same Idempotency-Key (or identical concurrent requests) share one run."""
+
+  async def run():
+    job = crud.get_job(db, data.job_id)
+    if not job:
+      raise HTTPException(status_code=400, detail='Invalid job_id')
+    resume = crud.get_resume(db, data.resume_id)
+    if not resume:
+      raise HTTPException(status_code=400, detail='Invalid resume_id')
+    if resume.job_id != job.id:
+      raise HTTPException(status_code=400, detail='Resume is not linked to the given job')
+
+    existing = crud.get_analysis_by_pair(db, job_id=job.id, resume_id=resume.id)
+    if existing and not data.force:
+      return model_response(existing, AIAnalysisOut)
 
-  return analysis
+    try:
+      with analysis_slot():
+        analysis = await analyze_pair(
+          db,
+          job=job,
+          resume=resume,
+          extra_conditions=data.extra_conditions,
+          existing=existing,
+          user_id=current_user.id,
+          # force means "ask Gemini again", so never answer it with a copy.
+          allow_reuse=not data.force,
+        )
+    except AnalysisBacklogFull as exc:
+      raise HTTPException(
+        status_code=503,
+        detail='AI 分析佇列已滿，請稍後再試',
+        headers={'Retry-After': str(exc.retry_after)},
+      ) from exc
+    return model_response(analysis, AIAnalysisOut)
+
+  return await idempotent(request, scope='ai-analyses', user_id=current_user.id, payload=data, run=run)
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from app import crud, models
+from app.core.config import settings
+from app.core.events import change_broker
+from app.db import SessionLocal
+from app.deps import get_current_user
+from app.schemas import ChangeEventOut
+from app.serialization import dump_row
+
+
+router = APIRouter(prefix='/events', tags=['events'])
+
+
+def _bounds() -> tuple[int, int]:
+  with SessionLocal() as db:
+    return crud.change_feed_bounds(db)
+
+
+def _events_after(seq: int) -> list:
+  with SessionLocal() as db:
+    return crud.list_change_events(db, seq)
+
+
+async def _stream(request: Request, since: int | None) -> AsyncIterator[str]:
+  oldest, newest = await run_in_threadpool(_bounds)
+  yield 'retry: 3000\n\n'
+  if since is None:
+    last = newest
+  elif since > newest or (oldest and since < oldest - 1):
+    # Events the client missed were pruned (or the database was replaced): it has to refetch.
+    last = newest
+    yield f'id: {last}\nevent: reset\ndata: {{"seq":{last}}}\n\n'
+  else:
+    last = since
+
+  idle = 0.0
+  while not await request.is_disconnected():
+    rows = await run_in_threadpool(_events_after, last)
+    for row in rows:
+      last = row['seq']
+      yield f"id: {last}\nevent: change\ndata: {dump_row(row, ChangeEventOut).decode()}\n\n"
+    if rows:
+      idle = 0.0
+      continue
+    # Writes in this worker wake us at once; other workers' writes are picked up by the next poll.
+    if await change_broker.wait(settings.change_feed_poll_seconds):
+      continue
+    idle += settings.change_feed_poll_seconds
+    if idle >= settings.change_feed_keepalive_seconds:
+      idle = 0.0
+      yield ': keepalive\n\n'
+
+
+@router.get('')
+async def change_feed(
+  request: Request,
+  since: int | None = Query(default=None, ge=0, description='Resume after this sequence number'),
+  _current_user: models.User = Depends(get_current_user),
+):
+  """Server-sent events: one `change` event ({seq, entity, entityId, action, jobId}) per write.
+
+  Reconnects resume from `since` or the Last-Event-ID header; without either the feed starts at
+  the current end. A `reset` event means the gap could not be replayed and lists must be refetched.
+  """
+  if since is None:
+    last_event_id = request.headers.get('last-event-id', '')
+    since = int(last_event_id) if last_event_id.isdigit() else None
+  return StreamingResponse(
+    _stream(request, since),
+    media_type='text/event-stream',
+    # Content-Encoding keeps GZipMiddleware from buffering the stream.
+    headers={'Cache-Control': 'no-cache', 'Content-Encoding': 'identity', 'X-Accel-Buffering': 'no'},
+  )
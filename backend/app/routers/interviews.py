@@ -1,16 +1,113 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+import datetime as dt
+from contextlib import contextmanager
+from typing import Iterator
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app import crud, models
+from app.core.blobs import CODEC, StreamEncoder, decode_text
+from app.core.config import settings
 from app.deps import get_current_user
 from app.db import get_db
-from app.schemas import InterviewCreate, InterviewOut, InterviewUpdate
+from app.http_cache import conditional_json
+from app.schemas import (
+  INTERVIEW_MAX_MINUTES,
+  AvailabilityOut,
+  InterviewBatchCancel,
+  InterviewBatchCreate,
+  InterviewBatchItemOut,
+  InterviewBatchOut,
+  InterviewBatchUpdate,
+  InterviewConflictOut,
+  InterviewCreate,
+  InterviewerAvailabilityOut,
+  InterviewOut,
+  InterviewUpdate,
+  TimeSlotOut,
+  TranscriptOut,
+)
+from app.serialization import dump_rows, model_response
+from app.services.interview_batch import (
+  ItemResult,
+  cancel_batch,
+  create_batch,
+  slot_fields_after,
+  update_batch,
+  with_booking_lock,
+)
+from app.services.scheduling import availability, to_utc_naive
+from app.services.transcripts import is_summarizing, split_chunks, summarize_transcript
 
 
 router = APIRouter(prefix='/interviews', tags=['interviews'])
 
+# Interview responses embed the job title/department and the candidate name.
+_INTERVIEW_TABLES = ('interviews', 'jobs', 'resumes')
+
+
+# Longest range and most interviewers GET /interviews/availability answers for at once.
+_AVAILABILITY_MAX_DAYS = 62
+_AVAILABILITY_MAX_INTERVIEWERS = 50
+
+# Fields that move an interview on an interviewer's calendar.
+_SLOT_FIELDS = ('scheduled_at', 'duration_minutes', 'interviewer', 'status')
+
+
+@contextmanager
+def _calendar_busy_as_503() -> Iterator[None]:
+  try:
+    yield
+  except TimeoutError as exc:
+    raise HTTPException(
+      status_code=503,
+      detail='Interviewer calendar is busy, please retry',
+      headers={'Retry-After': '1'},
+    ) from exc
+
+
+def _raise_on_conflict(db: Session, *, exclude_ids: tuple[int, ...] = (), **slot) -> None:
+  conflicts = crud.find_interview_conflicts(db, exclude_ids=exclude_ids, **slot)
+  if conflicts:
+    raise HTTPException(
+      status_code=409,
+      detail={
+        'message': 'Interviewer is already booked at this time',
+        'conflicts': [InterviewConflictOut.model_validate(dict(row)).model_dump(mode='json', by_alias=True) for row in conflicts],
+      },
+    )
+
+
+def _batch_out(db: Session, results: list[ItemResult], committed: bool) -> InterviewBatchOut:
+  """Per-item results; the job/candidate fields of every returned interview come from one query."""
+  refs = crud.get_resume_refs(db, {r.interview.resume_id for r in results if r.interview is not None})
+  items = []
+  for result in results:
+    interview = None
+    if result.interview is not None:
+      ref = refs.get(result.interview.resume_id)
+      interview = InterviewOut(
+        **result.interview.__dict__,
+        job_title=(ref['job_title'] if ref else None),
+        department=(ref['department'] if ref else None),
+        candidate_name=(ref['candidate_name'] if ref else None),
+      )
+    items.append(
+      InterviewBatchItemOut(
+        index=result.index,
+        ok=result.ok,
+        status_code=result.status_code,
+        error=result.error,
+        conflicts=[InterviewConflictOut.model_validate(conflict) for conflict in result.conflicts],
+        interview=interview,
+      )
+    )
+  succeeded = sum(1 for item in items if item.ok)
+  return InterviewBatchOut(committed=committed, succeeded=succeeded, failed=len(items) - succeeded, results=items)
+
 
 def _to_out(interview, job=None, resume=None) -> InterviewOut:
   return InterviewOut(
@@ -23,19 +120,20 @@ def _to_out(interview, job=None, resume=None) -> InterviewOut:
 
 @router.get('', response_model=list[InterviewOut])
 def list_interviews(
+  request: Request,
   job_id: int | None = Query(default=None),
   resume_id: int | None = Query(default=None),
   status: str | None = Query(default=None),
   db: Session = Depends(get_db),
   _current_user: models.User = Depends(get_current_user),
 ):
-  items = crud.list_interviews(db, job_id=job_id, resume_id=resume_id, status=status)
-  out: list[InterviewOut] = []
-  for it in items:
-    job = crud.get_job(db, it.job_id)
-    resume = crud.get_resume(db, it.resume_id)
-    out.append(_to_out(it, job=job, resume=resume))
-  return out
+  return conditional_json(
+    request,
+    db,
+    tables=_INTERVIEW_TABLES,
+    response_type=None,
+    build=lambda: dump_rows(crud.list_interviews(db, job_id=job_id, resume_id=resume_id, status=status), InterviewOut),
+  )
 
 
 @router.post('', response_model=InterviewOut)
@@ -49,18 +147,102 @@ def create_interview(data: InterviewCreate, db: Session = Depends(get_db), _curr
   if resume.job_id != job.id:
     raise HTTPException(status_code=400, detail='Resume is not linked to the given job')
 
-  created = crud.create_interview(db, data)
-  return _to_out(created, job=job, resume=resume)
+  def create() -> models.Interview:
+    _raise_on_conflict(
+      db,
+      interviewer=data.interviewer,
+      scheduled_at=data.scheduled_at,
+      duration_minutes=data.duration_minutes,
+      status=data.status,
+    )
+    return crud.create_interview(db, data)
+
+  # The check and the insert run under the interviewer's booking lock, so a concurrent request
+  # cannot pass the same check before this one commits.
+  with _calendar_busy_as_503():
+    created = with_booking_lock(db, lambda: {data.interviewer}, create)
+  return model_response(_to_out(created, job=job, resume=resume), InterviewOut)
+
+
+@router.get('/availability', response_model=AvailabilityOut)
+def interviewer_availability(
+  start: dt.datetime,
+  end: dt.datetime,
+  interviewer: list[str] = Query(default=[], description='Repeat for each interviewer'),
+  min_minutes: int = Query(default=30, ge=1, le=INTERVIEW_MAX_MINUTES, description='Shortest free slot to report'),
+  db: Session = Depends(get_db),
+  _current_user: models.User = Depends(get_current_user),
+):
+  """Busy and free time of each interviewer in [start, end), and the slots when all of them are free.
+
+  Canceled interviews do not count as busy. Times are UTC.
+  """
+  names = list(dict.fromkeys(name.strip() for name in interviewer if name.strip()))
+  if not names:
+    raise HTTPException(status_code=400, detail='At least one interviewer is required')
+  if len(names) > _AVAILABILITY_MAX_INTERVIEWERS:
+    raise HTTPException(status_code=400, detail=f'At most {_AVAILABILITY_MAX_INTERVIEWERS} interviewers per request')
+  start, end = to_utc_naive(start), to_utc_naive(end)
+  if end <= start:
+    raise HTTPException(status_code=400, detail='end must be after start')
+  if end - start > dt.timedelta(days=_AVAILABILITY_MAX_DAYS):
+    raise HTTPException(status_code=400, detail=f'Range is limited to {_AVAILABILITY_MAX_DAYS} days')
+
+  busy: dict[str, list[tuple[dt.datetime, dt.datetime]]] = {name: [] for name in names}
+  for row in crud.list_bookings(db, names, start, end):
+    busy[row['interviewer']].append((row['scheduled_at'], row['ends_at']))
+  per_interviewer, common = availability(busy, start, end, dt.timedelta(minutes=min_minutes))
+
+  def slots(intervals: list[tuple[dt.datetime, dt.datetime]]) -> list[TimeSlotOut]:
+    return [TimeSlotOut(start=s, end=e) for s, e in intervals]
+
+  return model_response(
+    AvailabilityOut(
+      start=start,
+      end=end,
+      interviewers=[
+        InterviewerAvailabilityOut(interviewer=name, busy=slots(taken), free=slots(free))
+        for name, (taken, free) in per_interviewer.items()
+      ],
+      common_free=slots(common),
+    ),
+    AvailabilityOut,
+  )
+
+
+@router.post('/batch', response_model=InterviewBatchOut)
+def create_interviews(data: InterviewBatchCreate, db: Session = Depends(get_db), _current_user: models.User = Depends(get_current_user)):
+  """Schedule many interviews at once; each item is checked like POST /interviews and against the others."""
+  with _calendar_busy_as_503():
+    results, committed = create_batch(db, data.items, atomic=data.atomic)
+  return model_response(_batch_out(db, results, committed), InterviewBatchOut)
+
+
+@router.patch('/batch', response_model=InterviewBatchOut)
+def update_interviews(data: InterviewBatchUpdate, db: Session = Depends(get_db), _current_user: models.User = Depends(get_current_user)):
+  """Reschedule or edit many interviews at once; each item is a PUT /interviews/{id} body plus its id."""
+  with _calendar_busy_as_503():
+    results, committed = update_batch(db, data.items, atomic=data.atomic)
+  return model_response(_batch_out(db, results, committed), InterviewBatchOut)
+
+
+@router.post('/batch/cancel', response_model=InterviewBatchOut)
+def cancel_interviews(data: InterviewBatchCancel, db: Session = Depends(get_db), _current_user: models.User = Depends(get_current_user)):
+  results, committed = cancel_batch(db, data.ids, atomic=data.atomic)
+  return model_response(_batch_out(db, results, committed), InterviewBatchOut)
 
 
 @router.get('/{interview_id}', response_model=InterviewOut)
-def get_interview(interview_id: int, db: Session = Depends(get_db), _current_user: models.User = Depends(get_current_user)):
-  item = crud.get_interview(db, interview_id)
-  if not item:
-    raise HTTPException(status_code=404, detail='Interview not found')
-  job = crud.get_job(db, item.job_id)
-  resume = crud.get_resume(db, item.resume_id)
-  return _to_out(item, job=job, resume=resume)
+def get_interview(interview_id: int, request: Request, db: Session = Depends(get_db), _current_user: models.User = Depends(get_current_user)):
+  def build() -> InterviewOut:
+    item = crud.get_interview(db, interview_id)
+    if not item:
+      raise HTTPException(status_code=404, detail='Interview not found')
+    job = crud.get_job(db, item.job_id)
+    resume = crud.get_resume(db, item.resume_id)
+    return _to_out(item, job=job, resume=resume)
+
+  return conditional_json(request, db, tables=_INTERVIEW_TABLES, response_type=InterviewOut, build=build)
 
 
 @router.put('/{interview_id}', response_model=InterviewOut)
@@ -68,10 +250,28 @@ def update_interview(interview_id: int, data: InterviewUpdate, db: Session = Dep
   item = crud.get_interview(db, interview_id)
   if not item:
     raise HTTPException(status_code=404, detail='Interview not found')
-  updated = crud.update_interview(db, item, data)
+  patch = crud.interview_patch(data)
+  if any(field in patch for field in _SLOT_FIELDS):
+
+    def interviewers() -> set[str]:
+      current = crud.get_interview(db, interview_id)
+      return {slot_fields_after(current, patch)['interviewer']} if current else set()
+
+    def update() -> models.Interview:
+      # Re-read under the lock: the interview may have changed or gone since the first read.
+      current = crud.get_interview(db, interview_id)
+      if not current:
+        raise HTTPException(status_code=404, detail='Interview not found')
+      _raise_on_conflict(db, exclude_ids=(current.id,), **slot_fields_after(current, patch))
+      return crud.update_interviews(db, [(current, patch)])[0]
+
+    with _calendar_busy_as_503():
+      updated = with_booking_lock(db, interviewers, update)
+  else:
+    updated = crud.update_interviews(db, [(item, patch)])[0]
   job = crud.get_job(db, updated.job_id)
   resume = crud.get_resume(db, updated.resume_id)
-  return _to_out(updated, job=job, resume=resume)
+  return model_response(_to_out(updated, job=job, resume=resume), InterviewOut)
 
 
 @router.delete('/{interview_id}')
@@ -81,3 +281,87 @@ def delete_interview(interview_id: int, db: Session = Depends(get_db), _current_
     raise HTTPException(status_code=404, detail='Interview not found')
   crud.delete_interview(db, item)
   return {'ok': True}
+
+
+def _transcript_out(db: Session, transcript: models.InterviewTranscript, *, include_text: bool = False) -> TranscriptOut:
+  return TranscriptOut.model_validate(
+    {
+      **{name: getattr(transcript, name) for name in TranscriptOut.model_fields if name not in ('chunks_done', 'text')},
+      'chunks_done': crud.count_transcript_chunks_done(db, transcript.interview_id),
+      'text': transcript.text if include_text else None,
+    }
+  )
+
+
+@router.put('/{interview_id}/transcript', response_model=TranscriptOut, status_code=202)
+async def upload_transcript(
+  interview_id: int,
+  request: Request,
+  background_tasks: BackgroundTasks,
+  summarize: bool = Query(default=True, description='Start summarizing right after the upload'),
+  db: Session = Depends(get_db),
+  current_user: models.User = Depends(get_current_user),
+):
+  """Upload (or replace) the transcript as the raw UTF-8 request body; it is compressed as it streams in."""
+  item = await run_in_threadpool(crud.get_interview, db, interview_id)
+  if not item:
+    raise HTTPException(status_code=404, detail='Interview not found')
+  if is_summarizing(interview_id):
+    raise HTTPException(status_code=409, detail='Transcript is being summarized')
+
+  encoder = StreamEncoder()
+  async for part in request.stream():
+    encoder.update(part)
+    if encoder.size > settings.transcript_max_bytes:
+      raise HTTPException(status_code=413, detail=f'Transcript exceeds {settings.transcript_max_bytes} bytes')
+  digest, data, size = encoder.finish()
+  chunk_count = await run_in_threadpool(_count_transcript_chunks, data)
+
+  def store() -> TranscriptOut:
+    transcript = crud.store_transcript(db, item, digest=digest, data=data, size=size, chunk_count=chunk_count)
+    return _transcript_out(db, transcript)
+
+  out = await run_in_threadpool(store)
+  if summarize:
+    background_tasks.add_task(summarize_transcript, interview_id, current_user.id)
+  return model_response(out, TranscriptOut, status_code=202)
+
+
+def _count_transcript_chunks(data: bytes) -> int:
+  """Decode the compressed upload and count its summary chunks (CPU-bound, run in the threadpool)."""
+  try:
+    text = decode_text(CODEC, data)
+  except UnicodeDecodeError as exc:
+    raise HTTPException(status_code=400, detail='Transcript must be UTF-8 text') from exc
+  if not text.strip():
+    raise HTTPException(status_code=400, detail='Transcript is empty')
+  return len(split_chunks(text, settings.transcript_chunk_tokens))
+
+
+@router.get('/{interview_id}/transcript', response_model=TranscriptOut)
+def get_transcript(
+  interview_id: int,
+  include_text: bool = Query(default=False),
+  db: Session = Depends(get_db),
+  _current_user: models.User = Depends(get_current_user),
+):
+  transcript = crud.get_transcript(db, interview_id)
+  if not transcript:
+    raise HTTPException(status_code=404, detail='Transcript not found')
+  return model_response(_transcript_out(db, transcript, include_text=include_text), TranscriptOut)
+
+
+@router.post('/{interview_id}/transcript/summarize', response_model=TranscriptOut, status_code=202)
+def summarize_interview_transcript(
+  interview_id: int,
+  background_tasks: BackgroundTasks,
+  db: Session = Depends(get_db),
+  current_user: models.User = Depends(get_current_user),
+):
+  """(Re)start summarization; chunks summarized by an earlier run are kept and only the rest are sent."""
+  transcript = crud.get_transcript(db, interview_id)
+  if not transcript:
+    raise HTTPException(status_code=404, detail='Transcript not found')
+  if not is_summarizing(interview_id):
+    background_tasks.add_task(summarize_transcript, interview_id, current_user.id)
+  return model_response(_transcript_out(db, transcript), TranscriptOut, status_code=202)
@@ -1,48 +1,215 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Literal
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app import crud
 from app.deps import get_current_user
 from app.db import get_db
+from app.http_cache import conditional_json
+from app.services.export import MEDIA_TYPES, stream_job_export
+from app.services.analysis import budget_status
+from app.services.gemini import invalidate_job_context_cache
+from app.services.questions import is_stale, refresh_job_questions, refresh_job_questions_task
 from app import models
-from app.schemas import JobCreate, JobOut, JobUpdate
+from app.schemas import JobCreate, JobListOut, JobOut, JobStatsOut, JobUpdate, QuestionBankOut, SkillMatchOut
+from app.serialization import dump_rows, model_response
 
 
 router = APIRouter(prefix='/jobs', tags=['jobs'])
 
 
-@router.get('', response_model=list[JobOut])
-def list_jobs(db: Session = Depends(get_db), _current_user: models.User = Depends(get_current_user)):
-  return crud.list_jobs(db)
+def _stats_out(job_id: int, stats: models.JobStats | None, histogram: list[int]) -> JobStatsOut:
+  resumes = {
+    'received': stats.resumes_received if stats else 0,
+    'analyzed': stats.resumes_analyzed if stats else 0,
+    'interviewed': stats.resumes_interviewed if stats else 0,
+  }
+  analyses_count = stats.analyses_count if stats else 0
+  return JobStatsOut(
+    job_id=job_id,
+    resumes_total=sum(resumes.values()),
+    resumes_by_status=resumes,
+    analyses_count=analyses_count,
+    average_score=(round(stats.score_sum / analyses_count, 1) if stats and analyses_count else None),
+    score_histogram=histogram,
+    interviews_by_status={
+      'scheduled': stats.interviews_scheduled if stats else 0,
+      'completed': stats.interviews_completed if stats else 0,
+      'canceled': stats.interviews_canceled if stats else 0,
+    },
+  )
 
 
-@router.post('', response_model=JobOut)
-def create_job(data: JobCreate, db: Session = Depends(get_db), _current_user: models.User = Depends(get_current_user)):
-  return crud.create_job(db, data)
+@router.get('', response_model=list[JobListOut])
+def list_jobs(request: Request, db: Session = Depends(get_db), _current_user: models.User = Depends(get_current_user)):
+  return conditional_json(request, db, tables=('jobs',), response_type=None, build=lambda: dump_rows(crud.list_jobs(db), JobListOut))
 
 
-@router.get('/{job_id}', response_model=JobOut)
-def get_job(job_id: int, db: Session = Depends(get_db), _current_user: models.User = Depends(get_current_user)):
+@router.post('', response_model=JobOut, status_code=201)
+def create_job(
+  data: JobCreate,
+  background_tasks: BackgroundTasks,
+  db: Session = Depends(get_db),
+  current_user: models.User = Depends(get_current_user),
+):
+  job = crud.create_job(db, data)
+  if job.ai_question_gen_enabled:
+    background_tasks.add_task(refresh_job_questions_task, job.id, current_user.id)
+  return model_response(job, JobOut, status_code=201)
+
+
+@router.get('/stats', response_model=list[JobStatsOut])
+def list_job_stats(db: Session = Depends(get_db), _current_user: models.User = Depends(get_current_user)):
+  return [_stats_out(stats.job_id, stats, histogram) for stats, histogram in crud.list_job_stats(db)]
+
+
+@router.get('/{job_id}/stats', response_model=JobStatsOut)
+def get_job_stats(job_id: int, db: Session = Depends(get_db), _current_user: models.User = Depends(get_current_user)):
+  stats, histogram = crud.get_job_stats(db, job_id)
+  if stats is None and not crud.get_job(db, job_id):
+    raise HTTPException(status_code=404, detail='Job not found')
+  return _stats_out(job_id, stats, histogram)
+
+
+@router.get('/{job_id}/skill-matches', response_model=list[SkillMatchOut])
+def get_skill_matches(
+  job_id: int,
+  request: Request,
+  min_matches: int = Query(default=1, ge=1),
+  include_nice_to_have: bool = Query(default=False),
+  limit: int = Query(default=200, ge=1, le=5000),
+  db: Session = Depends(get_db),
+  _current_user: models.User = Depends(get_current_user),
+):
+  """Resumes (for any job) sharing at least `min_matches` of this job's skills, best match first."""
+  if not crud.get_job(db, job_id):
+    raise HTTPException(status_code=404, detail='Job not found')
+
+  def build() -> bytes:
+    total, rows = crud.skill_matches(
+      db, job_id, min_matches=min_matches, include_nice_to_have=include_nice_to_have, limit=limit
+    )
+    return dump_rows(({**row, 'job_skills': total} for row in rows), SkillMatchOut)
+
+  return conditional_json(request, db, tables=('jobs', 'resumes'), response_type=None, build=build)
+
+
+@router.get('/{job_id}/export')
+def export_job(
+  job_id: int,
+  format: Literal['csv', 'xlsx'] = Query(default='csv'),
+  db: Session = Depends(get_db),
+  _current_user: models.User = Depends(get_current_user),
+):
+  """Download every candidate of the job with their latest analysis and interview, streamed."""
+  if not crud.get_job(db, job_id):
+    raise HTTPException(status_code=404, detail='Job not found')
+  return StreamingResponse(
+    stream_job_export(job_id, format),
+    media_type=MEDIA_TYPES[format],
+    headers={'Content-Disposition': f'attachment; filename="job-{job_id}-candidates.{format}"'},
+  )
+
+
+def _question_bank_out(db: Session, job: models.Job, resume_id: int | None) -> QuestionBankOut:
+  bank = crud.get_question_bank(db, job.id)
+  return QuestionBankOut(
+    job_id=job.id,
+    generated_at=bank.generated_at if bank else None,
+    model=bank.model if bank else '',
+    is_mock=bank.is_mock if bank else False,
+    stale=is_stale(bank, job),
+    questions=[dict(row) for row in crud.list_job_questions(db, job.id, resume_id=resume_id)],
+  )
+
+
+@router.get('/{job_id}/questions', response_model=QuestionBankOut)
+def get_job_questions(
+  job_id: int,
+  request: Request,
+  resume_id: int | None = Query(default=None, description="Also include this candidate's questions"),
+  db: Session = Depends(get_db),
+  _current_user: models.User = Depends(get_current_user),
+):
+  """Interview questions for the job, served from the bank generated once per version of the job.
+
+  Candidate questions come from that resume's latest analysis. Read-only: a missing or outdated bank
+  is reported with `stale` and regenerated after the job is saved or through `/questions/generate`.
+  """
   job = crud.get_job(db, job_id)
   if not job:
     raise HTTPException(status_code=404, detail='Job not found')
-  return job
+  return conditional_json(
+    request,
+    db,
+    tables=('jobs', 'job_questions'),
+    response_type=QuestionBankOut,
+    build=lambda: _question_bank_out(db, job, resume_id),
+  )
+
 
+@router.post('/{job_id}/questions/generate', response_model=QuestionBankOut)
+async def generate_job_questions(
+  job_id: int,
+  db: Session = Depends(get_db),
+  current_user: models.User = Depends(get_current_user),
+):
+  """Regenerate the job-level questions even when the bank is current."""
+  job = await run_in_threadpool(crud.get_job, db, job_id)
+  if not job:
+    raise HTTPException(status_code=404, detail='Job not found')
+  if not job.ai_question_gen_enabled:
+    raise HTTPException(status_code=400, detail='AI question generation is disabled for this job')
+  if (await run_in_threadpool(budget_status, db))['exhausted']:
+    raise HTTPException(status_code=429, detail='今日 AI 分析 token 額度已用完')
+  if not await refresh_job_questions(db, job, current_user.id, force=True):
+    raise HTTPException(status_code=503, detail='面試題庫產生失敗，請稍後再試')
+  bank = await run_in_threadpool(_question_bank_out, db, job, None)
+  return model_response(bank, QuestionBankOut)
 
+
+@router.get('/{job_id}', response_model=JobOut)
+def get_job(job_id: int, request: Request, db: Session = Depends(get_db), _current_user: models.User = Depends(get_current_user)):
+  def build() -> models.Job:
+    job = crud.get_job(db, job_id)
+    if not job:
+      raise HTTPException(status_code=404, detail='Job not found')
+    return job
+
+  return conditional_json(request, db, tables=('jobs',), response_type=JobOut, build=build)
+
+
+# Update and delete are async so invalidating the job's Gemini context caches can schedule the remote
+# deletes on the event loop; the database work still runs in the threadpool.
 @router.put('/{job_id}', response_model=JobOut)
-def update_job(job_id: int, data: JobUpdate, db: Session = Depends(get_db), _current_user: models.User = Depends(get_current_user)):
-  job = crud.get_job(db, job_id)
+async def update_job(
+  job_id: int,
+  data: JobUpdate,
+  background_tasks: BackgroundTasks,
+  db: Session = Depends(get_db),
+  current_user: models.User = Depends(get_current_user),
+):
+  job = await run_in_threadpool(crud.get_job, db, job_id)
   if not job:
     raise HTTPException(status_code=404, detail='Job not found')
-  return crud.update_job(db, job, data)
+  updated = await run_in_threadpool(crud.update_job, db, job, data)
+  invalidate_job_context_cache(job_id)
+  if updated.ai_question_gen_enabled:
+    # A no-op when the edit left the question inputs unchanged.
+    background_tasks.add_task(refresh_job_questions_task, job_id, current_user.id)
+  return model_response(updated, JobOut)
 
 
 @router.delete('/{job_id}')
-def delete_job(job_id: int, db: Session = Depends(get_db), _current_user: models.User = Depends(get_current_user)):
-  job = crud.get_job(db, job_id)
+async def delete_job(job_id: int, db: Session = Depends(get_db), _current_user: models.User = Depends(get_current_user)):
+  job = await run_in_threadpool(crud.get_job, db, job_id)
   if not job:
     raise HTTPException(status_code=404, detail='Job not found')
-  crud.delete_job(db, job)
+  await run_in_threadpool(crud.delete_job, db, job)
+  invalidate_job_context_cache(job_id)
   return {'ok': True}
@@ -1,62 +1,94 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app import crud
 from app import models
 from app.deps import get_current_user
 from app.db import get_db
-from app.schemas import ResumeCreate, ResumeOut
+from app.http_cache import conditional_json
+from app.idempotency import idempotent
+from app.schemas import ResumeCreate, ResumeDuplicateOut, ResumeListOut, ResumeOut
+from app.serialization import dump_rows, model_response
 
 
 router = APIRouter(prefix='/resumes', tags=['resumes'])
 
+# Resume responses embed the job title and the latest analysis.
+_RESUME_TABLES = ('resumes', 'jobs', 'ai_analyses')
 
-@router.get('', response_model=list[ResumeOut])
+
+@router.get('', response_model=list[ResumeListOut])
 def list_resumes(
+  request: Request,
   job_id: int | None = Query(default=None),
+  skill: str | None = Query(default=None, description='Only resumes listing this skill (any alias)'),
   db: Session = Depends(get_db),
   _current_user: models.User = Depends(get_current_user),
 ):
-  items = crud.list_resumes(db, job_id=job_id)
-  out: list[ResumeOut] = []
-  for r in items:
-    latest = crud.get_latest_analysis_for_resume(db, r.id)
-    out.append(
-      ResumeOut(
-        **r.__dict__,
-        applied_job_title=(r.job.title if getattr(r, 'job', None) else None),
-        ai_match_score=(latest.overall_score if latest else None),
-        ai_summary=(latest.summary if latest else None),
-        match_highlights=(list(latest.strengths)[:5] if latest and latest.strengths else []),
-        analysis_id=(latest.id if latest else None),
-      )
-    )
-  return out
+  return conditional_json(
+    request,
+    db,
+    tables=_RESUME_TABLES,
+    response_type=None,
+    build=lambda: dump_rows(crud.list_resumes(db, job_id=job_id, skill=skill), ResumeListOut),
+  )
 
 
 @router.post('', response_model=ResumeOut)
-def create_resume(data: ResumeCreate, db: Session = Depends(get_db), _current_user: models.User = Depends(get_current_user)):
-  job = crud.get_job(db, data.job_id)
-  if not job:
-    raise HTTPException(status_code=400, detail='Invalid job_id')
-  resume = crud.create_resume(db, data)
-  return ResumeOut(**resume.__dict__, applied_job_title=job.title)
+async def create_resume(
+  data: ResumeCreate,
+  request: Request,
+  db: Session = Depends(get_db),
+  current_user: models.User = Depends(get_current_user),
+):
+  """Create a resume; a retry with the same Idempotency-Key gets the first response instead of a second row."""
 
+  def create():
+    job = crud.get_job(db, data.job_id)
+    if not job:
+      raise HTTPException(status_code=400, detail='Invalid job_id')
+    resume = crud.create_resume(db, data)
+    return model_response(ResumeOut(**resume.__dict__, applied_job_title=job.title), ResumeOut)
 
-@router.get('/{resume_id}', response_model=ResumeOut)
-def get_resume(resume_id: int, db: Session = Depends(get_db), _current_user: models.User = Depends(get_current_user)):
-  resume = crud.get_resume(db, resume_id)
-  if not resume:
-    raise HTTPException(status_code=404, detail='Resume not found')
-  job = crud.get_job(db, resume.job_id)
-  latest = crud.get_latest_analysis_for_resume(db, resume.id)
-  return ResumeOut(
-    **resume.__dict__,
-    applied_job_title=(job.title if job else None),
-    ai_match_score=(latest.overall_score if latest else None),
-    ai_summary=(latest.summary if latest else None),
-    match_highlights=(list(latest.strengths)[:5] if latest and latest.strengths else []),
-    analysis_id=(latest.id if latest else None),
+  return await idempotent(
+    request, scope='resumes', user_id=current_user.id, payload=data, run=lambda: run_in_threadpool(create)
   )
+
+
+@router.get('/{resume_id}', response_model=ResumeOut)
+def get_resume(resume_id: int, request: Request, db: Session = Depends(get_db), _current_user: models.User = Depends(get_current_user)):
+  def build() -> ResumeOut:
+    resume = crud.get_resume(db, resume_id)
+    if not resume:
+      raise HTTPException(status_code=404, detail='Resume not found')
+    job = crud.get_job(db, resume.job_id)
+    latest = crud.get_latest_analysis_for_resume(db, resume.id)
+    return ResumeOut(
+      **resume.__dict__,
+      applied_job_title=(job.title if job else None),
+      ai_match_score=(latest.overall_score if latest else None),
+      ai_summary=(latest.summary if latest else None),
+      match_highlights=(list(latest.strengths)[:5] if latest and latest.strengths else []),
+      analysis_id=(latest.id if latest else None),
+    )
+
+  return conditional_json(request, db, tables=_RESUME_TABLES, response_type=ResumeOut, build=build)
+
+
+@router.get('/{resume_id}/duplicates', response_model=list[ResumeDuplicateOut])
+def list_resume_duplicates(
+  resume_id: int,
+  request: Request,
+  min_similarity: float | None = Query(default=None, ge=0, le=1, description='Defaults to RESUME_DEDUP_THRESHOLD'),
+  db: Session = Depends(get_db),
+  _current_user: models.User = Depends(get_current_user),
+):
+  def build() -> bytes:
+    if not crud.get_resume(db, resume_id):
+      raise HTTPException(status_code=404, detail='Resume not found')
+    return dump_rows(crud.list_resume_duplicates(db, resume_id, threshold=min_similarity), ResumeDuplicateOut)
+
+  return conditional_json(request, db, tables=('resumes', 'jobs'), response_type=None, build=build)
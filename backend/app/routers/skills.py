@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from app.deps import get_current_user
+from app.db import get_db
+from app.http_cache import conditional_json
+from app.schemas import SkillOut
+from app.serialization import dump_rows
+
+
+router = APIRouter(prefix='/skills', tags=['skills'])
+
+
+@router.get('', response_model=list[SkillOut])
+def list_skills(request: Request, db: Session = Depends(get_db), _current_user: models.User = Depends(get_current_user)):
+  # The skills index is rewritten together with jobs and resumes.
+  return conditional_json(
+    request,
+    db,
+    tables=('jobs', 'resumes'),
+    response_type=None,
+    build=lambda: dump_rows(crud.list_skills(db), SkillOut),
+  )
@@ -56,6 +56,33 @@ class JobOut(JobBase):
   model_config = ConfigDict(from_attributes=True, populate_by_name=True, alias_generator=_to_camel)
 
 
+class JobListOut(APIModel):
+  """JobOut without `description`, for list views."""
+
+  id: int
+  title: str
+  department: str
+  required_skills: list[str] = Field(default_factory=list)
+  nice_to_have: list[str] = Field(default_factory=list)
+  status: JobStatus = 'open'
+  experience_level: str = '2-3'
+  education: str = '大學'
+  ai_resume_matching_enabled: bool = True
+  ai_question_gen_enabled: bool = True
+  created_at: dt.datetime
+  model_config = ConfigDict(from_attributes=True, populate_by_name=True, alias_generator=_to_camel)
+
+
+class JobStatsOut(APIModel):
+  job_id: int
+  resumes_total: int
+  resumes_by_status: dict[str, int]
+  analyses_count: int
+  average_score: float | None = None
+  score_histogram: list[int]
+  interviews_by_status: dict[str, int]
+
+
 class ResumeBase(APIModel):
   candidate_name: str
   job_id: int
@@ -78,9 +105,56 @@ class ResumeOut(ResumeBase):
   ai_summary: str | None = None
   match_highlights: list[str] = Field(default_factory=list)
   analysis_id: int | None = None
+  duplicate_of_id: int | None = None
+  duplicate_similarity: float | None = None
+  model_config = ConfigDict(from_attributes=True, populate_by_name=True, alias_generator=_to_camel)
+
+
+class ResumeListOut(APIModel):
+  """ResumeOut without `resume_text` and the latest analysis' summary/highlights, for list views."""
+
+  id: int
+  candidate_name: str
+  job_id: int
+  status: ResumeStatus = 'received'
+  education: str = ''
+  years_exp: int = 0
+  skills: list[str] = Field(default_factory=list)
+  submitted_at: dt.datetime
+  applied_job_title: str | None = None
+  ai_match_score: int | None = None
+  analysis_id: int | None = None
+  duplicate_of_id: int | None = None
   model_config = ConfigDict(from_attributes=True, populate_by_name=True, alias_generator=_to_camel)
 
 
+class ResumeDuplicateOut(APIModel):
+  resume_id: int
+  candidate_name: str
+  job_id: int
+  applied_job_title: str | None = None
+  status: ResumeStatus
+  submitted_at: dt.datetime
+  similarity: float
+
+
+class SkillOut(APIModel):
+  id: int
+  name: str
+  job_count: int
+  resume_count: int
+
+
+class SkillMatchOut(APIModel):
+  resume_id: int
+  candidate_name: str
+  job_id: int
+  status: ResumeStatus
+  years_exp: int
+  matched_skills: int
+  job_skills: int
+
+
 class AIAnalysisCreate(APIModel):
   job_id: int
   resume_id: int
@@ -108,13 +182,107 @@ class AIAnalysisOut(APIModel):
 
   is_mock: bool
   raw_response: dict[str, Any]
+
+  route_tier: str = ''
+  estimated_prompt_tokens: int = 0
+  latency_ms: int = 0
+  prompt_tokens: int = 0
+  output_tokens: int = 0
+  cached_tokens: int = 0
+  requested_by_id: int | None = None
+  reused_from_id: int | None = None
   model_config = ConfigDict(from_attributes=True, populate_by_name=True, alias_generator=_to_camel)
 
 
+class AIAnalysisListOut(APIModel):
+  """AIAnalysisOut without the summary, bullet lists and raw_response, for list views."""
+
+  id: int
+  job_id: int
+  resume_id: int
+  created_at: dt.datetime
+  model: str
+  prompt_version: str
+
+  overall_score: int
+  professional_score: int
+  communication_score: int
+  problem_solving_score: int
+
+  is_mock: bool
+
+  route_tier: str = ''
+  latency_ms: int = 0
+  model_config = ConfigDict(from_attributes=True, populate_by_name=True, alias_generator=_to_camel)
+
+
+class QuestionOut(APIModel):
+  id: int
+  source: Literal['job', 'candidate']
+  category: str
+  question: str
+  times_suggested: int
+
+
+class QuestionBankOut(APIModel):
+  job_id: int
+  generated_at: dt.datetime | None = None
+  model: str = ''
+  is_mock: bool = False
+  # The job changed since the job-level questions were generated and they could not be refreshed yet.
+  stale: bool
+  questions: list[QuestionOut]
+
+
+class RoutingTierStatsOut(APIModel):
+  route_tier: str
+  model: str
+  count: int
+  avg_latency_ms: float
+  max_latency_ms: int
+  estimated_prompt_tokens: int
+  estimated_input_cost_usd: float
+
+
+class UsageRowOut(APIModel):
+  key: str
+  analyses: int
+  prompt_tokens: int
+  output_tokens: int
+  cached_tokens: int
+  avg_latency_ms: float
+
+
+class TokenBudgetOut(APIModel):
+  day: dt.date
+  used_tokens: int
+  limit_tokens: int
+  remaining_tokens: int | None
+  exhausted: bool
+  throttled: bool
+
+
+class UsageOut(APIModel):
+  group_by: str
+  rows: list[UsageRowOut]
+  budget: TokenBudgetOut
+
+
+class StaleAnalysesOut(APIModel):
+  count: int
+  analysis_ids: list[int]
+  queued: bool
+
+
+# Longest interview accepted; also bounds the index range scanned by conflict checks.
+INTERVIEW_MAX_MINUTES = 8 * 60
+
+
 class InterviewBase(APIModel):
   job_id: int
   resume_id: int
   scheduled_at: dt.datetime | None = None
+  duration_minutes: int = Field(default=60, ge=5, le=INTERVIEW_MAX_MINUTES)
   status: InterviewStatus = 'scheduled'
 
   interview_round: str = ''
@@ -133,6 +301,7 @@ class InterviewCreate(InterviewBase):
 
 class InterviewUpdate(APIModel):
   scheduled_at: dt.datetime | None = None
+  duration_minutes: int | None = Field(default=None, ge=5, le=INTERVIEW_MAX_MINUTES)
   status: InterviewStatus | None = None
 
   interview_round: str | None = None
@@ -147,6 +316,7 @@ class InterviewUpdate(APIModel):
 
 class InterviewOut(InterviewBase):
   id: int
+  ends_at: dt.datetime | None = None
   created_at: dt.datetime
   updated_at: dt.datetime
 
@@ -156,6 +326,92 @@ class InterviewOut(InterviewBase):
   model_config = ConfigDict(from_attributes=True, populate_by_name=True, alias_generator=_to_camel)
 
 
+class InterviewConflictOut(APIModel):
+  id: int
+  resume_id: int
+  interviewer: str
+  scheduled_at: dt.datetime
+  ends_at: dt.datetime
+
+
+# Batch endpoints (POST/PATCH /interviews/batch, POST /interviews/batch/cancel). With `atomic`, nothing
+# is written unless every item succeeds; otherwise the valid items are written and the rest reported.
+INTERVIEW_BATCH_MAX_ITEMS = 200
+
+
+class InterviewBatchCreate(APIModel):
+  items: list[InterviewCreate] = Field(min_length=1, max_length=INTERVIEW_BATCH_MAX_ITEMS)
+  atomic: bool = False
+
+
+class InterviewBatchUpdateItem(InterviewUpdate):
+  id: int
+
+
+class InterviewBatchUpdate(APIModel):
+  items: list[InterviewBatchUpdateItem] = Field(min_length=1, max_length=INTERVIEW_BATCH_MAX_ITEMS)
+  atomic: bool = False
+
+
+class InterviewBatchCancel(APIModel):
+  ids: list[int] = Field(min_length=1, max_length=INTERVIEW_BATCH_MAX_ITEMS)
+  atomic: bool = False
+
+
+class InterviewBatchItemOut(APIModel):
+  index: int
+  ok: bool
+  # What the single-item endpoint would have answered; 424 = valid but not written (atomic batch failed).
+  status_code: int
+  error: str | None = None
+  conflicts: list[InterviewConflictOut] = []
+  interview: InterviewOut | None = None
+
+
+class InterviewBatchOut(APIModel):
+  committed: bool
+  succeeded: int
+  failed: int
+  results: list[InterviewBatchItemOut]
+
+
+class TimeSlotOut(APIModel):
+  start: dt.datetime
+  end: dt.datetime
+
+
+class InterviewerAvailabilityOut(APIModel):
+  interviewer: str
+  busy: list[TimeSlotOut]
+  free: list[TimeSlotOut]
+
+
+class AvailabilityOut(APIModel):
+  start: dt.datetime
+  end: dt.datetime
+  interviewers: list[InterviewerAvailabilityOut]
+  # Free for every requested interviewer at once.
+  common_free: list[TimeSlotOut]
+
+
+class TranscriptOut(APIModel):
+  interview_id: int
+  size: int
+  uploaded_at: dt.datetime
+  status: Literal['pending', 'summarizing', 'done', 'failed']
+  chunk_count: int
+  chunks_done: int = 0
+  evaluation: dict[str, Any]
+  model: str
+  is_mock: bool
+  prompt_tokens: int
+  output_tokens: int
+  error: str
+  summarized_at: dt.datetime | None = None
+  text: str | None = None
+  model_config = ConfigDict(from_attributes=True, populate_by_name=True, alias_generator=_to_camel)
+
+
 class AuthRegister(APIModel):
   username: str
   password: str
@@ -177,3 +433,12 @@ class UserOut(APIModel):
   username: str
   created_at: dt.datetime
   model_config = ConfigDict(from_attributes=True, populate_by_name=True, alias_generator=_to_camel)
+
+
+class ChangeEventOut(APIModel):
+  seq: int
+  entity: Literal['job', 'resume', 'analysis', 'interview']
+  entity_id: int
+  action: Literal['created', 'updated', 'deleted']
+  job_id: int | None = None
+  created_at: dt.datetime
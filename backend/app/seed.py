@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import datetime as dt
+import random
+
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app import models
+from app import crud, models
 
 
 def seed_if_empty(db: Session) -> None:
@@ -60,4 +63,115 @@ def seed_if_empty(db: Session) -> None:
     skills=['Node.js', 'Express', 'PostgreSQL', 'Docker'],
   )
   db.add_all([resume1, resume2])
+  db.flush()
+  crud.rebuild_job_stats(db)
+  crud.rebuild_skill_index(db)
+  crud.rebuild_resume_fingerprints(db)
+  crud.mark_changed(db, 'jobs', 'resumes', 'ai_analyses', 'interviews')
+  db.commit()
+
+
+_BULK_SKILLS = [
+  'React', 'TypeScript', 'JavaScript', 'REST API', 'Node.js', 'SQL', 'PostgreSQL', 'Docker',
+  'Python', 'FastAPI', 'Go', 'Kubernetes', 'AWS', 'Testing', 'CI/CD', '系統設計',
+]
+_BULK_DEPARTMENTS = ['技術研發部', '平台服務部', '資料工程部', '產品設計部']
+_BULK_NAMES = ['林怡君', '陳冠宇', '王小明', '張雅婷', '李志豪', '黃淑芬', '吳承恩', '劉家豪']
+
+
+def seed_bulk(
+  db: Session,
+  *,
+  jobs: int,
+  resumes_per_job: int,
+  analyzed_ratio: float = 0.5,
+  interviewed_ratio: float = 0.2,
+  resume_chars: int = 1200,
+  seed: int = 42,
+) -> None:
+  """Deterministic, scaled-up variant of `seed_if_empty` used by the benchmark suite."""
+  rng = random.Random(seed)
+  now = dt.datetime.utcnow()
+
+  job_rows: list[models.Job] = []
+  for i in range(jobs):
+    required = rng.sample(_BULK_SKILLS, 3)
+    job_rows.append(
+      models.Job(
+        title=f'工程師職缺 #{i + 1}',
+        department=rng.choice(_BULK_DEPARTMENTS),
+        description='負責系統開發與維護，與產品團隊協作交付功能。' * 4,
+        required_skills=required,
+        nice_to_have=rng.sample([s for s in _BULK_SKILLS if s not in required], 2),
+        status='open',
+        experience_level=rng.choice(['0-1', '2-3', '4-6', '7+']),
+        education='大學',
+        created_at=now - dt.timedelta(minutes=i),
+      )
+    )
+  db.add_all(job_rows)
+  db.flush()
+
+  filler = '具備團隊合作與問題解決經驗，參與多個專案開發。'
+  for job in job_rows:
+    resume_rows: list[models.Resume] = []
+    for j in range(resumes_per_job):
+      skills = rng.sample(_BULK_SKILLS, 4)
+      text = f"熟悉 {', '.join(skills)}。" + filler * max(1, resume_chars // len(filler))
+      resume_rows.append(
+        models.Resume(
+          candidate_name=f'{rng.choice(_BULK_NAMES)}{j + 1}',
+          job_id=job.id,
+          resume_text=text[:resume_chars],
+          status='received',
+          education='國立大學 資工系',
+          years_exp=rng.randint(0, 12),
+          skills=skills,
+          submitted_at=now - dt.timedelta(minutes=j),
+        )
+      )
+    db.add_all(resume_rows)
+    db.flush()
+
+    for resume in resume_rows:
+      if rng.random() < analyzed_ratio:
+        score = rng.randint(40, 95)
+        db.add(
+          models.AIAnalysis(
+            job_id=job.id,
+            resume_id=resume.id,
+            model='gemini-2.5-flash',
+            prompt_version='v3',
+            overall_score=score,
+            professional_score=score,
+            communication_score=rng.randint(40, 95),
+            problem_solving_score=rng.randint(40, 95),
+            summary='候選人具備職缺所需的主要技能。',
+            strengths=['技能符合', '經驗完整'],
+            risks=['需確認實作深度'],
+            suggested_questions=['請分享一個代表性專案'],
+            raw_response_hash=crud.store_raw_response(db, {'overall_score': score, 'summary': '候選人具備職缺所需的主要技能。'}),
+            is_mock=True,
+          )
+        )
+        resume.status = 'analyzed'
+      if rng.random() < interviewed_ratio:
+        scheduled_at = now + dt.timedelta(hours=rng.randint(1, 24 * 14))
+        db.add(
+          models.Interview(
+            job_id=job.id,
+            resume_id=resume.id,
+            scheduled_at=scheduled_at,
+            duration_minutes=60,
+            ends_at=scheduled_at + dt.timedelta(minutes=60),
+            status=rng.choice(['scheduled', 'completed', 'canceled']),
+            interview_round='一面',
+            interviewer=f'面試官{rng.randint(1, 10)}',
+          )
+        )
+    db.commit()
+  crud.rebuild_job_stats(db)
+  crud.rebuild_skill_index(db)
+  crud.rebuild_resume_fingerprints(db)
+  crud.mark_changed(db, 'jobs', 'resumes', 'ai_analyses', 'interviews')
   db.commit()
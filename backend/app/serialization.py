@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Iterable, Mapping
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def adapter(tp: Any) -> TypeAdapter:
+  return TypeAdapter(tp)
+
+
+@lru_cache(maxsize=None)
+def _field_aliases(model: type[BaseModel]) -> tuple[tuple[str, str], ...]:
+  return tuple((name, field.alias or name) for name, field in model.model_fields.items())
+
+
+def dump(value: Any, response_type: Any) -> bytes:
+  """JSON for `value` (ORM objects, dicts or schema instances) shaped as `response_type`, camelCase keys.
+
+  Instances of the target schema pass validation as-is, so hand-built `...Out` objects are not
+  validated a second time.
+  """
+  tp = adapter(response_type)
+  return tp.dump_json(tp.validate_python(value, from_attributes=True), by_alias=True)
+
+
+def dump_rows(rows: Iterable[Mapping[str, Any]], model: type[BaseModel]) -> bytes:
+  """JSON array straight from SQL result mappings keyed by `model`'s field names, skipping Pydantic.
+
+  For list endpoints over trusted database rows: the query must select every field of `model`
+  (labelled with the field name); values go to orjson unchanged.
+  """
+  fields = _field_aliases(model)
+  return orjson.dumps([{alias: row[name] for name, alias in fields} for row in rows])
+
+
+def dump_row(row: Mapping[str, Any], model: type[BaseModel]) -> bytes:
+  """dump_rows for a single row (a JSON object rather than an array)."""
+  return orjson.dumps({alias: row[name] for name, alias in _field_aliases(model)})
+
+
+def json_response(body: bytes, *, status_code: int = 200, headers: Mapping[str, str] | None = None) -> Response:
+  return Response(content=body, status_code=status_code, media_type='application/json', headers=headers)
+
+
+def model_response(value: Any, response_type: Any, *, status_code: int = 200) -> Response:
+  """Serialize once here so FastAPI does not re-validate the value against `response_model`."""
+  return json_response(dump(value, response_type), status_code=status_code)
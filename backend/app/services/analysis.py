@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import logging
+import math
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from app.core.config import settings
+from app.core.shared_state import shared_state
+from app.db import SessionLocal
+from app.services.gemini import (
+  PROMPT_VERSION,
+  TokenUsage,
+  build_job_prefix,
+  build_resume_suffix,
+  circuit_open,
+  circuit_retry_after,
+  generate_analysis,
+  prompt_fingerprint,
+)
+from app.services.routing import route
+
+
+logger = logging.getLogger(__name__)
+
+# Shared-state keys (app/core/shared_state.py), so the limits hold across uvicorn workers:
+# the number of analyses waiting on Gemini (request path + background), for admission control,
+_ACTIVE_KEY = 'analysis:active'
+# and one claim per (job_id, resume_id) pair being re-analyzed in the background.
+_IN_FLIGHT_KEY = 'analysis:reanalyze:{job_id}:{resume_id}'
+
+
+class AnalysisBacklogFull(Exception):
+  def __init__(self, retry_after: int):
+    super().__init__('Analysis backlog is full')
+    self.retry_after = retry_after
+
+
+def active_analyses() -> int:
+  return max(0, int(shared_state().get(_ACTIVE_KEY) or 0))
+
+
+@contextmanager
+def analysis_slot(*, reject_when_full: bool = True) -> Iterator[None]:
+  """Count an in-flight analysis; raise AnalysisBacklogFull past `analysis_max_backlog`.
+
+  Background re-runs pass reject_when_full=False: they still count toward the backlog so interactive
+  requests get shed first, but are never refused themselves.
+  """
+  state = shared_state()
+  lease = settings.shared_state_lease_seconds
+  limit = settings.analysis_max_backlog
+  active = state.incr(_ACTIVE_KEY, 1, ttl=lease)
+  if reject_when_full and limit > 0 and active > limit:
+    state.incr(_ACTIVE_KEY, -1, ttl=lease)
+    retry_after = max(settings.analysis_retry_after_seconds, math.ceil(circuit_retry_after()))
+    raise AnalysisBacklogFull(retry_after)
+  try:
+    yield
+  finally:
+    state.incr(_ACTIVE_KEY, -1, ttl=lease)
+
+
+def _utc_today() -> dt.date:
+  return dt.datetime.now(dt.timezone.utc).date()
+
+
+def budget_status(db: Session) -> dict[str, Any]:
+  """Today's token spend against `analysis_daily_token_budget` (limit 0 = unlimited)."""
+  used = crud.tokens_used_on(db, _utc_today())
+  limit = settings.analysis_daily_token_budget
+  return {
+    'day': _utc_today().isoformat(),
+    'used_tokens': used,
+    'limit_tokens': limit,
+    'remaining_tokens': max(0, limit - used) if limit > 0 else None,
+    'exhausted': limit > 0 and used >= limit,
+    'throttled': limit > 0 and used >= limit * settings.analysis_budget_throttle_ratio,
+  }
+
+
+def build_pair_prefix(job: models.Job) -> str:
+  return build_job_prefix(
+    job_title=job.title,
+    job_department=job.department,
+    job_description=job.description,
+    required_skills=job.required_skills,
+    nice_to_have=job.nice_to_have,
+  )
+
+
+def build_pair_prompt(job: models.Job, resume: models.Resume, extra_conditions: str | None = None) -> str:
+  return build_pair_prefix(job) + build_resume_suffix(resume_text=resume.resume_text, extra_conditions=extra_conditions)
+
+
+def job_prompt_hash(job: models.Job) -> str:
+  """Hash of the job's part of the prompt (and PROMPT_VERSION); analyses with another one are stale."""
+  return prompt_fingerprint(build_pair_prefix(job))
+
+
+def resume_content_hash(resume: models.Resume) -> str:
+  return resume.fingerprint.content_hash if resume.fingerprint is not None else ''
+
+
+def _int_score(parsed: dict[str, Any], key: str) -> int:
+  try:
+    return int(max(0, min(100, int(parsed.get(key, 0)))))
+  except Exception:
+    return 0
+
+
+async def analyze_pair(
+  db: Session,
+  *,
+  job: models.Job,
+  resume: models.Resume,
+  extra_conditions: str | None = None,
+  existing: models.AIAnalysis | None = None,
+  user_id: int | None = None,
+  allow_reuse: bool = True,
+  keep_real: bool = False,
+) -> models.AIAnalysis:
+  """Run Gemini for one job x resume pair and store the result, replacing `existing` if given.
+
+  With `allow_reuse` (and ANALYSIS_REUSE_ENABLED), an earlier analysis of the identical prompt, e.g.
+  the same CV resubmitted to the same job, is copied instead and no tokens are spent. With
+  `keep_real`, a real `existing` analysis is kept (and returned) when Gemini falls back to a mock.
+  """
+  prefix = build_pair_prefix(job)
+  prompt = prefix + build_resume_suffix(resume_text=resume.resume_text, extra_conditions=extra_conditions)
+  fingerprint = prompt_fingerprint(prompt)
+  tier, prompt_tokens = route(prompt, experience_level=job.experience_level)
+
+  source = None
+  if allow_reuse and settings.analysis_reuse_enabled:
+    source = crud.find_reusable_analysis(db, fingerprint, exclude_id=existing.id if existing else None)
+  if source is not None:
+    is_mock = False
+    usage = TokenUsage()
+    latency_ms = 0
+    result = dict(
+      model=source.model,
+      overall_score=source.overall_score,
+      professional_score=source.professional_score,
+      communication_score=source.communication_score,
+      problem_solving_score=source.problem_solving_score,
+      summary=source.summary,
+      strengths=list(source.strengths or []),
+      risks=list(source.risks or []),
+      suggested_questions=list(source.suggested_questions or []),
+      raw_response_hash=source.raw_response_hash,
+      route_tier=source.route_tier,
+      reused_from_id=source.id,
+    )
+  else:
+    started = time.monotonic()
+    parsed, is_mock, model_used, usage = await generate_analysis(
+      prompt=prompt,
+      model=tier.model,
+      max_output_tokens=tier.max_output_tokens,
+      job_id=job.id,
+      prefix=prefix,
+    )
+    latency_ms = int((time.monotonic() - started) * 1000)
+    if is_mock and keep_real and existing is not None and not existing.is_mock:
+      _record_usage(db, job.id, user_id, usage, latency_ms)
+      db.commit()
+      logger.warning('Kept the real analysis of job=%s resume=%s: Gemini fell back to a mock', job.id, resume.id)
+      return existing
+    result = dict(
+      model=model_used,
+      overall_score=_int_score(parsed, 'overall_score'),
+      professional_score=_int_score(parsed, 'professional_score'),
+      communication_score=_int_score(parsed, 'communication_score'),
+      problem_solving_score=_int_score(parsed, 'problem_solving_score'),
+      summary=str(parsed.get('summary', '')).strip(),
+      strengths=list(parsed.get('strengths') or []),
+      risks=list(parsed.get('risks') or []),
+      suggested_questions=list(parsed.get('suggested_questions') or []),
+      raw_response_hash=crud.store_raw_response(db, parsed),
+      route_tier=tier.name,
+    )
+
+  analysis = models.AIAnalysis(
+    **result,
+    job_id=job.id,
+    resume_id=resume.id,
+    prompt_version=PROMPT_VERSION,
+    input_fingerprint=fingerprint,
+    job_prompt_hash=prompt_fingerprint(prefix),
+    resume_content_hash=resume_content_hash(resume),
+    extra_conditions=(extra_conditions or '').strip(),
+    is_mock=is_mock,
+    estimated_prompt_tokens=prompt_tokens,
+    latency_ms=latency_ms,
+    prompt_tokens=usage.prompt_tokens,
+    output_tokens=usage.output_tokens,
+    cached_tokens=usage.cached_tokens,
+    requested_by_id=user_id,
+  )
+
+  if existing:
+    db.delete(existing)
+    db.flush()
+    if existing.raw_response_hash and existing.raw_response_hash != analysis.raw_response_hash:
+      crud.prune_raw_responses(db, [existing.raw_response_hash])
+
+  db.add(analysis)
+  crud.track_analysis_score(db, job.id, existing.overall_score if existing else None, analysis.overall_score)
+  crud.track_resume_status(db, resume.job_id, resume.status, 'analyzed')
+  resume.status = 'analyzed'
+  db.add(resume)
+  if source is None:
+    _record_usage(db, job.id, user_id, usage, latency_ms)
+  crud.mark_changed(db, 'ai_analyses', 'resumes')
+  crud.merge_candidate_questions(db, job.id, resume.id, analysis.suggested_questions)
+  db.flush()
+  if existing:
+    crud.record_change(db, 'analysis', existing.id, 'deleted', job_id=job.id)
+  crud.record_change(db, 'analysis', analysis.id, 'created', job_id=job.id)
+  crud.record_change(db, 'resume', resume.id, 'updated', job_id=resume.job_id)
+  db.commit()
+  db.refresh(analysis)
+
+  return analysis
+
+
+def _record_usage(db: Session, job_id: int, user_id: int | None, usage: TokenUsage, latency_ms: int) -> None:
+  # A call that failed to parse still spent tokens even though it falls back to a mock result.
+  if usage.prompt_tokens or usage.output_tokens:
+    crud.record_usage(
+      db,
+      day=_utc_today(),
+      job_id=job_id,
+      user_id=user_id,
+      prompt_tokens=usage.prompt_tokens,
+      output_tokens=usage.output_tokens,
+      cached_tokens=usage.cached_tokens,
+      latency_ms=latency_ms,
+    )
+
+
+def is_stale(analysis: models.AIAnalysis, job: models.Job, resume: models.Resume) -> bool:
+  """The job or resume changed since the analysis ran, or it is a mock while a real API key is set."""
+  return (
+    analysis.job_prompt_hash != job_prompt_hash(job)
+    or analysis.resume_content_hash != resume_content_hash(resume)
+    or (analysis.is_mock and bool(settings.gemini_api_key))
+  )
+
+
+def find_stale_analyses(db: Session, job_id: int | None = None) -> list[Row]:
+  """(id, job_id, resume_id) of the analyses `is_stale` would flag, highest-priority first.
+
+  Only the jobs are hashed here; the analyses are compared in SQL without loading them or the
+  resume texts (ordering in crud.list_stale_analyses).
+  """
+  hashes = {job.id: job_prompt_hash(job) for job in crud.list_job_prompt_inputs(db, job_id)}
+  return crud.list_stale_analyses(db, hashes, include_mock=bool(settings.gemini_api_key))
+
+
+async def reanalyze_pairs(pairs: list[tuple[int, int]], user_id: int | None = None) -> None:
+  """Background task: re-run the given (job_id, resume_id) pairs in order, skipping fresh ones.
+
+  Honors the daily token budget: slows down past the throttle ratio and stops at the cap; whatever
+  is left stays stale for the next run.
+  """
+  db = SessionLocal()
+  try:
+    for job_id, resume_id in pairs:
+      if circuit_open():
+        # Gemini is degraded: stop rather than turn every remaining pair into a mock result.
+        # The pairs stay stale and are picked up by the next run.
+        logger.warning('Stale re-analysis paused: Gemini circuit breaker is open')
+        break
+      budget = budget_status(db)
+      if budget['exhausted']:
+        logger.warning('Stale re-analysis paused: daily token budget of %s reached', budget['limit_tokens'])
+        break
+      if budget['throttled']:
+        await asyncio.sleep(settings.analysis_budget_throttle_delay_seconds)
+      key = _IN_FLIGHT_KEY.format(job_id=job_id, resume_id=resume_id)
+      if not shared_state().add(key, str(os.getpid()), ttl=settings.shared_state_lease_seconds):
+        continue
+      try:
+        existing = crud.get_analysis_by_pair(db, job_id=job_id, resume_id=resume_id)
+        job = crud.get_job(db, job_id)
+        resume = crud.get_resume(db, resume_id)
+        if not job or not resume or not existing:
+          continue
+        # Inputs may have been refreshed by a manual re-run since the task was queued.
+        if not is_stale(existing, job, resume):
+          continue
+        with analysis_slot(reject_when_full=False):
+          await analyze_pair(
+            db,
+            job=job,
+            resume=resume,
+            extra_conditions=existing.extra_conditions or None,
+            existing=existing,
+            user_id=user_id,
+            keep_real=True,
+          )
+      except Exception:
+        db.rollback()
+        logger.exception('Stale re-analysis failed for job=%s resume=%s', job_id, resume_id)
+      finally:
+        shared_state().delete(key)
+  finally:
+    db.close()
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+import struct
+import unicodedata
+from dataclasses import dataclass
+
+
+# MinHash over token shingles, bucketed with LSH: NUM_PERM minimums split into BANDS bands of ROWS.
+# Two resumes become candidates when any band matches exactly (one indexed lookup per band); with
+# 16 x 4 the probability of that rises steeply around Jaccard ~0.5, and candidates are then checked
+# against the configured similarity threshold using the full signatures.
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = random.Random(20240611)  # fixed: signatures must be comparable across processes and releases
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+# One token per CJK character (no spaces to split on), one per run of other letters/digits, so text
+# like "熟悉Python與Go" still splits between scripts.
+_CJK = '[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]'
+_TOKEN_RE = re.compile(f'{_CJK}|(?:(?!{_CJK})[^\\W_])+')
+
+
+def normalize_text(text: str) -> str:
+  return re.sub(r'\s+', ' ', unicodedata.normalize('NFKC', text).casefold()).strip()
+
+
+def content_hash(text: str) -> str:
+  """sha256 of the normalized text: equal for resubmissions that differ only in spacing/width/case."""
+  return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set[str]:
+  tokens = _TOKEN_RE.findall(normalize_text(text))
+  if len(tokens) <= size:
+    return {' '.join(tokens)} if tokens else set()
+  return {' '.join(tokens[i : i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def _hash64(value: str) -> int:
+  return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def minhash(text: str) -> tuple[int, ...]:
+  hashes = [_hash64(s) for s in shingles(text)]
+  if not hashes:
+    return (_MAX_HASH,) * NUM_PERM
+  return tuple(min(((a * h + b) % _PRIME) & _MAX_HASH for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def band_hashes(signature: tuple[int, ...]) -> list[int]:
+  """One signed 63-bit key per band (fits a BIGINT / SQLite INTEGER column)."""
+  keys = []
+  for band in range(BANDS):
+    rows = struct.pack(f'>{ROWS}I', *signature[band * ROWS : (band + 1) * ROWS])
+    keys.append(int.from_bytes(hashlib.blake2b(rows, digest_size=8).digest(), 'big') >> 1)
+  return keys
+
+
+def similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+  """Estimated Jaccard similarity of the two shingle sets."""
+  return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def pack_signature(signature: tuple[int, ...]) -> bytes:
+  return struct.pack(f'>{NUM_PERM}I', *signature)
+
+
+def unpack_signature(data: bytes) -> tuple[int, ...]:
+  return struct.unpack(f'>{NUM_PERM}I', data)
+
+
+@dataclass(frozen=True)
+class Fingerprint:
+  content_hash: str
+  signature: tuple[int, ...]
+  bands: tuple[int, ...]
+
+
+def fingerprint(text: str) -> Fingerprint:
+  signature = minhash(text)
+  return Fingerprint(content_hash=content_hash(text), signature=signature, bands=tuple(band_hashes(signature)))
+
+
+# Interview questions are a sentence or two, so they are compared on exact shingle sets (bigrams)
+# rather than MinHash signatures.
+QUESTION_SHINGLE_SIZE = 2
+
+
+def question_shingles(question: str) -> set[str]:
+  return shingles(question, QUESTION_SHINGLE_SIZE)
+
+
+def jaccard(a: set[str], b: set[str]) -> float:
+  if not a or not b:
+    return 1.0 if a == b else 0.0
+  return len(a & b) / len(a | b)
@@ -1,16 +1,26 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
+import math
 import re
-from typing import Any
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
 from urllib.parse import urlparse, urlunparse
 
-import httpx
+from pydantic import BaseModel, ConfigDict, TypeAdapter, field_validator
 
 from app.core.config import settings
+from app.core.shared_state import shared_state
 
+if TYPE_CHECKING:
+  import httpx
 
-PROMPT_VERSION = 'v2'
+
+PROMPT_VERSION = 'v3'
 
 
 def _mock_analysis(*, summary: str) -> dict[str, Any]:
@@ -45,88 +55,359 @@ def _redact_url_query(url: str) -> str:
     return url
 
 
-def _build_generate_content_urls() -> list[str]:
-  endpoint = (settings.gemini_endpoint or '').rstrip('/')
-  model = (settings.gemini_model or '').strip()
+def _normalize_model(model: str | None) -> str:
+  return (model or settings.gemini_model or '').strip().removeprefix('models/')
 
-  if model.startswith('models/'):
-    model = model.removeprefix('models/')
+
+def _models_base_urls() -> list[str]:
+  """`.../models` base URLs, configured version first, then the v1beta <-> v1 alternative."""
+  endpoint = (settings.gemini_endpoint or '').rstrip('/')
 
   # Accept either:
   # - https://.../v1beta/models
   # - https://.../v1beta
   # - https://.../v1
-  if endpoint.endswith('/models'):
-    base_models = endpoint
-  else:
-    base_models = f"{endpoint}/models"
-
-  primary = f"{base_models}/{model}:generateContent"
-  urls = [primary]
+  base_models = endpoint if endpoint.endswith('/models') else f"{endpoint}/models"
+  bases = [base_models]
 
   # Fallback between v1beta <-> v1 (Google has shifted versions over time).
-  if '/v1beta' in primary:
-    urls.append(primary.replace('/v1beta', '/v1'))
-  elif '/v1' in primary:
-    urls.append(primary.replace('/v1', '/v1beta'))
-
-  # De-duplicate while preserving order.
-  seen: set[str] = set()
-  out: list[str] = []
-  for u in urls:
-    if u not in seen:
-      seen.add(u)
-      out.append(u)
-  return out
-
-
-async def _try_list_models(*, client: httpx.AsyncClient) -> list[str] | None:
-  endpoint = (settings.gemini_endpoint or '').rstrip('/')
-  models_url = endpoint if endpoint.endswith('/models') else f"{endpoint}/models"
-  candidates = [models_url]
-  if '/v1beta' in models_url:
-    candidates.append(models_url.replace('/v1beta', '/v1'))
-  elif '/v1' in models_url:
-    candidates.append(models_url.replace('/v1', '/v1beta'))
-
-  for url in candidates:
+  if '/v1beta' in base_models:
+    bases.append(base_models.replace('/v1beta', '/v1'))
+  elif '/v1' in base_models:
+    bases.append(base_models.replace('/v1', '/v1beta'))
+  return list(dict.fromkeys(bases))
+
+
+def _build_generate_content_urls(model: str | None = None) -> list[str]:
+  name = _normalize_model(model)
+  return [f"{base}/{name}:generateContent" for base in _models_base_urls()]
+
+
+class _EndpointResolver:
+  """Remembers the generateContent URL that last worked for each model.
+
+  The first call for a model walks the v1beta/v1 candidates; afterwards the known-good URL is tried
+  first (one request in steady state) and the others only on failure. Once the entry is older than
+  `gemini_resolver_ttl_seconds` it is re-validated by a background probe instead of on the request
+  path. The models list used for 404 diagnostics is cached with the same TTL.
+  """
+
+  def __init__(self) -> None:
+    self._working: dict[str, tuple[str, float]] = {}
+    self._models: tuple[list[str], float] | None = None
+    self._refreshing: set[str] = set()
+    self._tasks: set[asyncio.Task] = set()
+
+  def _expired(self, stamp: float) -> bool:
+    return time.monotonic() - stamp > settings.gemini_resolver_ttl_seconds
+
+  def urls(self, model: str | None = None) -> list[str]:
+    name = _normalize_model(model)
+    candidates = _build_generate_content_urls(name)
+    known = self._working.get(name)
+    if not known:
+      return candidates
+    url, stamp = known
+    if self._expired(stamp):
+      self._schedule_refresh(name)
+    return [url] + [u for u in candidates if u != url]
+
+  def mark_ok(self, model: str | None, url: str) -> None:
+    self._working[_normalize_model(model)] = (url, time.monotonic())
+
+  def mark_failed(self, model: str | None, url: str) -> None:
+    name = _normalize_model(model)
+    known = self._working.get(name)
+    if known and known[0] == url:
+      del self._working[name]
+
+  def snapshot(self) -> dict[str, Any]:
+    return {
+      'working': {m: _redact_url_query(u) for m, (u, _) in self._working.items()},
+      'models_cached': self._models is not None,
+    }
+
+  async def list_models(self, *, client: httpx.AsyncClient) -> list[str] | None:
+    if self._models and not self._expired(self._models[1]):
+      return self._models[0]
+
+    for base in _models_base_urls():
+      try:
+        resp = await client.get(base, params={'key': settings.gemini_api_key})
+        if resp.status_code >= 400:
+          continue
+        data = resp.json()
+        models = data.get('models')
+        if not isinstance(models, list):
+          continue
+        names: list[str] = []
+        for m in models:
+          if isinstance(m, dict) and isinstance(m.get('name'), str):
+            # e.g. "models/gemini-1.5-flash"
+            names.append(m['name'])
+        self._models = (names[:20], time.monotonic())
+        return self._models[0]
+      except Exception:
+        continue
+    return None
+
+  def _schedule_refresh(self, name: str) -> None:
+    if name in self._refreshing:
+      return
+    try:
+      task = asyncio.get_running_loop().create_task(self._refresh(name))
+    except RuntimeError:
+      return
+    self._refreshing.add(name)
+    self._tasks.add(task)
+    task.add_done_callback(self._tasks.discard)
+
+  async def _refresh(self, name: str) -> None:
+    """Probe `GET .../models/{name}` per API version (cheap metadata call) and keep the first that answers."""
     try:
-      resp = await client.get(url, params={'key': settings.gemini_api_key})
-      if resp.status_code >= 400:
+      client = _get_client()
+      for base in _models_base_urls():
+        try:
+          resp = await client.get(f"{base}/{name}", params={'key': settings.gemini_api_key})
+        except Exception:
+          continue
+        if resp.status_code < 400:
+          self.mark_ok(name, f"{base}/{name}:generateContent")
+          await self.list_models(client=client)
+          return
+      # Nothing answered; forget the entry so the next call walks all candidates again.
+      self._working.pop(name, None)
+    finally:
+      self._refreshing.discard(name)
+
+
+_resolver = _EndpointResolver()
+_client: httpx.AsyncClient | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+  """Shared client so steady-state calls reuse pooled (already TLS-negotiated) connections."""
+  global _client
+  import httpx
+
+  if _client is None or _client.is_closed:
+    _client = httpx.AsyncClient(timeout=settings.gemini_timeout_seconds)
+  return _client
+
+
+async def aclose_client() -> None:
+  global _client
+  if _client is not None:
+    await _client.aclose()
+    _client = None
+
+
+def _describe_http_error(exc: Exception, *, body_limit: int = 500) -> str:
+  import httpx
+
+  if isinstance(exc, httpx.HTTPStatusError):
+    # Avoid leaking API key in returned error message.
+    safe_url = _redact_url_query(str(exc.request.url))
+    resp_text = ''
+    try:
+      resp_text = exc.response.text
+    except Exception:
+      resp_text = ''
+    resp_text = _redact_api_key(resp_text)
+    return (
+      f"HTTP {exc.response.status_code} from {_redact_api_key(safe_url)}"
+      + (f"; body={resp_text[:body_limit]}" if resp_text else '')
+    )
+  return _redact_api_key(f"{type(exc).__name__}: {str(exc)}")
+
+
+class _CircuitBreaker:
+  """Fail fast while Gemini is degraded.
+
+  closed -> open after `failure_threshold` consecutive failures, or when the error rate over the last
+  `window` calls (at least `min_calls`) reaches `error_rate`. While open every call is refused until
+  `cooldown_seconds` pass; then half-open admits `half_open_probes` concurrent probe calls: a success
+  closes the breaker, a failure re-opens it for another cooldown.
+
+  Failure counting and probes are per worker, but opening is published through shared state so every
+  worker stops calling Gemini for the cooldown once one of them trips.
+  """
+
+  _OPEN_UNTIL_KEY = 'gemini:breaker:open_until'
+
+  def __init__(self) -> None:
+    self.state = 'closed'
+    self._consecutive_failures = 0
+    self._recent: deque[bool] = deque(maxlen=max(1, settings.gemini_breaker_window))
+    self._opened_at = 0.0
+    self._probes_in_flight = 0
+    # Bumped on every move to half-open; probe tickets carry it (0 = not a probe).
+    self._probe_generation = 0
+    self.counters: dict[str, int] = {'opened': 0, 'rejected': 0}
+
+  def retry_after(self) -> float:
+    if self.state != 'open':
+      return 0.0
+    return max(0.0, settings.gemini_breaker_cooldown_seconds - (time.monotonic() - self._opened_at))
+
+  def follow_shared(self) -> None:
+    """Adopt an open state published by another worker."""
+    if self.state != 'closed':
+      return
+    raw = shared_state().get(self._OPEN_UNTIL_KEY)
+    remaining = float(raw) - time.time() if raw else 0.0
+    if remaining > 0:
+      self.state = 'open'
+      self._opened_at = time.monotonic() - max(0.0, settings.gemini_breaker_cooldown_seconds - remaining)
+      self._probes_in_flight = 0
+
+  def acquire(self) -> int | None:
+    """Admit a call: None when refused, else a ticket to hand to `release` once the call is over.
+
+    In half-open the ticket holds one of the probe slots; `release` frees it whatever the outcome,
+    so a probe that is cancelled (a lost hedge, a client disconnect) or raises cannot keep the
+    breaker half-open forever.
+    """
+    self.follow_shared()
+    if self.state == 'open' and self.retry_after() <= 0:
+      self.state = 'half_open'
+      self._probes_in_flight = 0
+      self._probe_generation += 1
+    if self.state == 'closed':
+      return 0
+    if self.state == 'half_open' and self._probes_in_flight < settings.gemini_breaker_half_open_probes:
+      self._probes_in_flight += 1
+      return self._probe_generation
+    self.counters['rejected'] += 1
+    return None
+
+  def release(self, ticket: int) -> None:
+    # Slots of an earlier half-open period were already reset when the state changed.
+    if ticket and ticket == self._probe_generation and self.state == 'half_open' and self._probes_in_flight > 0:
+      self._probes_in_flight -= 1
+
+  def record_success(self) -> None:
+    self._consecutive_failures = 0
+    self._recent.append(True)
+    if self.state == 'half_open':
+      self.state = 'closed'
+      self._recent.clear()
+      shared_state().delete(self._OPEN_UNTIL_KEY)
+
+  def record_failure(self) -> None:
+    self._consecutive_failures += 1
+    self._recent.append(False)
+    failures = self._recent.count(False)
+    too_many_errors = (
+      len(self._recent) >= settings.gemini_breaker_min_calls
+      and failures / len(self._recent) >= settings.gemini_breaker_error_rate
+    )
+    if self.state == 'half_open' or self._consecutive_failures >= settings.gemini_breaker_failure_threshold or too_many_errors:
+      self._open()
+
+  def _open(self) -> None:
+    if self.state != 'open':
+      self.counters['opened'] += 1
+    self.state = 'open'
+    self._opened_at = time.monotonic()
+    self._probes_in_flight = 0
+    cooldown = settings.gemini_breaker_cooldown_seconds
+    shared_state().set(self._OPEN_UNTIL_KEY, str(time.time() + cooldown), ttl=cooldown)
+
+  def snapshot(self) -> dict[str, Any]:
+    return {'state': self.state, 'retry_after': round(self.retry_after(), 1), **self.counters}
+
+
+_breaker = _CircuitBreaker()
+
+
+def circuit_open() -> bool:
+  """True while the breaker refuses calls (open and still cooling down)."""
+  _breaker.follow_shared()
+  return _breaker.state == 'open' and _breaker.retry_after() > 0
+
+
+def circuit_retry_after() -> float:
+  return _breaker.retry_after()
+
+
+# Answers to a call carrying a cachedContent handle that mean the handle is gone.
+_STALE_CACHE_STATUSES = (400, 403, 404)
+
+
+async def _post_generate(*, payload: dict[str, Any], model: str | None = None) -> tuple[dict[str, Any] | None, str | None]:
+  """POST `payload` to generateContent for `model`. Returns (response_json, last_error)."""
+  import httpx
+
+  ticket = _breaker.acquire()
+  if ticket is None:
+    return None, f"circuit open (retry in {_breaker.retry_after():.0f}s)"
+
+  client = _get_client()
+  last_error: str | None = None
+  try:
+    for url in _resolver.urls(model):
+      try:
+        resp = await client.post(url, params={'key': settings.gemini_api_key}, json=payload)
+        resp.raise_for_status()
+        data = resp.json()
+        _resolver.mark_ok(model, url)
+        _breaker.record_success()
+        return data, None
+      except httpx.HTTPStatusError as exc:
+        last_error = _describe_http_error(exc)
+        if 'cachedContent' in payload and exc.response.status_code in _STALE_CACHE_STATUSES:
+          # The cachedContent handle expired or was evicted: not a Gemini outage and not a bad URL.
+          # The caller drops the handle and resends the full prompt.
+          return None, last_error
+        _resolver.mark_failed(model, url)
+
+        # If the model or version is wrong, listing models helps users fix config quickly.
+        if exc.response.status_code == 404:
+          models = await _resolver.list_models(client=client)
+          if models:
+            last_error += f"; available_models(sample)={models}"
         continue
-      data = resp.json()
-      models = data.get('models')
-      if not isinstance(models, list):
+      except httpx.HTTPError as exc:
+        last_error = _describe_http_error(exc)
+        _resolver.mark_failed(model, url)
         continue
-      names: list[str] = []
-      for m in models:
-        if isinstance(m, dict) and isinstance(m.get('name'), str):
-          # e.g. "models/gemini-1.5-flash"
-          names.append(m['name'])
-      return names[:20]
-    except Exception:
-      continue
-  return None
+    _breaker.record_failure()
+    return None, last_error
+  finally:
+    # Cancellation (CancelledError) or an unexpected error gives no verdict, but still frees the slot.
+    _breaker.release(ticket)
 
 
-def build_prompt(
+def resolver_stats() -> dict[str, Any]:
+  return _resolver.snapshot()
+
+
+def breaker_stats() -> dict[str, Any]:
+  return _breaker.snapshot()
+
+
+def build_job_prefix(
   *,
   job_title: str,
   job_department: str,
   job_description: str,
   required_skills: list[str],
   nice_to_have: list[str],
-  resume_text: str,
-  extra_conditions: str | None = None,
 ) -> str:
-  extra = (extra_conditions or '').strip()
+  """Instructions + job requirements: identical for every resume screened against the same job.
 
+  Keeping this as the literal start of the prompt lets Gemini reuse it (implicitly, or explicitly via
+  cachedContents when GEMINI_CONTEXT_CACHE_ENABLED).
+  """
   return (
     "你是一位資深招募顧問與面試官，請根據『職缺需求』與『履歷文字』輸出 JSON 分析結果。\n\n"
     "【重要規則】\n"
     "- 只輸出 JSON，禁止輸出其他文字。\n"
     "- 分數範圍 0~100，請避免不合理的滿分。\n"
-    "- 請強調：AI 僅供參考，不做決策。\n\n"
+    "- 請強調：AI 僅供參考，不做決策。\n"
+    "- suggested_questions 最多 3 題，只針對這份履歷與職缺需求的落差或需要查證之處；"
+    "通用的職缺面試題已另外準備，請勿重複。\n\n"
     "【輸出 JSON 格式】\n"
     "{\n"
     '  "overall_score": 0,\n'
@@ -145,7 +426,13 @@ def build_prompt(
     f"- 工作內容：{job_description}\n"
     f"- 必要技能：{', '.join(required_skills) if required_skills else '未提供'}\n"
     f"- 加分條件：{', '.join(nice_to_have) if nice_to_have else '未提供'}\n\n"
-    + (
+  )
+
+
+def build_resume_suffix(*, resume_text: str, extra_conditions: str | None = None) -> str:
+  extra = (extra_conditions or '').strip()
+  return (
+    (
       "【附加條件】\n"
       + f"{extra}\n\n"
       if extra
@@ -156,212 +443,622 @@ def build_prompt(
   )
 
 
-def _extract_json(text: str) -> dict[str, Any]:
-  def extract_first_json_object(raw: str) -> str | None:
-    start = raw.find('{')
-    if start == -1:
-      return None
+def build_prompt(
+  *,
+  job_title: str,
+  job_department: str,
+  job_description: str,
+  required_skills: list[str],
+  nice_to_have: list[str],
+  resume_text: str,
+  extra_conditions: str | None = None,
+) -> str:
+  return build_job_prefix(
+    job_title=job_title,
+    job_department=job_department,
+    job_description=job_description,
+    required_skills=required_skills,
+    nice_to_have=nice_to_have,
+  ) + build_resume_suffix(resume_text=resume_text, extra_conditions=extra_conditions)
+
+
+def prompt_fingerprint(prompt: str) -> str:
+  """Stable hash of everything the model sees; equal fingerprints mean re-analysis is redundant."""
+  return hashlib.sha256(f'{PROMPT_VERSION}\n{prompt}'.encode('utf-8')).hexdigest()
 
-    depth = 0
-    in_string = False
-    escape = False
-    for i in range(start, len(raw)):
-      ch = raw[i]
 
+_TRAILING_COMMA = re.compile(r',\s*([}\]])')
+# A number literal running into the end of the text (a truncated `7` may have been `75`).
+_PARTIAL_NUMBER = re.compile(r'(?<![\w.])(?:-|-?\d[\d.eE+-]*)$')
+_FENCED = re.compile(r'```(?:json)?\s*(.*?)\s*```', re.DOTALL | re.IGNORECASE)
+
+
+def _repair_json(raw: str) -> tuple[str, bool] | None:
+  """Single pass over the first JSON object in `raw`.
+
+  Returns (json_text, was_repaired). Trailing prose after a complete object is dropped; a truncated
+  object is closed (open string, arrays, objects), falling back to the last complete member when the
+  cut landed inside a key or a literal. A cut inside a number always drops that member, since `7`
+  may have been `75`.
+  """
+  start = raw.find('{')
+  if start == -1:
+    return None
+
+  closers: list[str] = []
+  in_string = False
+  escape = False
+  # Where the last member began: cutting there and closing the open containers drops that member.
+  last_boundary: tuple[int, list[str]] | None = None
+  for i in range(start, len(raw)):
+    ch = raw[i]
+    if in_string:
       if escape:
         escape = False
-        continue
-
-      if ch == '\\' and in_string:
+      elif ch == '\\':
         escape = True
-        continue
+      elif ch == '"':
+        in_string = False
+      continue
 
-      if ch == '"':
-        in_string = not in_string
+    if ch == '"':
+      in_string = True
+    elif ch in '{[':
+      closers.append('}' if ch == '{' else ']')
+      last_boundary = (i + 1, list(closers))
+    elif ch in '}]':
+      if not closers or closers[-1] != ch:
+        break
+      closers.pop()
+      if not closers:
+        complete = raw[start : i + 1]
+        cleaned = _TRAILING_COMMA.sub(r'\1', complete)
+        return cleaned, cleaned != complete
+    elif ch == ',':
+      last_boundary = (i, list(closers))
+  else:
+    # Ran off the end: output was truncated.
+    body = raw[start:]
+    if escape:
+      body = body[:-1]
+    if in_string:
+      body += '"'
+    candidates = []
+    if in_string or not _PARTIAL_NUMBER.search(body):
+      candidates.append(body.rstrip().rstrip(',') + ''.join(reversed(closers)))
+    if last_boundary is not None:
+      cut, cut_closers = last_boundary
+      candidates.append(raw[start:cut] + ''.join(reversed(cut_closers)))
+    for candidate in candidates:
+      candidate = _TRAILING_COMMA.sub(r'\1', candidate)
+      try:
+        json.loads(candidate)
+      except json.JSONDecodeError:
         continue
+      return candidate, True
+  return None
 
-      if in_string:
-        continue
 
-      if ch == '{':
-        depth += 1
-      elif ch == '}':
-        depth -= 1
-        if depth == 0:
-          return raw[start : i + 1]
-    return None
+def _extract_json(text: str) -> dict[str, Any]:
+  return _extract_json_with_repair(text)[0]
+
 
+def _extract_json_with_repair(text: str) -> tuple[dict[str, Any], bool]:
   text = text.strip()
 
   # Handle fenced blocks even when the model adds prefatory text.
   if '```' in text:
-    fenced = re.search(r'```(?:json)?\s*(.*?)\s*```', text, re.DOTALL | re.IGNORECASE)
+    fenced = _FENCED.search(text)
     if fenced and fenced.group(1).strip():
       text = fenced.group(1).strip()
 
   try:
-    return json.loads(text)
+    return json.loads(text), False
   except json.JSONDecodeError:
-    extracted = extract_first_json_object(text)
-    if extracted is None:
+    repaired = _repair_json(text)
+    if repaired is None:
       raise
-    return json.loads(extracted)
+    value = json.loads(repaired[0])
+    return value, repaired[1] or repaired[0] != text
 
 
-async def generate_analysis(*, prompt: str) -> tuple[dict[str, Any], bool, str]:
-  """Returns (parsed_json, is_mock, model_used)."""
-  if not settings.gemini_api_key:
-    return (_mock_analysis(summary='未提供 GEMINI_API_KEY，故使用 Mock 分析結果（可正常 demo 前後端串接）。'), True, settings.gemini_model)
+class _AnalysisPayload(BaseModel):
+  """Shape of the model's analysis JSON; every field optional so partial (repaired) output validates."""
 
-  def build_payload(*, prompt_text: str, max_output_tokens: int, temperature: float) -> dict[str, Any]:
-    return {
-      'contents': [
-        {
-          'role': 'user',
-          'parts': [{'text': prompt_text}],
-        }
-      ],
-      'generationConfig': {
-        'temperature': temperature,
-        'maxOutputTokens': max_output_tokens,
-        # Ask Gemini to respond with valid JSON if supported by the API version.
-        'responseMimeType': 'application/json',
-      },
+  model_config = ConfigDict(extra='allow')
+
+  overall_score: int | None = None
+  professional_score: int | None = None
+  communication_score: int | None = None
+  problem_solving_score: int | None = None
+  summary: str | None = None
+  strengths: list[str] | None = None
+  risks: list[str] | None = None
+  suggested_questions: list[str] | None = None
+
+  @field_validator('overall_score', 'professional_score', 'communication_score', 'problem_solving_score', mode='before')
+  @classmethod
+  def _score(cls, v: Any) -> Any:
+    if isinstance(v, str):
+      v = v.strip().rstrip('%')
+    try:
+      return max(0, min(100, int(float(v))))
+    except (TypeError, ValueError):
+      return None
+
+  @field_validator('strengths', 'risks', 'suggested_questions', mode='before')
+  @classmethod
+  def _str_list(cls, v: Any) -> Any:
+    if v is None:
+      return None
+    if isinstance(v, str):
+      v = [v]
+    if not isinstance(v, list):
+      return None
+    return [str(item).strip() for item in v if item is not None and str(item).strip()]
+
+
+_analysis_adapter = TypeAdapter(_AnalysisPayload)
+
+# How model output was turned into an analysis; `repaired` counts retries avoided by _repair_json.
+_parse_counters: dict[str, int] = {'clean': 0, 'repaired': 0, 'retried': 0, 'retry_ok': 0, 'unusable': 0}
+
+
+def parse_stats() -> dict[str, int]:
+  return dict(_parse_counters)
+
+
+def _parse_analysis(text: str) -> tuple[dict[str, Any], bool]:
+  """Parse and validate an analysis. Raises ValueError when nothing usable can be recovered."""
+  value, repaired = _extract_json_with_repair(text)
+  if not isinstance(value, dict):
+    raise ValueError(f'expected a JSON object, got {type(value).__name__}')
+  payload = _analysis_adapter.validate_python(value)
+  if payload.overall_score is None and not (payload.summary or '').strip():
+    raise ValueError('JSON has neither overall_score nor summary')
+  if repaired and payload.overall_score is None:
+    # Truncated before (or inside) the score: retry rather than store the analysis as a 0.
+    raise ValueError('truncated JSON lost overall_score')
+  fields = payload.model_dump(exclude_none=True)
+  return {**value, **fields}, repaired
+
+
+class _ContextCache:
+  """Per-job Gemini `cachedContents` handles for the job prompt prefix.
+
+  Keyed by (job_id, PROMPT_VERSION, model, prefix hash): a job edit changes the prefix and therefore
+  the key, and `invalidate_job` additionally drops (and deletes remotely) the job's handles. Concurrent
+  first calls for the same key share a single create request.
+
+  Handles are also published in shared state so other workers reuse them instead of creating (and
+  paying storage for) their own copy; `invalidate_job` bumps a per-job generation that is part of
+  the shared key.
+  """
+
+  def __init__(self) -> None:
+    # key -> (cache name, local expiry (monotonic), shared-state key)
+    self._handles: dict[tuple[int, str, str, str], tuple[str, float, str]] = {}
+    self._pending: dict[tuple[int, str, str, str], asyncio.Future] = {}
+    self.counters: dict[str, int] = {
+      'created': 0,
+      'hits': 0,
+      'shared_hits': 0,
+      'create_failed': 0,
+      'expired_fallback': 0,
     }
 
-  # More room reduces the chance of truncated JSON.
-  payload = build_payload(prompt_text=prompt, max_output_tokens=2048, temperature=0.2)
+  @staticmethod
+  def _shared_key(key: tuple[int, str, str, str]) -> str:
+    job_id, prompt_version, model, prefix_hash = key
+    generation = shared_state().get(f'gemini:ctx-gen:{job_id}') or '0'
+    return f'gemini:ctx:{job_id}:{generation}:{prompt_version}:{model}:{prefix_hash}'
 
-  urls_to_try = _build_generate_content_urls()
-  last_error: str | None = None
-  data: dict[str, Any] | None = None
+  def _remember(self, key: tuple[int, str, str, str], name: str, expires_at: float, shared_key: str) -> None:
+    # expires_at is wall-clock (shared with other workers); keep a monotonic deadline locally.
+    self._handles[key] = (name, time.monotonic() + max(0.0, expires_at - time.time()), shared_key)
 
-  async with httpx.AsyncClient(timeout=30) as client:
-    for url in urls_to_try:
-      try:
-        resp = await client.post(url, params={'key': settings.gemini_api_key}, json=payload)
-        resp.raise_for_status()
-        data = resp.json()
-        break
-      except httpx.HTTPStatusError as exc:
-        # Avoid leaking API key in returned error message.
-        safe_url = _redact_url_query(str(exc.request.url))
-        resp_text = ''
-        try:
-          resp_text = exc.response.text
-        except Exception:
-          resp_text = ''
-        resp_text = _redact_api_key(resp_text)
-        last_error = (
-          f"HTTP {exc.response.status_code} from {_redact_api_key(safe_url)}"
-          + (f"; body={resp_text[:500]}" if resp_text else '')
-        )
+  @staticmethod
+  def _cache_base() -> str:
+    # cachedContents lives next to /models on the configured API version.
+    return _models_base_urls()[0].removesuffix('/models')
 
-        # If the model or version is wrong, listing models helps users fix config quickly.
-        if exc.response.status_code == 404:
-          models = await _try_list_models(client=client)
-          if models:
-            last_error += f"; available_models(sample)={models}"
-        continue
-      except httpx.HTTPError as exc:
-        last_error = _redact_api_key(f"{type(exc).__name__}: {str(exc)}")
-        continue
+  async def handle(self, *, job_id: int, model: str, prefix: str) -> str | None:
+    from app.services.routing import estimate_tokens
 
-  if data is None:
-    return (
-      _mock_analysis(summary=f"Gemini 呼叫失敗，故使用 Mock 分析結果（{last_error or 'unknown error'}）。"),
-      True,
-      settings.gemini_model,
-    )
+    if estimate_tokens(prefix) < settings.gemini_context_cache_min_tokens:
+      return None
+
+    key = (job_id, PROMPT_VERSION, model, hashlib.sha1(prefix.encode('utf-8')).hexdigest())
+    entry = self._handles.get(key)
+    if entry and entry[1] > time.monotonic():
+      self.counters['hits'] += 1
+      return entry[0]
+    if key in self._pending:
+      return await asyncio.shield(self._pending[key])
+
+    state = shared_state()
+    shared_key = self._shared_key(key)
+    published = state.get(shared_key)
+    if published:
+      name, expires_at = json.loads(published)
+      self._remember(key, name, expires_at, shared_key)
+      self.counters['shared_hits'] += 1
+      return name
+
+    future: asyncio.Future = asyncio.get_running_loop().create_future()
+    self._pending[key] = future
+    name: str | None = None
+    try:
+      name = await self._create(model=model, prefix=prefix)
+      if name:
+        # Stop using the handle a little before Gemini expires it.
+        lifetime = settings.gemini_context_cache_ttl_seconds * 0.9
+        expires_at = time.time() + lifetime
+        if not state.add(shared_key, json.dumps([name, expires_at]), ttl=lifetime):
+          # Another worker published a handle meanwhile: use that one and drop ours.
+          published = state.get(shared_key)
+          if published:
+            asyncio.get_running_loop().create_task(self._delete(name))
+            name, expires_at = json.loads(published)
+        self._remember(key, name, expires_at, shared_key)
+    finally:
+      del self._pending[key]
+      future.set_result(name)
+    return name
+
+  async def _create(self, *, model: str, prefix: str) -> str | None:
+    body = {
+      'model': f'models/{model}',
+      'contents': [{'role': 'user', 'parts': [{'text': prefix}]}],
+      'ttl': f'{int(settings.gemini_context_cache_ttl_seconds)}s',
+    }
+    try:
+      resp = await _get_client().post(f'{self._cache_base()}/cachedContents', params={'key': settings.gemini_api_key}, json=body)
+      resp.raise_for_status()
+      name = resp.json().get('name')
+    except Exception:
+      name = None
+    if isinstance(name, str) and name:
+      self.counters['created'] += 1
+      return name
+    self.counters['create_failed'] += 1
+    return None
+
+  def forget(self, name: str) -> None:
+    for key in [k for k, (n, _, _) in self._handles.items() if n == name]:
+      shared_state().delete(self._handles.pop(key)[2])
+
+  def invalidate_job(self, job_id: int) -> None:
+    shared_state().incr(f'gemini:ctx-gen:{job_id}')
+    names = [n for k, (n, _, _) in self._handles.items() if k[0] == job_id]
+    for key in [k for k in self._handles if k[0] == job_id]:
+      del self._handles[key]
+    if not names:
+      return
+    try:
+      loop = asyncio.get_running_loop()
+    except RuntimeError:
+      # Called from a worker thread (no event loop to schedule on): delete them here.
+      for name in names:
+        self._delete_sync(name)
+      return
+    for name in names:
+      loop.create_task(self._delete(name))
+
+  async def _delete(self, name: str) -> None:
+    try:
+      await _get_client().delete(f'{self._cache_base()}/{name}', params={'key': settings.gemini_api_key})
+    except Exception:
+      pass
+
+  def _delete_sync(self, name: str) -> None:
+    import httpx
+
+    try:
+      httpx.delete(f'{self._cache_base()}/{name}', params={'key': settings.gemini_api_key}, timeout=settings.gemini_timeout_seconds)
+    except Exception:
+      pass
+
+  def snapshot(self) -> dict[str, Any]:
+    return {'handles': len(self._handles), **self.counters}
+
+
+_context_cache = _ContextCache()
+
+
+def invalidate_job_context_cache(job_id: int) -> None:
+  _context_cache.invalidate_job(job_id)
+
+
+def context_cache_stats() -> dict[str, Any]:
+  return _context_cache.snapshot()
+
+
+def _build_payload(*, prompt_text: str, max_output_tokens: int, temperature: float) -> dict[str, Any]:
+  return {
+    'contents': [
+      {
+        'role': 'user',
+        'parts': [{'text': prompt_text}],
+      }
+    ],
+    'generationConfig': {
+      'temperature': temperature,
+      'maxOutputTokens': max_output_tokens,
+      # Ask Gemini to respond with valid JSON if supported by the API version.
+      'responseMimeType': 'application/json',
+    },
+  }
 
-  text = ''
+
+def _response_text(data: dict[str, Any]) -> str:
   try:
-    text = data['candidates'][0]['content']['parts'][0]['text']
+    return data['candidates'][0]['content']['parts'][0]['text']
   except Exception:
-    text = json.dumps(data, ensure_ascii=False)
+    return json.dumps(data, ensure_ascii=False)
+
+
+def _retry_prompt(prompt: str) -> str:
+  return (
+    "請只輸出『有效 JSON』，禁止輸出任何說明文字或 Markdown。\n"
+    "請用最短文字回答，每個陣列最多 3 項。\n\n"
+    "JSON 必須符合以下欄位：\n"
+    "{\n"
+    "  \"overall_score\": 0,\n"
+    "  \"professional_score\": 0,\n"
+    "  \"communication_score\": 0,\n"
+    "  \"problem_solving_score\": 0,\n"
+    "  \"summary\": \"\",\n"
+    "  \"strengths\": [\"\"],\n"
+    "  \"risks\": [\"\"],\n"
+    "  \"suggested_questions\": [\"\"],\n"
+    "  \"disclaimer\": \"本分析結果僅供招募人員參考，最終決策由人類負責\"\n"
+    "}\n\n"
+    "請根據以下內容重新生成：\n\n"
+    + prompt
+  )
+
+
+class _LatencyTracker:
+  """Recent successful call latencies per model, used to pick the hedging delay."""
+
+  def __init__(self, size: int = 200) -> None:
+    self._samples: dict[str, deque[float]] = {}
+    self._size = size
+
+  def record(self, model: str, seconds: float) -> None:
+    self._samples.setdefault(model, deque(maxlen=self._size)).append(seconds)
+
+  def percentile(self, model: str, pct: float) -> float | None:
+    samples = sorted(self._samples.get(model) or ())
+    if len(samples) < settings.gemini_hedge_min_samples:
+      return None
+    rank = max(1, math.ceil(pct / 100 * len(samples)))
+    return samples[min(rank, len(samples)) - 1]
+
+
+_latency = _LatencyTracker()
+_hedge_counters: dict[str, int] = {'hedged': 0, 'hedge_won': 0}
+
+
+def hedge_stats() -> dict[str, int]:
+  return dict(_hedge_counters)
+
 
+@dataclass
+class TokenUsage:
+  """Billable token counts from Gemini's `usageMetadata` (summed over every call a result needed)."""
+
+  prompt_tokens: int = 0
+  output_tokens: int = 0
+  cached_tokens: int = 0
+
+  @classmethod
+  def from_response(cls, data: dict[str, Any]) -> 'TokenUsage':
+    meta = data.get('usageMetadata') or {}
+
+    def count(key: str) -> int:
+      try:
+        return int(meta.get(key) or 0)
+      except (TypeError, ValueError):
+        return 0
+
+    return cls(
+      prompt_tokens=count('promptTokenCount'),
+      # Thinking models bill reasoning tokens as output.
+      output_tokens=count('candidatesTokenCount') + count('thoughtsTokenCount'),
+      cached_tokens=count('cachedContentTokenCount'),
+    )
+
+  def __add__(self, other: 'TokenUsage') -> 'TokenUsage':
+    return TokenUsage(
+      prompt_tokens=self.prompt_tokens + other.prompt_tokens,
+      output_tokens=self.output_tokens + other.output_tokens,
+      cached_tokens=self.cached_tokens + other.cached_tokens,
+    )
+
+
+@dataclass
+class _Attempt:
+  model: str
+  data: dict[str, Any] | None = None
+  error: str | None = None
+  text: str = ''
+  parsed: dict[str, Any] | None = None
+  repaired: bool = False
+  parse_error: str | None = None
+  usage: TokenUsage = field(default_factory=TokenUsage)
+
+
+async def _attempt(*, payload: dict[str, Any], model: str) -> _Attempt:
+  """One generateContent call plus parsing; never raises for API or parse errors."""
+  started = time.monotonic()
+  data, error = await _post_generate(payload=payload, model=model)
+  attempt = _Attempt(model=model, data=data, error=error)
+  if data is None:
+    return attempt
+  _latency.record(model, time.monotonic() - started)
+  attempt.usage = TokenUsage.from_response(data)
+  attempt.text = _response_text(data)
   try:
-    parsed = _extract_json(text)
-    return parsed, False, settings.gemini_model
+    attempt.parsed, attempt.repaired = _parse_analysis(attempt.text)
   except Exception as exc:
-    # Retry once with a shorter/stricter prompt (models sometimes truncate or add extra text).
-    safe = _redact_api_key(str(exc))
-    snippet = _redact_api_key(text[:500])
-
-    retry_prompt = (
-      "請只輸出『有效 JSON』，禁止輸出任何說明文字或 Markdown。\n"
-      "請用最短文字回答，每個陣列最多 3 項。\n\n"
-      "JSON 必須符合以下欄位：\n"
-      "{\n"
-      "  \"overall_score\": 0,\n"
-      "  \"professional_score\": 0,\n"
-      "  \"communication_score\": 0,\n"
-      "  \"problem_solving_score\": 0,\n"
-      "  \"summary\": \"\",\n"
-      "  \"strengths\": [\"\"],\n"
-      "  \"risks\": [\"\"],\n"
-      "  \"suggested_questions\": [\"\"],\n"
-      "  \"disclaimer\": \"本分析結果僅供招募人員參考，最終決策由人類負責\"\n"
-      "}\n\n"
-      "請根據以下內容重新生成：\n\n"
-      + prompt
+    attempt.parse_error = _redact_api_key(str(exc))
+  return attempt
+
+
+def _hedge_delay(model: str) -> float:
+  observed = _latency.percentile(model, settings.gemini_hedge_percentile)
+  delay = observed if observed is not None else settings.gemini_hedge_default_delay_seconds
+  return max(settings.gemini_hedge_min_delay_seconds, delay)
+
+
+async def _hedged_attempt(*, payload: dict[str, Any], model: str) -> _Attempt:
+  """Send the call; if it is still pending after the hedge delay, race a second one.
+
+  The hedge goes to `gemini_hedge_model` (a faster fallback) or the same model. The first attempt
+  that yields usable JSON wins and the other is cancelled.
+  """
+  if not settings.gemini_hedge_enabled or circuit_open():
+    return await _attempt(payload=payload, model=model)
+
+  primary = asyncio.create_task(_attempt(payload=payload, model=model))
+  done, _ = await asyncio.wait({primary}, timeout=_hedge_delay(model))
+  if done:
+    return primary.result()
+
+  _hedge_counters['hedged'] += 1
+  # A cachedContent handle is bound to its model, so cached calls hedge on the same model.
+  hedge_model = model if 'cachedContent' in payload else _normalize_model(settings.gemini_hedge_model or model)
+  hedge = asyncio.create_task(_attempt(payload=payload, model=hedge_model))
+  pending: set[asyncio.Task] = {primary, hedge}
+  fallback: _Attempt | None = None
+  try:
+    while pending:
+      done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+      for task in done:
+        result = task.result()
+        if result.parsed is not None:
+          if task is hedge:
+            _hedge_counters['hedge_won'] += 1
+          return result
+        # Prefer the failure that at least got a response (its text feeds the retry diagnostics).
+        if fallback is None or (fallback.data is None and result.data is not None):
+          fallback = result
+    assert fallback is not None
+    return fallback
+  finally:
+    for task in pending:
+      task.cancel()
+
+
+async def generate_analysis(
+  *,
+  prompt: str,
+  model: str | None = None,
+  max_output_tokens: int = 2048,
+  job_id: int | None = None,
+  prefix: str | None = None,
+) -> tuple[dict[str, Any], bool, str, TokenUsage]:
+  """Returns (parsed_json, is_mock, model_used, usage).
+
+  When `prefix` (the job part `prompt` starts with) and `job_id` are given and context caching is
+  enabled, the prefix is sent once as cachedContent and each call only carries the remainder.
+  """
+  model = _normalize_model(model)
+  if not settings.gemini_api_key:
+    return (_mock_analysis(summary='未提供 GEMINI_API_KEY，故使用 Mock 分析結果（可正常 demo 前後端串接）。'), True, model, TokenUsage())
+
+  # More room reduces the chance of truncated JSON.
+  payload = _build_payload(prompt_text=prompt, max_output_tokens=max_output_tokens, temperature=0.2)
+  handle: str | None = None
+  if settings.gemini_context_cache_enabled and prefix and job_id is not None and prompt.startswith(prefix):
+    handle = await _context_cache.handle(job_id=job_id, model=model, prefix=prefix)
+  if handle:
+    cached_payload = _build_payload(prompt_text=prompt[len(prefix):], max_output_tokens=max_output_tokens, temperature=0.2)
+    cached_payload['cachedContent'] = handle
+    first = await _hedged_attempt(payload=cached_payload, model=model)
+    if first.data is None and (first.error or '').startswith('HTTP 4'):
+      # Cache expired or was evicted server-side: forget it and send the full prompt.
+      _context_cache.forget(handle)
+      _context_cache.counters['expired_fallback'] += 1
+      first = await _hedged_attempt(payload=payload, model=model)
+  else:
+    first = await _hedged_attempt(payload=payload, model=model)
+  usage = first.usage
+
+  if first.data is None:
+    return (
+      _mock_analysis(summary=f"Gemini 呼叫失敗，故使用 Mock 分析結果（{first.error or 'unknown error'}）。"),
+      True,
+      model,
+      usage,
     )
 
-    retry_payload = build_payload(prompt_text=retry_prompt, max_output_tokens=2048, temperature=0.0)
-    data2: dict[str, Any] | None = None
-    last_error2: str | None = None
-    async with httpx.AsyncClient(timeout=30) as client:
-      for url in urls_to_try:
-        try:
-          resp = await client.post(url, params={'key': settings.gemini_api_key}, json=retry_payload)
-          resp.raise_for_status()
-          data2 = resp.json()
-          break
-        except httpx.HTTPStatusError as exc2:
-          safe_url = _redact_url_query(str(exc2.request.url))
-          resp_text = ''
-          try:
-            resp_text = exc2.response.text
-          except Exception:
-            resp_text = ''
-          resp_text = _redact_api_key(resp_text)
-          last_error2 = (
-            f"HTTP {exc2.response.status_code} from {_redact_api_key(safe_url)}"
-            + (f"; body={resp_text[:300]}" if resp_text else '')
-          )
-          continue
-        except httpx.HTTPError as exc2:
-          last_error2 = _redact_api_key(f"{type(exc2).__name__}: {str(exc2)}")
-          continue
+  if first.parsed is not None:
+    _parse_counters['repaired' if first.repaired else 'clean'] += 1
+    return first.parsed, False, first.model, usage
 
-    if data2 is not None:
-      text2 = ''
-      try:
-        text2 = data2['candidates'][0]['content']['parts'][0]['text']
-      except Exception:
-        text2 = json.dumps(data2, ensure_ascii=False)
+  _parse_counters['retried'] += 1
+  # Retry once with a shorter/stricter prompt (models sometimes truncate or add extra text).
+  safe = first.parse_error
+  snippet = _redact_api_key(first.text[:500])
 
-      try:
-        parsed2 = _extract_json(text2)
-        return parsed2, False, settings.gemini_model
-      except Exception as exc2:
-        safe2 = _redact_api_key(str(exc2))
-        snippet2 = _redact_api_key(text2[:500])
-        return (
-          _mock_analysis(
-            summary=(
-              f"Gemini 回傳非合法 JSON，重試後仍失敗，改用 Mock（first={safe}; retry={safe2}; retry_err={last_error2 or 'none'}）。 "
-              f"raw_snippet={snippet}; retry_snippet={snippet2}"
-            )
-          ),
-          True,
-          settings.gemini_model,
-        )
+  retry_payload = _build_payload(prompt_text=_retry_prompt(prompt), max_output_tokens=max_output_tokens, temperature=0.0)
+  retry = None if circuit_open() else await _attempt(payload=retry_payload, model=first.model)
 
-    # Demo-friendly behavior: if the model returns malformed JSON, fall back to a deterministic mock
-    # instead of 500'ing the API.
+  if retry is not None and retry.data is not None:
+    usage = usage + retry.usage
+    if retry.parsed is not None:
+      _parse_counters['retry_ok'] += 1
+      return retry.parsed, False, retry.model, usage
+
+    _parse_counters['unusable'] += 1
+    snippet2 = _redact_api_key(retry.text[:500])
     return (
-      _mock_analysis(summary=f"Gemini 回傳非合法 JSON，改用 Mock 分析結果（{safe}）。 raw_snippet={snippet}"),
+      _mock_analysis(
+        summary=(
+          f"Gemini 回傳非合法 JSON，重試後仍失敗，改用 Mock（first={safe}; retry={retry.parse_error}; retry_err={retry.error or 'none'}）。 "
+          f"raw_snippet={snippet}; retry_snippet={snippet2}"
+        )
+      ),
       True,
-      settings.gemini_model,
+      first.model,
+      usage,
     )
+
+  _parse_counters['unusable'] += 1
+  # Demo-friendly behavior: if the model returns malformed JSON, fall back to a deterministic mock
+  # instead of 500'ing the API.
+  return (
+    _mock_analysis(summary=f"Gemini 回傳非合法 JSON，改用 Mock 分析結果（{safe}）。 raw_snippet={snippet}"),
+    True,
+    first.model,
+    usage,
+  )
+
+
+async def generate_json(
+  *,
+  prompt: str,
+  model: str | None = None,
+  max_output_tokens: int = 1024,
+) -> tuple[dict[str, Any] | None, str | None, str, TokenUsage]:
+  """One JSON-mode call for callers with their own schema: (object or None, error, model_used, usage).
+
+  Shares the endpoint resolver and circuit breaker with analyses but has no hedging, context cache
+  or mock fallback; callers decide what a failure means. Requires GEMINI_API_KEY.
+  """
+  model = _normalize_model(model)
+  payload = _build_payload(prompt_text=prompt, max_output_tokens=max_output_tokens, temperature=0.2)
+  data, error = await _post_generate(payload=payload, model=model)
+  if data is None:
+    return None, error or 'unknown error', model, TokenUsage()
+  usage = TokenUsage.from_response(data)
+  try:
+    value, _ = _extract_json_with_repair(_response_text(data))
+  except Exception as exc:
+    return None, f'invalid JSON: {_redact_api_key(str(exc))}', model, usage
+  if not isinstance(value, dict):
+    return None, f'expected a JSON object, got {type(value).__name__}', model, usage
+  return value, None, model, usage
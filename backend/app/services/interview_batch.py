@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import datetime as dt
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator, TypeVar
+
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from app.core.locks import shared_lock
+from app.schemas import InterviewBatchUpdateItem, InterviewCreate
+from app.services.scheduling import Booking, Calendar, to_utc_naive
+
+# (interviewer, start, end) of an interview that occupies its interviewer's calendar.
+Slot = tuple[str, dt.datetime, dt.datetime]
+
+_NOT_WRITTEN = 'Not written: another item of this atomic batch failed'
+
+# A conflict check plus its write takes milliseconds; the lease only matters if a worker dies holding it.
+_BOOKING_LEASE_SECONDS = 30.0
+
+T = TypeVar('T')
+
+
+@dataclass
+class ItemResult:
+  index: int
+  status_code: int = 200
+  error: str | None = None
+  conflicts: list[dict[str, Any]] = field(default_factory=list)
+  interview: models.Interview | None = None
+
+  @property
+  def ok(self) -> bool:
+    return self.status_code < 400
+
+  def fail(self, status_code: int, error: str) -> None:
+    self.status_code, self.error = status_code, error
+
+
+def slot_of(*, interviewer: str, scheduled_at: dt.datetime | None, duration_minutes: int, status: str) -> Slot | None:
+  """The calendar slot an interview takes, or None when it takes none (no interviewer/time, or canceled)."""
+  if not interviewer.strip() or scheduled_at is None or status == 'canceled':
+    return None
+  start = to_utc_naive(scheduled_at)
+  return interviewer, start, start + dt.timedelta(minutes=duration_minutes)
+
+
+def slot_fields_after(interview: models.Interview, patch: dict[str, Any]) -> dict[str, Any]:
+  """interviewer / scheduled_at / duration_minutes / status of `interview` once `patch` is applied."""
+  return {
+    'interviewer': patch['interviewer'] if patch.get('interviewer') is not None else interview.interviewer,
+    'scheduled_at': patch['scheduled_at'] if 'scheduled_at' in patch else interview.scheduled_at,
+    'duration_minutes': patch.get('duration_minutes') or interview.duration_minutes,
+    'status': patch.get('status') or interview.status,
+  }
+
+
+@contextmanager
+def booking_lock(db: Session, interviewers: Iterable[str]) -> Iterator[None]:
+  """Hold the calendars of `interviewers` from the conflict check until the write has committed.
+
+  Without it two requests can both pass the check and then both write. Once the locks are held the
+  session's transaction is ended, so the check reads what the previous holder committed (a SQLite
+  read transaction keeps its snapshot); ORM objects loaded earlier are expired and reload on access.
+  Raises TimeoutError when the calendars stay busy.
+  """
+  names = (f'interviews:book:{name}' for name in interviewers if name.strip())
+  with shared_lock(names, lease_seconds=_BOOKING_LEASE_SECONDS):
+    db.rollback()
+    yield
+
+
+def with_booking_lock(db: Session, interviewers_of: Callable[[], set[str]], run: Callable[[], T]) -> T:
+  """run() under booking_lock for the interviewers it touches, as read once the locks are held.
+
+  `interviewers_of` is called again under the locks; if another request moved an interview to an
+  interviewer outside the locked set meanwhile, the locks are retaken with that interviewer added.
+  """
+  names = interviewers_of()
+  while True:
+    with booking_lock(db, names):
+      current = interviewers_of()
+      if current <= names:
+        return run()
+    names = names | current
+
+
+def _interviewers(slots: Iterable[Slot | None]) -> set[str]:
+  return {slot[0] for slot in slots if slot is not None}
+
+
+def _load_calendar(db: Session, slots: list[Slot | None], exclude_ids: Iterable[int] = ()) -> Calendar:
+  """Stored bookings of every interviewer in `slots` over the batch's whole time span, in one query."""
+  calendar = Calendar()
+  taken = [slot for slot in slots if slot is not None]
+  if not taken:
+    return calendar
+  rows = crud.list_bookings(
+    db,
+    {interviewer for interviewer, _, _ in taken},
+    min(start for _, start, _ in taken),
+    max(end for _, _, end in taken),
+    exclude_ids=exclude_ids,
+  )
+  for row in rows:
+    calendar.add(row['interviewer'], Booking(row['scheduled_at'], row['ends_at'], interview_id=row['id'], resume_id=row['resume_id']))
+  return calendar
+
+
+def _book(calendar: Calendar, slot: Slot, result: ItemResult, **booking: Any) -> bool:
+  """Take `slot` for the item, or mark the item 409 with what it overlaps; True when booked."""
+  interviewer, start, end = slot
+  overlapping = calendar.overlapping(interviewer, start, end)
+  if not overlapping:
+    calendar.add(interviewer, Booking(start, end, batch_index=result.index, **booking))
+    return True
+  error = 'Interviewer is already booked at this time'
+  in_batch = sorted({b.batch_index for b in overlapping if b.batch_index is not None})
+  if in_batch:
+    error += f" (overlaps batch item {', '.join(str(i) for i in in_batch)})"
+  result.fail(409, error)
+  result.conflicts = [
+    {'id': b.interview_id, 'resume_id': b.resume_id, 'interviewer': interviewer, 'scheduled_at': b.start, 'ends_at': b.end}
+    for b in overlapping
+    if b.interview_id is not None
+  ]
+  return False
+
+
+def _should_write(results: list[ItemResult], accepted: list[ItemResult], atomic: bool) -> bool:
+  if not accepted:
+    return False
+  if atomic and len(accepted) < len(results):
+    for result in accepted:
+      result.fail(424, _NOT_WRITTEN)
+      result.interview = None
+    return False
+  return True
+
+
+def create_batch(db: Session, items: list[InterviewCreate], *, atomic: bool) -> tuple[list[ItemResult], bool]:
+  """Validate every item (one query for all resumes, one for all calendars), then insert in one transaction.
+
+  Items are checked for conflicts against stored interviews and against the earlier items of the batch,
+  with the calendars of every interviewer involved locked until the insert commits.
+  Returns the per-item results and whether anything was committed.
+  """
+  slots = [
+    slot_of(interviewer=item.interviewer, scheduled_at=item.scheduled_at, duration_minutes=item.duration_minutes, status=item.status)
+    for item in items
+  ]
+  return with_booking_lock(db, lambda: _interviewers(slots), lambda: _create_batch(db, items, slots, atomic))
+
+
+def _create_batch(db: Session, items: list[InterviewCreate], slots: list[Slot | None], atomic: bool) -> tuple[list[ItemResult], bool]:
+  results = [ItemResult(index=i) for i in range(len(items))]
+  refs = crud.get_resume_refs(db, {item.resume_id for item in items})
+  calendar = _load_calendar(db, slots)
+
+  accepted: list[ItemResult] = []
+  for result, item, slot in zip(results, items, slots):
+    ref = refs.get(item.resume_id)
+    if ref is None:
+      result.fail(400, 'Invalid resume_id')
+    elif ref['job_id'] != item.job_id:
+      result.fail(400, 'Resume is not linked to the given job')
+    elif slot is None or _book(calendar, slot, result, resume_id=item.resume_id):
+      accepted.append(result)
+
+  if not _should_write(results, accepted, atomic):
+    return results, False
+  created = crud.create_interviews(db, [items[result.index] for result in accepted])
+  for result, interview in zip(accepted, created):
+    result.status_code, result.interview = 201, interview
+  return results, True
+
+
+def update_batch(db: Session, items: list[InterviewBatchUpdateItem], *, atomic: bool) -> tuple[list[ItemResult], bool]:
+  """Apply several updates in one transaction, checking the moved interviews against each other too.
+
+  Interviews in the batch keep their current slot until their own item moves them, so two interviews
+  can only trade places across two batches; what is written never double-books anyone.
+  """
+  ids = {item.id for item in items}
+  patches = [{k: v for k, v in crud.interview_patch(item).items() if k != 'id'} for item in items]
+
+  def interviewers() -> set[str]:
+    return _interviewers(_update_slots(items, patches, crud.get_interviews(db, ids)))
+
+  return with_booking_lock(db, interviewers, lambda: _update_batch(db, items, patches, atomic))
+
+
+def _update_slots(
+  items: list[InterviewBatchUpdateItem], patches: list[dict[str, Any]], found: dict[int, models.Interview]
+) -> list[Slot | None]:
+  return [slot_of(**slot_fields_after(found[item.id], patch)) if item.id in found else None for item, patch in zip(items, patches)]
+
+
+def _update_batch(
+  db: Session, items: list[InterviewBatchUpdateItem], patches: list[dict[str, Any]], atomic: bool
+) -> tuple[list[ItemResult], bool]:
+  results = [ItemResult(index=i) for i in range(len(items))]
+  found = crud.get_interviews(db, {item.id for item in items})
+  slots = _update_slots(items, patches, found)
+  calendar = _load_calendar(db, slots, exclude_ids=set(found))
+  for interview in found.values():
+    current = slot_of(
+      interviewer=interview.interviewer,
+      scheduled_at=interview.scheduled_at,
+      duration_minutes=interview.duration_minutes,
+      status=interview.status,
+    )
+    if current is not None:
+      calendar.add(current[0], Booking(current[1], current[2], interview_id=interview.id, resume_id=interview.resume_id))
+
+  accepted: list[ItemResult] = []
+  seen: set[int] = set()
+  for result, item, slot in zip(results, items, slots):
+    interview = found.get(item.id)
+    if interview is None:
+      result.fail(404, 'Interview not found')
+      continue
+    if item.id in seen:
+      result.fail(400, 'Interview appears more than once in the batch')
+      continue
+    seen.add(item.id)
+    previous = calendar.remove(interview.interviewer, interview.id)
+    if slot is not None and not _book(calendar, slot, result, interview_id=interview.id, resume_id=interview.resume_id):
+      for booking in previous:
+        calendar.add(interview.interviewer, booking)
+      continue
+    accepted.append(result)
+
+  if not _should_write(results, accepted, atomic):
+    return results, False
+  updated = crud.update_interviews(db, [(found[items[r.index].id], patches[r.index]) for r in accepted])
+  for result, interview in zip(accepted, updated):
+    result.interview = interview
+  return results, True
+
+
+def cancel_batch(db: Session, ids: list[int], *, atomic: bool) -> tuple[list[ItemResult], bool]:
+  """Cancel several interviews in one transaction; already-canceled ones succeed without a write."""
+  results = [ItemResult(index=i) for i in range(len(ids))]
+  found = crud.get_interviews(db, set(ids))
+  accepted: list[ItemResult] = []
+  seen: set[int] = set()
+  for result, interview_id in zip(results, ids):
+    interview = found.get(interview_id)
+    if interview is None:
+      result.fail(404, 'Interview not found')
+    elif interview_id in seen:
+      result.fail(400, 'Interview appears more than once in the batch')
+    else:
+      seen.add(interview_id)
+      result.interview = interview
+      accepted.append(result)
+
+  if not _should_write(results, accepted, atomic):
+    return results, False
+  changes = [(r.interview, {'status': 'canceled'}) for r in accepted if r.interview.status != 'canceled']
+  if changes:
+    crud.update_interviews(db, changes)
+  return results, True
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import json
+import logging
+import os
+from typing import Any
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from app.core.config import settings
+from app.core.shared_state import shared_state
+from app.db import SessionLocal
+from app.services.analysis import budget_status
+from app.services.dedup import jaccard, question_shingles
+from app.services.gemini import TokenUsage, circuit_open, generate_json
+
+
+logger = logging.getLogger(__name__)
+
+# Part of the job inputs hash: bump it when the prompt below changes so every bank is regenerated.
+QUESTION_PROMPT_VERSION = 'q1'
+
+# One generation per job at a time, across workers (app/core/shared_state.py).
+_CLAIM_KEY = 'questions:generate:{job_id}'
+
+
+def job_inputs_hash(job: models.Job) -> str:
+  """sha256 of everything the job-level prompt is built from; the bank is stale once it differs."""
+  inputs = [
+    QUESTION_PROMPT_VERSION,
+    settings.job_question_count,
+    job.title,
+    job.department,
+    job.description,
+    job.required_skills,
+    job.nice_to_have,
+    job.experience_level,
+    job.education,
+  ]
+  return hashlib.sha256(json.dumps(inputs, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def is_stale(bank: models.JobQuestionBank | None, job: models.Job) -> bool:
+  """Missing, generated from other job inputs, or a mock set while a real API key is now configured."""
+  if bank is None:
+    return True
+  return bank.inputs_hash != job_inputs_hash(job) or (bank.is_mock and bool(settings.gemini_api_key))
+
+
+def build_question_prompt(job: models.Job, count: int) -> str:
+  return (
+    "你是一位資深面試官，請根據『職缺需求』準備適用於所有應徵者的面試題庫並輸出 JSON。\n\n"
+    "【重要規則】\n"
+    "- 只輸出 JSON，禁止輸出其他文字。\n"
+    f"- 共 {count} 題，涵蓋必要技能、工作內容與團隊合作，題目之間不要重複。\n"
+    "- category 只能是 technical、experience、behavioral、culture 之一。\n\n"
+    "【輸出 JSON 格式】\n"
+    "{\n"
+    '  "questions": [{"category": "", "question": ""}]\n'
+    "}\n\n"
+    "【職缺需求】\n"
+    f"- 職缺：{job.title}\n"
+    f"- 部門：{job.department}\n"
+    f"- 年資：{job.experience_level}\n"
+    f"- 學歷：{job.education}\n"
+    f"- 工作內容：{job.description}\n"
+    f"- 必要技能：{', '.join(job.required_skills) if job.required_skills else '未提供'}\n"
+    f"- 加分條件：{', '.join(job.nice_to_have) if job.nice_to_have else '未提供'}\n"
+  )
+
+
+def _mock_questions(job: models.Job) -> dict[str, Any]:
+  skills = job.required_skills or ['此職缺的核心技能']
+  return {
+    'questions': [
+      {'category': 'technical', 'question': f'請說明你使用 {skill} 完成過最有挑戰性的工作。'} for skill in skills[:3]
+    ]
+    + [
+      {'category': 'experience', 'question': f'你過去的經驗如何對應「{job.title}」的工作內容？'},
+      {'category': 'behavioral', 'question': '請分享一次與團隊意見不同時，你如何溝通並達成共識。'},
+    ]
+  }
+
+
+def parse_questions(value: dict[str, Any], limit: int) -> list[tuple[str, str]]:
+  """(category, question) pairs from the model output, near-duplicates removed, at most `limit`."""
+  items = value.get('questions')
+  if not isinstance(items, list):
+    return []
+  kept: list[tuple[str, str, set[str]]] = []
+  for item in items:
+    if isinstance(item, str):
+      item = {'question': item}
+    if not isinstance(item, dict):
+      continue
+    text = str(item.get('question') or '').strip()
+    if not text:
+      continue
+    grams = question_shingles(text)
+    if any(jaccard(grams, other) >= settings.question_dedup_threshold for _, _, other in kept):
+      continue
+    kept.append((str(item.get('category') or '').strip()[:40], text, grams))
+    if len(kept) >= limit:
+      break
+  return [(category, text) for category, text, _ in kept]
+
+
+async def refresh_job_questions(db: Session, job: models.Job, user_id: int | None = None, *, force: bool = False) -> bool:
+  """Generate the job-level questions when the bank is missing or stale (or `force`); one Gemini call.
+
+  Returns False when nothing could be generated: question generation is off for the job, another
+  request is already generating, Gemini is unavailable or over budget, or the output was unusable.
+  The previous bank, if any, is kept in those cases. Database work runs in the threadpool.
+  """
+  if not job.ai_question_gen_enabled:
+    return False
+  if not force and not is_stale(await run_in_threadpool(crud.get_question_bank, db, job.id), job):
+    return True
+  key = _CLAIM_KEY.format(job_id=job.id)
+  state = shared_state()
+  if not state.add(key, str(os.getpid()), ttl=settings.shared_state_lease_seconds):
+    return False
+  try:
+    is_mock = not settings.gemini_api_key
+    if is_mock:
+      value, error, model, usage = _mock_questions(job), None, 'mock', TokenUsage()
+    else:
+      if circuit_open() or (await run_in_threadpool(budget_status, db))['exhausted']:
+        return False
+      value, error, model, usage = await generate_json(
+        prompt=build_question_prompt(job, settings.job_question_count),
+        max_output_tokens=settings.job_question_max_output_tokens,
+      )
+    questions = parse_questions(value, settings.job_question_count) if value else []
+    await run_in_threadpool(_store, db, job, questions, model=model, is_mock=is_mock, usage=usage, user_id=user_id)
+    if not questions:
+      logger.warning('Question generation failed for job=%s: %s', job.id, error or 'no questions in output')
+      return False
+    return True
+  finally:
+    state.delete(key)
+
+
+def _store(
+  db: Session,
+  job: models.Job,
+  questions: list[tuple[str, str]],
+  *,
+  model: str,
+  is_mock: bool,
+  usage: TokenUsage,
+  user_id: int | None,
+) -> None:
+  # Spent tokens count toward the daily budget even when the output was unusable, but a question
+  # bank is not an analysis.
+  if usage.prompt_tokens or usage.output_tokens:
+    crud.record_usage(
+      db,
+      day=dt.datetime.now(dt.timezone.utc).date(),
+      job_id=job.id,
+      user_id=user_id,
+      prompt_tokens=usage.prompt_tokens,
+      output_tokens=usage.output_tokens,
+      cached_tokens=usage.cached_tokens,
+      latency_ms=0,
+      analyses=0,
+    )
+  if not questions:
+    db.commit()
+    return
+  crud.replace_job_questions(
+    db,
+    job.id,
+    inputs_hash=job_inputs_hash(job),
+    questions=questions,
+    model=model,
+    is_mock=is_mock,
+    prompt_tokens=usage.prompt_tokens,
+    output_tokens=usage.output_tokens,
+  )
+
+
+async def refresh_job_questions_task(job_id: int, user_id: int | None = None) -> None:
+  """Background task: bring the job's question bank up to date after the job was saved."""
+  db = SessionLocal()
+  try:
+    job = await run_in_threadpool(crud.get_job, db, job_id)
+    if job is not None:
+      await refresh_job_questions(db, job, user_id)
+  except Exception:
+    db.rollback()
+    logger.exception('Question bank refresh failed for job=%s', job_id)
+  finally:
+    db.close()
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from app.core.config import settings
+
+
+# CJK ideographs, kana and fullwidth punctuation tokenize at roughly one token per character;
+# other text at roughly four characters per token.
+_CJK = re.compile(r'[\u3000-\u303f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uff00-\uffef]')
+
+
+def estimate_tokens(text: str) -> int:
+  cjk = len(_CJK.findall(text))
+  return cjk + (len(text) - cjk + 3) // 4
+
+
+@dataclass(frozen=True)
+class RouteTier:
+  """One routing rule. A tier matches when every bound it sets holds; the first match wins."""
+
+  name: str
+  model: str
+  max_output_tokens: int = 2048
+  min_prompt_tokens: int | None = None
+  max_prompt_tokens: int | None = None
+  experience_levels: tuple[str, ...] = ()
+  # USD per 1k tokens, only used for the cost estimates in routing stats.
+  input_cost_per_1k: float = 0.0
+  output_cost_per_1k: float = 0.0
+
+  def matches(self, *, prompt_tokens: int, experience_level: str | None) -> bool:
+    if self.min_prompt_tokens is not None and prompt_tokens < self.min_prompt_tokens:
+      return False
+    if self.max_prompt_tokens is not None and prompt_tokens > self.max_prompt_tokens:
+      return False
+    if self.experience_levels and experience_level not in self.experience_levels:
+      return False
+    return True
+
+
+def _tier_from_rule(rule: dict[str, Any]) -> RouteTier:
+  return RouteTier(
+    name=str(rule.get('name') or rule.get('model') or 'default'),
+    model=str(rule.get('model') or settings.gemini_model),
+    max_output_tokens=int(rule.get('max_output_tokens') or 2048),
+    min_prompt_tokens=rule.get('min_prompt_tokens'),
+    max_prompt_tokens=rule.get('max_prompt_tokens'),
+    experience_levels=tuple(rule.get('experience_levels') or ()),
+    input_cost_per_1k=float(rule.get('input_cost_per_1k') or 0.0),
+    output_cost_per_1k=float(rule.get('output_cost_per_1k') or 0.0),
+  )
+
+
+@lru_cache(maxsize=1)
+def tiers() -> tuple[RouteTier, ...]:
+  """Tiers from GEMINI_ROUTING_RULES (a JSON list), always ending with a catch-all default tier.
+
+  Example:
+    [{"name": "light", "model": "gemini-2.5-flash-lite", "max_prompt_tokens": 1500, "max_output_tokens": 1024},
+     {"name": "strong", "model": "gemini-2.5-pro", "experience_levels": ["7+"], "max_output_tokens": 3072},
+     {"name": "strong", "model": "gemini-2.5-pro", "min_prompt_tokens": 12000, "max_output_tokens": 3072}]
+  """
+  configured = tuple(_tier_from_rule(rule) for rule in settings.gemini_routing_rules)
+  return configured + (RouteTier(name='default', model=settings.gemini_model, max_output_tokens=2048),)
+
+
+def route(prompt: str, *, experience_level: str | None = None) -> tuple[RouteTier, int]:
+  """Pick the tier for a prompt. Returns (tier, estimated_prompt_tokens)."""
+  prompt_tokens = estimate_tokens(prompt)
+  for tier in tiers():
+    if tier.matches(prompt_tokens=prompt_tokens, experience_level=experience_level):
+      return tier, prompt_tokens
+  return tiers()[-1], prompt_tokens
+
+
+def tier_by_name(name: str) -> RouteTier | None:
+  return next((t for t in tiers() if t.name == name), None)
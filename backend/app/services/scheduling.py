@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import datetime as dt
+from dataclasses import dataclass
+from typing import Iterable
+
+Interval = tuple[dt.datetime, dt.datetime]
+
+
+def to_utc_naive(value: dt.datetime | None) -> dt.datetime | None:
+  """Stored datetimes are naive UTC; aware input (ISO strings ending in Z or +08:00) is converted to match."""
+  if value is None or value.tzinfo is None:
+    return value
+  return value.astimezone(dt.timezone.utc).replace(tzinfo=None)
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> list[Interval]:
+  """Union of the intervals as sorted, disjoint intervals (back-to-back ones are joined)."""
+  merged: list[Interval] = []
+  for start, end in sorted(intervals):
+    if merged and start <= merged[-1][1]:
+      if end > merged[-1][1]:
+        merged[-1] = (merged[-1][0], end)
+    else:
+      merged.append((start, end))
+  return merged
+
+
+def clip(intervals: list[Interval], start: dt.datetime, end: dt.datetime) -> list[Interval]:
+  return [(max(s, start), min(e, end)) for s, e in intervals if s < end and e > start]
+
+
+def free_slots(busy: list[Interval], start: dt.datetime, end: dt.datetime, min_length: dt.timedelta) -> list[Interval]:
+  """Gaps of at least `min_length` in [start, end) between the merged `busy` intervals, in one sweep."""
+  slots: list[Interval] = []
+  cursor = start
+  for busy_start, busy_end in busy:
+    if busy_end <= cursor:
+      continue
+    if busy_start >= end:
+      break
+    if busy_start - cursor >= min_length:
+      slots.append((cursor, busy_start))
+    cursor = busy_end
+  if end - cursor >= min_length:
+    slots.append((cursor, end))
+  return slots
+
+
+def availability(
+  busy_by_interviewer: dict[str, list[Interval]],
+  start: dt.datetime,
+  end: dt.datetime,
+  min_length: dt.timedelta,
+) -> tuple[dict[str, tuple[list[Interval], list[Interval]]], list[Interval]]:
+  """Per interviewer (merged busy, free) within [start, end), plus the slots free for all of them.
+
+  The common slots are the gaps of the union of everyone's busy time, so they need one more sweep
+  over all intervals rather than pairwise intersections.
+  """
+  per_interviewer: dict[str, tuple[list[Interval], list[Interval]]] = {}
+  for interviewer, intervals in busy_by_interviewer.items():
+    busy = clip(merge_intervals(intervals), start, end)
+    per_interviewer[interviewer] = (busy, free_slots(busy, start, end, min_length))
+  everyone = merge_intervals(interval for busy, _ in per_interviewer.values() for interval in busy)
+  return per_interviewer, free_slots(everyone, start, end, min_length)
+
+
+@dataclass
+class Booking:
+  start: dt.datetime
+  end: dt.datetime
+  interview_id: int | None = None
+  resume_id: int | None = None
+  # Set for slots taken by an earlier item of the batch being checked.
+  batch_index: int | None = None
+
+
+class Calendar:
+  """Bookings per interviewer, for checking a whole batch against the database and against itself."""
+
+  def __init__(self) -> None:
+    self._bookings: dict[str, list[Booking]] = {}
+
+  def add(self, interviewer: str, booking: Booking) -> None:
+    self._bookings.setdefault(interviewer, []).append(booking)
+
+  def remove(self, interviewer: str, interview_id: int) -> list[Booking]:
+    bookings = self._bookings.get(interviewer, [])
+    removed = [b for b in bookings if b.interview_id == interview_id]
+    self._bookings[interviewer] = [b for b in bookings if b.interview_id != interview_id]
+    return removed
+
+  def overlapping(self, interviewer: str, start: dt.datetime, end: dt.datetime) -> list[Booking]:
+    return sorted(
+      (b for b in self._bookings.get(interviewer, []) if b.start < end and b.end > start),
+      key=lambda b: b.start,
+    )
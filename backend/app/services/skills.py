@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from functools import lru_cache
+
+from app.core.config import settings
+
+
+# Canonical display name -> other spellings that mean the same skill. Extended (or overridden) by
+# the SKILL_ALIASES setting; spellings are compared with skill_key().
+_BUILTIN_ALIASES: dict[str, list[str]] = {
+  'JavaScript': ['JS', 'ECMAScript', 'ES6'],
+  'TypeScript': ['TS'],
+  'Node.js': ['Node', 'NodeJS', 'Node JS'],
+  'React': ['React.js', 'ReactJS'],
+  'Vue': ['Vue.js', 'VueJS'],
+  'PostgreSQL': ['Postgres', 'psql'],
+  'Kubernetes': ['k8s'],
+  'Go': ['Golang'],
+  'Python': ['Python3', 'py'],
+  'C#': ['CSharp', 'C Sharp'],
+  'C++': ['cpp'],
+  'AWS': ['Amazon Web Services'],
+  'GCP': ['Google Cloud', 'Google Cloud Platform'],
+  'CI/CD': ['CICD', 'CI CD'],
+  'REST API': ['REST', 'RESTful', 'RESTful API'],
+  '系統設計': ['System Design'],
+}
+
+
+def skill_key(name: str) -> str:
+  """Comparison key: NFKC (full-width -> ASCII), case-folded, whitespace collapsed."""
+  return re.sub(r'\s+', ' ', unicodedata.normalize('NFKC', name).casefold()).strip()
+
+
+@lru_cache(maxsize=1)
+def _canonical_names() -> dict[str, str]:
+  names: dict[str, str] = {}
+  for canonical, aliases in {**_BUILTIN_ALIASES, **settings.skill_aliases}.items():
+    for spelling in (canonical, *aliases):
+      names[skill_key(spelling)] = canonical
+  return names
+
+
+def canonical_skill(name: str) -> tuple[str, str] | None:
+  """(key, display name) of the skill `name` refers to, or None for blank input.
+
+  Known aliases map to their canonical skill; anything else is its own skill, displayed as first seen.
+  """
+  key = skill_key(name)
+  if not key:
+    return None
+  canonical = _canonical_names().get(key)
+  if canonical is None:
+    return key, name.strip()
+  return skill_key(canonical), canonical
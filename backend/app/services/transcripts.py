@@ -0,0 +1,341 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import json
+import logging
+import os
+import re
+from typing import Any
+
+from app import crud, models
+from app.core.config import settings
+from app.core.shared_state import shared_state
+from app.db import SessionLocal
+from app.services.analysis import budget_status
+from app.services.gemini import TokenUsage, circuit_open, generate_json
+from app.services.routing import estimate_tokens
+
+
+logger = logging.getLogger(__name__)
+
+# One summarization run per interview at a time, across workers (app/core/shared_state.py).
+_CLAIM_KEY = 'transcript:summarize:{interview_id}'
+
+# Where a long line may be cut: after sentence punctuation (CJK or Latin) followed by optional space.
+_SENTENCE_END = re.compile(r'(?<=[。！？!?；;.])\s*')
+
+
+def _split_long(line: str, max_tokens: int) -> list[str]:
+  """Cut one over-long line at sentence ends, falling back to fixed-size pieces."""
+  pieces: list[str] = []
+  current = ''
+  for sentence in (s for s in _SENTENCE_END.split(line) if s):
+    if current and estimate_tokens(current + sentence) > max_tokens:
+      pieces.append(current)
+      current = ''
+    while estimate_tokens(sentence) > max_tokens:
+      # No usable boundary: cut by characters (CJK is ~1 token/char, so this is conservative).
+      pieces.append(sentence[:max_tokens])
+      sentence = sentence[max_tokens:]
+    current += sentence
+  if current:
+    pieces.append(current)
+  return pieces
+
+
+def split_chunks(text: str, max_tokens: int) -> list[str]:
+  """Token-bounded chunks of the transcript, cut between lines (speaker turns) where possible."""
+  chunks: list[str] = []
+  current: list[str] = []
+  current_tokens = 0
+  for line in text.splitlines():
+    if not line.strip():
+      continue
+    for piece in _split_long(line, max_tokens) if estimate_tokens(line) > max_tokens else [line]:
+      tokens = estimate_tokens(piece) + 1
+      if current and current_tokens + tokens > max_tokens:
+        chunks.append('\n'.join(current))
+        current, current_tokens = [], 0
+      current.append(piece)
+      current_tokens += tokens
+  if current:
+    chunks.append('\n'.join(current))
+  return chunks
+
+
+def _context(job: models.Job | None, interview: models.Interview) -> str:
+  if job is None:
+    return ''
+  return (
+    "【職缺】\n"
+    f"- 職缺：{job.title}（{job.department}）\n"
+    f"- 必要技能：{', '.join(job.required_skills) if job.required_skills else '未提供'}\n"
+    f"- 面試關卡：{interview.interview_round or '未提供'}\n\n"
+  )
+
+
+_CHUNK_FORMAT = (
+  "{\n"
+  '  "summary": "",\n'
+  '  "topics": [""],\n'
+  '  "strengths": [""],\n'
+  '  "concerns": [""],\n'
+  '  "notable_quotes": [""]\n'
+  "}\n\n"
+)
+
+
+def build_chunk_prompt(*, context: str, chunk: str, index: int, total: int) -> str:
+  return (
+    "你是一位資深面試官，以下是一場面試逐字稿的其中一段，請摘要這一段中候選人的表現並輸出 JSON。\n\n"
+    "【重要規則】\n"
+    "- 只輸出 JSON，禁止輸出其他文字。\n"
+    "- 只根據本段內容，不要推測其他段落。\n"
+    "- 每個陣列最多 5 項，引述請保留原文。\n\n"
+    "【輸出 JSON 格式】\n" + _CHUNK_FORMAT + context + f"【逐字稿 第 {index + 1}/{total} 段】\n{chunk}\n"
+  )
+
+
+def build_combine_prompt(*, context: str, summaries: list[dict[str, Any]]) -> str:
+  """Merge several partial summaries into one of the same shape (for transcripts too long to reduce at once)."""
+  return (
+    "以下是同一場面試連續數段逐字稿的 JSON 摘要，請合併成一份相同格式的 JSON 摘要。\n\n"
+    "【重要規則】\n"
+    "- 只輸出 JSON，禁止輸出其他文字。\n"
+    "- 每個陣列最多 5 項，去除重複。\n\n"
+    "【輸出 JSON 格式】\n" + _CHUNK_FORMAT + context + "【各段摘要】\n"
+    + json.dumps(summaries, ensure_ascii=False)
+    + "\n"
+  )
+
+
+def build_reduce_prompt(*, context: str, summaries: list[dict[str, Any]]) -> str:
+  return (
+    "你是一位資深面試官，以下是一場面試逐字稿依序分段的 JSON 摘要，請綜合成對候選人的結構化評估並輸出 JSON。\n\n"
+    "【重要規則】\n"
+    "- 只輸出 JSON，禁止輸出其他文字。\n"
+    "- 分數範圍 0~100，recommendation 只能是 strong_hire、hire、lean_hire、lean_no、no_hire 之一。\n"
+    "- 請強調：AI 僅供參考，不做決策。\n\n"
+    "【輸出 JSON 格式】\n"
+    "{\n"
+    '  "overall_score": 0,\n'
+    '  "technical_score": 0,\n'
+    '  "communication_score": 0,\n'
+    '  "problem_solving_score": 0,\n'
+    '  "recommendation": "",\n'
+    '  "summary": "",\n'
+    '  "strengths": [""],\n'
+    '  "concerns": [""],\n'
+    '  "notable_quotes": [""],\n'
+    '  "follow_up_questions": [""],\n'
+    '  "disclaimer": "本評估僅供招募人員參考，最終決策由人類負責"\n'
+    "}\n\n" + context + "【各段摘要】\n"
+    + json.dumps(summaries, ensure_ascii=False)
+    + "\n"
+  )
+
+
+def _mock_chunk(chunk: str) -> dict[str, Any]:
+  return {
+    'summary': chunk[:120],
+    'topics': [],
+    'strengths': [],
+    'concerns': [],
+    'notable_quotes': [],
+  }
+
+
+def _mock_evaluation(chunks: int) -> dict[str, Any]:
+  return {
+    'overall_score': 75,
+    'technical_score': 75,
+    'communication_score': 75,
+    'problem_solving_score': 75,
+    'recommendation': 'lean_hire',
+    'summary': f'未提供 GEMINI_API_KEY，故使用 Mock 評估結果（逐字稿共 {chunks} 段）。',
+    'strengths': [],
+    'concerns': [],
+    'notable_quotes': [],
+    'follow_up_questions': [],
+    'disclaimer': '本評估僅供招募人員參考，最終決策由人類負責',
+  }
+
+
+class _Run:
+  """Model, token totals and mock flag accumulated over every call of one summarization run."""
+
+  def __init__(self) -> None:
+    self.model = settings.transcript_model or settings.gemini_model
+    self.usage = TokenUsage()
+    self.is_mock = not settings.gemini_api_key
+
+  async def call(self, prompt: str, mock: dict[str, Any]) -> tuple[dict[str, Any] | None, str | None, TokenUsage]:
+    if self.is_mock:
+      return mock, None, TokenUsage()
+    value, error, self.model, usage = await generate_json(
+      prompt=prompt, model=self.model, max_output_tokens=settings.transcript_max_output_tokens
+    )
+    self.usage = self.usage + usage
+    return value, error, usage
+
+
+async def _map_chunk(run: _Run, semaphore: asyncio.Semaphore, *, interview_id: int, idx: int, prompt: str, chunk: str) -> bool:
+  async with semaphore:
+    summary, error, usage = await run.call(prompt, _mock_chunk(chunk))
+  # Saved one by one so a failed run keeps every chunk that did succeed.
+  with SessionLocal() as db:
+    db.merge(
+      models.TranscriptChunk(
+        interview_id=interview_id,
+        idx=idx,
+        summary=summary,
+        error=error or '',
+        prompt_tokens=usage.prompt_tokens,
+        output_tokens=usage.output_tokens,
+      )
+    )
+    db.commit()
+  return summary is not None
+
+
+def _group(summaries: list[dict[str, Any]], max_tokens: int) -> list[list[dict[str, Any]]]:
+  groups: list[list[dict[str, Any]]] = [[]]
+  used = 0
+  for summary in summaries:
+    tokens = estimate_tokens(json.dumps(summary, ensure_ascii=False))
+    if groups[-1] and used + tokens > max_tokens:
+      groups.append([])
+      used = 0
+    groups[-1].append(summary)
+    used += tokens
+  return groups
+
+
+async def _reduce(run: _Run, semaphore: asyncio.Semaphore, context: str, summaries: list[dict[str, Any]]) -> tuple[dict[str, Any] | None, str | None]:
+  """Combine partial summaries level by level until they fit one call, then produce the evaluation."""
+  limit = settings.transcript_chunk_tokens
+
+  async def combine(group: list[dict[str, Any]]) -> tuple[dict[str, Any] | None, str | None, TokenUsage]:
+    if len(group) == 1:
+      return group[0], None, TokenUsage()
+    async with semaphore:
+      return await run.call(build_combine_prompt(context=context, summaries=group), group[0])
+
+  level = summaries
+  while len(level) > 1 and estimate_tokens(json.dumps(level, ensure_ascii=False)) > limit:
+    groups = _group(level, limit)
+    if len(groups) == len(level):
+      # Every summary is a group of its own: combining cannot shrink this level any further.
+      break
+    results = await asyncio.gather(*(combine(group) for group in groups))
+    errors = [error for _, error, _ in results if error]
+    if errors:
+      return None, f'combine step failed: {errors[0]}'
+    level = [value for value, _, _ in results if value is not None]
+
+  evaluation, error, _ = await run.call(build_reduce_prompt(context=context, summaries=level), _mock_evaluation(len(summaries)))
+  return evaluation, (f'reduce step failed: {error}' if error else None)
+
+
+def _finish(interview_id: int, run: _Run, user_id: int | None, **fields: Any) -> None:
+  with SessionLocal() as db:
+    transcript = crud.get_transcript(db, interview_id)
+    if transcript is None:
+      return
+    for name, value in fields.items():
+      setattr(transcript, name, value)
+    transcript.model = run.model
+    transcript.is_mock = run.is_mock
+    transcript.prompt_tokens += run.usage.prompt_tokens
+    transcript.output_tokens += run.usage.output_tokens
+    interview = crud.get_interview(db, interview_id)
+    if interview is not None and not run.is_mock and (run.usage.prompt_tokens or run.usage.output_tokens):
+      crud.record_usage(
+        db,
+        day=dt.datetime.now(dt.timezone.utc).date(),
+        job_id=interview.job_id,
+        user_id=user_id,
+        prompt_tokens=run.usage.prompt_tokens,
+        output_tokens=run.usage.output_tokens,
+        cached_tokens=run.usage.cached_tokens,
+        latency_ms=0,
+        analyses=0,
+      )
+    crud.mark_changed(db, 'interviews')
+    crud.record_change(db, 'interview', interview_id, 'updated', job_id=interview.job_id if interview else None)
+    db.commit()
+
+
+def is_summarizing(interview_id: int) -> bool:
+  return shared_state().get(_CLAIM_KEY.format(interview_id=interview_id)) is not None
+
+
+async def summarize_transcript(interview_id: int, user_id: int | None = None) -> None:
+  """Background task: map every missing chunk summary (bounded concurrency), then reduce to the evaluation.
+
+  Chunk results persist as they arrive, so after a failure the next run only redoes the missing
+  chunks and the reduce step. Skipped when another task already holds the interview's claim.
+  """
+  key = _CLAIM_KEY.format(interview_id=interview_id)
+  state = shared_state()
+  if not state.add(key, str(os.getpid()), ttl=settings.shared_state_lease_seconds):
+    return
+  run = _Run()
+  try:
+    with SessionLocal() as db:
+      transcript = crud.get_transcript(db, interview_id)
+      interview = crud.get_interview(db, interview_id)
+      if transcript is None or interview is None:
+        return
+      if not run.is_mock:
+        blocked = None
+        if circuit_open():
+          blocked = 'Gemini circuit breaker is open'
+        elif budget_status(db)['exhausted']:
+          blocked = 'daily token budget reached'
+        if blocked:
+          transcript.status, transcript.error = 'failed', f'{blocked}; summarize again later'
+          db.commit()
+          return
+      context = _context(crud.get_job(db, interview.job_id), interview)
+      chunks = split_chunks(transcript.text, settings.transcript_chunk_tokens)
+      if transcript.chunk_count != len(chunks):
+        # TRANSCRIPT_CHUNK_TOKENS changed since the last run: earlier chunk summaries no longer line up.
+        transcript.chunks.clear()
+      done = {chunk.idx for chunk in transcript.chunks if chunk.summary is not None}
+      transcript.status, transcript.error, transcript.chunk_count = 'summarizing', '', len(chunks)
+      db.commit()
+
+    semaphore = asyncio.Semaphore(max(1, settings.transcript_concurrency))
+    results = await asyncio.gather(
+      *(
+        _map_chunk(
+          run,
+          semaphore,
+          interview_id=interview_id,
+          idx=idx,
+          prompt=build_chunk_prompt(context=context, chunk=chunk, index=idx, total=len(chunks)),
+          chunk=chunk,
+        )
+        for idx, chunk in enumerate(chunks)
+        if idx not in done
+      )
+    )
+    failed = results.count(False)
+    if failed:
+      _finish(interview_id, run, user_id, status='failed', error=f'{failed} of {len(chunks)} chunks failed; summarize again to retry them')
+      return
+
+    with SessionLocal() as db:
+      summaries = [chunk.summary for chunk in crud.list_transcript_chunks(db, interview_id)][: len(chunks)]
+    evaluation, error = await _reduce(run, semaphore, context, summaries)
+    if evaluation is None:
+      _finish(interview_id, run, user_id, status='failed', error=error or 'reduce step failed')
+      return
+    _finish(interview_id, run, user_id, status='done', evaluation=evaluation, summarized_at=dt.datetime.utcnow())
+  except Exception:
+    logger.exception('Transcript summarization failed for interview=%s', interview_id)
+    _finish(interview_id, run, user_id, status='failed', error='internal error; summarize again to retry')
+  finally:
+    state.delete(key)
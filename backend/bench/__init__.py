@@ -0,0 +1 @@
+"""Benchmark and load-test suite for the backend API (see `python -m bench.load --help`)."""
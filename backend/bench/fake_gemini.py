@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+
+@dataclass
+class FakeGeminiConfig:
+  latency_ms: float = 800.0
+  jitter_ms: float = 200.0
+  error_rate: float = 0.0
+  malformed_rate: float = 0.0
+  seed: int = 0
+
+
+_ANALYSIS = {
+  'overall_score': 74,
+  'professional_score': 78,
+  'communication_score': 70,
+  'problem_solving_score': 72,
+  'summary': '候選人具備職缺所需的主要技能，建議安排面試確認實作深度。',
+  'strengths': ['技能與職缺需求相符', '有完整專案經驗'],
+  'risks': ['需確認團隊協作經驗'],
+  'suggested_questions': ['請分享一個最有代表性的專案與你的角色'],
+  'disclaimer': '本分析結果僅供招募人員參考，最終決策由人類負責',
+}
+
+
+class FakeGemini:
+  """Local stand-in for the Gemini REST API with configurable latency and failure modes.
+
+  Point `GEMINI_ENDPOINT` at `endpoint` to use it.
+  """
+
+  def __init__(self, config: FakeGeminiConfig | None = None, *, host: str = '127.0.0.1', port: int = 0):
+    self.config = config or FakeGeminiConfig()
+    self.counters: dict[str, int] = {'requests': 0, 'errors': 0, 'malformed': 0, 'ok': 0}
+    self._rng = random.Random(self.config.seed)
+    self._lock = threading.Lock()
+    self._server = ThreadingHTTPServer((host, port), self._handler_class())
+    self._server.daemon_threads = True
+    self._thread: threading.Thread | None = None
+
+  @property
+  def endpoint(self) -> str:
+    host, port = self._server.server_address[:2]
+    return f'http://{host}:{port}/v1beta/models'
+
+  def start(self) -> 'FakeGemini':
+    self._thread = threading.Thread(target=self._server.serve_forever, name='fake-gemini', daemon=True)
+    self._thread.start()
+    return self
+
+  def stop(self) -> None:
+    self._server.shutdown()
+    self._server.server_close()
+
+  def __enter__(self) -> 'FakeGemini':
+    return self.start()
+
+  def __exit__(self, *exc: object) -> None:
+    self.stop()
+
+  def _roll(self) -> tuple[float, str]:
+    cfg = self.config
+    with self._lock:
+      self.counters['requests'] += 1
+      delay = max(0.0, self._rng.gauss(cfg.latency_ms, cfg.jitter_ms)) / 1000
+      roll = self._rng.random()
+      if roll < cfg.error_rate:
+        outcome = 'errors'
+      elif roll < cfg.error_rate + cfg.malformed_rate:
+        outcome = 'malformed'
+      else:
+        outcome = 'ok'
+      self.counters[outcome] += 1
+    return delay, outcome
+
+  def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+    fake = self
+
+    class Handler(BaseHTTPRequestHandler):
+      def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+      def _send_json(self, status: int, body: Any) -> None:
+        raw = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+      def do_GET(self) -> None:
+        path = self.path.split('?', 1)[0].rstrip('/')
+        if path.endswith('/models'):
+          self._send_json(200, {'models': [{'name': 'models/gemini-2.5-flash'}, {'name': 'models/gemini-2.5-flash-lite'}]})
+          return
+        if '/models/' in path:
+          self._send_json(200, {'name': 'models/' + path.rsplit('/', 1)[-1]})
+          return
+        self._send_json(404, {'error': {'code': 404, 'message': 'not found'}})
+
+      def do_DELETE(self) -> None:
+        self._send_json(200, {})
+
+      def do_POST(self) -> None:
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        path = self.path.split('?', 1)[0]
+        if path.endswith('/cachedContents'):
+          with fake._lock:
+            fake.counters['cached_contents'] = fake.counters.get('cached_contents', 0) + 1
+            name = f"cachedContents/bench-{fake.counters['cached_contents']}"
+          self._send_json(200, {'name': name})
+          return
+        if not path.endswith(':generateContent'):
+          self._send_json(404, {'error': {'code': 404, 'message': 'not found'}})
+          return
+
+        delay, outcome = fake._roll()
+        time.sleep(delay)
+
+        if outcome == 'errors':
+          self._send_json(503, {'error': {'code': 503, 'message': 'The model is overloaded.'}})
+          return
+
+        text = json.dumps(_ANALYSIS, ensure_ascii=False)
+        if outcome == 'malformed':
+          # Cut the JSON mid-way, the same failure shape Gemini produces on truncated output.
+          text = text[: len(text) // 2]
+
+        self._send_json(
+          200,
+          {
+            'candidates': [{'content': {'role': 'model', 'parts': [{'text': text}]}, 'finishReason': 'STOP'}],
+            'usageMetadata': {
+              'promptTokenCount': max(1, len(body) // 3),
+              'candidatesTokenCount': max(1, len(text) // 3),
+              'totalTokenCount': max(1, len(body) // 3) + max(1, len(text) // 3),
+            },
+          },
+        )
+
+    return Handler
+
+
+if __name__ == '__main__':
+  import argparse
+
+  parser = argparse.ArgumentParser(description='Run the fake Gemini server standalone.')
+  parser.add_argument('--port', type=int, default=8765)
+  parser.add_argument('--latency-ms', type=float, default=800.0)
+  parser.add_argument('--jitter-ms', type=float, default=200.0)
+  parser.add_argument('--error-rate', type=float, default=0.0)
+  parser.add_argument('--malformed-rate', type=float, default=0.0)
+  args = parser.parse_args()
+
+  server = FakeGemini(
+    FakeGeminiConfig(
+      latency_ms=args.latency_ms,
+      jitter_ms=args.jitter_ms,
+      error_rate=args.error_rate,
+      malformed_rate=args.malformed_rate,
+    ),
+    port=args.port,
+  )
+  print(f'Fake Gemini listening; set GEMINI_ENDPOINT={server.endpoint}')
+  try:
+    server._server.serve_forever()
+  except KeyboardInterrupt:
+    pass
@@ -0,0 +1,288 @@
+"""Seed a throwaway database, start the API against a fake Gemini and drive it at fixed concurrency.
+
+  python -m bench.load --jobs 20 --resumes-per-job 250 --concurrency 16 --requests 400
+
+Reports p50/p95/p99 latency and throughput per scenario; `--json` writes the same numbers to a
+file so runs can be diffed against a stored baseline.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+import httpx
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.migrations import ensure_schema
+from app.seed import seed_bulk
+from bench.fake_gemini import FakeGemini, FakeGeminiConfig
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+RequestSpec = tuple[str, str, dict[str, Any] | None]
+
+
+@dataclass
+class ScenarioResult:
+  name: str
+  requests: int
+  errors: int
+  seconds: float
+  p50_ms: float
+  p95_ms: float
+  p99_ms: float
+  throughput_rps: float
+  avg_response_bytes: float
+  status_codes: dict[str, int] = field(default_factory=dict)
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+  if not sorted_values:
+    return 0.0
+  rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+  return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _free_port() -> int:
+  with socket.socket() as s:
+    s.bind(('127.0.0.1', 0))
+    return s.getsockname()[1]
+
+
+def seed_database(database_url: str, *, jobs: int, resumes_per_job: int, seed: int) -> list[tuple[int, int]]:
+  engine = create_engine(database_url)
+  ensure_schema(engine)
+  with Session(engine) as db:
+    seed_bulk(db, jobs=jobs, resumes_per_job=resumes_per_job, seed=seed)
+    pairs = [(job_id, resume_id) for resume_id, job_id in db.execute(select(models.Resume.id, models.Resume.job_id))]
+  engine.dispose()
+  return pairs
+
+
+def start_api(*, port: int, database_url: str, gemini_endpoint: str) -> subprocess.Popen:
+  env = {
+    **os.environ,
+    'DATABASE_URL': database_url,
+    'DATABASE_ECHO': 'false',
+    'GEMINI_API_KEY': 'bench-key',
+    'GEMINI_ENDPOINT': gemini_endpoint,
+    'AUTH_SECRET_KEY': 'bench-secret-key-for-local-load-tests-only',
+  }
+  return subprocess.Popen(
+    [sys.executable, '-m', 'uvicorn', 'app.main:app', '--port', str(port), '--log-level', 'warning'],
+    cwd=BACKEND_DIR,
+    env=env,
+  )
+
+
+async def wait_healthy(base_url: str, *, timeout: float = 30.0) -> None:
+  deadline = time.monotonic() + timeout
+  async with httpx.AsyncClient() as client:
+    while time.monotonic() < deadline:
+      try:
+        resp = await client.get(f'{base_url}/health')
+        if resp.status_code == 200:
+          return
+      except httpx.HTTPError:
+        pass
+      await asyncio.sleep(0.1)
+  raise RuntimeError(f'API at {base_url} did not become healthy within {timeout}s')
+
+
+async def login(client: httpx.AsyncClient) -> str:
+  creds = {'username': 'bench', 'password': 'bench-password'}
+  await client.post('/api/v1/auth/register', json=creds)
+  resp = await client.post('/api/v1/auth/login', json=creds)
+  resp.raise_for_status()
+  return resp.json()['accessToken']
+
+
+def build_scenarios(pairs: list[tuple[int, int]], rng: random.Random) -> dict[str, Callable[[int], RequestSpec]]:
+  job_ids = sorted({job_id for job_id, _ in pairs})
+
+  def list_jobs(_: int) -> RequestSpec:
+    return ('GET', '/api/v1/jobs', None)
+
+  def list_resumes(_: int) -> RequestSpec:
+    return ('GET', f'/api/v1/resumes?job_id={rng.choice(job_ids)}', None)
+
+  def list_interviews(_: int) -> RequestSpec:
+    return ('GET', f'/api/v1/interviews?job_id={rng.choice(job_ids)}', None)
+
+  def list_analyses(_: int) -> RequestSpec:
+    return ('GET', f'/api/v1/ai-analyses?job_id={rng.choice(job_ids)}', None)
+
+  def create_resume(i: int) -> RequestSpec:
+    return (
+      'POST',
+      '/api/v1/resumes',
+      {
+        'candidateName': f'壓測候選人{i}',
+        'jobId': rng.choice(job_ids),
+        'resumeText': '熟悉 Python, FastAPI, SQL。具備團隊合作與問題解決經驗。' * 20,
+        'skills': ['Python', 'FastAPI', 'SQL'],
+      },
+    )
+
+  def analyze(_: int) -> RequestSpec:
+    job_id, resume_id = rng.choice(pairs)
+    return ('POST', '/api/v1/ai-analyses', {'jobId': job_id, 'resumeId': resume_id, 'force': True})
+
+  return {
+    'list_jobs': list_jobs,
+    'list_resumes': list_resumes,
+    'list_interviews': list_interviews,
+    'list_analyses': list_analyses,
+    'create_resume': create_resume,
+    'analyze': analyze,
+  }
+
+
+async def run_scenario(
+  client: httpx.AsyncClient,
+  name: str,
+  make_request: Callable[[int], RequestSpec],
+  *,
+  total: int,
+  concurrency: int,
+) -> ScenarioResult:
+  latencies: list[float] = []
+  status_codes: dict[str, int] = {}
+  errors = 0
+  response_bytes = 0
+  next_index = 0
+
+  async def worker() -> None:
+    nonlocal errors, response_bytes, next_index
+    while next_index < total:
+      i = next_index
+      next_index += 1
+      method, url, body = make_request(i)
+      started = time.perf_counter()
+      try:
+        resp = await client.request(method, url, json=body)
+        code = str(resp.status_code)
+        response_bytes += len(resp.content)
+        if resp.status_code >= 400:
+          errors += 1
+      except httpx.HTTPError as exc:
+        code = type(exc).__name__
+        errors += 1
+      latencies.append((time.perf_counter() - started) * 1000)
+      status_codes[code] = status_codes.get(code, 0) + 1
+
+  started = time.perf_counter()
+  await asyncio.gather(*(worker() for _ in range(concurrency)))
+  seconds = time.perf_counter() - started
+
+  latencies.sort()
+  return ScenarioResult(
+    name=name,
+    requests=len(latencies),
+    errors=errors,
+    seconds=round(seconds, 3),
+    p50_ms=round(percentile(latencies, 50), 2),
+    p95_ms=round(percentile(latencies, 95), 2),
+    p99_ms=round(percentile(latencies, 99), 2),
+    throughput_rps=round(len(latencies) / seconds, 2) if seconds > 0 else 0.0,
+    avg_response_bytes=round(response_bytes / len(latencies), 1) if latencies else 0.0,
+    status_codes=status_codes,
+  )
+
+
+def print_report(results: list[ScenarioResult]) -> None:
+  header = f"{'scenario':<16}{'reqs':>7}{'errs':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'avg KB':>10}"
+  print(header)
+  print('-' * len(header))
+  for r in results:
+    print(f'{r.name:<16}{r.requests:>7}{r.errors:>6}{r.p50_ms:>10.1f}{r.p95_ms:>10.1f}{r.p99_ms:>10.1f}{r.throughput_rps:>10.1f}{r.avg_response_bytes / 1024:>10.1f}')
+
+
+async def run(args: argparse.Namespace) -> list[ScenarioResult]:
+  workdir = Path(tempfile.mkdtemp(prefix='bench-'))
+  database_url = f"sqlite:///{(workdir / 'bench.db').as_posix()}"
+  print(f'Seeding {args.jobs} jobs x {args.resumes_per_job} resumes into {database_url}')
+  pairs = seed_database(database_url, jobs=args.jobs, resumes_per_job=args.resumes_per_job, seed=args.seed)
+
+  fake = FakeGemini(
+    FakeGeminiConfig(
+      latency_ms=args.gemini_latency_ms,
+      jitter_ms=args.gemini_jitter_ms,
+      error_rate=args.gemini_error_rate,
+      malformed_rate=args.gemini_malformed_rate,
+      seed=args.seed,
+    )
+  ).start()
+
+  port = args.port or _free_port()
+  base_url = f'http://127.0.0.1:{port}'
+  proc = start_api(port=port, database_url=database_url, gemini_endpoint=fake.endpoint)
+  try:
+    await wait_healthy(base_url)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+      token = await login(client)
+      client.headers['Authorization'] = f'Bearer {token}'
+
+      scenarios = build_scenarios(pairs, random.Random(args.seed))
+      results: list[ScenarioResult] = []
+      for name in args.scenarios:
+        total = args.analyze_requests if name == 'analyze' else args.requests
+        results.append(await run_scenario(client, name, scenarios[name], total=total, concurrency=args.concurrency))
+  finally:
+    proc.terminate()
+    try:
+      proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+      proc.kill()
+    fake.stop()
+
+  print_report(results)
+  print(f'fake gemini: {fake.counters}')
+  if args.json:
+    payload = {
+      'config': {k: v for k, v in vars(args).items() if k != 'json'},
+      'fake_gemini': fake.counters,
+      'results': [asdict(r) for r in results],
+    }
+    Path(args.json).write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding='utf-8')
+  return results
+
+
+def main(argv: list[str] | None = None) -> None:
+  scenario_names = ['list_jobs', 'list_resumes', 'list_interviews', 'list_analyses', 'create_resume', 'analyze']
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--jobs', type=int, default=20)
+  parser.add_argument('--resumes-per-job', type=int, default=100)
+  parser.add_argument('--concurrency', type=int, default=8)
+  parser.add_argument('--requests', type=int, default=200, help='requests per list/create scenario')
+  parser.add_argument('--analyze-requests', type=int, default=50)
+  parser.add_argument('--scenarios', nargs='+', choices=scenario_names, default=scenario_names)
+  parser.add_argument('--gemini-latency-ms', type=float, default=800.0)
+  parser.add_argument('--gemini-jitter-ms', type=float, default=200.0)
+  parser.add_argument('--gemini-error-rate', type=float, default=0.0)
+  parser.add_argument('--gemini-malformed-rate', type=float, default=0.0)
+  parser.add_argument('--timeout', type=float, default=120.0)
+  parser.add_argument('--port', type=int, default=0)
+  parser.add_argument('--seed', type=int, default=42)
+  parser.add_argument('--json', help='write results to this file')
+  asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,89 @@
+"""Microbenchmark: serialize N resume list rows through each response path.
+
+  python -m bench.serialize --rows 10000 --repeat 5
+
+`fastapi-default` approximates what FastAPI does with a hand-built `ResumeOut(**row)` list and a
+`response_model`: validate again, dump to Python in JSON mode, then `json.dumps`. `adapter` is the
+cached TypeAdapter path used by detail endpoints, and `rows` is the orjson path the list endpoints
+use (`app.serialization.dump_rows`). Prints best-of-N milliseconds and payload sizes.
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import gzip
+import json
+import random
+import time
+from typing import Any, Callable
+
+from pydantic import TypeAdapter
+
+from app.schemas import ResumeListOut
+from app.serialization import dump, dump_rows
+
+
+def make_rows(n: int, *, seed: int = 42) -> list[dict[str, Any]]:
+  rng = random.Random(seed)
+  now = dt.datetime(2025, 1, 1, 9, 0, 0)
+  skills = ['Python', 'FastAPI', 'SQL', 'React', 'TypeScript', 'Docker', 'AWS', 'Go']
+  return [
+    {
+      'id': i + 1,
+      'candidate_name': f'候選人{i + 1}',
+      'job_id': rng.randint(1, 50),
+      'status': rng.choice(['received', 'analyzed', 'interviewed']),
+      'education': '國立大學 資工系',
+      'years_exp': rng.randint(0, 12),
+      'skills': rng.sample(skills, 4),
+      'submitted_at': now - dt.timedelta(minutes=i),
+      'applied_job_title': '後端工程師',
+      'ai_match_score': rng.randint(40, 95),
+      'analysis_id': i + 1 if rng.random() < 0.7 else None,
+      'duplicate_of_id': None,
+    }
+    for i in range(n)
+  ]
+
+
+def _fastapi_default(rows: list[dict[str, Any]]) -> bytes:
+  items = [ResumeListOut(**row) for row in rows]
+  adapter = TypeAdapter(list[ResumeListOut])
+  validated = adapter.validate_python(items, from_attributes=True)
+  content = adapter.dump_python(validated, mode='json', by_alias=True)
+  return json.dumps(content, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _best_ms(fn: Callable[[], bytes], repeat: int) -> tuple[float, bytes]:
+  best = float('inf')
+  body = b''
+  for _ in range(repeat):
+    started = time.perf_counter()
+    body = fn()
+    best = min(best, (time.perf_counter() - started) * 1000)
+  return best, body
+
+
+def main(argv: list[str] | None = None) -> None:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--rows', type=int, default=10_000)
+  parser.add_argument('--repeat', type=int, default=5)
+  args = parser.parse_args(argv)
+
+  rows = make_rows(args.rows)
+  paths: dict[str, Callable[[], bytes]] = {
+    'fastapi-default': lambda: _fastapi_default(rows),
+    'adapter': lambda: dump(rows, list[ResumeListOut]),
+    'rows': lambda: dump_rows(rows, ResumeListOut),
+  }
+
+  header = f"{'path':<18}{'best ms':>10}{'KB':>10}{'gzip KB':>10}"
+  print(header)
+  print('-' * len(header))
+  for name, fn in paths.items():
+    ms, body = _best_ms(fn, args.repeat)
+    print(f'{name:<18}{ms:>10.1f}{len(body) / 1024:>10.1f}{len(gzip.compress(body)) / 1024:>10.1f}')
+
+
+if __name__ == '__main__':
+  main()
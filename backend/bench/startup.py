@@ -0,0 +1,85 @@
+"""Measure backend cold start (process spawn -> first 200 from /health) against a time budget.
+
+  python -m bench.startup --runs 5 --budget-ms 2500
+
+The first boot against a fresh database runs the schema migration and is reported separately;
+the budget applies to the median of the following boots, which is what the desktop app pays each
+time it is opened. Exits non-zero when the budget is exceeded so it can gate CI.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from bench.load import BACKEND_DIR, _free_port
+
+
+def _import_ms(env: dict[str, str]) -> float:
+  code = 'import time; t = time.perf_counter(); import app.main; print((time.perf_counter() - t) * 1000)'
+  out = subprocess.run([sys.executable, '-c', code], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True)
+  return float(out.stdout.strip().splitlines()[-1])
+
+
+def _boot_ms(env: dict[str, str], *, timeout: float) -> float:
+  port = _free_port()
+  started = time.perf_counter()
+  proc = subprocess.Popen(
+    [sys.executable, '-m', 'uvicorn', 'app.main:app', '--port', str(port), '--log-level', 'warning'],
+    cwd=BACKEND_DIR,
+    env=env,
+  )
+  try:
+    deadline = started + timeout
+    while time.perf_counter() < deadline:
+      try:
+        if httpx.get(f'http://127.0.0.1:{port}/health', timeout=1).status_code == 200:
+          return (time.perf_counter() - started) * 1000
+      except httpx.HTTPError:
+        pass
+      time.sleep(0.01)
+    raise RuntimeError(f'backend did not become healthy within {timeout}s')
+  finally:
+    proc.terminate()
+    try:
+      proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+      proc.kill()
+
+
+def main(argv: list[str] | None = None) -> int:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--runs', type=int, default=5)
+  parser.add_argument('--budget-ms', type=float, default=2500.0)
+  parser.add_argument('--timeout', type=float, default=60.0)
+  args = parser.parse_args(argv)
+
+  workdir = Path(tempfile.mkdtemp(prefix='bench-startup-'))
+  env = {
+    **os.environ,
+    'DATABASE_URL': f"sqlite:///{(workdir / 'startup.db').as_posix()}",
+    'DATABASE_ECHO': 'false',
+    'AUTH_SECRET_KEY': 'bench-secret-key-for-local-load-tests-only',
+  }
+
+  first = _boot_ms(env, timeout=args.timeout)
+  warm = sorted(_boot_ms(env, timeout=args.timeout) for _ in range(args.runs))
+  imports = sorted(_import_ms(env) for _ in range(args.runs))
+  median = statistics.median(warm)
+
+  print(f'first boot (migrates schema): {first:8.1f} ms')
+  print(f'boot to healthy  min/med/max: {warm[0]:8.1f} / {median:8.1f} / {warm[-1]:8.1f} ms')
+  print(f'import app.main  min/med/max: {imports[0]:8.1f} / {statistics.median(imports):8.1f} / {imports[-1]:8.1f} ms')
+  print(f'budget: {args.budget_ms:.0f} ms -> {"OK" if median <= args.budget_ms else "OVER BUDGET"}')
+  return 0 if median <= args.budget_ms else 1
+
+
+if __name__ == '__main__':
+  raise SystemExit(main())
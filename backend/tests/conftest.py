@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import tempfile
+import uuid
+from pathlib import Path
+
+# The engine and settings are built at import time, so point them at a throwaway database first.
+_TMP = Path(tempfile.mkdtemp(prefix='api-tests-'))
+os.environ.update(
+  {
+    'DATABASE_URL': f'sqlite:///{(_TMP / "test.db").as_posix()}',
+    'DATABASE_ECHO': 'false',
+    'GEMINI_API_KEY': '',
+    'AUTH_SECRET_KEY': 'test-secret-key-for-the-pytest-suite-only',
+    'SHARED_STATE_URL': 'memory://',
+    'SCHEMA_LOCK_PATH': (_TMP / 'schema.lock').as_posix(),
+  }
+)
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.db import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def tmp_root() -> Path:
+  return _TMP
+
+
+@pytest.fixture(scope='session')
+def client() -> TestClient:
+  # Entering the client runs the startup hook, which migrates the test database.
+  with TestClient(app) as test_client:
+    creds = {'username': 'tester', 'password': 'tester-password'}
+    test_client.post('/api/v1/auth/register', json=creds)
+    token = test_client.post('/api/v1/auth/login', json=creds).json()['accessToken']
+    test_client.headers['Authorization'] = f'Bearer {token}'
+    yield test_client
+
+
+@pytest.fixture
+def db():
+  session = SessionLocal()
+  try:
+    yield session
+  finally:
+    session.close()
+
+
+@pytest.fixture
+def make_job(client: TestClient):
+  def make(**fields) -> dict:
+    body = {
+      'title': f'Backend Engineer {uuid.uuid4().hex[:6]}',
+      'department': 'Engineering',
+      'description': 'Build and run the hiring platform APIs.',
+      'requiredSkills': ['Python', 'SQL'],
+      **fields,
+    }
+    resp = client.post('/api/v1/jobs', json=body)
+    assert resp.status_code == 201, resp.text
+    return resp.json()
+
+  return make
+
+
+@pytest.fixture
+def make_resume(client: TestClient):
+  def make(job_id: int, **fields) -> dict:
+    body = {
+      'jobId': job_id,
+      'candidateName': f'Candidate {uuid.uuid4().hex[:6]}',
+      'resumeText': f'Five years of Python and SQL services. Ref {uuid.uuid4().hex}',
+      'skills': ['Python'],
+      **fields,
+    }
+    resp = client.post('/api/v1/resumes', json=body)
+    assert resp.status_code == 200, resp.text
+    return resp.json()
+
+  return make
+
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+  """Non-mock analyses from a per-test model name; counts the calls made."""
+  from app.services import analysis
+  from app.services.gemini import TokenUsage, _mock_analysis
+
+  model = f'gemini-{uuid.uuid4().hex[:8]}'
+  calls: list[str] = []
+
+  async def generate(**kwargs):
+    calls.append(kwargs['prompt'])
+    await asyncio.sleep(0.02)
+    return _mock_analysis(summary='real'), False, model, TokenUsage(prompt_tokens=400, output_tokens=80)
+
+  monkeypatch.setattr(analysis, 'generate_analysis', generate)
+  return model, calls
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+  """A fresh Gemini circuit breaker that trips after 2 failures and cools down instantly."""
+  from app.core.config import settings
+  from app.core.shared_state import shared_state
+  from app.services import gemini
+
+  monkeypatch.setattr(settings, 'gemini_breaker_failure_threshold', 2)
+  monkeypatch.setattr(settings, 'gemini_breaker_min_calls', 100)
+  monkeypatch.setattr(settings, 'gemini_breaker_cooldown_seconds', 0.0)
+  monkeypatch.setattr(settings, 'gemini_breaker_half_open_probes', 1)
+  monkeypatch.setattr(settings, 'gemini_api_key', 'test-key')
+  shared_state().delete(gemini._CircuitBreaker._OPEN_UNTIL_KEY)
+  fresh = gemini._CircuitBreaker()
+  monkeypatch.setattr(gemini, '_breaker', fresh)
+  yield fresh
+  shared_state().delete(gemini._CircuitBreaker._OPEN_UNTIL_KEY)
+
+
+@pytest.fixture
+def use_transport(monkeypatch):
+  """Route the shared Gemini HTTP client through an httpx.MockTransport handler."""
+  import httpx
+
+  from app.services import gemini
+
+  def install(handler) -> None:
+    monkeypatch.setattr(gemini, '_client', httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(gemini, '_resolver', gemini._EndpointResolver())
+
+  return install
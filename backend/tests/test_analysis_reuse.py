@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import uuid
+
+
+def _analyze(client, job_id: int, resume_id: int, **extra) -> dict:
+  resp = client.post('/api/v1/ai-analyses', json={'jobId': job_id, 'resumeId': resume_id, **extra})
+  assert resp.status_code == 200, resp.text
+  return resp.json()
+
+
+def test_identical_prompt_reuses_the_earlier_analysis(client, make_job, make_resume, fake_gemini):
+  _, calls = fake_gemini
+  job = make_job()
+  text = f'Identical CV text {uuid.uuid4().hex}'
+  first = _analyze(client, job['id'], make_resume(job['id'], resumeText=text)['id'])
+  second = _analyze(client, job['id'], make_resume(job['id'], resumeText=text)['id'])
+  assert len(calls) == 1
+  assert second['reusedFromId'] == first['id']
+  assert second['overallScore'] == first['overallScore']
+
+
+def test_force_never_reuses(client, make_job, make_resume, fake_gemini):
+  _, calls = fake_gemini
+  job = make_job()
+  text = f'Identical CV text {uuid.uuid4().hex}'
+  _analyze(client, job['id'], make_resume(job['id'], resumeText=text)['id'])
+  forced = _analyze(client, job['id'], make_resume(job['id'], resumeText=text)['id'], force=True)
+  assert len(calls) == 2
+  assert forced['reusedFromId'] is None
+
+
+def test_routing_stats_leave_out_reused_analyses(client, make_job, make_resume, fake_gemini):
+  model, _ = fake_gemini
+  job = make_job()
+  text = f'Identical CV text {uuid.uuid4().hex}'
+  for _ in range(3):
+    _analyze(client, job['id'], make_resume(job['id'], resumeText=text)['id'])
+
+  rows = [row for row in client.get('/api/v1/ai-analyses/routing-stats').json() if row['model'] == model]
+  assert len(rows) == 1
+  assert rows[0]['count'] == 1
+  assert rows[0]['avgLatencyMs'] > 0
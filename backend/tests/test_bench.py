@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+
+from app.core.config import settings
+from app.services import gemini
+from bench.fake_gemini import FakeGemini, FakeGeminiConfig
+from bench.load import percentile
+from bench.serialize import make_rows
+
+
+def test_percentile_uses_nearest_rank():
+  values = [float(v) for v in range(1, 101)]
+  assert percentile(values, 50) == 50.0
+  assert percentile(values, 99) == 99.0
+  assert percentile(values, 100) == 100.0
+  assert percentile([], 95) == 0.0
+
+
+def test_make_rows_is_deterministic():
+  assert make_rows(50) == make_rows(50)
+  assert len(make_rows(50)) == 50
+
+
+def _analyze(fake: FakeGemini, monkeypatch) -> tuple[dict, bool]:
+  monkeypatch.setattr(settings, 'gemini_endpoint', fake.endpoint)
+  monkeypatch.setattr(gemini, '_resolver', gemini._EndpointResolver())
+
+  async def call() -> tuple[dict, bool]:
+    # A client per event loop: the module-level one would outlive this asyncio.run.
+    monkeypatch.setattr(gemini, '_client', httpx.AsyncClient(timeout=5))
+    try:
+      parsed, is_mock, _, _ = await gemini.generate_analysis(prompt='評估這位候選人')
+    finally:
+      await gemini._client.aclose()
+    return parsed, is_mock
+
+  return asyncio.run(call())
+
+
+def test_client_talks_to_the_fake_server(breaker, monkeypatch):
+  with FakeGemini(FakeGeminiConfig(latency_ms=0, jitter_ms=0)) as fake:
+    parsed, is_mock = _analyze(fake, monkeypatch)
+  assert not is_mock
+  assert parsed['overall_score'] == 74
+  assert fake.counters['ok'] == 1
+
+
+def test_fake_server_errors_fall_back_to_a_mock(breaker, monkeypatch):
+  with FakeGemini(FakeGeminiConfig(latency_ms=0, jitter_ms=0, error_rate=1.0)) as fake:
+    _, is_mock = _analyze(fake, monkeypatch)
+  assert is_mock
+  assert fake.counters['errors'] >= 1
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from sqlalchemy import func, select
+
+from app import crud, models
+from app.core.blobs import CODEC, StreamEncoder, decode_json, decode_text, encode_json
+
+
+def test_equal_payloads_hash_the_same_whatever_the_key_order():
+  digest, data, size = encode_json({'b': 1, 'a': '中文'})
+  assert digest == encode_json({'a': '中文', 'b': 1})[0]
+  assert decode_json(CODEC, data) == {'a': '中文', 'b': 1}
+  assert size == len('{"a":"中文","b":1}'.encode('utf-8'))
+
+
+def test_stream_encoder_round_trips_text():
+  encoder = StreamEncoder()
+  for part in ('第一行\n', 'second line\n' * 100):
+    encoder.update(part.encode('utf-8'))
+  digest, data, size = encoder.finish()
+  assert decode_text(CODEC, data) == '第一行\n' + 'second line\n' * 100
+  assert size == len(('第一行\n' + 'second line\n' * 100).encode('utf-8'))
+  assert len(data) < size and len(digest) == 64
+
+
+def test_identical_raw_responses_share_one_blob_and_orphans_are_pruned(client, db, make_job, make_resume, fake_gemini):
+  job = make_job()
+  analyses = [
+    client.post('/api/v1/ai-analyses', json={'jobId': job['id'], 'resumeId': make_resume(job['id'])['id']}).json()
+    for _ in range(2)
+  ]
+  hashes = {db.get(models.AIAnalysis, a['id']).raw_response_hash for a in analyses}
+  assert len(hashes) == 1
+  [digest] = hashes
+  assert db.scalar(select(func.count()).select_from(models.AnalysisBlob).where(models.AnalysisBlob.hash == digest)) == 1
+  assert client.get(f"/api/v1/ai-analyses/{analyses[0]['id']}").json()['rawResponse']['summary'] == 'real'
+
+  orphan = crud.store_raw_response(db, {'orphan': True})
+  db.commit()
+  assert crud.prune_raw_responses(db, [orphan, digest]) == 1
+  db.commit()
+  assert db.get(models.AnalysisBlob, orphan) is None
+  assert db.get(models.AnalysisBlob, digest) is not None
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import delete
+
+from app import crud, models
+from app.core.config import settings
+from app.routers import events
+
+
+@pytest.fixture(autouse=True)
+def fast_polls(monkeypatch):
+  monkeypatch.setattr(settings, 'change_feed_poll_seconds', 0.01)
+
+
+class _Request:
+  """Just enough of a Request for the feed: disconnects after `polls` checks."""
+
+  def __init__(self, polls: int) -> None:
+    self.polls = polls
+
+  async def is_disconnected(self) -> bool:
+    self.polls -= 1
+    return self.polls < 0
+
+
+def _read(since: int | None, polls: int = 1) -> list[tuple[str, dict]]:
+  async def collect() -> list[str]:
+    return [chunk async for chunk in events._stream(_Request(polls), since)]
+
+  out = []
+  for chunk in asyncio.run(collect()):
+    fields = dict(line.split(': ', 1) for line in chunk.strip().splitlines() if ': ' in line and not line.startswith(':'))
+    if 'event' in fields:
+      out.append((fields['event'], json.loads(fields['data'])))
+  return out
+
+
+def test_writes_are_replayed_in_order_after_since(client, db, make_job, make_resume):
+  _, start = crud.change_feed_bounds(db)
+  job = make_job()
+  resume = make_resume(job['id'])
+  client.put(f"/api/v1/jobs/{job['id']}", json={'status': 'closed'})
+
+  changes = [data for kind, data in _read(since=start) if kind == 'change']
+  assert [(c['entity'], c['entityId'], c['action']) for c in changes] == [
+    ('job', job['id'], 'created'),
+    ('resume', resume['id'], 'created'),
+    ('job', job['id'], 'updated'),
+  ]
+  assert changes[1]['jobId'] == job['id']
+  assert [c['seq'] for c in changes] == sorted(c['seq'] for c in changes)
+
+
+def test_a_pruned_gap_gets_a_reset(client, db, make_job):
+  make_job()
+  make_job()
+  _, newest = crud.change_feed_bounds(db)
+  # What retention pruning leaves behind: everything but the latest event is gone.
+  db.execute(delete(models.ChangeEvent).where(models.ChangeEvent.seq < newest))
+  db.commit()
+  assert _read(since=newest - 2, polls=0) == [('reset', {'seq': newest})]
+  assert _read(since=newest + 1000, polls=0) == [('reset', {'seq': newest})]
+  assert _read(since=newest - 1, polls=0) == []
+
+
+def test_without_since_the_feed_starts_at_the_end(client, make_job):
+  make_job()
+  assert _read(since=None) == []
+
+
+def test_endpoint_requires_auth(client):
+  resp = client.get('/api/v1/events', headers={'Authorization': ''})
+  assert resp.status_code == 401
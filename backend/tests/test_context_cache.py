@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+
+from app.services import gemini
+
+
+def _add_handle(job_id: int, name: str) -> None:
+  key = (job_id, gemini.PROMPT_VERSION, 'gemini-test', name)
+  gemini._context_cache._handles[key] = (name, time.monotonic() + 600, f'test:{name}')
+
+
+def test_invalidate_without_event_loop_deletes_remote_caches(monkeypatch):
+  deleted: list[str] = []
+  monkeypatch.setattr(httpx, 'delete', lambda url, **kwargs: deleted.append(url))
+  _add_handle(424242, 'cachedContents/thread')
+
+  gemini.invalidate_job_context_cache(424242)
+  assert any(url.endswith('/cachedContents/thread') for url in deleted)
+  assert not [k for k in gemini._context_cache._handles if k[0] == 424242]
+
+
+def test_job_update_and_delete_schedule_remote_deletes(client, make_job, monkeypatch):
+  deleted: list[str] = []
+
+  async def record(name: str) -> None:
+    deleted.append(name)
+
+  monkeypatch.setattr(gemini._context_cache, '_delete', record)
+  job = make_job()
+
+  _add_handle(job['id'], 'cachedContents/on-update')
+  resp = client.put(f'/api/v1/jobs/{job["id"]}', json={'description': 'Changed'})
+  assert resp.status_code == 200, resp.text
+  assert resp.json()['description'] == 'Changed'
+
+  _add_handle(job['id'], 'cachedContents/on-delete')
+  assert client.delete(f'/api/v1/jobs/{job["id"]}').status_code == 200
+  assert client.get(f'/api/v1/jobs/{job["id"]}').status_code == 404
+
+  deadline = time.monotonic() + 2
+  while len(deleted) < 2 and time.monotonic() < deadline:
+    time.sleep(0.01)
+  assert deleted == ['cachedContents/on-update', 'cachedContents/on-delete']
+
+
+def test_stale_cache_4xx_does_not_count_against_the_breaker(breaker, use_transport):
+  use_transport(lambda request: httpx.Response(404, json={'error': {'message': 'cache not found'}}))
+  for _ in range(5):
+    data, error = asyncio.run(gemini._post_generate(payload={'cachedContent': 'cachedContents/gone'}, model='gemini-test'))
+    assert data is None and error.startswith('HTTP 404')
+  assert breaker.state == 'closed'
+  assert breaker._consecutive_failures == 0
+
+
+def test_other_4xx_still_counts(breaker, use_transport):
+  use_transport(lambda request: httpx.Response(400, json={'error': {'message': 'bad request'}}))
+  for _ in range(2):
+    asyncio.run(gemini._post_generate(payload={}, model='gemini-test'))
+  assert breaker.state == 'open'
+
+
+def test_expired_handle_falls_back_to_the_full_prompt(breaker, use_transport, monkeypatch):
+  monkeypatch.setattr(gemini.settings, 'gemini_context_cache_enabled', True)
+  sent: list[dict] = []
+
+  def handler(request: httpx.Request) -> httpx.Response:
+    body = __import__('json').loads(request.content)
+    sent.append(body)
+    if 'cachedContent' in body:
+      return httpx.Response(404, json={'error': {'message': 'expired'}})
+    text = '{"overall_score": 70, "summary": "ok"}'
+    return httpx.Response(200, json={'candidates': [{'content': {'parts': [{'text': text}]}}]})
+
+  use_transport(handler)
+
+  async def handle(**kwargs):
+    return 'cachedContents/expired'
+
+  monkeypatch.setattr(gemini._context_cache, 'handle', handle)
+  parsed, is_mock, _, _ = asyncio.run(
+    gemini.generate_analysis(prompt='PREFIX rest', model='gemini-test', max_output_tokens=256, job_id=1, prefix='PREFIX ')
+  )
+  assert not is_mock and parsed['overall_score'] == 70
+  assert ['cachedContent' in body for body in sent] == [True, False]
+  assert breaker.state == 'closed' and breaker._consecutive_failures == 0
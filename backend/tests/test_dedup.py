@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import random
+import uuid
+
+from app.services import dedup
+
+_WORDS = (
+  'python sql docker kubernetes react typescript aws gcp kafka redis postgres spark airflow terraform '
+  'linux nginx celery django fastapi flask graphql grpc pandas numpy pytorch'
+).split()
+
+
+def _cv(seed: int, words: int = 200) -> str:
+  rng = random.Random(seed)
+  return ' '.join(rng.choice(_WORDS) for _ in range(words))
+
+
+def test_content_hash_ignores_spacing_width_and_case():
+  assert dedup.content_hash('Python  ＳＱＬ\n工程師') == dedup.content_hash('python sql 工程師')
+  assert dedup.content_hash('python sql') != dedup.content_hash('python go')
+
+
+def test_cjk_and_latin_split_without_spaces():
+  assert dedup.shingles('熟悉Python與Go', size=1) == {'熟', '悉', 'python', '與', 'go'}
+
+
+def test_minhash_similarity_tracks_jaccard():
+  text = _cv(1)
+  edited = text.rsplit(' ', 10)[0] + ' ' + _cv(2, words=10)
+  exact = dedup.jaccard(dedup.shingles(text), dedup.shingles(edited))
+  estimate = dedup.similarity(dedup.minhash(text), dedup.minhash(edited))
+  assert abs(estimate - exact) < 0.15
+  assert dedup.similarity(dedup.minhash(text), dedup.minhash(_cv(3))) < 0.2
+
+
+def test_near_duplicates_share_an_lsh_band():
+  text = _cv(4)
+  edited = text.replace('python', 'golang', 1)
+  a, b = dedup.fingerprint(text), dedup.fingerprint(edited)
+  assert set(a.bands) & set(b.bands)
+  assert dedup.unpack_signature(dedup.pack_signature(a.signature)) == a.signature
+
+
+def test_resubmitted_resume_is_flagged_across_jobs(client, make_job, make_resume):
+  text = f'{_cv(5)} ref {uuid.uuid4().hex}'
+  first = make_resume(make_job()['id'], resumeText=text)
+  assert first['duplicateOfId'] is None
+
+  again = make_resume(make_job()['id'], resumeText=text.upper() + '  ')
+  assert again['duplicateOfId'] == first['id']
+  assert again['duplicateSimilarity'] == 1.0
+  unrelated = make_resume(make_job()['id'], resumeText=f'{_cv(6)} ref {uuid.uuid4().hex}')
+  assert unrelated['duplicateOfId'] is None
+
+  dupes = client.get(f"/api/v1/resumes/{first['id']}/duplicates").json()
+  assert [d['resumeId'] for d in dupes] == [again['id']]
+  assert client.get('/api/v1/resumes/999999/duplicates').status_code == 404
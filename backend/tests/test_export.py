@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import csv
+import io
+import zipfile
+from xml.etree import ElementTree
+
+from app.services.export import COLUMNS, csv_chunks, xlsx_chunks
+
+_NS = {'s': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+
+
+def _sheet_rows(body: bytes) -> list[list[str]]:
+  with zipfile.ZipFile(io.BytesIO(body)) as archive:
+    assert archive.testzip() is None
+    root = ElementTree.fromstring(archive.read('xl/worksheets/sheet1.xml'))
+  return [[''.join(c.itertext()) for c in row.findall('s:c', _NS)] for row in root.iter(f"{{{_NS['s']}}}row")]
+
+
+def test_job_export_lists_every_candidate_with_latest_results(client, make_job, make_resume, fake_gemini):
+  job = make_job()
+  analyzed = make_resume(job['id'], candidateName='王小明')
+  make_resume(job['id'], candidateName='=HYPERLINK("x")')
+  client.post('/api/v1/ai-analyses', json={'jobId': job['id'], 'resumeId': analyzed['id']})
+  client.post(
+    '/api/v1/interviews',
+    json={'jobId': job['id'], 'resumeId': analyzed['id'], 'scheduledAt': '2026-05-04T09:00:00Z', 'interviewer': 'Lee'},
+  )
+
+  resp = client.get(f"/api/v1/jobs/{job['id']}/export", params={'format': 'csv'})
+  assert resp.status_code == 200
+  assert resp.headers['content-type'].startswith('text/csv')
+  assert resp.content.startswith(b'\xef\xbb\xbf')
+  rows = list(csv.DictReader(io.StringIO(resp.content.decode('utf-8-sig'))))
+  by_name = {row['Candidate']: row for row in rows}
+  assert set(by_name) == {'王小明', '\'=HYPERLINK("x")'}
+  assert by_name['王小明']['Overall score'] != ''
+  assert by_name['王小明']['Interviewer'] == 'Lee'
+  assert by_name['王小明']['Interview status'] == 'scheduled'
+
+  xlsx = client.get(f"/api/v1/jobs/{job['id']}/export", params={'format': 'xlsx'})
+  assert xlsx.status_code == 200
+  sheet = _sheet_rows(xlsx.content)
+  assert sheet[0] == [header for _, header in COLUMNS]
+  assert sorted(row[1] for row in sheet[1:]) == sorted(by_name)
+
+
+def test_export_of_a_missing_job_is_404(client):
+  assert client.get('/api/v1/jobs/999999/export').status_code == 404
+
+
+def test_writers_stream_in_chunks():
+  header = ['a', 'b']
+  rows = [[i, f'行 {i}'] for i in range(1200)]
+  csv_parts = list(csv_chunks(header, iter(rows), rows_per_chunk=500))
+  assert len(csv_parts) >= 3
+  assert b''.join(csv_parts).decode('utf-8-sig').splitlines()[1200] == '1199,行 1199'
+
+  xlsx_parts = list(xlsx_chunks(header, iter(rows), rows_per_chunk=500))
+  assert len(xlsx_parts) >= 2
+  sheet = _sheet_rows(b''.join(xlsx_parts))
+  assert len(sheet) == 1201 and sheet[-1] == ['1199', '行 1199']
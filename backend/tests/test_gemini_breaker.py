@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services import gemini
+
+
+def _trip(breaker: gemini._CircuitBreaker) -> None:
+  for _ in range(settings.gemini_breaker_failure_threshold):
+    breaker.record_failure()
+  assert breaker.state == 'open'
+
+
+def test_opens_after_consecutive_failures_and_closes_on_probe_success(breaker, monkeypatch):
+  monkeypatch.setattr(settings, 'gemini_breaker_cooldown_seconds', 60.0)
+  _trip(breaker)
+  assert breaker.acquire() is None
+  assert gemini.circuit_open()
+
+  monkeypatch.setattr(settings, 'gemini_breaker_cooldown_seconds', 0.0)
+  ticket = breaker.acquire()
+  assert ticket and breaker.state == 'half_open'
+  assert breaker.acquire() is None  # the only probe slot is taken
+  breaker.record_success()
+  breaker.release(ticket)
+  assert breaker.state == 'closed'
+  assert breaker.acquire() == 0
+
+
+def test_released_probe_slot_admits_the_next_probe(breaker):
+  _trip(breaker)
+  ticket = breaker.acquire()
+  assert ticket
+  breaker.release(ticket)  # e.g. cancelled: no verdict
+  assert breaker.state == 'half_open'
+  assert breaker.acquire()
+
+
+def test_stale_ticket_does_not_free_a_newer_probe(breaker):
+  _trip(breaker)
+  old = breaker.acquire()
+  breaker.record_failure()  # the probe fails: open again, then half-open on the next acquire
+  new = breaker.acquire()
+  assert new and new != old
+  breaker.release(old)
+  assert breaker.acquire() is None
+
+
+def test_cancelled_probe_call_frees_its_slot(breaker, use_transport):
+  started = asyncio.Event()
+
+  async def hang(request: httpx.Request) -> httpx.Response:
+    started.set()
+    await asyncio.sleep(30)
+    return httpx.Response(200, json={})
+
+  use_transport(hang)
+  _trip(breaker)
+
+  async def scenario() -> None:
+    task = asyncio.create_task(gemini._post_generate(payload={}, model='gemini-test'))
+    await started.wait()
+    assert breaker.acquire() is None
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+      await task
+
+  asyncio.run(scenario())
+  assert breaker.state == 'half_open'
+  assert breaker.acquire()
+
+
+def test_probe_that_raises_frees_its_slot(breaker, use_transport):
+  def broken(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, content=b'not json')
+
+  use_transport(broken)
+  _trip(breaker)
+  with pytest.raises(ValueError):
+    asyncio.run(gemini._post_generate(payload={}, model='gemini-test'))
+  assert breaker.acquire()
+
+
+def test_failed_calls_trip_the_breaker(breaker, use_transport):
+  use_transport(lambda request: httpx.Response(500, json={'error': {'message': 'boom'}}))
+  for _ in range(settings.gemini_breaker_failure_threshold):
+    data, error = asyncio.run(gemini._post_generate(payload={}, model='gemini-test'))
+    assert data is None and error
+  assert breaker.state == 'open'
+
+
+def test_full_backlog_sheds_analyses_with_503(client, make_job, make_resume, fake_gemini, monkeypatch):
+  from app.services import analysis
+
+  _, calls = fake_gemini
+  monkeypatch.setattr(settings, 'analysis_max_backlog', 1)
+  job = make_job()
+  resume = make_resume(job['id'])
+  with analysis.analysis_slot():
+    resp = client.post('/api/v1/ai-analyses', json={'jobId': job['id'], 'resumeId': resume['id']})
+  assert resp.status_code == 503
+  assert int(resp.headers['Retry-After']) >= 1
+  assert calls == []
+  assert analysis.active_analyses() == 0
+
+  # Shed requests are not kept, so retrying the same body runs it.
+  assert client.post('/api/v1/ai-analyses', json={'jobId': job['id'], 'resumeId': resume['id']}).status_code == 200
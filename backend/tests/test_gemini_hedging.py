@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services import gemini
+
+
+def _reply() -> httpx.Response:
+  text = json.dumps(gemini._mock_analysis(summary='ok'))
+  return httpx.Response(200, json={'candidates': [{'content': {'parts': [{'text': text}]}}]})
+
+
+@pytest.fixture
+def hedging(breaker, monkeypatch):
+  monkeypatch.setattr(settings, 'gemini_hedge_enabled', True)
+  monkeypatch.setattr(settings, 'gemini_hedge_model', 'gemini-fast')
+  monkeypatch.setattr(settings, 'gemini_hedge_min_delay_seconds', 0.05)
+  monkeypatch.setattr(settings, 'gemini_hedge_default_delay_seconds', 0.05)
+  monkeypatch.setattr(gemini, '_latency', gemini._LatencyTracker())
+  monkeypatch.setattr(gemini, '_hedge_counters', {'hedged': 0, 'hedge_won': 0})
+
+
+def _latencies(slow_seconds: float):
+  seen: list[str] = []
+
+  async def handler(request: httpx.Request) -> httpx.Response:
+    model = request.url.path.rsplit('/', 1)[-1].split(':')[0]
+    seen.append(model)
+    if model != 'gemini-fast':
+      await asyncio.sleep(slow_seconds)
+    return _reply()
+
+  return handler, seen
+
+
+def test_slow_call_is_hedged_to_the_fallback_model(hedging, use_transport):
+  handler, seen = _latencies(slow_seconds=2.0)
+  use_transport(handler)
+  started = time.monotonic()
+  attempt = asyncio.run(gemini._hedged_attempt(payload={}, model='gemini-slow'))
+  assert time.monotonic() - started < 1.0
+  assert attempt.model == 'gemini-fast' and attempt.parsed is not None
+  assert seen == ['gemini-slow', 'gemini-fast']
+  assert gemini.hedge_stats() == {'hedged': 1, 'hedge_won': 1}
+
+
+def test_fast_call_is_not_hedged(hedging, use_transport):
+  handler, seen = _latencies(slow_seconds=0.0)
+  use_transport(handler)
+  attempt = asyncio.run(gemini._hedged_attempt(payload={}, model='gemini-slow'))
+  assert attempt.model == 'gemini-slow'
+  assert seen == ['gemini-slow']
+  assert gemini.hedge_stats()['hedged'] == 0
+
+
+def test_hedge_delay_follows_observed_latency(hedging, monkeypatch):
+  monkeypatch.setattr(settings, 'gemini_hedge_min_samples', 10)
+  monkeypatch.setattr(settings, 'gemini_hedge_percentile', 90.0)
+  assert gemini._hedge_delay('gemini-slow') == 0.05
+  for ms in range(100, 1100, 100):
+    gemini._latency.record('gemini-slow', ms / 1000)
+  assert gemini._hedge_delay('gemini-slow') == pytest.approx(0.9)
+
+
+def test_cached_calls_hedge_on_the_same_model(hedging, use_transport):
+  handler, seen = _latencies(slow_seconds=0.3)
+  use_transport(handler)
+  attempt = asyncio.run(gemini._hedged_attempt(payload={'cachedContent': 'cachedContents/x'}, model='gemini-slow'))
+  assert attempt.model == 'gemini-slow'
+  assert seen == ['gemini-slow', 'gemini-slow']
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+
+from app.core.config import settings
+from app.services import gemini
+
+
+def _only_v1(seen: list[str]):
+  def handler(request: httpx.Request) -> httpx.Response:
+    seen.append(f'{request.method} {request.url.path}')
+    if request.url.path.startswith('/v1beta/'):
+      return httpx.Response(404, json={'error': {'code': 404, 'message': 'not found'}})
+    if request.method == 'GET':
+      return httpx.Response(200, json={'models': [{'name': 'models/gemini-test'}]})
+    return httpx.Response(200, json={'candidates': []})
+
+  return handler
+
+
+def test_working_url_is_remembered_per_model(breaker, use_transport):
+  seen: list[str] = []
+  use_transport(_only_v1(seen))
+
+  data, error = asyncio.run(gemini._post_generate(payload={}, model='gemini-test'))
+  assert data == {'candidates': []} and error is None
+  assert seen == [
+    'POST /v1beta/models/gemini-test:generateContent',
+    'GET /v1beta/models',
+    'GET /v1/models',
+    'POST /v1/models/gemini-test:generateContent',
+  ]
+  assert gemini.resolver_stats()['working']['gemini-test'].endswith('/v1/models/gemini-test:generateContent')
+
+  # Steady state: one request, straight to the URL that worked.
+  seen.clear()
+  asyncio.run(gemini._post_generate(payload={}, model='gemini-test'))
+  assert seen == ['POST /v1/models/gemini-test:generateContent']
+
+
+def test_failed_url_is_forgotten(breaker, use_transport):
+  seen: list[str] = []
+  use_transport(_only_v1(seen))
+  asyncio.run(gemini._post_generate(payload={}, model='gemini-test'))
+
+  use_transport(lambda request: httpx.Response(500, json={'error': {'message': 'boom'}}))
+  gemini._resolver.mark_ok('gemini-test', 'https://generativelanguage.googleapis.com/v1/models/gemini-test:generateContent')
+  data, error = asyncio.run(gemini._post_generate(payload={}, model='gemini-test'))
+  assert data is None and 'HTTP 500' in error
+  assert 'gemini-test' not in gemini.resolver_stats()['working']
+
+
+def test_expired_entry_is_refreshed_in_the_background(breaker, use_transport, monkeypatch):
+  seen: list[str] = []
+  use_transport(_only_v1(seen))
+  monkeypatch.setattr(settings, 'gemini_resolver_ttl_seconds', 0.0)
+
+  async def scenario() -> None:
+    await gemini._post_generate(payload={}, model='gemini-test')
+    seen.clear()
+    # The stale URL is still tried first; the probe runs next to the request, not before it.
+    await gemini._post_generate(payload={}, model='gemini-test')
+    await asyncio.gather(*gemini._resolver._tasks)
+
+  asyncio.run(scenario())
+  assert seen[0] == 'POST /v1/models/gemini-test:generateContent'
+  assert 'GET /v1/models/gemini-test' in seen
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from app import crud
+
+
+def test_list_returns_etag_and_304_until_a_write(client, db):
+  first = client.get('/api/v1/interviews')
+  assert first.status_code == 200
+  etag = first.headers['ETag']
+  assert etag.startswith('W/"')
+
+  unchanged = client.get('/api/v1/interviews', headers={'If-None-Match': etag})
+  assert unchanged.status_code == 304
+  assert unchanged.headers['ETag'] == etag
+  assert unchanged.content == b''
+
+  crud.mark_changed(db, 'interviews')
+  db.commit()
+  changed = client.get('/api/v1/interviews', headers={'If-None-Match': etag})
+  assert changed.status_code == 200
+  assert changed.headers['ETag'] != etag
+
+
+def test_etag_depends_on_query(client):
+  all_items = client.get('/api/v1/interviews')
+  filtered = client.get('/api/v1/interviews?status=scheduled')
+  assert all_items.status_code == filtered.status_code == 200
+  assert all_items.headers['ETag'] != filtered.headers['ETag']
+
+
+def test_detail_404_is_not_cached_as_success(client):
+  assert client.get('/api/v1/interviews/999999').status_code == 404
+  assert client.get('/api/v1/resumes/999999').status_code == 404
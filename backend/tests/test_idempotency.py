@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import uuid
+
+from sqlalchemy import select
+
+from app import models
+from app.core.shared_state import shared_state
+from app.idempotency import HEADER
+
+
+def _resume(job_id: int) -> dict:
+  return {
+    'jobId': job_id,
+    'candidateName': f'Candidate {uuid.uuid4().hex[:6]}',
+    'resumeText': f'Python and SQL for six years. Ref {uuid.uuid4().hex}',
+  }
+
+
+def test_retried_post_replays_the_first_response(client, make_job):
+  job_id = make_job()['id']
+  body, key = _resume(job_id), uuid.uuid4().hex
+  first = client.post('/api/v1/resumes', json=body, headers={HEADER: key})
+  assert first.status_code == 200, first.text
+  assert 'Idempotent-Replayed' not in first.headers
+
+  retry = client.post('/api/v1/resumes', json=body, headers={HEADER: key})
+  assert retry.status_code == 200
+  assert retry.headers['Idempotent-Replayed'] == 'true'
+  assert retry.json()['id'] == first.json()['id']
+  names = [r['candidateName'] for r in client.get('/api/v1/resumes', params={'job_id': job_id}).json()]
+  assert names.count(body['candidateName']) == 1
+
+
+def test_key_reused_with_another_body_is_rejected(client, make_job):
+  job_id = make_job()['id']
+  key = uuid.uuid4().hex
+  assert client.post('/api/v1/resumes', json=_resume(job_id), headers={HEADER: key}).status_code == 200
+  resp = client.post('/api/v1/resumes', json=_resume(job_id), headers={HEADER: key})
+  assert resp.status_code == 422
+
+
+def test_key_of_a_running_request_answers_409(client, db, make_job):
+  job_id = make_job()['id']
+  key = uuid.uuid4().hex
+  user_id = db.scalar(select(models.User.id).where(models.User.username == 'tester'))
+  # What another worker leaves in shared state while it runs the first request with this key.
+  shared_state().set(f'idem:resumes:{user_id}:{key}', 'pending', ttl=60)
+  resp = client.post('/api/v1/resumes', json=_resume(job_id), headers={HEADER: key})
+  assert resp.status_code == 409
+  assert 'Retry-After' in resp.headers
+
+
+def test_blank_or_oversized_key_is_400(client, make_job):
+  job_id = make_job()['id']
+  for key in (' ', 'k' * 256):
+    assert client.post('/api/v1/resumes', json=_resume(job_id), headers={HEADER: key}).status_code == 400
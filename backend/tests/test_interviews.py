@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app import crud
+from app.core.locks import shared_lock
+
+
+def _interviewer() -> str:
+  return f'Interviewer {uuid.uuid4().hex[:6]}'
+
+
+def _body(job_id: int, resume_id: int, interviewer: str, scheduled_at: str, **fields) -> dict:
+  return {
+    'jobId': job_id,
+    'resumeId': resume_id,
+    'interviewer': interviewer,
+    'scheduledAt': scheduled_at,
+    'durationMinutes': 60,
+    **fields,
+  }
+
+
+@pytest.fixture
+def candidate(make_job, make_resume) -> tuple[int, int]:
+  job = make_job()
+  return job['id'], make_resume(job['id'])['id']
+
+
+def test_overlapping_interview_is_rejected_with_conflicts(client, candidate):
+  job_id, resume_id = candidate
+  who = _interviewer()
+  first = client.post('/api/v1/interviews', json=_body(job_id, resume_id, who, '2026-03-02T09:00:00Z'))
+  assert first.status_code == 200, first.text
+
+  clash = client.post('/api/v1/interviews', json=_body(job_id, resume_id, who, '2026-03-02T09:30:00Z'))
+  assert clash.status_code == 409
+  assert [c['id'] for c in clash.json()['detail']['conflicts']] == [first.json()['id']]
+
+  back_to_back = client.post('/api/v1/interviews', json=_body(job_id, resume_id, who, '2026-03-02T10:00:00Z'))
+  assert back_to_back.status_code == 200
+  other = client.post('/api/v1/interviews', json=_body(job_id, resume_id, _interviewer(), '2026-03-02T09:30:00Z'))
+  assert other.status_code == 200
+
+
+def test_concurrent_creates_book_a_slot_once(client, candidate, monkeypatch):
+  job_id, resume_id = candidate
+  who = _interviewer()
+  create = crud.create_interview
+
+  def slow_create(db, data):
+    # Widen the window between the overlap check and the insert.
+    time.sleep(0.05)
+    return create(db, data)
+
+  monkeypatch.setattr(crud, 'create_interview', slow_create)
+  body = _body(job_id, resume_id, who, '2026-03-03T14:00:00Z')
+  with ThreadPoolExecutor(max_workers=4) as pool:
+    codes = sorted(pool.map(lambda _: client.post('/api/v1/interviews', json=body).status_code, range(4)))
+  assert codes == [200, 409, 409, 409]
+
+
+def test_concurrent_moves_into_one_slot_book_it_once(client, candidate, monkeypatch):
+  job_id, resume_id = candidate
+  who = _interviewer()
+  ids = [
+    client.post('/api/v1/interviews', json=_body(job_id, resume_id, who, f'2026-03-04T0{hour}:00:00Z')).json()['id']
+    for hour in (1, 3)
+  ]
+  update = crud.update_interviews
+
+  def slow_update(db, pairs):
+    time.sleep(0.05)
+    return update(db, pairs)
+
+  monkeypatch.setattr(crud, 'update_interviews', slow_update)
+  move = {'scheduledAt': '2026-03-04T06:00:00Z'}
+  with ThreadPoolExecutor(max_workers=2) as pool:
+    codes = sorted(pool.map(lambda i: client.put(f'/api/v1/interviews/{i}', json=move).status_code, ids))
+  assert codes == [200, 409]
+
+
+def test_busy_calendar_lock_answers_503(client, candidate, monkeypatch):
+  from app.services import interview_batch
+
+  job_id, resume_id = candidate
+  who = _interviewer()
+  monkeypatch.setattr(
+    interview_batch,
+    'shared_lock',
+    lambda names, **kwargs: shared_lock(names, **{**kwargs, 'timeout': 0.05}),
+  )
+  with shared_lock([f'interviews:book:{who}']):
+    resp = client.post('/api/v1/interviews', json=_body(job_id, resume_id, who, '2026-03-05T09:00:00Z'))
+  assert resp.status_code == 503
+  assert resp.headers['Retry-After'] == '1'
+
+
+def test_shared_lock_is_exclusive_and_released():
+  name = f'test:{uuid.uuid4().hex}'
+  entered = threading.Event()
+  with shared_lock([name]):
+    with pytest.raises(TimeoutError):
+      with shared_lock([name], timeout=0.05):
+        entered.set()
+  assert not entered.is_set()
+  with shared_lock([name], timeout=0.05):
+    pass
+
+
+def test_batch_create_checks_items_against_each_other(client, candidate):
+  job_id, resume_id = candidate
+  who = _interviewer()
+  items = [
+    _body(job_id, resume_id, who, '2026-03-06T09:00:00Z'),
+    _body(job_id, resume_id, who, '2026-03-06T09:30:00Z'),
+    _body(job_id, 10**9, who, '2026-03-06T12:00:00Z'),
+    _body(job_id, resume_id, who, '2026-03-06T13:00:00Z'),
+  ]
+  resp = client.post('/api/v1/interviews/batch', json={'items': items})
+  assert resp.status_code == 200, resp.text
+  out = resp.json()
+  assert [r['statusCode'] for r in out['results']] == [201, 409, 400, 201]
+  assert out['committed'] and (out['succeeded'], out['failed']) == (2, 2)
+
+
+def test_atomic_batch_writes_nothing_when_an_item_fails(client, candidate):
+  job_id, resume_id = candidate
+  who = _interviewer()
+  items = [
+    _body(job_id, resume_id, who, '2026-03-07T09:00:00Z'),
+    _body(job_id, resume_id, who, '2026-03-07T09:15:00Z'),
+  ]
+  out = client.post('/api/v1/interviews/batch', json={'items': items, 'atomic': True}).json()
+  assert not out['committed']
+  assert [r['statusCode'] for r in out['results']] == [424, 409]
+  listed = client.get('/api/v1/interviews', params={'job_id': job_id}).json()
+  assert listed == []
+
+
+def test_batch_update_and_cancel(client, candidate):
+  job_id, resume_id = candidate
+  who = _interviewer()
+  created = client.post(
+    '/api/v1/interviews/batch',
+    json={'items': [_body(job_id, resume_id, who, f'2026-03-09T0{hour}:00:00Z') for hour in (1, 3)]},
+  ).json()
+  ids = [r['interview']['id'] for r in created['results']]
+
+  # The first interview keeps its slot until its own item moves it, so only the second move fits.
+  moves = [{'id': ids[1], 'scheduledAt': '2026-03-09T01:30:00Z'}, {'id': ids[0], 'scheduledAt': '2026-03-09T05:00:00Z'}]
+  out = client.patch('/api/v1/interviews/batch', json={'items': moves}).json()
+  assert [r['statusCode'] for r in out['results']] == [409, 200]
+
+  out = client.post('/api/v1/interviews/batch/cancel', json={'ids': [ids[1], 10**9]}).json()
+  assert [r['statusCode'] for r in out['results']] == [200, 404]
+  freed = client.post('/api/v1/interviews', json=_body(job_id, resume_id, who, '2026-03-09T03:30:00Z'))
+  assert freed.status_code == 200
+
+
+def test_availability_reports_common_free_time(client, candidate):
+  job_id, resume_id = candidate
+  a, b = _interviewer(), _interviewer()
+  client.post('/api/v1/interviews', json=_body(job_id, resume_id, a, '2026-03-10T09:00:00Z'))
+  client.post('/api/v1/interviews', json=_body(job_id, resume_id, b, '2026-03-10T10:30:00Z'))
+  resp = client.get(
+    '/api/v1/interviews/availability',
+    params={'interviewer': [a, b], 'start': '2026-03-10T08:00:00Z', 'end': '2026-03-10T12:00:00Z', 'min_minutes': 30},
+  )
+  assert resp.status_code == 200, resp.text
+  common = [(s['start'][11:16], s['end'][11:16]) for s in resp.json()['commonFree']]
+  assert common == [('08:00', '09:00'), ('10:00', '10:30'), ('11:30', '12:00')]
+
+
+def test_batch_rejects_oversized_and_repeated_items(client, candidate):
+  job_id, resume_id = candidate
+  who = _interviewer()
+  too_many = [_body(job_id, resume_id, who, '2026-03-11T09:00:00Z')] * 201
+  assert client.post('/api/v1/interviews/batch', json={'items': too_many}).status_code == 422
+
+  ids = [
+    r['interview']['id']
+    for r in client.post(
+      '/api/v1/interviews/batch',
+      json={'items': [_body(job_id, resume_id, who, f'2026-03-11T0{hour}:00:00Z') for hour in (1, 3)]},
+    ).json()['results']
+  ]
+  moves = [{'id': ids[0], 'scheduledAt': '2026-03-11T05:00:00Z'}, {'id': ids[0], 'scheduledAt': '2026-03-11T07:00:00Z'}]
+  out = client.patch('/api/v1/interviews/batch', json={'items': moves}).json()
+  assert [r['statusCode'] for r in out['results']] == [200, 400]
+  assert 'more than once' in out['results'][1]['error']
+
+  out = client.post('/api/v1/interviews/batch/cancel', json={'ids': [ids[1], 10**9], 'atomic': True}).json()
+  assert not out['committed']
+  assert [r['statusCode'] for r in out['results']] == [424, 404]
+  assert client.get(f'/api/v1/interviews/{ids[1]}').status_code == 200
+
+
+def test_only_a_completed_interview_marks_the_resume_interviewed(client, candidate):
+  job_id, resume_id = candidate
+  who = _interviewer()
+  created = client.post('/api/v1/interviews', json=_body(job_id, resume_id, who, '2026-03-12T09:00:00Z')).json()
+  assert client.get(f'/api/v1/resumes/{resume_id}').json()['status'] == 'received'
+
+  moved = client.put(f"/api/v1/interviews/{created['id']}", json={'status': 'scheduled', 'notes': 'Bring laptop'})
+  assert moved.status_code == 200, moved.text
+  assert client.get(f'/api/v1/resumes/{resume_id}').json()['status'] == 'received'
+
+  assert client.put(f"/api/v1/interviews/{created['id']}", json={'status': 'completed'}).status_code == 200
+  assert client.get(f'/api/v1/resumes/{resume_id}').json()['status'] == 'interviewed'
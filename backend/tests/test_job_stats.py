@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from app import crud
+
+
+def _stats(client, job_id: int) -> dict:
+  resp = client.get(f'/api/v1/jobs/{job_id}/stats')
+  assert resp.status_code == 200, resp.text
+  return resp.json()
+
+
+def test_stats_follow_resume_analysis_and_interview_writes(client, db, make_job, make_resume, fake_gemini):
+  job = make_job()
+  resumes = [make_resume(job['id']) for _ in range(3)]
+  assert _stats(client, job['id'])['resumesByStatus']['received'] == 3
+
+  for resume in resumes[:2]:
+    client.post('/api/v1/ai-analyses', json={'jobId': job['id'], 'resumeId': resume['id']})
+  interview = client.post(
+    '/api/v1/interviews',
+    json={'jobId': job['id'], 'resumeId': resumes[0]['id'], 'scheduledAt': '2026-04-01T09:00:00Z'},
+  ).json()
+  client.put(f"/api/v1/interviews/{interview['id']}", json={'status': 'completed'})
+
+  stats = _stats(client, job['id'])
+  assert stats['resumesTotal'] == 3
+  assert stats['analysesCount'] == 2
+  # The fake analysis scores every candidate the same.
+  score = client.get('/api/v1/ai-analyses', params={'job_id': job['id']}).json()[0]['overallScore']
+  assert stats['averageScore'] == score
+  assert sum(stats['scoreHistogram']) == 2
+  assert stats['interviewsByStatus'] == {'scheduled': 0, 'completed': 1, 'canceled': 0}
+
+  # The incremental counters agree with a full recount.
+  crud.rebuild_job_stats(db)
+  db.commit()
+  assert _stats(client, job['id']) == stats
+  assert any(row['jobId'] == job['id'] for row in client.get('/api/v1/jobs/stats').json())
+
+
+def test_stats_of_a_missing_job_are_404(client):
+  assert client.get('/api/v1/jobs/999999/stats').status_code == 404
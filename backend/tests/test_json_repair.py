@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from app.services.gemini import _extract_json_with_repair, _parse_analysis, _repair_json
+
+
+def _repaired(raw: str):
+  result = _repair_json(raw)
+  return None if result is None else json.loads(result[0])
+
+
+def test_complete_object_with_trailing_prose():
+  value, repaired = _extract_json_with_repair('Here you go: {"overall_score": 80, "summary": "ok"} hope it helps')
+  assert value == {'overall_score': 80, 'summary': 'ok'}
+  assert repaired
+
+
+def test_fenced_block_and_trailing_comma():
+  value, _ = _extract_json_with_repair('```json\n{"strengths": ["a", "b",],}\n```')
+  assert value == {'strengths': ['a', 'b']}
+
+
+def test_clean_json_is_not_marked_repaired():
+  assert _extract_json_with_repair('{"overall_score": 5}') == ({'overall_score': 5}, False)
+
+
+def test_truncated_inside_string_closes_it():
+  assert _repaired('{"overall_score": 80, "summary": "strong back') == {'overall_score': 80, 'summary': 'strong back'}
+
+
+def test_truncated_inside_key_drops_the_member():
+  assert _repaired('{"overall_score": 80, "summ') == {'overall_score': 80}
+
+
+def test_truncated_after_a_complete_number_keeps_it():
+  assert _repaired('{"summary": "ok", "overall_score": 75 ') == {'summary': 'ok', 'overall_score': 75}
+  assert _repaired('{"summary": "ok", "overall_score": 75,') == {'summary': 'ok', 'overall_score': 75}
+
+
+@pytest.mark.parametrize('tail', ['7', '7.', '-', '-3', '1e', '1e+', '0.5'])
+def test_truncated_inside_a_number_drops_the_member(tail):
+  assert _repaired(f'{{"summary": "ok", "overall_score": {tail}') == {'summary': 'ok'}
+
+
+def test_truncated_number_as_first_member_leaves_an_empty_object():
+  assert _repaired('{"overall_score": 7') == {}
+
+
+def test_truncated_number_in_nested_containers():
+  assert _repaired('{"summary": "ok", "scores": [90, 8') == {'summary': 'ok', 'scores': [90]}
+  assert _repaired('{"summary": "ok", "detail": {"a": 1') == {'summary': 'ok', 'detail': {}}
+
+
+def test_literals_at_the_cut():
+  assert _repaired('{"summary": "ok", "flag": true') == {'summary': 'ok', 'flag': True}
+  assert _repaired('{"summary": "ok", "flag": tr') == {'summary': 'ok'}
+
+
+def test_analysis_cut_inside_its_score_is_not_accepted_with_a_partial_score():
+  with pytest.raises(ValueError):
+    _parse_analysis('{"overall_score": 7')
+  with pytest.raises(ValueError):
+    _parse_analysis('{"summary": "good fit", "overall_score": 7')
+  value, repaired = _parse_analysis('{"overall_score": 72, "summary": "good fit", "risks": ["x", "y')
+  assert repaired
+  assert value['overall_score'] == 72
+  assert value['risks'] == ['x', 'y']
+
+
+def test_no_object_at_all():
+  assert _repair_json('no json here') is None
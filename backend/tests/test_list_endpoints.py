@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app.db import engine
+
+
+@contextmanager
+def _count_selects():
+  statements: list[str] = []
+
+  def record(conn, cursor, statement, *args) -> None:
+    if statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+      statements.append(statement)
+
+  event.listen(engine, 'before_cursor_execute', record)
+  try:
+    yield statements
+  finally:
+    event.remove(engine, 'before_cursor_execute', record)
+
+
+def test_lists_leave_out_heavy_fields_that_details_keep(client, make_job, make_resume, fake_gemini):
+  job = make_job(description='A long description. ' * 50)
+  resume = make_resume(job['id'])
+  analysis = client.post('/api/v1/ai-analyses', json={'jobId': job['id'], 'resumeId': resume['id']}).json()
+
+  listed_job = next(j for j in client.get('/api/v1/jobs').json() if j['id'] == job['id'])
+  assert 'description' not in listed_job
+  assert client.get(f"/api/v1/jobs/{job['id']}").json()['description'] == job['description']
+
+  [listed_resume] = client.get('/api/v1/resumes', params={'job_id': job['id']}).json()
+  assert 'resumeText' not in listed_resume
+  assert listed_resume['appliedJobTitle'] == job['title']
+  assert listed_resume['aiMatchScore'] == analysis['overallScore']
+  assert listed_resume['analysisId'] == analysis['id']
+
+  [listed_analysis] = client.get('/api/v1/ai-analyses', params={'job_id': job['id']}).json()
+  assert not {'summary', 'strengths', 'rawResponse'} & set(listed_analysis)
+  detail = client.get(f"/api/v1/ai-analyses/{analysis['id']}").json()
+  assert detail['summary'] and detail['rawResponse']
+
+
+def test_resume_list_query_count_does_not_grow_with_rows(client, make_job, make_resume, fake_gemini):
+  job = make_job()
+
+  def selects_for_list() -> int:
+    # The writes in between bump the change counters, so neither call is served from the response cache.
+    with _count_selects() as statements:
+      resp = client.get('/api/v1/resumes', params={'job_id': job['id']})
+    assert len(resp.json()) == len(rows)
+    return len(statements)
+
+  rows = [make_resume(job['id'])]
+  client.post('/api/v1/ai-analyses', json={'jobId': job['id'], 'resumeId': rows[0]['id']})
+  few = selects_for_list()
+  assert few > 0
+  for _ in range(5):
+    resume = make_resume(job['id'])
+    rows.append(resume)
+    client.post('/api/v1/ai-analyses', json={'jobId': job['id'], 'resumeId': resume['id']})
+  assert selects_for_list() == few
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+
+from app.migrations import SCHEMA_VERSION, ensure_schema, read_schema_version
+
+# The tables as they were before schema versioning (version 1).
+_BASELINE = [
+  """CREATE TABLE jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, title VARCHAR(200) NOT NULL, department VARCHAR(120) NOT NULL,
+    description TEXT NOT NULL, required_skills JSON NOT NULL, nice_to_have JSON NOT NULL,
+    status VARCHAR(20) NOT NULL, created_at DATETIME NOT NULL, experience_level VARCHAR(20) NOT NULL,
+    education VARCHAR(20) NOT NULL, ai_resume_matching_enabled BOOLEAN NOT NULL,
+    ai_question_gen_enabled BOOLEAN NOT NULL
+  )""",
+  """CREATE TABLE users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, username VARCHAR(80) NOT NULL UNIQUE,
+    password_hash VARCHAR(255) NOT NULL, created_at DATETIME NOT NULL
+  )""",
+  """CREATE TABLE resumes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, candidate_name VARCHAR(120) NOT NULL,
+    job_id INTEGER NOT NULL REFERENCES jobs(id) ON DELETE CASCADE, resume_text TEXT NOT NULL,
+    status VARCHAR(20) NOT NULL, submitted_at DATETIME NOT NULL, education VARCHAR(200) NOT NULL,
+    years_exp INTEGER NOT NULL, skills JSON NOT NULL
+  )""",
+  """CREATE TABLE ai_analyses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, job_id INTEGER NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+    resume_id INTEGER NOT NULL REFERENCES resumes(id) ON DELETE CASCADE, created_at DATETIME NOT NULL,
+    model VARCHAR(80) NOT NULL, prompt_version VARCHAR(40) NOT NULL, overall_score INTEGER NOT NULL,
+    professional_score INTEGER NOT NULL, communication_score INTEGER NOT NULL,
+    problem_solving_score INTEGER NOT NULL, summary TEXT NOT NULL, strengths JSON NOT NULL,
+    risks JSON NOT NULL, suggested_questions JSON NOT NULL, raw_response JSON NOT NULL,
+    is_mock BOOLEAN NOT NULL, CONSTRAINT uq_ai_analyses_job_resume UNIQUE (job_id, resume_id)
+  )""",
+  """CREATE TABLE interviews (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, job_id INTEGER NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+    resume_id INTEGER NOT NULL REFERENCES resumes(id) ON DELETE CASCADE, scheduled_at DATETIME,
+    status VARCHAR(20) NOT NULL, interview_round VARCHAR(40) NOT NULL, interviewer VARCHAR(120) NOT NULL,
+    meeting_link VARCHAR(400) NOT NULL, location VARCHAR(200) NOT NULL, notes TEXT NOT NULL,
+    decision VARCHAR(20) NOT NULL, rating INTEGER, created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL
+  )""",
+]
+
+_NOW = '2025-01-06 09:00:00.000000'
+
+
+def _baseline_database(path) -> str:
+  url = f'sqlite:///{path.as_posix()}'
+  engine = create_engine(url)
+  raw = json.dumps({'overall_score': 80, 'summary': '符合需求'}, ensure_ascii=False)
+  with engine.begin() as conn:
+    for ddl in _BASELINE:
+      conn.execute(text(ddl))
+    conn.execute(
+      text(
+        "INSERT INTO jobs VALUES (1, 'Backend', 'Eng', '', :skills, '[]', 'open', :now, '2-3', '大學', 1, 1)"
+      ),
+      {'skills': json.dumps(['Python', 'JS']), 'now': _NOW},
+    )
+    for resume_id in (1, 2):
+      conn.execute(
+        text("INSERT INTO resumes VALUES (:id, :name, 1, :text, 'analyzed', :now, '', 3, :skills)"),
+        {
+          'id': resume_id,
+          'name': f'Candidate {resume_id}',
+          'text': 'Three years of Python and JavaScript services with PostgreSQL and Docker.',
+          'now': _NOW,
+          'skills': json.dumps(['python', 'JavaScript']),
+        },
+      )
+      conn.execute(
+        text(
+          "INSERT INTO ai_analyses VALUES (:id, 1, :id, :now, 'gemini-1.5-flash', 'v1', 80, 80, 70, 75, "
+          "'符合需求', '[]', '[]', '[]', :raw, 0)"
+        ),
+        {'id': resume_id, 'now': _NOW, 'raw': raw},
+      )
+    conn.execute(
+      text("INSERT INTO interviews VALUES (1, 1, 1, :now, 'scheduled', '', 'Lee', '', '', '', '', NULL, :now, :now)"),
+      {'now': _NOW},
+    )
+  engine.dispose()
+  return url
+
+
+def test_baseline_database_upgrades_to_the_current_schema(tmp_path):
+  engine = create_engine(_baseline_database(tmp_path / 'baseline.db'))
+  assert read_schema_version(engine) is None
+
+  assert ensure_schema(engine)
+  assert read_schema_version(engine) == SCHEMA_VERSION
+  assert not ensure_schema(engine)
+
+  with engine.connect() as conn:
+    columns = {c['name'] for c in inspect(conn).get_columns('ai_analyses')}
+    assert 'raw_response' not in columns and 'raw_response_hash' in columns
+    # Identical raw responses are stored once.
+    assert conn.execute(text('SELECT COUNT(*) FROM analysis_blobs')).scalar_one() == 1
+    hashes = conn.execute(text('SELECT DISTINCT raw_response_hash FROM ai_analyses')).scalars().all()
+    assert len(hashes) == 1 and hashes[0]
+
+    stats = conn.execute(text('SELECT resumes_analyzed, analyses_count, score_sum FROM job_stats WHERE job_id = 1')).one()
+    assert tuple(stats) == (2, 2, 160)
+
+    job_skills = conn.execute(
+      text('SELECT s.name FROM job_skills js JOIN skills s ON s.id = js.skill_id WHERE js.job_id = 1 ORDER BY s.name')
+    ).scalars().all()
+    assert job_skills == ['JavaScript', 'Python']
+    assert conn.execute(text('SELECT COUNT(*) FROM resume_skills')).scalar_one() == 4
+
+    assert conn.execute(text('SELECT COUNT(*) FROM resume_fingerprints')).scalar_one() == 2
+    assert conn.execute(text('SELECT duplicate_of_id FROM resumes WHERE id = 2')).scalar_one() == 1
+    # Analyses from before input fingerprints cannot be matched to their prompt and stay stale.
+    assert set(conn.execute(text('SELECT job_prompt_hash FROM ai_analyses')).scalars()) == {''}
+
+    ends_at = conn.execute(text('SELECT ends_at FROM interviews WHERE id = 1')).scalar_one()
+    assert str(ends_at).startswith('2025-01-06 10:00:00')
+  engine.dispose()
+
+
+def test_upgrade_fingerprints_resumes_once(tmp_path, monkeypatch):
+  from app import crud
+
+  rebuild = crud.rebuild_resume_fingerprints
+  calls = []
+  monkeypatch.setattr(crud, 'rebuild_resume_fingerprints', lambda db: calls.append(1) or rebuild(db))
+  engine = create_engine(_baseline_database(tmp_path / 'baseline.db'))
+  assert ensure_schema(engine)
+  assert calls == [1]
+  engine.dispose()
+
+
+def test_upgrade_keeps_current_analyses_fresh(tmp_path):
+  from app import crud, models
+  from app.schemas import JobCreate, ResumeCreate
+  from app.services.analysis import build_pair_prompt, find_stale_analyses
+  from app.services.gemini import prompt_fingerprint
+
+  engine = create_engine(f"sqlite:///{(tmp_path / 'v13.db').as_posix()}")
+  ensure_schema(engine)
+  with Session(engine) as db:
+    job = crud.create_job(db, JobCreate(title='Backend', department='Eng', description='APIs'))
+    resumes = [crud.create_resume(db, ResumeCreate(job_id=job.id, candidate_name=f'C{i}', resume_text=f'Python {i}')) for i in range(2)]
+    fingerprints = [prompt_fingerprint(build_pair_prompt(job, resumes[0])), 'outdated']
+    for resume, fingerprint in zip(resumes, fingerprints):
+      db.add(models.AIAnalysis(job_id=job.id, resume_id=resume.id, input_fingerprint=fingerprint))
+    db.commit()
+    outdated_id = resumes[1].id
+  with engine.begin() as conn:
+    conn.execute(text('UPDATE schema_version SET version = 13'))
+    conn.execute(text("UPDATE ai_analyses SET job_prompt_hash = '', resume_content_hash = ''"))
+
+  assert ensure_schema(engine)
+  with Session(engine) as db:
+    assert [row.resume_id for row in find_stale_analyses(db)] == [outdated_id]
+  engine.dispose()
+
+
+def test_fresh_database_is_created_at_the_current_version(tmp_path):
+  engine = create_engine(f"sqlite:///{(tmp_path / 'fresh.db').as_posix()}")
+  assert ensure_schema(engine)
+  assert read_schema_version(engine) == SCHEMA_VERSION
+  assert inspect(engine).has_table('interview_transcripts')
+  engine.dispose()
+
+
+def test_newer_database_is_refused(tmp_path):
+  engine = create_engine(f"sqlite:///{(tmp_path / 'newer.db').as_posix()}")
+  ensure_schema(engine)
+  with engine.begin() as conn:
+    conn.execute(text('UPDATE schema_version SET version = :v'), {'v': SCHEMA_VERSION + 1})
+  try:
+    ensure_schema(engine)
+  except RuntimeError as exc:
+    assert 'newer' in str(exc)
+  else:
+    raise AssertionError('expected RuntimeError')
+  engine.dispose()
+
+
+def test_app_import_defers_auth_and_http_libraries(tmp_path):
+  code = (
+    'import sys, app.main; '
+    "print('loaded=' + ','.join(m for m in ('httpx', 'jose', 'passlib') if m in sys.modules))"
+  )
+  env = {**os.environ, 'DATABASE_URL': f"sqlite:///{(tmp_path / 'import.db').as_posix()}"}
+  out = subprocess.run([sys.executable, '-c', code], cwd=Path(__file__).parents[1], env=env, capture_output=True, text=True, check=True)
+  assert out.stdout.strip().splitlines()[-1] == 'loaded='
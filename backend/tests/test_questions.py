@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import select, update
+
+from app import models
+from app.core.config import settings
+from app.services import questions
+from app.services.gemini import TokenUsage
+
+
+@pytest.fixture
+def generated(breaker, monkeypatch) -> list[str]:
+  """Job-level question generation through a fake Gemini; returns the prompts sent."""
+  prompts: list[str] = []
+
+  async def generate_json(*, prompt, max_output_tokens, model=None):
+    prompts.append(prompt)
+    value = {
+      'questions': [
+        {'category': 'technical', 'question': f'請說明你如何設計第 {len(prompts)} 版的資料庫索引？'},
+        {'category': 'behavioral', 'question': '請分享一次跨團隊合作的經驗。'},
+      ]
+    }
+    return value, None, 'gemini-test', TokenUsage(prompt_tokens=300, output_tokens=60)
+
+  monkeypatch.setattr(questions, 'generate_json', generate_json)
+  return prompts
+
+
+def test_parse_questions_drops_near_duplicates_and_caps_the_count():
+  value = {
+    'questions': [
+      {'category': 'technical', 'question': '請說明你如何設計資料庫索引？'},
+      {'category': 'technical', 'question': '請說明你如何設計資料庫的索引？'},
+      '請分享一次跨團隊合作的經驗。',
+      {'question': ''},
+      {'category': 'culture', 'question': '你理想中的團隊文化是什麼？'},
+    ]
+  }
+  assert questions.parse_questions(value, limit=2) == [
+    ('technical', '請說明你如何設計資料庫索引？'),
+    ('', '請分享一次跨團隊合作的經驗。'),
+  ]
+  assert questions.parse_questions({'questions': 'nope'}, limit=5) == []
+
+
+def test_bank_is_generated_once_per_version_of_the_job(client, make_job, generated):
+  job = make_job()
+  first = client.get(f"/api/v1/jobs/{job['id']}/questions").json()
+  assert len(generated) == 1
+  assert [q['source'] for q in first['questions']] == ['job', 'job']
+  assert not first['stale'] and first['model'] == 'gemini-test'
+
+  client.get(f"/api/v1/jobs/{job['id']}/questions")
+  client.put(f"/api/v1/jobs/{job['id']}", json={'status': 'closed'})
+  client.get(f"/api/v1/jobs/{job['id']}/questions")
+  assert len(generated) == 1
+
+  client.put(f"/api/v1/jobs/{job['id']}", json={'requiredSkills': ['Go']})
+  refreshed = client.get(f"/api/v1/jobs/{job['id']}/questions").json()
+  assert len(generated) == 2 and 'Go' in generated[-1]
+  assert '第 2 版' in refreshed['questions'][0]['question']
+
+  client.post(f"/api/v1/jobs/{job['id']}/questions/generate")
+  assert len(generated) == 3
+
+
+def test_reading_an_outdated_bank_does_not_generate(client, db, make_job, generated):
+  job = make_job(aiQuestionGenEnabled=False)
+  bank = client.get(f"/api/v1/jobs/{job['id']}/questions").json()
+  assert bank['stale'] and bank['questions'] == []
+
+  db.execute(update(models.Job).where(models.Job.id == job['id']).values(ai_question_gen_enabled=True))
+  db.commit()
+  for _ in range(2):
+    assert client.get(f"/api/v1/jobs/{job['id']}/questions").json()['stale']
+  assert generated == []
+
+  generated_bank = client.post(f"/api/v1/jobs/{job['id']}/questions/generate").json()
+  assert not generated_bank['stale'] and len(generated) == 1
+
+
+def test_bank_tokens_are_billed_without_counting_an_analysis(client, db, make_job, generated):
+  job = make_job()
+  assert len(generated) == 1
+  usage = db.scalars(select(models.UsageDaily).where(models.UsageDaily.job_id == job['id'])).one()
+  assert (usage.analyses, usage.prompt_tokens, usage.output_tokens) == (0, 300, 60)
+
+
+def test_candidate_questions_are_merged_across_resumes(client, make_job, make_resume, fake_gemini, monkeypatch):
+  monkeypatch.setattr(settings, 'gemini_api_key', '')
+  job = make_job()
+  resumes = [make_resume(job['id']) for _ in range(2)]
+  for resume in resumes:
+    client.post('/api/v1/ai-analyses', json={'jobId': job['id'], 'resumeId': resume['id']})
+
+  bank = client.get(f"/api/v1/jobs/{job['id']}/questions", params={'resume_id': resumes[0]['id']}).json()
+  candidate = [q for q in bank['questions'] if q['source'] == 'candidate']
+  assert len(candidate) == 2
+  assert {q['timesSuggested'] for q in candidate} == {2}
+
+  job_only = client.get(f"/api/v1/jobs/{job['id']}/questions").json()
+  assert {q['source'] for q in job_only['questions']} == {'job'}
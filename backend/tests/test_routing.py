@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import pytest
+
+from app.core.config import settings
+from app.services import analysis, routing
+from app.services.gemini import TokenUsage, _mock_analysis
+
+_RULES = [
+  {'name': 'light', 'model': 'gemini-lite', 'max_prompt_tokens': 400, 'max_output_tokens': 1024},
+  {'name': 'strong', 'model': 'gemini-pro', 'experience_levels': ['7+'], 'max_output_tokens': 3072},
+]
+
+
+@pytest.fixture
+def rules(monkeypatch):
+  monkeypatch.setattr(settings, 'gemini_routing_rules', _RULES)
+  routing.tiers.cache_clear()
+  yield
+  routing.tiers.cache_clear()
+
+
+def test_estimate_tokens_counts_cjk_per_character():
+  assert routing.estimate_tokens('abcdefgh') == 2
+  assert routing.estimate_tokens('後端工程師') == 5
+  assert routing.estimate_tokens('後端 engineer') == 2 + 3
+
+
+def test_first_matching_tier_wins(rules):
+  assert routing.route('short prompt')[0].name == 'light'
+  assert routing.route('x' * 4000, experience_level='7+')[0].name == 'strong'
+  assert routing.route('short prompt', experience_level='7+')[0].name == 'light'
+  tier, tokens = routing.route('x' * 4000, experience_level='2-3')
+  assert (tier.name, tier.model, tokens) == ('default', settings.gemini_model, 1000)
+
+
+def test_without_rules_everything_goes_to_the_default_model():
+  routing.tiers.cache_clear()
+  assert [t.name for t in routing.tiers()] == ['default']
+
+
+def test_analysis_uses_and_records_the_routed_tier(client, make_job, make_resume, rules, monkeypatch):
+  requested: list[tuple[str, int]] = []
+
+  async def generate(**kwargs):
+    requested.append((kwargs['model'], kwargs['max_output_tokens']))
+    return _mock_analysis(summary='real'), False, kwargs['model'], TokenUsage(prompt_tokens=900, output_tokens=100)
+
+  monkeypatch.setattr(analysis, 'generate_analysis', generate)
+  job = make_job(experienceLevel='7+', description='Lead the platform team. ' * 200)
+  resp = client.post('/api/v1/ai-analyses', json={'jobId': job['id'], 'resumeId': make_resume(job['id'])['id']})
+  assert resp.status_code == 200, resp.text
+  assert requested == [('gemini-pro', 3072)]
+  assert resp.json()['routeTier'] == 'strong'
+
+  stats = {row['routeTier']: row for row in client.get('/api/v1/ai-analyses/routing-stats').json()}
+  assert stats['strong']['model'] == 'gemini-pro'
+  assert stats['strong']['count'] >= 1
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import datetime as dt
+
+from app.services.scheduling import Booking, Calendar, availability, free_slots, merge_intervals, to_utc_naive
+
+
+def _t(hour: float) -> dt.datetime:
+  return dt.datetime(2026, 3, 2) + dt.timedelta(hours=hour)
+
+
+def test_merge_joins_overlapping_and_back_to_back_intervals():
+  assert merge_intervals([(_t(3), _t(4)), (_t(1), _t(2)), (_t(2), _t(2.5)), (_t(3.5), _t(3.75))]) == [
+    (_t(1), _t(2.5)),
+    (_t(3), _t(4)),
+  ]
+
+
+def test_free_slots_skip_gaps_shorter_than_the_minimum():
+  busy = [(_t(9), _t(10)), (_t(10.5), _t(12))]
+  assert free_slots(busy, _t(8), _t(13), dt.timedelta(minutes=45)) == [(_t(8), _t(9)), (_t(12), _t(13))]
+  assert free_slots(busy, _t(8), _t(13), dt.timedelta(minutes=30)) == [(_t(8), _t(9)), (_t(10), _t(10.5)), (_t(12), _t(13))]
+
+
+def test_common_free_time_is_the_gap_of_everyone_busy():
+  per, common = availability(
+    {'a': [(_t(7), _t(9.5))], 'b': [(_t(11), _t(12)), (_t(9), _t(10))]},
+    _t(8),
+    _t(13),
+    dt.timedelta(minutes=30),
+  )
+  assert per['a'] == ([(_t(8), _t(9.5))], [(_t(9.5), _t(13))])
+  assert common == [(_t(10), _t(11)), (_t(12), _t(13))]
+
+
+def test_aware_times_are_stored_as_naive_utc():
+  taipei = dt.timezone(dt.timedelta(hours=8))
+  assert to_utc_naive(dt.datetime(2026, 3, 2, 17, 0, tzinfo=taipei)) == _t(9)
+  assert to_utc_naive(_t(9)) == _t(9)
+
+
+def test_calendar_reports_overlaps_in_start_order():
+  calendar = Calendar()
+  calendar.add('a', Booking(_t(11), _t(12), interview_id=2))
+  calendar.add('a', Booking(_t(9), _t(10), interview_id=1))
+  calendar.add('b', Booking(_t(9), _t(10), interview_id=3))
+  assert [b.interview_id for b in calendar.overlapping('a', _t(9.5), _t(11.5))] == [1, 2]
+  assert calendar.overlapping('a', _t(10), _t(11)) == []
+  assert [b.interview_id for b in calendar.remove('a', 1)] == [1]
+  assert [b.interview_id for b in calendar.overlapping('a', _t(0), _t(24))] == [2]
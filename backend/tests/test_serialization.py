@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import json
+
+from pydantic import TypeAdapter
+
+from app.schemas import ResumeListOut
+from app.serialization import dump, dump_row, dump_rows
+from bench.serialize import make_rows
+
+
+def test_dump_rows_matches_the_pydantic_output():
+  rows = make_rows(50)
+  expected = TypeAdapter(list[ResumeListOut]).dump_json(
+    [ResumeListOut.model_validate(row) for row in rows], by_alias=True
+  )
+  assert json.loads(dump_rows(rows, ResumeListOut)) == json.loads(expected)
+  assert json.loads(dump_row(rows[0], ResumeListOut)) == json.loads(expected)[0]
+
+
+def test_dump_passes_schema_instances_through():
+  row = make_rows(1)[0]
+  item = ResumeListOut.model_validate(row)
+  assert json.loads(dump(item, ResumeListOut)) == json.loads(dump(row, ResumeListOut))
+  assert 'candidateName' in json.loads(dump(item, ResumeListOut))
+
+
+def test_large_responses_are_gzipped(client, make_job):
+  job = make_job(description='x' * 2000)
+  resp = client.get(f"/api/v1/jobs/{job['id']}", headers={'Accept-Encoding': 'gzip'})
+  assert resp.status_code == 200
+  assert resp.headers['Content-Encoding'] == 'gzip'
+  assert resp.json()['description'] == job['description']
+
+  small = client.get('/api/v1/jobs/999999', headers={'Accept-Encoding': 'gzip'})
+  assert 'Content-Encoding' not in small.headers
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from app.core.config import settings
+from app.core.locks import file_lock, shared_lock
+from app.core.shared_state import MemoryState, SharedState, SQLiteState
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def state(request, tmp_path):
+  if request.param == 'memory':
+    return MemoryState()
+  return SQLiteState((tmp_path / 'state.db').as_posix())
+
+
+def test_add_incr_and_ttl(state):
+  assert state.add('claim', 'a', ttl=60)
+  assert not state.add('claim', 'b', ttl=60)
+  assert state.get('claim') == 'a'
+  assert state.incr('count') == 1
+  assert state.incr('count', 4) == 5
+  state.set('short', 'x', ttl=0.01)
+  time.sleep(0.02)
+  assert state.get('short') is None
+  assert state.add('short', 'y')
+
+
+def test_delete_if_only_removes_the_expected_value(state):
+  state.set('lock:a', 'mine', ttl=60)
+  assert not state.delete_if('lock:a', 'theirs')
+  assert state.get('lock:a') == 'mine'
+  assert state.delete_if('lock:a', 'mine')
+  assert state.get('lock:a') is None and not state.delete_if('lock:a', 'mine')
+
+
+def test_expired_lock_taken_over_is_not_released_by_its_old_holder(state, monkeypatch):
+  from app.core import shared_state as shared_state_module
+
+  monkeypatch.setattr(shared_state_module, 'shared_state', lambda: state)
+  with shared_lock(['slot'], lease_seconds=0.01):
+    time.sleep(0.02)
+    assert state.add('lock:slot', 'other', ttl=60)
+  assert state.get('lock:slot') == 'other'
+
+
+def test_incomplete_backend_fails_when_created():
+  class NoDelete(MemoryState):
+    delete_if = SharedState.delete_if
+
+  with pytest.raises(TypeError):
+    NoDelete()
+
+
+def _stored_keys(state) -> set[str]:
+  if isinstance(state, MemoryState):
+    return set(state._items)
+  return {row[0] for row in state._conn().execute('SELECT key FROM kv')}
+
+
+def test_purge_expired_drops_keys_that_are_never_read(state):
+  for i in range(5):
+    state.set(f'idem:old:{i}', 'response', ttl=0.01)
+  state.set('idem:fresh', 'response', ttl=60)
+  state.set('forever', 'value')
+  time.sleep(0.02)
+  assert state.purge_expired() == 5
+  assert _stored_keys(state) == {'idem:fresh', 'forever'}
+
+
+def test_writes_purge_at_most_once_per_interval(state, monkeypatch):
+  monkeypatch.setattr(settings, 'shared_state_purge_interval_seconds', 3600.0)
+  state.set('first', 'x', ttl=0.01)
+  time.sleep(0.02)
+  # The first write purged an empty store; the next purge is an hour away.
+  state.set('second', 'x')
+  assert 'first' in _stored_keys(state)
+
+  state._next_purge = 0.0
+  state.add('third', 'x')
+  assert _stored_keys(state) == {'second', 'third'}
+
+
+def _claim(path: str, key: str) -> bool:
+  return SQLiteState(path).add(key, str(os.getpid()), ttl=60)
+
+
+def test_sqlite_state_is_shared_between_processes(tmp_path):
+  path = (tmp_path / 'shared.db').as_posix()
+  with ProcessPoolExecutor(max_workers=4, mp_context=multiprocessing.get_context('spawn')) as pool:
+    claims = list(pool.map(_claim, [path] * 8, ['job:1'] * 8))
+  assert claims.count(True) == 1
+  assert SQLiteState(path).get('job:1') is not None
+
+
+def _hold_file_lock(path: str, ready, release) -> None:
+  with file_lock(path):
+    ready.set()
+    release.wait(10)
+
+
+def test_file_lock_excludes_other_processes(tmp_path):
+  path = tmp_path / 'schema.lock'
+  ctx = multiprocessing.get_context('spawn')
+  ready, release = ctx.Event(), ctx.Event()
+  holder = ctx.Process(target=_hold_file_lock, args=(str(path), ready, release))
+  holder.start()
+  try:
+    assert ready.wait(10)
+    with pytest.raises(TimeoutError):
+      with file_lock(path, timeout=0.1, poll_seconds=0.02):
+        pass
+  finally:
+    release.set()
+    holder.join(10)
+  with file_lock(path, timeout=1):
+    pass
+
+
+def test_backend_is_chosen_by_url(monkeypatch, tmp_path):
+  from app.core import shared_state as module
+
+  try:
+    monkeypatch.setattr(settings, 'shared_state_url', f"sqlite:///{(tmp_path / 's.db').as_posix()}")
+    module.shared_state.cache_clear()
+    assert isinstance(module.shared_state(), SQLiteState)
+    monkeypatch.setattr(settings, 'shared_state_url', 'memcached://localhost')
+    module.shared_state.cache_clear()
+    with pytest.raises(ValueError):
+      module.shared_state()
+  finally:
+    monkeypatch.undo()
+    module.shared_state.cache_clear()
+  assert isinstance(module.shared_state(), MemoryState)
+
+
+def test_open_breaker_is_seen_by_other_workers(breaker, monkeypatch):
+  from app.services import gemini
+
+  monkeypatch.setattr(settings, 'gemini_breaker_cooldown_seconds', 60.0)
+  for _ in range(settings.gemini_breaker_failure_threshold):
+    breaker.record_failure()
+  # Another worker's breaker has seen no failures itself but reads the open state.
+  other = gemini._CircuitBreaker()
+  assert other.acquire() is None
+  assert other.retry_after() > 0
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import uuid
+
+from app import crud
+
+
+def test_job_create_indexes_skills_and_matches_resumes(client, make_job, make_resume):
+  tag = uuid.uuid4().hex[:6]
+  job = make_job(requiredSkills=['JavaScript', f'Kafka{tag}', 'SQL'], niceToHave=['Docker'])
+  other = make_job(requiredSkills=['Go'])
+  strong = make_resume(other['id'], skills=['JS', f'kafka{tag}', 'sql'])
+  weak = make_resume(other['id'], skills=['ECMAScript'])
+  make_resume(other['id'], skills=['Rust'])
+
+  matches = client.get(f'/api/v1/jobs/{job["id"]}/skill-matches?min_matches=1')
+  assert matches.status_code == 200, matches.text
+  rows = matches.json()
+  assert [r['resumeId'] for r in rows if r['resumeId'] in (strong['id'], weak['id'])] == [strong['id'], weak['id']]
+  best = next(r for r in rows if r['resumeId'] == strong['id'])
+  assert best['matchedSkills'] == 3
+  assert best['jobSkills'] == 3
+
+  at_least_two = client.get(f'/api/v1/jobs/{job["id"]}/skill-matches?min_matches=2').json()
+  assert strong['id'] in {r['resumeId'] for r in at_least_two}
+  assert weak['id'] not in {r['resumeId'] for r in at_least_two}
+
+  with_nice = client.get(f'/api/v1/jobs/{job["id"]}/skill-matches?include_nice_to_have=true').json()
+  assert next(r for r in with_nice if r['resumeId'] == strong['id'])['jobSkills'] == 4
+
+
+def test_aliases_fold_into_one_skill(client, make_job, make_resume):
+  job = make_job(requiredSkills=['JavaScript'])
+  resume = make_resume(job['id'], skills=['js'])
+
+  skills = client.get('/api/v1/skills')
+  assert skills.status_code == 200, skills.text
+  names = [s['name'] for s in skills.json()]
+  assert names.count('JavaScript') == 1
+  assert not {'JS', 'js', 'ECMAScript'} & set(names)
+
+  by_alias = client.get('/api/v1/resumes?skill=ECMAScript')
+  assert by_alias.status_code == 200
+  assert resume['id'] in {r['id'] for r in by_alias.json()}
+
+
+def test_rebuild_skill_index_reproduces_the_index(client, db, make_job, make_resume):
+  job = make_job(requiredSkills=['JavaScript', 'SQL'])
+  make_resume(job['id'], skills=['JS'])
+
+
+  def counts() -> dict[str, tuple[int, int]]:
+    # Skills whose jobs and resumes were all deleted linger until a rebuild prunes them.
+    return {
+      row['name']: (row['job_count'], row['resume_count'])
+      for row in crud.list_skills(db)
+      if row['job_count'] or row['resume_count']
+    }
+
+  before = counts()
+  crud.rebuild_skill_index(db)
+  db.commit()
+  assert counts() == before
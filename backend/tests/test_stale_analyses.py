@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+
+def _stale_ids(client, job_id: int) -> list[int]:
+  resp = client.get('/api/v1/ai-analyses/stale', params={'job_id': job_id})
+  assert resp.status_code == 200, resp.text
+  return resp.json()['analysisIds']
+
+
+def test_job_edit_marks_analyses_stale_and_reanalyze_refreshes_them(client, make_job, make_resume, fake_gemini):
+  _, calls = fake_gemini
+  job = make_job()
+  analyses = [
+    client.post('/api/v1/ai-analyses', json={'jobId': job['id'], 'resumeId': make_resume(job['id'])['id']}).json()
+    for _ in range(2)
+  ]
+  assert len(calls) == 2
+  assert _stale_ids(client, job['id']) == []
+
+  resp = client.put(f"/api/v1/jobs/{job['id']}", json={'description': 'Now also owns the data pipeline.'})
+  assert resp.status_code == 200, resp.text
+  assert sorted(_stale_ids(client, job['id'])) == sorted(a['id'] for a in analyses)
+
+  # TestClient runs the background task before returning.
+  queued = client.post('/api/v1/ai-analyses/stale/reanalyze', params={'job_id': job['id']}).json()
+  assert queued['queued'] and queued['count'] == 2
+  assert len(calls) == 4
+  assert _stale_ids(client, job['id']) == []
+
+
+def test_unrelated_job_edit_keeps_analyses_fresh(client, make_job, make_resume, fake_gemini):
+  job = make_job()
+  client.post('/api/v1/ai-analyses', json={'jobId': job['id'], 'resumeId': make_resume(job['id'])['id']})
+  client.put(f"/api/v1/jobs/{job['id']}", json={'status': 'closed'})
+  assert _stale_ids(client, job['id']) == []
+
+
+def _fall_back_to_mock(monkeypatch) -> list[str]:
+  from app.services import analysis
+  from app.services.gemini import TokenUsage, _mock_analysis
+
+  calls: list[str] = []
+
+  async def generate(**kwargs):
+    calls.append(kwargs['prompt'])
+    return _mock_analysis(summary='mock'), True, 'mock', TokenUsage(prompt_tokens=50)
+
+  monkeypatch.setattr(analysis, 'generate_analysis', generate)
+  return calls
+
+
+def test_background_reanalysis_keeps_a_real_result_over_a_mock(client, make_job, make_resume, fake_gemini, monkeypatch):
+  job = make_job()
+  real = client.post('/api/v1/ai-analyses', json={'jobId': job['id'], 'resumeId': make_resume(job['id'])['id']}).json()
+  client.put(f"/api/v1/jobs/{job['id']}", json={'description': 'Now also owns the data pipeline.'})
+
+  calls = _fall_back_to_mock(monkeypatch)
+  client.post('/api/v1/ai-analyses/stale/reanalyze', params={'job_id': job['id']})
+  assert len(calls) == 1
+  kept = client.get(f"/api/v1/ai-analyses/{real['id']}").json()
+  assert kept['summary'] == 'real' and not kept['isMock']
+  assert _stale_ids(client, job['id']) == [real['id']]
+
+
+def test_mock_results_stay_stale_once_an_api_key_is_set(client, make_job, make_resume, monkeypatch):
+  from app.core.config import settings
+
+  _fall_back_to_mock(monkeypatch)
+  monkeypatch.setattr(settings, 'gemini_api_key', '')
+  job = make_job()
+  mock = client.post('/api/v1/ai-analyses', json={'jobId': job['id'], 'resumeId': make_resume(job['id'])['id']}).json()
+  assert mock['isMock']
+  assert _stale_ids(client, job['id']) == []
+
+  monkeypatch.setattr(settings, 'gemini_api_key', 'test-key')
+  assert _stale_ids(client, job['id']) == [mock['id']]
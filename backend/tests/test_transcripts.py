@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import select
+
+from app import models
+from app.core.config import settings
+from app.services import transcripts
+from app.services.gemini import TokenUsage
+from app.services.routing import estimate_tokens
+
+
+@pytest.fixture
+def interview(client, make_job, make_resume) -> int:
+  job = make_job()
+  resp = client.post('/api/v1/interviews', json={'jobId': job['id'], 'resumeId': make_resume(job['id'])['id']})
+  assert resp.status_code == 200, resp.text
+  return resp.json()['id']
+
+
+def _transcript(lines: int) -> str:
+  return '\n'.join(f'{"面試官" if i % 2 else "候選人"}：第 {i} 句，我們談到 Python 與資料庫的設計。' for i in range(lines))
+
+
+def _upload(client, interview_id: int, text: str, **params):
+  return client.put(
+    f'/api/v1/interviews/{interview_id}/transcript',
+    content=text.encode('utf-8'),
+    headers={'Content-Type': 'text/plain'},
+    params=params,
+  )
+
+
+def test_chunks_stay_under_the_limit_and_keep_lines_whole():
+  text = _transcript(60)
+  chunks = transcripts.split_chunks(text, 200)
+  assert len(chunks) > 1
+  assert all(estimate_tokens(chunk) <= 200 for chunk in chunks)
+  assert '\n'.join(chunks).splitlines() == text.splitlines()
+
+
+def test_long_line_is_cut_at_sentence_ends():
+  line = '我負責後端服務。' * 30
+  chunks = transcripts.split_chunks(line, 50)
+  assert all(estimate_tokens(chunk) <= 50 for chunk in chunks)
+  assert all(chunk.endswith('。') for chunk in chunks)
+  assert ''.join(chunks) == line
+
+
+def test_upload_is_summarized_in_the_background(client, interview, monkeypatch):
+  monkeypatch.setattr(settings, 'transcript_chunk_tokens', 200)
+  text = _transcript(60)
+  resp = _upload(client, interview, text)
+  assert resp.status_code == 202, resp.text
+
+  out = client.get(f'/api/v1/interviews/{interview}/transcript', params={'include_text': True}).json()
+  assert out['status'] == 'done'
+  assert out['chunkCount'] == len(transcripts.split_chunks(text, 200)) > 1
+  assert out['chunksDone'] == out['chunkCount']
+  assert out['isMock'] and out['evaluation']['recommendation']
+  assert out['text'] == text
+  assert out['size'] == len(text.encode('utf-8'))
+
+
+def test_bad_uploads_are_rejected(client, interview, monkeypatch):
+  assert _upload(client, interview, '  \n').status_code == 400
+  assert client.put(f'/api/v1/interviews/{interview}/transcript', content=b'\xff\xfe\x00bad').status_code == 400
+  monkeypatch.setattr(settings, 'transcript_max_bytes', 10)
+  assert _upload(client, interview, 'x' * 11).status_code == 413
+  assert _upload(client, 999999, 'hello').status_code == 404
+  assert client.get(f'/api/v1/interviews/{interview}/transcript').status_code == 404
+
+
+def test_retry_only_resends_the_failed_chunks(client, db, interview, breaker, monkeypatch):
+  monkeypatch.setattr(settings, 'transcript_chunk_tokens', 200)
+  prompts: list[str] = []
+  fail_once = {'第 1/'}
+
+  async def generate_json(*, prompt, model, max_output_tokens):
+    prompts.append(prompt)
+    usage = TokenUsage(prompt_tokens=100, output_tokens=20)
+    for marker in list(fail_once):
+      if marker in prompt:
+        fail_once.discard(marker)
+        return None, 'HTTP 503', model, usage
+    if '【各段摘要】' in prompt and '"overall_score"' in prompt:
+      return {'overall_score': 81, 'recommendation': 'hire'}, None, model, usage
+    return {'summary': 'ok'}, None, model, usage
+
+  monkeypatch.setattr(transcripts, 'generate_json', generate_json)
+  text = _transcript(60)
+  chunk_count = len(transcripts.split_chunks(text, 200))
+  _upload(client, interview, text)
+  failed = client.get(f'/api/v1/interviews/{interview}/transcript').json()
+  assert failed['status'] == 'failed'
+  assert failed['chunksDone'] == chunk_count - 1
+  assert len(prompts) == chunk_count
+
+  prompts.clear()
+  resp = client.post(f'/api/v1/interviews/{interview}/transcript/summarize')
+  assert resp.status_code == 202
+  done = client.get(f'/api/v1/interviews/{interview}/transcript').json()
+  assert done['status'] == 'done'
+  assert done['evaluation'] == {'overall_score': 81, 'recommendation': 'hire'}
+  # One map call for the missing chunk, then the reduce.
+  assert len(prompts) == 2 and '第 1/' in prompts[0]
+  assert done['promptTokens'] == 100 * (chunk_count + 2)
+  # Billed against the daily budget without counting as analyses.
+  job_id = client.get(f'/api/v1/interviews/{interview}').json()['jobId']
+  usage = db.scalars(select(models.UsageDaily).where(models.UsageDaily.job_id == job_id)).one()
+  assert (usage.analyses, usage.prompt_tokens) == (0, 100 * (chunk_count + 2))
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from app.services import analysis
+from app.services.gemini import TokenUsage, _mock_analysis
+
+
+def _usage_for(client, job_id: int) -> dict | None:
+  rows = client.get('/api/v1/ai-analyses/usage?group_by=job').json()['rows']
+  return next((row for row in rows if row['key'] == str(job_id)), None)
+
+
+def test_mock_without_api_key_records_no_usage(client, make_job, make_resume):
+  job = make_job()
+  resume = make_resume(job['id'])
+  resp = client.post('/api/v1/ai-analyses', json={'jobId': job['id'], 'resumeId': resume['id']})
+  assert resp.status_code == 200, resp.text
+  assert resp.json()['isMock'] is True
+  assert _usage_for(client, job['id']) is None
+
+
+def test_failed_paid_call_falling_back_to_mock_still_counts_tokens(client, make_job, make_resume, monkeypatch):
+  async def unparseable(**kwargs):
+    return _mock_analysis(summary='fallback'), True, 'gemini-test', TokenUsage(prompt_tokens=1200, output_tokens=300)
+
+  monkeypatch.setattr(analysis, 'generate_analysis', unparseable)
+  job = make_job()
+  resume = make_resume(job['id'])
+  resp = client.post('/api/v1/ai-analyses', json={'jobId': job['id'], 'resumeId': resume['id'], 'force': True})
+  assert resp.status_code == 200, resp.text
+  assert resp.json()['isMock'] is True
+
+  usage = _usage_for(client, job['id'])
+  assert usage is not None
+  assert (usage['promptTokens'], usage['outputTokens']) == (1200, 300)
+
+
+def test_successful_call_counts_tokens_per_analysis(client, make_job, make_resume, monkeypatch):
+  async def real(**kwargs):
+    return _mock_analysis(summary='ok'), False, 'gemini-test', TokenUsage(prompt_tokens=500, output_tokens=100)
+
+  monkeypatch.setattr(analysis, 'generate_analysis', real)
+  job = make_job()
+  for _ in range(2):
+    resume = make_resume(job['id'])
+    assert client.post('/api/v1/ai-analyses', json={'jobId': job['id'], 'resumeId': resume['id']}).status_code == 200
+
+  usage = _usage_for(client, job['id'])
+  assert usage['analyses'] == 2
+  assert usage['promptTokens'] == 1000
@@ -63,12 +63,19 @@ function startPythonBackend() {
   const backendDir = path.join(app.getAppPath(), 'backend');
   const venvPath = path.join(backendDir, '.venv', 'Scripts', 'python.exe');
 
-  pyProcess = spawn(venvPath, ['-m', 'uvicorn', 'app.main:app', '--port', '8000', '--workers', '1'], {
+  // 後端 worker 數量：預設 1，可用 BACKEND_WORKERS 調整；多個 worker 時改用共享的 SQLite 狀態檔
+  const workers = Math.max(1, Number.parseInt(process.env.BACKEND_WORKERS ?? '1', 10) || 1);
+  const sharedStateUrl =
+    process.env.SHARED_STATE_URL ??
+    (workers > 1 ? `sqlite:///${path.join(app.getPath('userData'), 'shared-state.db')}` : 'memory://');
+
+  pyProcess = spawn(venvPath, ['-m', 'uvicorn', 'app.main:app', '--port', '8000', '--workers', String(workers)], {
     cwd: backendDir,
     env: {
       ...process.env,
       PYTHONPATH: backendDir, // 關鍵：告訴 Python backend 是搜尋模組的根目錄
-      PYTHONIOENCODING: 'utf-8'
+      PYTHONIOENCODING: 'utf-8',
+      SHARED_STATE_URL: sharedStateUrl
     }
   });
 
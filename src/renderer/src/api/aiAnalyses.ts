@@ -1,19 +1,27 @@
 import { request } from './http'
-import type { AIAnalysis } from './types'
+import type { AIAnalysis, AIAnalysisListItem } from './types'
 
-export function listAnalyses(params?: { jobId?: number; resumeId?: number }): Promise<AIAnalysis[]> {
+export function listAnalyses(params?: { jobId?: number; resumeId?: number }): Promise<AIAnalysisListItem[]> {
   const parts: string[] = []
   if (params?.jobId) parts.push(`job_id=${encodeURIComponent(params.jobId)}`)
   if (params?.resumeId) parts.push(`resume_id=${encodeURIComponent(params.resumeId)}`)
   const qs = parts.length ? `?${parts.join('&')}` : ''
-  return request<AIAnalysis[]>(`/ai-analyses${qs}`)
+  return request<AIAnalysisListItem[]>(`/ai-analyses${qs}`)
 }
 
-export function createAnalysis(data: {
-  jobId: number
-  resumeId: number
-  force?: boolean
-  extraConditions?: string
-}): Promise<AIAnalysis> {
-  return request<AIAnalysis>('/ai-analyses', { method: 'POST', body: data })
+export function getAnalysis(analysisId: number): Promise<AIAnalysis> {
+  return request<AIAnalysis>(`/ai-analyses/${analysisId}`)
+}
+
+// Pass the same idempotencyKey when retrying, so a retry cannot start a second Gemini call.
+export function createAnalysis(
+  data: {
+    jobId: number
+    resumeId: number
+    force?: boolean
+    extraConditions?: string
+  },
+  idempotencyKey: string = crypto.randomUUID(),
+): Promise<AIAnalysis> {
+  return request<AIAnalysis>('/ai-analyses', { method: 'POST', body: data, idempotencyKey })
 }
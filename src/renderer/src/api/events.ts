@@ -0,0 +1,100 @@
+import { useEffect, useRef } from 'react'
+import { getAccessToken, getBaseUrl } from './http'
+
+export type ChangeEvent = {
+  seq: number
+  entity: 'job' | 'resume' | 'analysis' | 'interview'
+  entityId: number
+  action: 'created' | 'updated' | 'deleted'
+  jobId?: number | null
+  createdAt: string
+}
+
+export type ChangeFeedHandlers = {
+  onChange: (event: ChangeEvent) => void
+  // The server could not replay the missed events; refetch whatever the page shows.
+  onReset?: () => void
+}
+
+const RETRY_MS = 3000
+
+/**
+ * Follow GET /events (server-sent events). Uses fetch rather than EventSource so the bearer token
+ * can be sent, and reconnects from the last seen sequence number. Returns an unsubscribe function.
+ */
+export function subscribeChanges(handlers: ChangeFeedHandlers): () => void {
+  const controller = new AbortController()
+  let lastSeq: number | null = null
+
+  function dispatch(block: string) {
+    let event = 'message'
+    let data = ''
+    for (const line of block.split('\n')) {
+      if (!line || line.startsWith(':')) continue
+      const colon = line.indexOf(':')
+      const field = colon < 0 ? line : line.slice(0, colon)
+      const value = colon < 0 ? '' : line.slice(colon + 1).replace(/^ /, '')
+      if (field === 'event') event = value
+      else if (field === 'data') data = data ? `${data}\n${value}` : value
+      else if (field === 'id' && /^\d+$/.test(value)) lastSeq = Number(value)
+    }
+    if (event === 'change' && data) handlers.onChange(JSON.parse(data) as ChangeEvent)
+    else if (event === 'reset') handlers.onReset?.()
+  }
+
+  async function run() {
+    while (!controller.signal.aborted) {
+      try {
+        const token = getAccessToken()
+        const qs = lastSeq !== null ? `?since=${lastSeq}` : ''
+        const response = await fetch(`${getBaseUrl().replace(/\/+$/, '')}/events${qs}`, {
+          headers: { Accept: 'text/event-stream', ...(token ? { Authorization: `Bearer ${token}` } : {}) },
+          signal: controller.signal,
+        })
+        if (response.ok && response.body) {
+          const reader = response.body.pipeThrough(new TextDecoderStream()).getReader()
+          let buffer = ''
+          for (;;) {
+            const { value, done } = await reader.read()
+            if (done) break
+            buffer += value.replace(/\r\n?/g, '\n')
+            let end = buffer.indexOf('\n\n')
+            while (end >= 0) {
+              dispatch(buffer.slice(0, end))
+              buffer = buffer.slice(end + 2)
+              end = buffer.indexOf('\n\n')
+            }
+          }
+        }
+      } catch {
+        if (controller.signal.aborted) return
+      }
+      await new Promise((resolve) => setTimeout(resolve, RETRY_MS))
+    }
+  }
+
+  run()
+  return () => controller.abort()
+}
+
+/** subscribeChanges for the lifetime of a component; the latest handlers are always used. */
+export function useChangeFeed(onChange: ChangeFeedHandlers['onChange'], onReset?: ChangeFeedHandlers['onReset']) {
+  const handlers = useRef<ChangeFeedHandlers>({ onChange, onReset })
+  handlers.current = { onChange, onReset }
+
+  useEffect(
+    () =>
+      subscribeChanges({
+        onChange: (event) => handlers.current.onChange(event),
+        onReset: () => handlers.current.onReset?.(),
+      }),
+    [],
+  )
+}
+
+/** Replace the item with the same id, or put it first when it is new. */
+export function upsertById<T extends { id: number }>(items: T[], item: T): T[] {
+  return items.some((existing) => existing.id === item.id)
+    ? items.map((existing) => (existing.id === item.id ? item : existing))
+    : [item, ...items]
+}
@@ -1,4 +1,4 @@
-type HttpMethod = 'GET' | 'POST' | 'PUT' | 'DELETE'
+type HttpMethod = 'GET' | 'POST' | 'PUT' | 'PATCH' | 'DELETE'
 
 export class ApiError extends Error {
   status: number
@@ -17,7 +17,7 @@ const DEFAULT_BASE_URL = 'http://localhost:8000/api/v1'
 const ACCESS_TOKEN_KEY = 'access_token'
 const REFRESH_TOKEN_KEY = 'refresh_token'
 
-function getAccessToken(): string | null {
+export function getAccessToken(): string | null {
   return localStorage.getItem(ACCESS_TOKEN_KEY)
 }
 
@@ -35,7 +35,7 @@ function clearTokens() {
   localStorage.removeItem(REFRESH_TOKEN_KEY)
 }
 
-function getBaseUrl(): string {
+export function getBaseUrl(): string {
   const value = import.meta.env.VITE_API_BASE_URL as string | undefined
   return (value && value.trim()) || DEFAULT_BASE_URL
 }
@@ -50,7 +50,12 @@ async function parseJsonSafely(response: Response): Promise<unknown> {
   }
 }
 
-export async function request<T>(path: string, options?: { method?: HttpMethod; body?: unknown }): Promise<T> {
+// idempotencyKey: sent as Idempotency-Key, so a retried POST replays the first response instead of
+// running again. Reuse the same key when retrying the same action.
+export async function request<T>(
+  path: string,
+  options?: { method?: HttpMethod; body?: unknown; idempotencyKey?: string },
+): Promise<T> {
   const baseUrl = getBaseUrl().replace(/\/+$/, '')
   const normalizedPath = path.startsWith('/') ? path : `/${path}`
 
@@ -61,6 +66,7 @@ export async function request<T>(path: string, options?: { method?: HttpMethod;
       headers: {
         'Content-Type': 'application/json',
         ...(withAuth && token ? { Authorization: `Bearer ${token}` } : {}),
+        ...(options?.idempotencyKey ? { 'Idempotency-Key': options.idempotencyKey } : {}),
       },
       body: options?.body === undefined ? undefined : JSON.stringify(options.body),
     })
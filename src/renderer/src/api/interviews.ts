@@ -1,10 +1,11 @@
-import { request } from './http'
-import type { Interview } from './types'
+import { ApiError, getAccessToken, getBaseUrl, request } from './http'
+import type { Availability, Interview, InterviewBatchResult, InterviewTranscript } from './types'
 
 export type InterviewCreate = {
   jobId: number
   resumeId: number
   scheduledAt?: string | null
+  durationMinutes?: number
   status?: 'scheduled' | 'completed' | 'canceled'
 
   interviewRound?: string
@@ -28,6 +29,19 @@ export function listInterviews(params?: { jobId?: number; resumeId?: number; sta
   return request<Interview[]>(`/interviews${qs}`)
 }
 
+// Times are ISO strings; the server answers in UTC.
+export function getAvailability(params: {
+  interviewers: string[]
+  start: string
+  end: string
+  minMinutes?: number
+}): Promise<Availability> {
+  const parts = params.interviewers.map((name) => `interviewer=${encodeURIComponent(name)}`)
+  parts.push(`start=${encodeURIComponent(params.start)}`, `end=${encodeURIComponent(params.end)}`)
+  if (params.minMinutes) parts.push(`min_minutes=${params.minMinutes}`)
+  return request<Availability>(`/interviews/availability?${parts.join('&')}`)
+}
+
 export function getInterview(interviewId: number): Promise<Interview> {
   return request<Interview>(`/interviews/${interviewId}`)
 }
@@ -43,3 +57,43 @@ export function updateInterview(interviewId: number, data: InterviewUpdate): Pro
 export function deleteInterview(interviewId: number): Promise<{ ok: boolean }> {
   return request<{ ok: boolean }>(`/interviews/${interviewId}`, { method: 'DELETE' })
 }
+
+// With atomic, nothing is written unless every item succeeds; otherwise valid items are written and the rest reported.
+export function createInterviews(items: InterviewCreate[], atomic = false): Promise<InterviewBatchResult> {
+  return request<InterviewBatchResult>('/interviews/batch', { method: 'POST', body: { items, atomic } })
+}
+
+export function updateInterviews(items: (InterviewUpdate & { id: number })[], atomic = false): Promise<InterviewBatchResult> {
+  return request<InterviewBatchResult>('/interviews/batch', { method: 'PATCH', body: { items, atomic } })
+}
+
+export function cancelInterviews(ids: number[], atomic = false): Promise<InterviewBatchResult> {
+  return request<InterviewBatchResult>('/interviews/batch/cancel', { method: 'POST', body: { ids, atomic } })
+}
+
+export function getTranscript(interviewId: number, includeText = false): Promise<InterviewTranscript> {
+  return request<InterviewTranscript>(`/interviews/${interviewId}/transcript${includeText ? '?include_text=true' : ''}`)
+}
+
+export function summarizeTranscript(interviewId: number): Promise<InterviewTranscript> {
+  return request<InterviewTranscript>(`/interviews/${interviewId}/transcript/summarize`, { method: 'POST' })
+}
+
+// The transcript goes up as the raw text body (streamed and compressed server-side), not as JSON.
+export async function uploadTranscript(interviewId: number, text: string | Blob, summarize = true): Promise<InterviewTranscript> {
+  const token = getAccessToken()
+  const response = await fetch(
+    `${getBaseUrl().replace(/\/+$/, '')}/interviews/${interviewId}/transcript?summarize=${summarize}`,
+    {
+      method: 'PUT',
+      headers: { 'Content-Type': 'text/plain; charset=utf-8', ...(token ? { Authorization: `Bearer ${token}` } : {}) },
+      body: text,
+    },
+  )
+  const payload = await response.json().catch(() => null)
+  if (!response.ok) {
+    const detail = payload && typeof payload === 'object' && 'detail' in payload ? payload.detail : payload
+    throw new ApiError(`API request failed: ${response.status}`, response.status, detail)
+  }
+  return payload as InterviewTranscript
+}
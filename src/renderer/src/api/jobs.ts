@@ -1,11 +1,11 @@
 import { request } from './http'
-import type { Job } from './types'
+import type { Job, JobListItem, QuestionBank } from './types'
 
 export type JobCreate = Omit<Job, 'id' | 'createdAt'>
 export type JobUpdate = Partial<JobCreate>
 
-export function listJobs(): Promise<Job[]> {
-  return request<Job[]>('/jobs')
+export function listJobs(): Promise<JobListItem[]> {
+  return request<JobListItem[]>('/jobs')
 }
 
 export function getJob(jobId: number): Promise<Job> {
@@ -23,3 +23,12 @@ export function updateJob(jobId: number, data: JobUpdate): Promise<Job> {
 export function deleteJob(jobId: number): Promise<{ ok: boolean }> {
   return request<{ ok: boolean }>(`/jobs/${jobId}`, { method: 'DELETE' })
 }
+
+export function getJobQuestions(jobId: number, params?: { resumeId?: number }): Promise<QuestionBank> {
+  const qs = params?.resumeId ? `?resume_id=${params.resumeId}` : ''
+  return request<QuestionBank>(`/jobs/${jobId}/questions${qs}`)
+}
+
+export function regenerateJobQuestions(jobId: number): Promise<QuestionBank> {
+  return request<QuestionBank>(`/jobs/${jobId}/questions/generate`, { method: 'POST' })
+}
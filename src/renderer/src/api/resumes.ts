@@ -1,5 +1,5 @@
 import { request } from './http'
-import type { Resume } from './types'
+import type { Resume, ResumeDuplicate, ResumeListItem } from './types'
 
 export type ResumeCreate = {
   candidateName: string
@@ -10,15 +10,31 @@ export type ResumeCreate = {
   skills?: string[]
 }
 
-export function listResumes(params?: { jobId?: number }): Promise<Resume[]> {
-  const qs = params?.jobId ? `?job_id=${encodeURIComponent(params.jobId)}` : ''
-  return request<Resume[]>(`/resumes${qs}`)
+export function listResumes(params?: { jobId?: number; skill?: string }): Promise<ResumeListItem[]> {
+  const parts: string[] = []
+  if (params?.jobId) parts.push(`job_id=${encodeURIComponent(params.jobId)}`)
+  if (params?.skill) parts.push(`skill=${encodeURIComponent(params.skill)}`)
+  const qs = parts.length ? `?${parts.join('&')}` : ''
+  return request<ResumeListItem[]>(`/resumes${qs}`)
 }
 
 export function getResume(resumeId: number): Promise<Resume> {
   return request<Resume>(`/resumes/${resumeId}`)
 }
 
-export function createResume(data: ResumeCreate): Promise<Resume> {
-  return request<Resume>('/resumes', { method: 'POST', body: data })
+// The list row for a resume fetched in full, without the detail-only fields.
+export function toResumeListItem(resume: Resume): ResumeListItem {
+  // eslint-disable-next-line @typescript-eslint/no-unused-vars
+  const { resumeText, aiSummary, matchHighlights, duplicateSimilarity, ...item } = resume
+  return item
+}
+
+export function listResumeDuplicates(resumeId: number, minSimilarity?: number): Promise<ResumeDuplicate[]> {
+  const qs = minSimilarity != null ? `?min_similarity=${encodeURIComponent(minSimilarity)}` : ''
+  return request<ResumeDuplicate[]>(`/resumes/${resumeId}/duplicates${qs}`)
+}
+
+// Pass the same idempotencyKey when retrying, so a retry cannot create a second resume.
+export function createResume(data: ResumeCreate, idempotencyKey: string = crypto.randomUUID()): Promise<Resume> {
+  return request<Resume>('/resumes', { method: 'POST', body: data, idempotencyKey })
 }
@@ -16,6 +16,9 @@ export type Job = {
   aiQuestionGenEnabled: boolean
 }
 
+// List endpoints omit the long text/JSON fields; fetch the detail endpoint for those.
+export type JobListItem = Omit<Job, 'description'>
+
 export type Resume = {
   id: number
   candidateName: string
@@ -32,6 +35,20 @@ export type Resume = {
   aiSummary?: string | null
   matchHighlights: string[]
   analysisId?: number | null
+  duplicateOfId?: number | null
+  duplicateSimilarity?: number | null
+}
+
+export type ResumeListItem = Omit<Resume, 'resumeText' | 'aiSummary' | 'matchHighlights' | 'duplicateSimilarity'>
+
+export type ResumeDuplicate = {
+  resumeId: number
+  candidateName: string
+  jobId: number
+  appliedJobTitle?: string | null
+  status: ResumeStatus
+  submittedAt: string
+  similarity: number
 }
 
 export type AIAnalysis = {
@@ -54,6 +71,35 @@ export type AIAnalysis = {
 
   isMock: boolean
   rawResponse: Record<string, unknown>
+
+  routeTier?: string
+  estimatedPromptTokens?: number
+  latencyMs?: number
+  promptTokens?: number
+  outputTokens?: number
+  cachedTokens?: number
+  requestedById?: number | null
+  reusedFromId?: number | null
+}
+
+export type AIAnalysisListItem = Omit<AIAnalysis, 'summary' | 'strengths' | 'risks' | 'suggestedQuestions' | 'rawResponse'>
+
+export type InterviewQuestion = {
+  id: number
+  // 'job': generated once for the job; 'candidate': suggested by this resume's analysis.
+  source: 'job' | 'candidate'
+  category: string
+  question: string
+  timesSuggested: number
+}
+
+export type QuestionBank = {
+  jobId: number
+  generatedAt?: string | null
+  model: string
+  isMock: boolean
+  stale: boolean
+  questions: InterviewQuestion[]
 }
 
 export type InterviewStatus = 'scheduled' | 'completed' | 'canceled'
@@ -63,6 +109,8 @@ export type Interview = {
   jobId: number
   resumeId: number
   scheduledAt?: string | null
+  durationMinutes: number
+  endsAt?: string | null
   status: InterviewStatus
 
   interviewRound: string
@@ -82,6 +130,65 @@ export type Interview = {
   candidateName?: string | null
 }
 
+// Body of a 409 from POST/PUT /interviews when the interviewer is already booked.
+export type InterviewConflict = {
+  id: number
+  resumeId: number
+  interviewer: string
+  scheduledAt: string
+  endsAt: string
+}
+
+// Per-item result of the /interviews/batch endpoints; statusCode 424 = valid but not written (atomic batch failed).
+export type InterviewBatchItem = {
+  index: number
+  ok: boolean
+  statusCode: number
+  error?: string | null
+  conflicts: InterviewConflict[]
+  interview?: Interview | null
+}
+
+export type InterviewBatchResult = {
+  committed: boolean
+  succeeded: number
+  failed: number
+  results: InterviewBatchItem[]
+}
+
+export type TimeSlot = { start: string; end: string }
+
+export type InterviewerAvailability = {
+  interviewer: string
+  busy: TimeSlot[]
+  free: TimeSlot[]
+}
+
+export type Availability = {
+  start: string
+  end: string
+  interviewers: InterviewerAvailability[]
+  commonFree: TimeSlot[]
+}
+
+export type InterviewTranscript = {
+  interviewId: number
+  size: number
+  uploadedAt: string
+  status: 'pending' | 'summarizing' | 'done' | 'failed'
+  chunkCount: number
+  chunksDone: number
+  // Model JSON as returned (snake_case keys): overall_score, recommendation, summary, strengths, ...
+  evaluation: Record<string, unknown>
+  model: string
+  isMock: boolean
+  promptTokens: number
+  outputTokens: number
+  error: string
+  summarizedAt?: string | null
+  text?: string | null
+}
+
 export type AuthTokens = {
   accessToken: string
   refreshToken?: string | null
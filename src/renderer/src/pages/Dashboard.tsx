@@ -3,15 +3,17 @@ import { Link } from 'react-router-dom'
 import { StatCard } from '../components/StatCard'
 import { Badge } from '../components/Badge'
 import { ProgressBar } from '../components/ProgressBar'
+import { useChangeFeed } from '../api/events'
 import { listJobs } from '../api/jobs'
 import { listResumes } from '../api/resumes'
-import type { Job, Resume } from '../api/types'
+import type { JobListItem, ResumeListItem } from '../api/types'
 import { formatDate, formatJobStatus, formatResumeStatus } from '../utils/format'
 
 export function DashboardPage() {
-  const [jobs, setJobs] = useState<Job[] | null>(null)
-  const [resumes, setResumes] = useState<Resume[] | null>(null)
+  const [jobs, setJobs] = useState<JobListItem[] | null>(null)
+  const [resumes, setResumes] = useState<ResumeListItem[] | null>(null)
   const [error, setError] = useState<string | null>(null)
+  const [version, setVersion] = useState(0)
 
   useEffect(() => {
     let cancelled = false
@@ -33,7 +35,15 @@ export function DashboardPage() {
     return () => {
       cancelled = true
     }
-  }, [])
+  }, [version])
+
+  // The dashboard only shows counts and the newest few rows: reload on job / resume changes.
+  useChangeFeed(
+    (event) => {
+      if (event.entity === 'job' || event.entity === 'resume') setVersion((v) => v + 1)
+    },
+    () => setVersion((v) => v + 1),
+  )
 
   const metrics = useMemo(() => {
     const safeJobs = jobs ?? []
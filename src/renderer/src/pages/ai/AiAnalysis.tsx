@@ -2,9 +2,10 @@ import { useEffect, useMemo, useState } from 'react'
 import { Link, useParams } from 'react-router-dom'
 import { Badge } from '../../components/Badge'
 import { ProgressBar } from '../../components/ProgressBar'
-import { createAnalysis, listAnalyses } from '../../api/aiAnalyses'
+import { createAnalysis, getAnalysis, listAnalyses } from '../../api/aiAnalyses'
+import { getJobQuestions } from '../../api/jobs'
 import { getResume } from '../../api/resumes'
-import type { AIAnalysis, Resume } from '../../api/types'
+import type { AIAnalysis, AIAnalysisListItem, QuestionBank, Resume } from '../../api/types'
 
 function scoreToTone(score: number) {
   if (score >= 85) return 'success' as const
@@ -17,11 +18,12 @@ export function AiAnalysisPage() {
   const numericResumeId = resumeId ? Number(resumeId) : null
   const [resume, setResume] = useState<Resume | null>(null)
   const [analysis, setAnalysis] = useState<AIAnalysis | null>(null)
-  const [analyses, setAnalyses] = useState<AIAnalysis[] | null>(null)
+  const [analyses, setAnalyses] = useState<AIAnalysisListItem[] | null>(null)
   const [error, setError] = useState<string | null>(null)
   const [busy, setBusy] = useState(false)
   const [extraConditions, setExtraConditions] = useState('')
   const [rebusy, setRebusy] = useState(false)
+  const [questionBank, setQuestionBank] = useState<QuestionBank | null>(null)
 
   useEffect(() => {
     let cancelled = false
@@ -57,7 +59,9 @@ export function AiAnalysisPage() {
         const existing = await listAnalyses({ resumeId: r.id })
         if (cancelled) return
         if (existing.length) {
-          setAnalysis(existing[0])
+          const full = await getAnalysis(existing[0].id)
+          if (cancelled) return
+          setAnalysis(full)
           return
         }
 
@@ -89,6 +93,35 @@ export function AiAnalysisPage() {
     }
   }, [resumeId, numericResumeId])
 
+  // Job-level questions come from the job's cached bank; the analysis only adds this candidate's.
+  useEffect(() => {
+    if (!resume || !analysis) {
+      setQuestionBank(null)
+      return
+    }
+    let cancelled = false
+    getJobQuestions(resume.jobId, { resumeId: resume.id })
+      .then((bank) => {
+        if (!cancelled) setQuestionBank(bank)
+      })
+      .catch(() => {
+        if (!cancelled) setQuestionBank(null)
+      })
+    return () => {
+      cancelled = true
+    }
+  }, [resume, analysis])
+
+  const questions = useMemo(() => {
+    if (!questionBank) {
+      return { job: [] as string[], candidate: analysis?.suggestedQuestions ?? [] }
+    }
+    return {
+      job: questionBank.questions.filter((q) => q.source === 'job').map((q) => q.question),
+      candidate: questionBank.questions.filter((q) => q.source === 'candidate').map((q) => q.question),
+    }
+  }, [questionBank, analysis])
+
   async function reanalyze() {
     if (!resume) return
     try {
@@ -281,11 +314,25 @@ export function AiAnalysisPage() {
         <div className="text-sm font-semibold text-slate-900">AI 建議摘要</div>
         <div className="mt-3 text-sm text-slate-700">{analysis?.summary ?? resume.aiSummary ?? '尚未產生摘要。'}</div>
 
-        {analysis?.suggestedQuestions?.length ? (
+        {questions.candidate.length ? (
+          <div className="mt-6">
+            <div className="text-sm font-semibold text-slate-900">針對此候選人的面試問題</div>
+            <ul className="mt-3 space-y-2 text-sm text-slate-700">
+              {questions.candidate.map((q) => (
+                <li key={q} className="rounded-md bg-slate-50 px-3 py-2">
+                  {q}
+                </li>
+              ))}
+            </ul>
+          </div>
+        ) : null}
+
+        {questions.job.length ? (
           <div className="mt-6">
-            <div className="text-sm font-semibold text-slate-900">建議面試問題</div>
+            <div className="text-sm font-semibold text-slate-900">職缺通用面試問題</div>
+            {questionBank?.stale ? <div className="mt-1 text-xs text-slate-500">職缺內容已更新，題庫稍後重新產生。</div> : null}
             <ul className="mt-3 space-y-2 text-sm text-slate-700">
-              {analysis.suggestedQuestions.map((q) => (
+              {questions.job.map((q) => (
                 <li key={q} className="rounded-md bg-slate-50 px-3 py-2">
                   {q}
                 </li>
@@ -3,7 +3,7 @@ import { Link, useNavigate, useParams } from 'react-router-dom'
 import { listJobs } from '../../api/jobs'
 import { listResumes } from '../../api/resumes'
 import { createInterview, getInterview, updateInterview } from '../../api/interviews'
-import type { Interview, Job, Resume } from '../../api/types'
+import type { Interview, InterviewConflict, JobListItem, ResumeListItem } from '../../api/types'
 
 function toDatetimeLocalValue(iso: string | null | undefined): string {
   if (!iso) return ''
@@ -18,17 +18,27 @@ function fromDatetimeLocalValue(value: string): string | null {
   return date.toISOString()
 }
 
+function describeError(err: any, fallback: string): string {
+  const conflicts: InterviewConflict[] | undefined = err?.status === 409 ? err?.detail?.conflicts : undefined
+  if (conflicts?.length) {
+    const times = conflicts.map((c) => `${new Date(c.scheduledAt).toLocaleString()}–${new Date(c.endsAt).toLocaleTimeString()}`)
+    return `面試官該時段已有其他面試：${times.join('、')}`
+  }
+  return err?.detail ? JSON.stringify(err.detail) : err?.message ?? fallback
+}
+
 export function InterviewFormPage({ mode }: { mode: 'create' | 'edit' }) {
   const navigate = useNavigate()
   const { interviewId } = useParams()
   const numericId = Number(interviewId)
 
-  const [jobs, setJobs] = useState<Job[]>([])
-  const [resumes, setResumes] = useState<Resume[]>([])
+  const [jobs, setJobs] = useState<JobListItem[]>([])
+  const [resumes, setResumes] = useState<ResumeListItem[]>([])
 
   const [jobId, setJobId] = useState<number | ''>('')
   const [resumeId, setResumeId] = useState<number | ''>('')
   const [scheduledAt, setScheduledAt] = useState<string>('')
+  const [durationMinutes, setDurationMinutes] = useState<number>(60)
   const [status, setStatus] = useState<Interview['status']>('scheduled')
   const [interviewRound, setInterviewRound] = useState('')
   const [interviewer, setInterviewer] = useState('')
@@ -82,6 +92,7 @@ export function InterviewFormPage({ mode }: { mode: 'create' | 'edit' }) {
         setJobId(it.jobId)
         setResumeId(it.resumeId)
         setScheduledAt(toDatetimeLocalValue(it.scheduledAt ?? null))
+        setDurationMinutes(it.durationMinutes ?? 60)
         setStatus(it.status)
         setInterviewRound(it.interviewRound)
         setInterviewer(it.interviewer)
@@ -136,6 +147,7 @@ export function InterviewFormPage({ mode }: { mode: 'create' | 'edit' }) {
                 jobId: jobId as number,
                 resumeId: resumeId as number,
                 scheduledAt: fromDatetimeLocalValue(scheduledAt),
+                durationMinutes,
                 status,
                 interviewRound,
                 interviewer,
@@ -155,7 +167,7 @@ export function InterviewFormPage({ mode }: { mode: 'create' | 'edit' }) {
                 navigate(`/interviews/${updated.id}`)
               }
             } catch (err: any) {
-              setError(err?.detail ? JSON.stringify(err.detail) : err?.message ?? '儲存失敗')
+              setError(describeError(err, '儲存失敗'))
             } finally {
               setSaving(false)
             }
@@ -203,6 +215,19 @@ export function InterviewFormPage({ mode }: { mode: 'create' | 'edit' }) {
             />
           </div>
 
+          <div>
+            <label className="block text-sm font-medium text-slate-700">面試長度（分鐘）</label>
+            <input
+              type="number"
+              min={5}
+              max={480}
+              step={5}
+              value={durationMinutes}
+              onChange={(e) => setDurationMinutes(Number(e.target.value) || 60)}
+              className="mt-2 w-full rounded-md border border-slate-200 bg-white px-3 py-2 text-sm text-slate-900 focus:outline-none focus:ring-2 focus:ring-slate-200"
+            />
+          </div>
+
           <div>
             <label className="block text-sm font-medium text-slate-700">狀態</label>
             <select
@@ -1,6 +1,7 @@
 import { useEffect, useState } from 'react'
 import { Link } from 'react-router-dom'
 import { Badge } from '../../components/Badge'
+import { useChangeFeed } from '../../api/events'
 import { deleteInterview, listInterviews } from '../../api/interviews'
 import type { Interview } from '../../api/types'
 
@@ -50,6 +51,17 @@ export function InterviewsListPage() {
     refresh()
   }, [])
 
+  useChangeFeed((event) => {
+    if (event.entity === 'interview' && event.action === 'deleted') {
+      setItems((prev) => prev && prev.filter((item) => item.id !== event.entityId))
+    } else if (event.entity === 'job' && event.action === 'deleted') {
+      setItems((prev) => prev && prev.filter((item) => item.jobId !== event.jobId))
+    } else if (event.entity === 'interview') {
+      // New and edited rows carry joined job / candidate names, so take them from the list endpoint.
+      refresh()
+    }
+  }, refresh)
+
   return (
     <div className="space-y-4">
       <div className="flex flex-wrap items-start justify-between gap-3">
@@ -2,11 +2,11 @@ import { useEffect, useState } from 'react'
 import { Link } from 'react-router-dom'
 import { Badge } from '../../components/Badge'
 import { deleteJob, listJobs } from '../../api/jobs'
-import type { Job } from '../../api/types'
+import type { JobListItem } from '../../api/types'
 import { formatDate, formatJobStatus } from '../../utils/format'
 
 export function JobsListPage() {
-  const [jobs, setJobs] = useState<Job[] | null>(null)
+  const [jobs, setJobs] = useState<JobListItem[] | null>(null)
   const [error, setError] = useState<string | null>(null)
   const [busyId, setBusyId] = useState<number | null>(null)
 
@@ -3,11 +3,11 @@ import { Link, useNavigate } from 'react-router-dom'
 import { TagInput } from '../../components/TagInput'
 import { listJobs } from '../../api/jobs'
 import { createResume } from '../../api/resumes'
-import type { Job } from '../../api/types'
+import type { JobListItem } from '../../api/types'
 
 export function ResumeFormPage() {
   const navigate = useNavigate()
-  const [jobs, setJobs] = useState<Job[]>([])
+  const [jobs, setJobs] = useState<JobListItem[]>([])
   const [jobId, setJobId] = useState<number | ''>('')
 
   const [candidateName, setCandidateName] = useState('')
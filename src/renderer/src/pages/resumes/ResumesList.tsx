@@ -2,12 +2,13 @@ import { useEffect, useState } from 'react'
 import { Link } from 'react-router-dom'
 import { Badge } from '../../components/Badge'
 import { ProgressBar } from '../../components/ProgressBar'
-import { listResumes } from '../../api/resumes'
-import type { Resume } from '../../api/types'
+import { useChangeFeed, upsertById } from '../../api/events'
+import { getResume, listResumes, toResumeListItem } from '../../api/resumes'
+import type { ResumeListItem } from '../../api/types'
 import { formatDate, formatResumeStatus } from '../../utils/format'
 
 export function ResumesListPage() {
-  const [resumes, setResumes] = useState<Resume[] | null>(null)
+  const [resumes, setResumes] = useState<ResumeListItem[] | null>(null)
   const [error, setError] = useState<string | null>(null)
 
   useEffect(() => {
@@ -30,6 +31,24 @@ export function ResumesListPage() {
     }
   }, [])
 
+  // Patch the list from the change feed instead of refetching it.
+  useChangeFeed(
+    (event) => {
+      if (event.entity === 'job' && event.action === 'deleted') {
+        setResumes((prev) => prev && prev.filter((r) => r.jobId !== event.jobId))
+      } else if (event.entity === 'resume') {
+        getResume(event.entityId)
+          .then((resume) => setResumes((prev) => prev && upsertById(prev, toResumeListItem(resume))))
+          .catch(() => {})
+      }
+    },
+    () => {
+      listResumes()
+        .then(setResumes)
+        .catch(() => {})
+    },
+  )
+
   return (
     <div className="space-y-4">
       <div className="flex flex-wrap items-start justify-between gap-3">